@@ -62,4 +62,31 @@ def create_app(config_class=Config):
     # Mobile-specific endpoints
     api.add_namespace(notifications_ns, path='/api/mobile/notifications')
 
+    if Config.MODEL_WARMUP == 'preload':
+        # Under gunicorn's preload_app this runs once in the master; threads and
+        # database connections must wait for the fork (see gunicorn.conf.py post_fork)
+        from app.services.model_registry import warm_models
+        warm_models()
+    else:
+        start_background_services()
+
     return app
+
+
+def start_background_services():
+    """Per-process background threads; call once in each worker after forking"""
+    # In-process workers for the queued /resumes/apply and /resumes/add_client pipeline, for
+    # local development only; deployments run app.commands.pipeline_worker as its own process
+    if Config.PIPELINE_WORKERS > 0:
+        from app.services.job_apply.pipeline import start_pipeline_workers
+        start_pipeline_workers()
+
+    # Arabic job pages queue translations instead of waiting for them. The translation-worker
+    # service drains the queue; web processes only do so when TRANSLATION_WEB_WORKERS is set
+    if Config.TRANSLATION_WEB_WORKERS > 0:
+        from app.services.job_translation_worker import start_translation_worker
+        start_translation_worker(threads=Config.TRANSLATION_WEB_WORKERS)
+
+    if Config.MODEL_WARMUP == 'background':
+        from app.services.model_registry import warm_models_in_background
+        warm_models_in_background()
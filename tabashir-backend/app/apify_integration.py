@@ -1,15 +1,24 @@
 import os
+import sys
 import requests
+from pathlib import Path
 from typing import List, Dict, Any
-import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+# Run as a script (python app/apify_integration.py), the backend root is not on sys.path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database.db import ai_db_connection
+from app.services.job_apply.job_features import store_job_features
+from app.services.job_apply.ranking import rank_new_jobs
+from app.services.job_apply.skill_model import refresh_skill_model
+
 load_dotenv()
 
 APIFY_API_TOKEN = os.getenv('APIFY_API_TOKEN')
 APIFY_ACTOR_ID = 'bebity~linkedin-jobs-scraper'
-DATABASE_URL = os.getenv('AI_DATABASE_URL')
 
 def get_apify_jobs() -> List[Dict[str, Any]]:
     """
@@ -55,50 +64,64 @@ def sync_apify_jobs():
         # Get jobs from Apify
         apify_jobs = get_apify_jobs()
         
-        # Connect to database
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        
-        # Get existing job IDs
-        cur.execute("SELECT id FROM jobs WHERE source = 'Apify'")
-        existing_ids = {row[0] for row in cur.fetchall()}
-        
-        # Process new jobs
-        new_jobs = []
-        for job in apify_jobs:
-            if job['id'] not in existing_ids:
-                mapped_job = map_apify_to_db_job(job)
-                new_jobs.append(mapped_job)
-        
+        # Check out a pooled AI database connection
+        with ai_db_connection() as conn:
+            cur = conn.cursor()
+            try:
+                # Get existing job IDs
+                cur.execute("SELECT id FROM jobs WHERE source = 'Apify'")
+                existing_ids = {row[0] for row in cur.fetchall()}
+                
+                # Process new jobs
+                new_jobs = []
+                for job in apify_jobs:
+                    if job['id'] not in existing_ids:
+                        mapped_job = map_apify_to_db_job(job)
+                        new_jobs.append(mapped_job)
+                
+                if new_jobs:
+                    # Prepare insert query
+                    columns = new_jobs[0].keys()
+                    query = f"""
+                        INSERT INTO jobs ({', '.join(columns)})
+                        VALUES %s
+                        ON CONFLICT (id) DO NOTHING
+                    """
+                    
+                    # Prepare values for bulk insert
+                    values = [[job[col] for col in columns] for job in new_jobs]
+                    
+                    # Execute bulk insert
+                    execute_values(cur, query, values)
+                    conn.commit()
+
+                    # Precompute scoring features while the job text is at hand
+                    try:
+                        store_job_features(new_jobs, conn=conn)
+                    except Exception as e:
+                        print(f"Error storing job features: {str(e)}")
+
+                    print(f"Successfully inserted {len(new_jobs)} new jobs")
+                else:
+                    print("No new jobs to insert")
+            finally:
+                cur.close()
+
         if new_jobs:
-            # Prepare insert query
-            columns = new_jobs[0].keys()
-            query = f"""
-                INSERT INTO jobs ({', '.join(columns)})
-                VALUES %s
-                ON CONFLICT (id) DO NOTHING
-            """
-            
-            # Prepare values for bulk insert
-            values = [[job[col] for col in columns] for job in new_jobs]
-            
-            # Execute bulk insert
-            execute_values(cur, query, values)
-            conn.commit()
-            
-            print(f"Successfully inserted {len(new_jobs)} new jobs")
-        else:
-            print("No new jobs to insert")
+            # Refit skill matching on the grown corpus so new jobs get precomputed vectors
+            try:
+                refresh_skill_model()
+            except Exception as e:
+                print(f"Error refreshing skill model: {str(e)}")
+
+            # Score just these jobs against active clients; runs inline because cron exits with the script
+            try:
+                rank_new_jobs([job['id'] for job in new_jobs])
+            except Exception as e:
+                print(f"Error ranking new jobs: {str(e)}")
             
     except Exception as e:
         print(f"Error syncing jobs: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
 
 if __name__ == '__main__':
     sync_apify_jobs() 
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of the title/location similarity backends
+Usage: python -m app.commands.benchmark_similarity [--pairs N] [--no-db]
+
+Times the static word-vector table against spaCy Doc.similarity on
+(job title, position) pairs and reports how closely their scores agree.
+Pairs are sampled from the AI database's jobs table, or from a built-in
+list when the database is unavailable or --no-db is given.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+SAMPLE_TEXTS = [
+    "Software Engineer", "Senior Backend Developer", "Data Scientist", "Machine Learning Engineer",
+    "Accountant", "Financial Analyst", "Sales Manager", "Marketing Executive", "Civil Engineer",
+    "Mechanical Engineer", "HR Coordinator", "Registered Nurse", "Pharmacist", "Teacher",
+    "Project Manager", "Graphic Designer", "Customer Service Representative", "Receptionist",
+    "Dubai", "Abu Dhabi", "Sharjah", "Ajman", "Al Ain", "Ras Al Khaimah", "Fujairah",
+]
+
+
+def load_texts(use_db, limit):
+    """Distinct job titles and cities from the AI database, else SAMPLE_TEXTS"""
+    if use_db:
+        try:
+            from app.database.db import execute_ai_query
+            rows = execute_ai_query(
+                "SELECT job_title, vacancy_city FROM jobs ORDER BY id DESC LIMIT %s",
+                (limit,), fetch_all=True
+            ) or []
+            texts = {value for row in rows for value in (row['job_title'], row['vacancy_city']) if value}
+            if len(texts) > 1:
+                return sorted(texts)
+        except Exception as e:
+            print(f"Falling back to built-in samples: {e}")
+    return SAMPLE_TEXTS
+
+
+def time_backend(similarity, pairs):
+    """Per-pair latencies in milliseconds and the scores returned"""
+    latencies, scores = [], []
+    for text_a, text_b in pairs:
+        started = time.perf_counter()
+        score = similarity(text_a, text_b)
+        latencies.append((time.perf_counter() - started) * 1000)
+        scores.append(score)
+    return latencies, scores
+
+
+def summarize(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:>8}: mean {statistics.mean(latencies):.3f} ms, p95 {p95:.3f} ms over {len(latencies)} pairs")
+
+
+def main():
+    """Run both backends over the same pairs and print latency and agreement"""
+    parser = argparse.ArgumentParser(description="Benchmark similarity backends")
+    parser.add_argument('--pairs', type=int, default=2000, help="number of text pairs to score")
+    parser.add_argument('--no-db', action='store_true', help="use the built-in sample texts")
+    args = parser.parse_args()
+
+    from app.services.job_apply.ai_matching import get_nlp
+    from app.services.job_apply.word_vectors import get_word_vectors
+
+    texts = load_texts(not args.no_db, args.pairs)
+    rng = random.Random(0)
+    pairs = [tuple(rng.sample(texts, 2)) for _ in range(args.pairs)]
+
+    results = {}
+    vectors = get_word_vectors()
+    if vectors is not None:
+        results['static'] = time_backend(vectors.similarity, pairs)
+        summarize('static', results['static'][0])
+    else:
+        print("  static: no word vectors built (python -m app.commands.build_word_vectors)")
+
+    nlp = get_nlp()
+    if nlp is not None:
+        results['spacy'] = time_backend(lambda a, b: nlp(a).similarity(nlp(b)), pairs)
+        summarize('spacy', results['spacy'][0])
+    else:
+        print("   spacy: en_core_web_sm is not installed")
+
+    if len(results) == 2:
+        both = [(s, p) for s, p in zip(results['static'][1], results['spacy'][1]) if s is not None]
+        if len(both) > 1:
+            static_scores, spacy_scores = np.array(both, dtype=float).T
+            correlation = float(np.corrcoef(static_scores, spacy_scores)[0, 1])
+            difference = float(np.mean(np.abs(static_scores - spacy_scores)))
+            print(f"agreement: pearson {correlation:.3f}, mean |diff| {difference:.3f} "
+                  f"on {len(both)} pairs with static coverage")
+        speedup = statistics.mean(results['spacy'][0]) / max(statistics.mean(results['static'][0]), 1e-9)
+        print(f"  speedup: {speedup:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Management command to build the memory-mapped word-vector table
+Usage: python -m app.commands.build_word_vectors <glove-or-fasttext.txt> [--max-words N] [--output DIR]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import Config
+from app.services.job_apply.word_vectors import StaticWordVectors
+
+
+def main():
+    """Convert a text embedding file into words.npy + vectors.npy"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help="GloVe/fastText text file (word followed by its vector on each line)")
+    parser.add_argument('--max-words', type=int, default=200000, help="keep the N most frequent words")
+    parser.add_argument('--output', default=str(Config.WORD_VECTORS_PATH), help="output directory")
+    args = parser.parse_args()
+
+    try:
+        count = StaticWordVectors.build(args.source, args.output, max_words=args.max_words)
+    except OSError as e:
+        print(f"Could not build word vectors: {e}")
+        sys.exit(1)
+    table = StaticWordVectors(args.output)
+    size_mb = (table.vectors.nbytes + table.words.nbytes) / (1024 * 1024)
+    print(f"Wrote {count} words x {table.dim} dims ({size_mb:.1f} MB) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Management command to profile app start-up imports
+Usage: python -m app.commands.import_profile [--top N] [--budget SECONDS] [--module run]
+
+Imports the app in a fresh interpreter with `python -X importtime`, prints the
+slowest top-level packages and the total, and exits non-zero when the total
+exceeds the budget (Config.STARTUP_IMPORT_BUDGET_SECONDS) or when a module
+that must stay lazy (see LAZY_MODULES) was imported at start-up.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import Config
+
+# Loaded on first use by app.services.model_registry and the matchers
+LAZY_MODULES = ('spacy', 'sklearn')
+
+
+def profile_imports(module='run'):
+    """
+    Import `module` in a subprocess with background work disabled.
+
+    Returns:
+        {top-level package: seconds spent importing its own modules}
+    """
+    env = {**os.environ, 'MODEL_WARMUP': 'lazy', 'PIPELINE_WORKERS': '0', 'TRANSLATION_WEB_WORKERS': '0'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        # Self times add up to the total without double-counting nested imports
+        top = name.strip().split('.')[0]
+        packages[top] = packages.get(top, 0.0) + int(self_us) / 1e6
+    return packages
+
+
+def main():
+    """Print the import profile and enforce the start-up budget"""
+    parser = argparse.ArgumentParser(description="Profile app start-up imports")
+    parser.add_argument('--top', type=int, default=15, help="number of packages to list")
+    parser.add_argument('--budget', type=float, default=Config.STARTUP_IMPORT_BUDGET_SECONDS,
+                        help="maximum total import time in seconds")
+    parser.add_argument('--module', default='run', help="module to import")
+    args = parser.parse_args()
+
+    packages = profile_imports(args.module)
+    total = sum(packages.values())
+    for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{seconds:8.3f}s  {name}")
+    print(f"{total:8.3f}s  total (budget {args.budget:.1f}s)")
+
+    eager = [name for name in LAZY_MODULES if name in packages]
+    if eager:
+        print(f"Imported at start-up but should be lazy: {', '.join(eager)}")
+    if eager or total > args.budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
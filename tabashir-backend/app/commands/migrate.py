@@ -0,0 +1,37 @@
+"""
+Management command to apply AI database schema migrations
+Usage: python -m app.commands.migrate [--dry-run]
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database.migrations import run_migrations
+
+
+def main():
+    """Apply pending migrations from migrations/ai, exiting non-zero on failure"""
+    dry_run = '--dry-run' in sys.argv[1:]
+    try:
+        applied = run_migrations(dry_run=dry_run)
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        sys.exit(1)
+
+    label = "Pending" if dry_run else "Applied"
+    print(f"{label} migrations: {', '.join(applied) if applied else 'none'}")
+
+    if not dry_run:
+        # Deploys that bump the scoring version or change the similarity backend leave the old cached scores unread
+        from app.services.job_apply.match_cache import prune_match_scores
+        try:
+            print(f"Pruned {prune_match_scores()} match scores from older scoring versions or similarity backends")
+        except Exception as e:
+            print(f"Could not prune match scores: {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Management command to run dedicated pipeline workers for /resumes/apply and /resumes/add_client
+Usage: python -m app.commands.pipeline_worker [--threads N]
+
+This is how the pipeline runs in production (the `pipeline-worker` service in
+docker-compose.yml): CV processing, ranking and applications are CPU-heavy and
+would otherwise compete with request handling for the GIL and the gunicorn
+worker timeout. Web processes keep PIPELINE_WORKERS=0 and only enqueue.
+Several of these processes may run at once; jobs are leased, never shared.
+"""
+
+import sys
+import signal
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import Config
+from app.services.job_apply.pipeline import start_pipeline_workers, stop_pipeline_workers, get_pipeline_stats
+
+
+def main():
+    """Run pipeline workers until SIGINT/SIGTERM"""
+    threads = Config.PIPELINE_WORKER_THREADS
+    if '--threads' in sys.argv:
+        threads = int(sys.argv[sys.argv.index('--threads') + 1])
+
+    shutdown = threading.Event()
+
+    def signal_handler(signum, frame):
+        print("Received shutdown signal, stopping pipeline workers...")
+        shutdown.set()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    start_pipeline_workers(threads=threads)
+    try:
+        while not shutdown.wait(60):
+            try:
+                print(f"Pipeline stats: {get_pipeline_stats()}")
+            except Exception as e:
+                print(f"Could not read pipeline stats: {e}")
+    finally:
+        stop_pipeline_workers()
+
+
+if __name__ == '__main__':
+    main()
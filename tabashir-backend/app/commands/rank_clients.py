@@ -0,0 +1,48 @@
+"""
+Management command to re-rank every active client in one batch
+Usage: python -m app.commands.rank_clients [--workers N] [--clients-per-task N]
+
+Loads the 60-day job window once and ranks clients with
+jobs_to_apply_number > 0 across a process pool (see ranking.rank_all_clients).
+Run it after a large scrape instead of calling ranking.main per client.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import Config
+from app.services.job_apply.ranking import rank_all_clients
+
+
+def print_progress(totals):
+    """One progress line per finished task"""
+    seconds = max(totals['seconds'], 1e-6)
+    print(f"[RANK_CLIENTS] {totals['clients_done']}/{totals['clients']} clients, "
+          f"{totals['matches_inserted']} inserted, {totals['clients_done'] / seconds:.1f} clients/s, "
+          f"{totals['pairs_scored'] / seconds:,.0f} pairs/s")
+
+
+def main():
+    """Rank all active clients and report throughput, exiting non-zero if any task failed"""
+    parser = argparse.ArgumentParser(description="Re-rank every active client in one batch")
+    parser.add_argument('--workers', type=int, default=Config.RANKING_WORKERS, help="processes, 0 = one per CPU")
+    parser.add_argument('--clients-per-task', type=int, default=Config.RANKING_CLIENTS_PER_TASK,
+                        help="clients a worker ranks and inserts in one go")
+    args = parser.parse_args()
+
+    totals = rank_all_clients(workers=args.workers, clients_per_task=args.clients_per_task, progress=print_progress)
+    seconds = max(totals['seconds'], 1e-6)
+    print(f"Ranked {totals['clients_done']} clients against {totals['jobs']} jobs with {totals['workers']} workers "
+          f"in {totals['seconds']:.1f}s ({totals['clients_done'] / seconds:.1f} clients/s, "
+          f"{totals['pairs_scored'] / seconds:,.0f} pairs/s): {totals['matches_found']} matches, "
+          f"{totals['matches_inserted']} inserted, {totals['failed_tasks']} failed tasks")
+    if totals['failed_tasks']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,89 +1,70 @@
 """
 Management command to run the translation worker
-Usage: python -m app.commands.translation_worker
+Usage: python -m app.commands.translation_worker [--threads N] [--max-runtime SECONDS] [--forever]
+
+Jobs are leased from the database (see app.services.job_translation_worker),
+so any number of these processes can run at once, on one host or many,
+without translating a job twice. Throughput grows with the total number of
+threads until the LLM provider's rate limit is reached.
+
+The process exits once no job is left to claim, or after --max-runtime.
+With --forever it keeps polling the queue until SIGINT/SIGTERM; that is how
+the `translation-worker` service in docker-compose.yml runs it, so web
+processes (TRANSLATION_WEB_WORKERS=0) only enqueue.
 """
 
 import sys
-import os
 import signal
-import fcntl
+import threading
 import time
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.services.job_translation_worker import start_translation_worker, stop_translation_worker, get_translation_stats
-
-def signal_handler(signum, frame):
-    """Handle shutdown signals"""
-    print("Received shutdown signal, stopping translation worker...")
-    stop_translation_worker()
-    sys.exit(0)
+from app.config import Config
+from app.services.job_translation_worker import (
+    start_translation_worker, stop_translation_worker, get_translation_stats, get_translation_queue_depth
+)
 
 def main():
-    """Main function to run the translation worker with process management"""
-    
-    # Create lock file to prevent multiple instances
-    lock_file = '/tmp/translation_worker.lock'
-    
+    """Run translation worker threads until the queue is drained (unless --forever), the runtime is up or SIGINT/SIGTERM"""
+    threads = Config.TRANSLATION_WORKERS
+    if '--threads' in sys.argv:
+        threads = int(sys.argv[sys.argv.index('--threads') + 1])
+    forever = '--forever' in sys.argv
+    max_runtime = None if forever else 30 * 60
+    if '--max-runtime' in sys.argv:
+        max_runtime = int(sys.argv[sys.argv.index('--max-runtime') + 1])
+
+    shutdown = threading.Event()
+
+    def signal_handler(signum, frame):
+        """Handle shutdown signals"""
+        print("Received shutdown signal, stopping translation worker...")
+        shutdown.set()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if not forever and get_translation_queue_depth() == 0:
+        print("No pending translations found. Worker will exit.")
+        return
+
+    print("Starting Job Translation Worker...")
+    start_translation_worker(threads=threads)
+    start_time = time.time()
     try:
-        # Try to acquire lock
-        with open(lock_file, 'w') as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            
-        print("Starting Job Translation Worker...")
-        print(f"Lock file created: {lock_file}")
-        
-        # Set up signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        
-        try:
-            start_translation_worker()
-            
-            stats = get_translation_stats()
-            print(f"Translation stats: {stats}")
-            
-            # Check if there's work to do
-            pending_jobs = stats.get('pending', 0) + stats.get('failed', 0)
-            if pending_jobs == 0:
-                print("No pending translations found. Worker will exit.")
-                return
-            
-            # Run for a limited time (30 minutes max) then exit
-            max_runtime = 30 * 60  # 30 minutes in seconds
-            start_time = time.time()
-            
-            while time.time() - start_time < max_runtime:
-                time.sleep(60)  # Check every minute
-                stats = get_translation_stats()
-                print(f"Translation stats: {stats}")
-                
-                pending_jobs = stats.get('pending', 0) + stats.get('failed', 0)
-                if pending_jobs == 0:
-                    print("All translations completed. Worker will exit.")
-                    break
-                    
-        except KeyboardInterrupt:
-            print("Received keyboard interrupt, shutting down...")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        finally:
-            stop_translation_worker()
-            print("Translation worker stopped")
-            
-    except IOError:
-        print("Translation worker already running, exiting...")
-        sys.exit(0)
+        while not shutdown.wait(60) and (max_runtime is None or time.time() - start_time < max_runtime):
+            print(f"Translation stats: {get_translation_stats()}")
+            if not forever and get_translation_queue_depth() == 0:
+                print("All translations claimed. Worker will exit.")
+                break
+    except Exception as e:
+        print(f"Unexpected error: {e}")
     finally:
-        # Clean up lock file
-        if os.path.exists(lock_file):
-            try:
-                os.remove(lock_file)
-                print(f"Lock file removed: {lock_file}")
-            except:
-                pass
+        # A batch cut short here is claimed again once its lease expires
+        stop_translation_worker()
 
 if __name__ == "__main__":
     main()
@@ -30,6 +30,14 @@ class Config:
     AI_POSTGRES_PASSWORD = os.getenv("AI_POSTGRES_PASSWORD", "")
     AI_DATABASE_URL = os.getenv("AI_DATABASE_URL")
 
+    # Connection pool bounds, per process (web workers, CLI commands and background threads alike)
+    DB_POOL_MINCONN = int(os.getenv("DB_POOL_MINCONN", 2))
+    DB_POOL_MAXCONN = int(os.getenv("DB_POOL_MAXCONN", 20))
+    DB_POOL_VALIDATE_IDLE_SECONDS = int(os.getenv("DB_POOL_VALIDATE_IDLE_SECONDS", 30))  # SELECT 1 only past this idle time
+    DB_POOL_MAX_AGE_SECONDS = int(os.getenv("DB_POOL_MAX_AGE_SECONDS", 1800))  # recycle connections older than this
+    DB_POOL_REAP_INTERVAL_SECONDS = int(os.getenv("DB_POOL_REAP_INTERVAL_SECONDS", 60))
+    DB_POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT_SECONDS", 30))  # wait this long for a free connection
+
 
     SECRET_KEY = os.getenv('SECRET_KEY', 'default-dev-key')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', os.getenv('JWT_ACCESS_SECRET', os.getenv('SECRET_KEY', 'default-dev-key')))
@@ -43,6 +51,72 @@ class Config:
     LLM_API_KEY = os.getenv('LLM_API_KEY')
     LLM_BASE_URL = os.getenv('LLM_BASE_URL', 'https://api.inceptionlabs.ai/v1')
     LLM_MODEL = os.getenv('LLM_MODEL', 'mercury-2')
+    CV_SECTION_WORKERS = int(os.getenv('CV_SECTION_WORKERS', 4))  # parallel section extractions per CV
+
+    # LLM response cache: 'disk', 'postgres' or 'off'
+    LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'disk')
+    LLM_CACHE_DIR = BASE_DIR / os.getenv('LLM_CACHE_DIR', 'uploads/cache/llm')
+    LLM_CACHE_DEFAULT_TTL = int(os.getenv('LLM_CACHE_DEFAULT_TTL', 7 * 24 * 3600))
+    LLM_CACHE_TTLS = {  # seconds per call site, 0 = never expires
+        'cv_formatter': 30 * 24 * 3600,
+        'cv_parsing': 30 * 24 * 3600,
+        'job_title_suggestions': 7 * 24 * 3600,
+        'job_translation': 0,
+        'cv_translation': 30 * 24 * 3600,
+    }
+
+    # Corpus TF-IDF model for skill matching (app/services/job_apply/skill_model.py)
+    SKILL_MODEL_PATH = BASE_DIR / os.getenv('SKILL_MODEL_PATH', 'uploads/models/skill_tfidf.joblib')
+    SKILL_MODEL_REFRESH_SECONDS = int(os.getenv('SKILL_MODEL_REFRESH_SECONDS', 6 * 3600))  # refit in the background after this
+    SKILL_MODEL_MAX_JOBS = int(os.getenv('SKILL_MODEL_MAX_JOBS', 50000))  # most recent jobs used to fit
+
+    # Precomputed job features (app/services/job_apply/job_features.py)
+    JOB_FEATURE_CACHE_SIZE = int(os.getenv('JOB_FEATURE_CACHE_SIZE', 50000))  # per-process cache entries in front of job_features
+
+    # Heavyweight model loading (app/services/model_registry.py)
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'background').lower()  # lazy, background or preload (load once in the gunicorn master)
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+    STARTUP_IMPORT_BUDGET_SECONDS = float(os.getenv('STARTUP_IMPORT_BUDGET_SECONDS', 5))  # app.commands.import_profile fails above this
+
+    # Semantic fallback for title/location matching (app/services/job_apply/word_vectors.py)
+    SIMILARITY_BACKEND = os.getenv('SIMILARITY_BACKEND', 'static').lower()  # static (spacy until the table is built), spacy or off
+    WORD_VECTORS_PATH = BASE_DIR / os.getenv('WORD_VECTORS_PATH', 'uploads/models/word_vectors')  # words.npy + vectors.npy
+
+    # Batch ranking of every active client (python -m app.commands.rank_clients)
+    RANKING_WORKERS = int(os.getenv('RANKING_WORKERS', 0))  # processes, 0 = one per CPU
+    RANKING_CLIENTS_PER_TASK = int(os.getenv('RANKING_CLIENTS_PER_TASK', 20))  # clients a worker scores and inserts in one go
+
+    # Job translation to Arabic (app/services/translation_service.py)
+    TRANSLATION_MODE = os.getenv('TRANSLATION_MODE', 'structured').lower()  # structured (all fields in one call) or per_field
+    TRANSLATION_JOBS_PER_CALL = int(os.getenv('TRANSLATION_JOBS_PER_CALL', 5))  # jobs sent together in structured mode
+    TRANSLATION_CHARS_PER_CALL = int(os.getenv('TRANSLATION_CHARS_PER_CALL', 12000))  # source characters per structured call
+    TRANSLATION_TIMEOUT_SECONDS = int(os.getenv('TRANSLATION_TIMEOUT_SECONDS', 120))  # per structured call
+    TRANSLATION_MAX_TOKENS = int(os.getenv('TRANSLATION_MAX_TOKENS', 8000))  # completion budget per structured call
+    TRANSLATION_MEMORY = os.getenv('TRANSLATION_MEMORY', 'true').lower() in ['true', '1', 'yes']  # reuse stored translations of short fields
+    TRANSLATION_MEMORY_MAX_CHARS = int(os.getenv('TRANSLATION_MEMORY_MAX_CHARS', 200))  # longer fields are never looked up or stored
+    TRANSLATION_WORKERS = int(os.getenv('TRANSLATION_WORKERS', 4))  # threads per app.commands.translation_worker process
+    TRANSLATION_POLL_INTERVAL = float(os.getenv('TRANSLATION_POLL_INTERVAL', 10))  # seconds between claims when nothing is pending
+    TRANSLATION_LEASE_SECONDS = int(os.getenv('TRANSLATION_LEASE_SECONDS', 300))  # a claim whose worker stops renewing this is reclaimed
+    TRANSLATION_MAX_ATTEMPTS = int(os.getenv('TRANSLATION_MAX_ATTEMPTS', 5))
+    TRANSLATION_RETRY_BACKOFF_SECONDS = int(os.getenv('TRANSLATION_RETRY_BACKOFF_SECONDS', 300))  # doubled per failed attempt
+    TRANSLATION_WEB_WORKERS = int(os.getenv('TRANSLATION_WEB_WORKERS', 0))  # translation threads per web process; 0 = enqueue only, the translation-worker service translates
+    TRANSLATION_WARM_JOBS = int(os.getenv('TRANSLATION_WARM_JOBS', 100))  # newest and most-matched jobs queued ahead of views, 0 = off
+    TRANSLATION_WARM_INTERVAL_SECONDS = int(os.getenv('TRANSLATION_WARM_INTERVAL_SECONDS', 600))
+
+    # CV (DOCX) translation to Arabic (app/services/arabic_translator.py)
+    DOCX_TRANSLATION_WORKERS = int(os.getenv('DOCX_TRANSLATION_WORKERS', 8))  # concurrent batch requests per document
+    DOCX_TRANSLATION_SEGMENTS_PER_CALL = int(os.getenv('DOCX_TRANSLATION_SEGMENTS_PER_CALL', 25))
+    DOCX_TRANSLATION_CHARS_PER_CALL = int(os.getenv('DOCX_TRANSLATION_CHARS_PER_CALL', 2500))
+    DOCX_TRANSLATION_TIMEOUT_SECONDS = int(os.getenv('DOCX_TRANSLATION_TIMEOUT_SECONDS', 60))  # per batch request
+
+    # Background pipeline for /resumes/apply and /resumes/add_client
+    PIPELINE_FOLDER = BASE_DIR / os.getenv('PIPELINE_FOLDER', 'uploads/pipeline')  # uploaded CVs kept until the job finishes
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 0))  # threads per web process (dev only); 0 = jobs run in app.commands.pipeline_worker
+    PIPELINE_WORKER_THREADS = int(os.getenv('PIPELINE_WORKER_THREADS', 2))  # threads in each app.commands.pipeline_worker process
+    PIPELINE_POLL_INTERVAL = float(os.getenv('PIPELINE_POLL_INTERVAL', 2))  # seconds between claims when the queue is empty
+    PIPELINE_LEASE_SECONDS = int(os.getenv('PIPELINE_LEASE_SECONDS', 300))  # a job whose worker stops renewing this is reclaimed
+    PIPELINE_STAGE_MAX_ATTEMPTS = int(os.getenv('PIPELINE_STAGE_MAX_ATTEMPTS', 3))
+    PIPELINE_RETRY_BACKOFF_SECONDS = int(os.getenv('PIPELINE_RETRY_BACKOFF_SECONDS', 30))  # doubled per failed attempt
 
     # Email settings
     EMAIL_HOST = 'mail.tabashir.ae'
@@ -72,4 +146,11 @@ class Config:
     APPLE_ISSUER_ID = os.getenv('APPLE_ISSUER_ID')
     APPLE_TEAM_ID = os.getenv('APPLE_TEAM_ID')
     APPLE_BUNDLE_ID = os.getenv('APPLE_BUNDLE_ID')
-    APPLE_PRIVATE_KEY_PATH = os.getenv('APPLE_PRIVATE_KEY_PATH')
\ No newline at end of file
+    APPLE_PRIVATE_KEY_PATH = os.getenv('APPLE_PRIVATE_KEY_PATH')
+
+    # LibreOffice PDF conversion pool (per worker process)
+    LIBREOFFICE_POOL_SIZE = int(os.getenv('LIBREOFFICE_POOL_SIZE', 2))
+    LIBREOFFICE_CONVERT_TIMEOUT = int(os.getenv('LIBREOFFICE_CONVERT_TIMEOUT', 120))  # seconds per document
+    LIBREOFFICE_ACQUIRE_TIMEOUT = int(os.getenv('LIBREOFFICE_ACQUIRE_TIMEOUT', 300))  # seconds waiting for a free instance
+    LIBREOFFICE_PROFILE_DIR = Path(os.getenv('LIBREOFFICE_PROFILE_DIR', '/tmp/tabashir-libreoffice'))
+    LIBREOFFICE_PYTHON = os.getenv('LIBREOFFICE_PYTHON', '')  # Python that can import uno; '' = detect LibreOffice's own
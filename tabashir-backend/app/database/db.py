@@ -1,9 +1,12 @@
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 import threading
+import time
+import weakref
 import psycopg2
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 from app.config import Config
+from contextlib import contextmanager
 import atexit
 
 # Initialize pools as None, create them lazily
@@ -42,22 +45,24 @@ def clean_postgres_url(url):
 
 def init_pools():
     global main_pool, ai_pool, main_pool_error, ai_pool_error
+    if main_pool is not None and ai_pool is not None:
+        return
     with _pool_lock:  # Only one thread initializes the pool
         if main_pool is None:
             try:
                 db_url = clean_postgres_url(Config.POSTGRES_DATABASE_PATH)
                 if db_url:
-                    main_pool = ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=20,
+                    main_pool = ManagedConnectionPool(
+                        minconn=Config.DB_POOL_MINCONN,
+                        maxconn=Config.DB_POOL_MAXCONN,
                         dsn=db_url,
                         cursor_factory=RealDictCursor,
                         connect_timeout=50
                     )
                 else:
-                    main_pool = ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=20,
+                    main_pool = ManagedConnectionPool(
+                        minconn=Config.DB_POOL_MINCONN,
+                        maxconn=Config.DB_POOL_MAXCONN,
                         host=Config.POSTGRES_HOST,
                         port=Config.POSTGRES_PORT,
                         dbname=Config.POSTGRES_DB,
@@ -76,16 +81,16 @@ def init_pools():
             try:
                 ai_url = clean_postgres_url(Config.AI_DATABASE_URL)
                 if ai_url:
-                    ai_pool = ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=20,
+                    ai_pool = ManagedConnectionPool(
+                        minconn=Config.DB_POOL_MINCONN,
+                        maxconn=Config.DB_POOL_MAXCONN,
                         dsn=ai_url,
                         connect_timeout=50
                     )
                 else:
-                    ai_pool = ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=20,
+                    ai_pool = ManagedConnectionPool(
+                        minconn=Config.DB_POOL_MINCONN,
+                        maxconn=Config.DB_POOL_MAXCONN,
                         dbname=Config.AI_POSTGRES_DB,
                         user=Config.AI_POSTGRES_USER,
                         password=Config.AI_POSTGRES_PASSWORD,
@@ -98,6 +103,9 @@ def init_pools():
                 ai_pool_error = e
                 print("Failed to initialize AI DB pool:", e)
 
+        if main_pool or ai_pool:
+            _start_reaper()
+
 
 @atexit.register
 def close_pools():
@@ -107,65 +115,248 @@ def close_pools():
     if ai_pool:
         ai_pool.closeall()
 
+class ManagedConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that waits for a free connection instead of
+    raising PoolError when all of them are checked out, and keeps the
+    per-connection ages and the counters used to validate and recycle them.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        # Per-connection bookkeeping; entries vanish with their connection
+        self._meta = weakref.WeakKeyDictionary()
+        self._meta_lock = threading.Lock()
+        self.stats = {'checkouts': 0, 'validations': 0, 'validation_failures': 0, 'discards': 0,
+                      'wait_time_total': 0.0, 'wait_time_max': 0.0}
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        """Block up to DB_POOL_ACQUIRE_TIMEOUT_SECONDS for a free connection."""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=Config.DB_POOL_ACQUIRE_TIMEOUT_SECONDS):
+            raise PoolError(f"no connection free after {Config.DB_POOL_ACQUIRE_TIMEOUT_SECONDS}s")
+        waited = time.monotonic() - started
+        try:
+            conn = super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+        now = time.time()
+        with self._meta_lock:
+            self.stats['wait_time_total'] += waited
+            self.stats['wait_time_max'] = max(self.stats['wait_time_max'], waited)
+            self._meta.setdefault(conn, {'created_at': now, 'last_used': now})
+        return conn
+
+    def putconn(self, conn=None, key=None, close=False):
+        with self._meta_lock:
+            if close or conn.closed:
+                self._meta.pop(conn, None)
+            elif conn in self._meta:
+                self._meta[conn]['last_used'] = time.time()
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+    def count(self, stat, amount=1):
+        with self._meta_lock:
+            self.stats[stat] += amount
+
+    def age(self, conn, now):
+        """(seconds since created, seconds since last returned) of a connection."""
+        with self._meta_lock:
+            meta = self._meta.setdefault(conn, {'created_at': now, 'last_used': now})
+            return now - meta['created_at'], now - meta['last_used']
+
+    def _close_idle(self, stale):
+        """Remove idle connections matching `stale(conn)` from the pool and close them."""
+        with self._lock:
+            idle = [conn for conn in self._pool if stale(conn)]
+            self._pool[:] = [conn for conn in self._pool if conn not in idle]
+        with self._meta_lock:
+            for conn in idle:
+                self._meta.pop(conn, None)
+            self.stats['discards'] += len(idle)
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        return len(idle)
+
+    def purge_idle(self):
+        """Drop every idle connection, e.g. after the server restarted under us."""
+        return self._close_idle(lambda conn: True)
+
+    def reap(self):
+        """Close idle connections that are closed or past their max age."""
+        now = time.time()
+        return self._close_idle(
+            lambda conn: conn.closed or self.age(conn, now)[0] > Config.DB_POOL_MAX_AGE_SECONDS)
+
+    def snapshot(self):
+        """Counters plus the current idle and in-use connection counts."""
+        with self._lock:
+            idle, in_use = len(self._pool), len(self._used)
+        with self._meta_lock:
+            return {**self.stats, 'idle': idle, 'in_use': in_use}
+
+
+_reaper_thread = None
+
+
+def _discard(pool, conn):
+    """Close a connection and drop it from the pool."""
+    pool.count('discards')
+    try:
+        pool.putconn(conn, close=True)
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _is_alive(conn):
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def _checkout(pool):
+    """
+    Get a connection from `pool`, validating it only when it is suspect.
+
+    Connections idle longer than DB_POOL_VALIDATE_IDLE_SECONDS get a SELECT 1;
+    connections older than DB_POOL_MAX_AGE_SECONDS are replaced. A failed
+    validation purges all idle connections, since they most likely died
+    together (e.g. a Postgres restart).
+    """
+    for _ in range(3):
+        conn = pool.getconn()
+        age, idle = pool.age(conn, time.time())
+
+        if conn.closed or age > Config.DB_POOL_MAX_AGE_SECONDS:
+            _discard(pool, conn)
+            continue
+
+        if idle > Config.DB_POOL_VALIDATE_IDLE_SECONDS:
+            pool.count('validations')
+            if not _is_alive(conn):
+                pool.count('validation_failures')
+                _discard(pool, conn)
+                pool.purge_idle()
+                continue
+
+        pool.count('checkouts')
+        return conn
+
+    conn = pool.getconn()
+    pool.count('checkouts')
+    return conn
+
+
+def _release(pool, conn):
+    try:
+        conn.rollback()
+    except:
+        pass
+    try:
+        pool.putconn(conn, close=bool(conn.closed))
+    except:
+        pass
+
+
+def _reaper_loop():
+    while True:
+        time.sleep(Config.DB_POOL_REAP_INTERVAL_SECONDS)
+        for pool, name in ((main_pool, 'main'), (ai_pool, 'ai')):
+            if pool and not pool.closed:
+                try:
+                    pool.reap()
+                except Exception as e:
+                    print(f"[DB] Pool reaper error ({name}): {e}")
+
+
+def _start_reaper():
+    global _reaper_thread
+    if _reaper_thread is None or not _reaper_thread.is_alive():
+        _reaper_thread = threading.Thread(target=_reaper_loop, name="db-pool-reaper", daemon=True)
+        _reaper_thread.start()
+
+
+# Pools inherited from the parent by a forked child; kept referenced so the child never closes their sockets
+_inherited_pools = []
+
+
+def reset_pools_after_fork():
+    """Give a forked child process its own pools (multiprocessing pool initializer).
+
+    The inherited connections share sockets with the parent, so the child must
+    neither use nor close them; new pools are created on first use.
+    """
+    global main_pool, ai_pool, main_pool_error, ai_pool_error, _reaper_thread, _pool_lock
+    _inherited_pools.extend(pool for pool in (main_pool, ai_pool) if pool is not None)
+    main_pool = ai_pool = main_pool_error = ai_pool_error = None
+    _reaper_thread = None
+    _pool_lock = threading.Lock()
+
+
+def get_pool_stats():
+    """Checkout, validation, discard and wait-time counters per pool for this process."""
+    return {
+        name: {'initialized': pool is not None, **(pool.snapshot() if pool is not None else {})}
+        for pool, name in ((main_pool, 'main'), (ai_pool, 'ai'))
+    }
+
+
 def get_db_connection():
     init_pools()
     if not main_pool:
         raise ValueError(f"Main DB pool not initialized. Last error: {main_pool_error}")
-    
-    # Try up to 3 times to get a live connection (purging dead ones)
-    for _ in range(3):
-        conn = main_pool.getconn()
-        try:
-            # Test connection liveness
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-            return conn
-        except (psycopg2.OperationalError, psycopg2.InterfaceError):
-            try:
-                main_pool.putconn(conn, close=True)
-            except:
-                pass
-    return main_pool.getconn()
+    return _checkout(main_pool)
 
 def release_db_connection(conn):
     if main_pool and conn:
-        try:
-            conn.rollback()
-        except:
-            pass
-        try:
-            main_pool.putconn(conn)
-        except:
-            pass
+        _release(main_pool, conn)
 
 def get_ai_db_connection():
     init_pools()
     if not ai_pool:
         raise ValueError(f"AI DB pool not initialized. Last error: {ai_pool_error}")
-    
-    for _ in range(3):
-        conn = ai_pool.getconn()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-            return conn
-        except (psycopg2.OperationalError, psycopg2.InterfaceError):
-            try:
-                ai_pool.putconn(conn, close=True)
-            except:
-                pass
-    return ai_pool.getconn()
+    return _checkout(ai_pool)
 
 def release_ai_db_connection(conn):
     if ai_pool and conn:
-        try:
-            conn.rollback()
-        except:
-            pass
-        try:
-            ai_pool.putconn(conn)
-        except:
-            pass
+        _release(ai_pool, conn)
+
+
+@contextmanager
+def db_connection():
+    """Check out a pooled main DB connection for the duration of a with-block."""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        release_db_connection(conn)
+
+
+@contextmanager
+def ai_db_connection():
+    """Check out a pooled AI DB connection for the duration of a with-block.
+
+    Uncommitted work is rolled back when the connection is returned, so callers
+    commit explicitly as they would with a dedicated connection.
+    """
+    conn = get_ai_db_connection()
+    try:
+        yield conn
+    finally:
+        release_ai_db_connection(conn)
 
 
 _column_cache = {}
@@ -0,0 +1,120 @@
+"""
+Versioned SQL migrations for the AI database.
+
+Migration files live in `migrations/ai/` and are named `<version>_<name>.sql`
+(e.g. `0003_hot_path_indexes.sql`). Each pending file runs once, in version
+order, inside its own transaction, and is recorded in `schema_migrations`.
+A Postgres advisory lock ensures only one deploy applies migrations at a time.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+from app.config import Config
+from app.database.db import ai_db_connection
+
+AI_MIGRATIONS_DIR = Config.BASE_DIR / "migrations" / "ai"
+
+# Arbitrary constant shared by every process running migrations
+MIGRATION_LOCK_ID = 7346201
+
+_FILENAME = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+
+def discover_migrations(directory=AI_MIGRATIONS_DIR):
+    """Return [(version, name, path)] for every migration file, sorted by version."""
+    migrations = []
+    for path in Path(directory).glob("*.sql"):
+        match = _FILENAME.match(path.name)
+        if not match:
+            print(f"[MIGRATE] Skipping unrecognised file name: {path.name}")
+            continue
+        migrations.append((match.group(1), match.group(2), path))
+    migrations.sort(key=lambda item: int(item[0]))
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def _checksum(sql):
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+
+def get_applied_migrations(cursor):
+    cursor.execute("SELECT version, name, checksum FROM schema_migrations")
+    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def run_migrations(directory=AI_MIGRATIONS_DIR, dry_run=False):
+    """
+    Apply every pending migration to the AI database.
+
+    Args:
+        directory: Folder holding the versioned .sql files
+        dry_run: Only report what would be applied
+
+    Returns:
+        List of versions applied (or pending, for a dry run)
+    """
+    migrations = discover_migrations(directory)
+    applied_now = []
+
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            try:
+                _ensure_migrations_table(cursor)
+                conn.commit()
+                applied = get_applied_migrations(cursor)
+
+                for version, name, path in migrations:
+                    sql = path.read_text(encoding="utf-8")
+                    checksum = _checksum(sql)
+
+                    if version in applied:
+                        if applied[version][1] != checksum:
+                            print(f"[MIGRATE] ⚠️ {path.name} changed after it was applied; not re-running")
+                        continue
+
+                    if dry_run:
+                        print(f"[MIGRATE] Pending: {path.name}")
+                        applied_now.append(version)
+                        continue
+
+                    print(f"[MIGRATE] Applying {path.name}...")
+                    try:
+                        cursor.execute(sql)
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                            (version, name, checksum)
+                        )
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        print(f"[MIGRATE] ❌ {path.name} failed: {e}")
+                        raise
+                    applied_now.append(version)
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+                conn.commit()
+        finally:
+            cursor.close()
+
+    if not applied_now:
+        print("[MIGRATE] AI database schema is up to date")
+    return applied_now
@@ -1,10 +1,14 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from app.config import Config
+from app.database.db import db_connection
 
 
 def get_prisma_connection():
-    """Create and return a connection to the Prisma (main) database."""
+    """Create and return a dedicated connection to the Prisma (main) database.
+
+    Queries should go through execute_prisma_query, which uses the shared main pool.
+    """
     host = getattr(Config, 'PRISMA_DB_HOST', None) or Config.POSTGRES_HOST
     port = getattr(Config, 'PRISMA_DB_PORT', None) or Config.POSTGRES_PORT
     database = getattr(Config, 'PRISMA_DB_NAME', None) or Config.POSTGRES_DB
@@ -24,7 +28,7 @@ def get_prisma_connection():
 
 def execute_prisma_query(query, params=None, fetch_one=False, fetch_all=False, commit=False):
     """
-    Execute a query on the Prisma database.
+    Execute a query on the Prisma database using a pooled main DB connection.
 
     Args:
         query: SQL query string
@@ -36,17 +40,16 @@ def execute_prisma_query(query, params=None, fetch_one=False, fetch_all=False, c
     Returns:
         Query results based on fetch_one/fetch_all flags
     """
-    conn = get_prisma_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query, params)
-        if commit:
-            conn.commit()
-        if fetch_one:
-            return cursor.fetchone()
-        if fetch_all:
-            return cursor.fetchall()
-        return None
-    finally:
-        cursor.close()
-        conn.close()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            if commit:
+                conn.commit()
+            if fetch_one:
+                return cursor.fetchone()
+            if fetch_all:
+                return cursor.fetchall()
+            return None
+        finally:
+            cursor.close()
@@ -1,31 +1,19 @@
-import subprocess
+from app.services.pdf_converter import convert_docx_to_pdf
 import os
 from pathlib import Path
 from typing import Optional
 
 def convert_to_pdf(docx_path: str, output_dir: str) -> bool:
     """
-    Converts a DOCX file to PDF using LibreOffice (soffice).
+    Converts a DOCX file to PDF using the shared LibreOffice pool.
     """
     try:
         print(f"Attempting PDF conversion for: {docx_path}")
-        # Use LibreOffice to convert
-        result = subprocess.run([
-            'soffice', 
-            '--headless', 
-            '--convert-to', 'pdf', 
-            '--outdir', str(output_dir), 
-            str(docx_path)
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print("PDF conversion successful via LibreOffice")
-            return True
-        else:
-            print(f"LibreOffice conversion failed: {result.stderr}")
-            return False
+        convert_docx_to_pdf(docx_path, output_dir)
+        print("PDF conversion successful via LibreOffice")
+        return True
     except Exception as e:
-        print(f"Error during LibreOffice conversion: {e}")
+        print(f"LibreOffice conversion failed: {e}")
         return False
 
 from docxtpl import DocxTemplate, RichText
@@ -5,6 +5,7 @@ from app.database.db import execute_query, execute_ai_query
 from app.services.jwt_service import create_access_token, create_refresh_token, verify_refresh_token
 from app.services.password_service import verify_password, hash_password
 from app.routes.middleware import jwt_required
+from app.services.job_apply.match_cache import invalidate_client
 from flask import request
 
 auth_ns = Namespace('auth', description='Authentication Endpoints')
@@ -213,6 +214,8 @@ class Account(Resource):
                 try:
                     execute_ai_query("DELETE FROM clients WHERE email = %s", (email,), commit=True)
                     execute_ai_query("DELETE FROM rankings WHERE email = %s", (email,), commit=True)
+                    execute_ai_query("DELETE FROM ranking_watermarks WHERE email = %s", (email,), commit=True)
+                    invalidate_client(email)
                 except Exception as ai_e:
                     # Log but continue to ensure main account deletion proceeds
                     print(f"Non-critical: Failed to delete legacy AI records for {email}: {ai_e}")
@@ -5,6 +5,8 @@ import uuid
 import datetime
 from app.database.db import execute_query, execute_ai_query
 from app.routes.middleware import jwt_required
+from app.services.job_apply.gazetteer import client_location_ids
+from app.services.job_apply.ranking import rank_client_async
 
 candidates_ns = Namespace('candidates', description='Candidate Onboarding and Profile Management')
 
@@ -99,15 +101,17 @@ class PersonalInfo(Resource):
         # 4. Sync to AI DB Clients table
         try:
             execute_ai_query(
-                """INSERT INTO clients (name, email, phone_number, location, nationality, gender, date_in)
-                   VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                """INSERT INTO clients (name, email, phone_number, location, location_ids, nationality, gender, date_in)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
                    ON CONFLICT (email) DO UPDATE 
                    SET name = EXCLUDED.name, 
                        phone_number = EXCLUDED.phone_number, 
                        location = EXCLUDED.location,
+                       location_ids = CASE WHEN clients.job_location_based IS NULL
+                                           THEN EXCLUDED.location_ids ELSE clients.location_ids END,
                        nationality = EXCLUDED.nationality,
                        gender = EXCLUDED.gender""",
-                (full_name, email, phone, location, nationality, gender),
+                (full_name, email, phone, location, client_location_ids(location), nationality, gender),
                 commit=True
             )
         except Exception as e:
@@ -188,6 +192,8 @@ class ProfessionalInfo(Resource):
                     (email, job_type, skills_str),
                     commit=True
                 )
+                # New positions: re-rank this client in the background (a no-op until job apply is active)
+                rank_client_async(email)
             except Exception as e:
                 print(f"Failed to sync professional info to AI DB: {e}")
 
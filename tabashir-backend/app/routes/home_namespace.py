@@ -3,7 +3,7 @@ from flask import request
 from http import HTTPStatus
 from app.database.db import execute_query
 from app.routes.middleware import jwt_required
-from app.services.job_apply.ai_matching import title_position_match, calculate_skills_match, semantic_location_match
+from app.services.job_apply.match_cache import score_jobs_cached
 
 home_ns = Namespace('home', description='Home Dashboard Endpoints')
 
@@ -118,16 +118,14 @@ class Dashboard(Resource):
             else:
                 print(f"[DASHBOARD] ⚠️ No profile found for user {user_id} or email {email}")
 
-            for job in featured_jobs:
+            matches = score_jobs_cached(request.user_email, match_profile, featured_jobs) if match_profile else []
+
+            for index, job in enumerate(featured_jobs):
                 if match_profile:
                     try:
-                        title_score = title_position_match(job.get('job_title', ''), match_profile['positions'])
-                        skill_score = calculate_skills_match(job.get('job_description') or job.get('job_title', ''), match_profile['skills'])
-                        location_score = semantic_location_match(job.get('vacancy_city', ''), match_profile['location'])
-
-                        final_score = round((0.4 * title_score + 0.4 * skill_score + 0.2 * location_score), 3)
-                        job['match_percentage'] = str(int(round(final_score * 100, 0)))
-                        print(f"[DASHBOARD] Job {job.get('id')}: {job.get('job_title')} => {job['match_percentage']}% (T:{title_score:.3f}, S:{skill_score:.3f}, L:{location_score:.3f})")
+                        match = matches[index]
+                        job['match_percentage'] = str(match['percentage'])
+                        print(f"[DASHBOARD] Job {job.get('id')}: {job.get('job_title')} => {job['match_percentage']}% (T:{match['title_score']:.3f}, S:{match['skill_score']:.3f}, L:{match['location_score']:.3f})")
                     except Exception as e:
                         print(f"[DASHBOARD] Match calc error for job {job.get('id')}: {e}")
                         job['match_percentage'] = None  # Return null on error
@@ -252,15 +250,12 @@ class Recommendations(Resource):
                 }
 
             if jobs:
-                for job in jobs:
+                matches = score_jobs_cached(request.user_email, match_profile, jobs) if match_profile else []
+
+                for index, job in enumerate(jobs):
                     if match_profile:
                         try:
-                            title_score = title_position_match(job.get('job_title', ''), match_profile['positions'] or "")
-                            skill_score = calculate_skills_match(job.get('job_description') or job.get('job_title', ''), match_profile['skills'] or "")
-                            location_score = semantic_location_match(job.get('vacancy_city', ''), match_profile['location'] or "")
-                            
-                            final_score = round((0.4 * title_score + 0.4 * skill_score + 0.2 * location_score), 3)
-                            job['match_percentage'] = str(int(round(final_score * 100, 0)))
+                            job['match_percentage'] = str(matches[index]['percentage'])
                         except Exception as e:
                             print(f"[RECO] Match calc error: {e}")
                             job['match_percentage'] = '0'
@@ -320,7 +315,7 @@ class Analytics(Resource):
             if user_skills:
                 # Get match percentage for the 30 most recent ACTIVE jobs (limited for performance)
                 recent_jobs = execute_query(
-                    '''SELECT title, description, "requiredSkills", location FROM "Job" 
+                    '''SELECT id, title, description, "requiredSkills", location FROM "Job" 
                        WHERE status = 'ACTIVE' 
                        ORDER BY "createdAt" DESC LIMIT 30''',
                     fetch_all=True
@@ -334,14 +329,13 @@ class Analytics(Resource):
                     "location": profile.get('location') or ""
                 }
                 
-                for job in recent_jobs:
+                matches = score_jobs_cached(request.user_email, m_profile, recent_jobs,
+                                            fields={'title': 'title', 'description': 'description', 'location': 'location'})
+
+                for match in matches:
                     try:
-                        title_score = title_position_match(job.get('title', ''), m_profile['positions'])
-                        skill_score = calculate_skills_match(job.get('description') or job.get('title', ''), m_profile['skills'])
-                        location_score = semantic_location_match(job.get('location', ''), m_profile['location'])
-                        
-                        percentage = (0.4 * title_score + 0.4 * skill_score + 0.2 * location_score) * 100
-                        
+                        percentage = match['score'] * 100
+
                         if percentage >= 90:
                             match_distribution[0]["count"] += 1
                         elif percentage >= 80:
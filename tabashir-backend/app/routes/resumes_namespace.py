@@ -38,12 +38,16 @@ from app.services.job_apply import (
     process_ai_job_input, process_ai_job_input_not_active, update_ai_job_input_not_active, serialize_row,
     get_client_job_settings, activate_client_job_apply, suggest_job_titles_from_resume,
     get_client_cv_filename, convert_docx_to_pdf, update_client_cv_filename, get_client_data,
-    main as run_ranking_main, apply_single_job, apply as apply_jobs
+    main as run_ranking_main, rank_new_jobs_async, apply_single_job, apply as apply_jobs
 )
-from app.services.send_linkedin_email import send_email
-from app.services.job_apply.ai_matching import (
-    title_position_match, calculate_skills_match, semantic_location_match
+from app.services.job_apply.pipeline import (
+    enqueue_pipeline_job, get_pipeline_job, retry_pipeline_job, get_pipeline_stats
 )
+from app.services.send_linkedin_email import send_email
+from app.services.job_apply.match_cache import invalidate_job, score_jobs_cached
+from app.services.job_translation_worker import request_translation
+from app.services.job_apply.job_features import store_job_features
+from app.services.job_apply.gazetteer import EMIRATE_IDS, city_of, place_name, resolve_location, resolve_locations
 
 resumes_ns = Namespace('resumes', description='Resume Management and AI Processing')
 
@@ -427,7 +431,31 @@ class HealthCheck(Resource):
         """
         GET endpoint to check the health status of the API Server.
         """
-        return {"status": "healthy", "message": "CV Processing API is running"}, HTTPStatus.OK.value
+        from app.services.llm_cache import get_llm_cache_stats
+        from app.database.db import get_pool_stats
+        from app.services.model_registry import model_status
+        return {
+            "status": "healthy",
+            "message": "CV Processing API is running",
+            "llm_cache": get_llm_cache_stats(),
+            "db_pools": get_pool_stats(),
+            "models": model_status()
+        }, HTTPStatus.OK.value
+
+
+@resumes_ns.route('/ready')
+class ReadinessCheck(Resource):
+    def get(self):
+        """
+        GET endpoint for readiness probes: 200 once the NLP models are loaded, 503 while they warm up.
+        """
+        from app.services.model_registry import model_status, warm_models_in_background
+        status = model_status()
+        if not status['ready']:
+            # In lazy mode nothing else would start loading them
+            warm_models_in_background()
+            return status, HTTPStatus.SERVICE_UNAVAILABLE.value
+        return status, HTTPStatus.OK.value
 
 
 @resumes_ns.route('/format')
@@ -1018,58 +1046,29 @@ update_client_parser.replace_argument('file', type=FileStorage, location='files'
 @resumes_ns.route('/apply')
 class ApplyJobs(Resource):
     @resumes_ns.expect(apply_parser)
-    @resumes_ns.response(HTTPStatus.OK.value, 'Successfully matched and ranked jobs')
+    @resumes_ns.response(HTTPStatus.ACCEPTED.value, 'Job queued; poll /resumes/pipeline/<job_id> for progress')
     @resumes_ns.response(HTTPStatus.BAD_REQUEST.value, 'Invalid input')
-    @resumes_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR.value, 'Internal server error during processing')
+    @resumes_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR.value, 'Internal server error while queuing')
     def post(self):
         """
-        POST endpoint to process resume and find matching jobs with rankings.
+        POST endpoint to queue CV processing, job ranking and applications for an active client.
         """
-        temp_input_path = None
         try:
             email, file, nationality, gender, preferred_positions, location_preference = self._validate_and_extract_request(request)
-            
+
             preferred_positions_str = ", ".join(p.strip() for p in preferred_positions if p.strip())
             location_preference_str = ", ".join(l.strip() for l in location_preference if l.strip())
-            filename = secure_filename(file.filename)
-            base_name = os.path.splitext(filename)[0]
-            temp_input_path = Config.TEMP_FOLDER / filename
-            file.save(temp_input_path)
 
-            email = process_ai_job_input(
-                email=email, resume_path=temp_input_path, nationality=nationality, gender=gender,  location_preferred=location_preference_str, preferred_positions=preferred_positions_str
+            job_id = enqueue_pipeline_job(
+                kind='apply', email=email, file=file, nationality=nationality, gender=gender,
+                positions=preferred_positions_str, locations=location_preference_str
             )
-            if not email:
-                raise ValueError("Failed to process resume. Please ensure the file is a valid PDF or DOCX and contains your contact information.")
-
-            ranking_result = run_ranking_main(client_email=email)
-            if not ranking_result:
-                raise ValueError("Failed to rank jobs")
-
-            apply_result = apply_jobs(email=email, file_path=temp_input_path) # we can also use client IDs
-            if not apply_result:
-                raise ValueError("Failed to apply for jobs")
-
-            summary = {
-                "email": email,
-                "ranking_result": ranking_result,
-                "apply_result": apply_result
-            }
-
-
-            return jsonify({
-                "success": True,
-                "message": "Successfully processed CV and applied for matching jobs",
-                "summary": summary
-            })
+            return _pipeline_accepted(job_id, email)
 
         except ValueError as ve:
             return self._error_response("Invalid input", str(ve), HTTPStatus.BAD_REQUEST.value)
         except Exception as e:
             return self._error_response("Job matching failed", str(e), HTTPStatus.INTERNAL_SERVER_ERROR.value)
-        finally:
-            if temp_input_path and os.path.exists(temp_input_path):
-                os.remove(temp_input_path)
 
     def _validate_and_extract_request(self, req):
         """Validate and extract request parameters"""
@@ -1123,89 +1122,38 @@ apply_specific_parser.add_argument('gender', type=str, location='form', required
 @resumes_ns.route('/add_client')
 class AddClient(Resource):
     @resumes_ns.expect(apply_parser)
-    @resumes_ns.response(HTTPStatus.OK.value, 'Successfully matched and ranked jobs')
+    @resumes_ns.response(HTTPStatus.ACCEPTED.value, 'Job queued; poll /resumes/pipeline/<job_id> for progress')
     @resumes_ns.response(HTTPStatus.BAD_REQUEST.value, 'Invalid input')
-    @resumes_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR.value, 'Internal server error during processing')
+    @resumes_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR.value, 'Internal server error while queuing')
     def post(self):
         """
-        POST endpoint to process resume and find matching jobs with rankings.
+        POST endpoint to queue CV processing, job ranking and applications for a new (inactive) client.
         """
-        temp_input_path = None
         try:
             print("\n" + "="*60)
             print("[ADD_CLIENT] === POST /api/v1/resumes/add_client CALLED ===")
             print("="*60)
-            
+
             email, file, nationality, gender, preferred_positions, location_preference = self._validate_and_extract_request(request)
-            
+
             print(f"[ADD_CLIENT] ✅ Request validated successfully")
             print(f"[ADD_CLIENT] Email: {email}")
             print(f"[ADD_CLIENT] Nationality: {nationality}")
             print(f"[ADD_CLIENT] Gender: {gender}")
             print(f"[ADD_CLIENT] Positions: {preferred_positions}")
             print(f"[ADD_CLIENT] Locations: {location_preference}")
-            print(f"[ADD_CLIENT] File: {file.filename} ({len(file.read())} bytes)")
-            file.stream.seek(0)  # Reset file pointer
-            
+            print(f"[ADD_CLIENT] File: {file.filename}")
+
             preferred_positions_str = ", ".join(p.strip() for p in preferred_positions if p.strip())
             location_preference_str = ", ".join(l.strip() for l in location_preference if l.strip())
-            
-            print(f"[ADD_CLIENT] Positions (joined): {preferred_positions_str}")
-            print(f"[ADD_CLIENT] Locations (joined): {location_preference_str}")
-            
-            filename = secure_filename(file.filename)
-            base_name = os.path.splitext(filename)[0]
-            temp_input_path = Config.TEMP_FOLDER / filename
-            file.save(temp_input_path)
-            
-            print(f"[ADD_CLIENT] ✅ File saved to: {temp_input_path}")
-            print(f"[ADD_CLIENT] 🔄 Calling process_ai_job_input_not_active()...")
 
-            email = process_ai_job_input_not_active(
-                email=email, resume_path=temp_input_path, nationality=nationality, gender=gender,  location_preferred=location_preference_str, preferred_positions=preferred_positions_str
+            job_id = enqueue_pipeline_job(
+                kind='add_client', email=email, file=file, nationality=nationality, gender=gender,
+                positions=preferred_positions_str, locations=location_preference_str
             )
-            
-            if not email:
-                print(f"[ADD_CLIENT] ❌ process_ai_job_input_not_active() returned None")
-                raise ValueError("Failed to process resume. Please ensure the file is a valid PDF or DOCX and contains your contact information.")
-            
-            print(f"[ADD_CLIENT] ✅ process_ai_job_input_not_active() completed. Email: {email}")
-            print(f"[ADD_CLIENT] 🔄 Calling run_ranking_main()...")
-
-            ranking_result = run_ranking_main(client_email=email)
-            
-            print(f"[ADD_CLIENT] 📊 Ranking result: {ranking_result}")
-            
-            if not ranking_result:
-                print(f"[ADD_CLIENT] ❌ run_ranking_main() returned None or empty")
-                raise ValueError("Failed to rank jobs")
-
-            print(f"[ADD_CLIENT] ✅ Ranking completed successfully")
-            print(f"[ADD_CLIENT] 🔄 Calling apply_jobs()...")
-
-            apply_result = apply_jobs(email=email, file_path=temp_input_path) # we can also use client IDs
-
-            print(f"[ADD_CLIENT] 📋 Apply result: {apply_result}")
-
-            if not apply_result:
-                print(f"[ADD_CLIENT] ❌ apply_jobs() returned None or empty")
-                raise ValueError("Failed to apply for jobs")
-
-            summary = {
-                "email": email,
-                "ranking_result": ranking_result,
-                "apply_result": apply_result
-            }
-
-            print(f"[ADD_CLIENT] ✅✅✅ ADD_CLIENT COMPLETED SUCCESSFULLY")
-            print(f"[ADD_CLIENT] Summary: {summary}")
+            print(f"[ADD_CLIENT] ✅ Queued pipeline job {job_id}")
             print("="*60 + "\n")
-
-            return jsonify({
-                "success": True,
-                "message": "Successfully processed CV and applied for matching jobs",
-                "summary": summary
-            })
+            return _pipeline_accepted(job_id, email)
 
         except ValueError as ve:
             print(f"[ADD_CLIENT] ❌ ValueError: {ve}")
@@ -1215,10 +1163,6 @@ class AddClient(Resource):
             print(f"[ADD_CLIENT] ❌ Exception: {e}")
             traceback.print_exc()
             return self._error_response("Job matching failed", str(e), HTTPStatus.INTERNAL_SERVER_ERROR.value)
-        finally:
-            if temp_input_path and os.path.exists(temp_input_path):
-                os.remove(temp_input_path)
-                print(f"[ADD_CLIENT] 🗑️ Temp file deleted: {temp_input_path}")
 
     def _validate_and_extract_request(self, req):
         """Validate and extract request parameters"""
@@ -1263,6 +1207,68 @@ class AddClient(Resource):
         return make_response(response, status_code)
 
 
+def _pipeline_accepted(job_id, email):
+    response = jsonify({
+        "success": True,
+        "message": "Your CV is being processed. Matching jobs will be ranked and applied to in the background.",
+        "job_id": job_id,
+        "email": email,
+        "status_url": f"/api/v1/resumes/pipeline/{job_id}"
+    })
+    return make_response(response, HTTPStatus.ACCEPTED.value)
+
+
+@resumes_ns.route('/pipeline/stats')
+class PipelineStats(Resource):
+    @resumes_ns.response(HTTPStatus.OK.value, 'Queue depth and recent stage durations')
+    def get(self):
+        """
+        GET endpoint to report pipeline queue depth and per-stage durations.
+        """
+        try:
+            return {"success": True, "data": get_pipeline_stats()}, HTTPStatus.OK.value
+        except Exception as e:
+            return {"success": False, "message": "Failed to read pipeline stats", "error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+
+@resumes_ns.route('/pipeline/<string:job_id>')
+class PipelineJobStatus(Resource):
+    @resumes_ns.response(HTTPStatus.OK.value, 'Job status with per-stage progress')
+    @resumes_ns.response(HTTPStatus.NOT_FOUND.value, 'Unknown job id')
+    def get(self, job_id):
+        """
+        GET endpoint to check the progress of a queued /apply or /add_client job.
+        """
+        try:
+            job = get_pipeline_job(job_id)
+            if not job:
+                return {"success": False, "message": "Pipeline job not found"}, HTTPStatus.NOT_FOUND.value
+            return {"success": True, "data": job}, HTTPStatus.OK.value
+        except Exception as e:
+            return {"success": False, "message": "Failed to read pipeline job", "error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+
+@resumes_ns.route('/pipeline/<string:job_id>/retry')
+class PipelineJobRetry(Resource):
+    @resumes_ns.expect(resumes_ns.model('PipelineRetryInput', {
+        'stage': fields.String(required=False, description='Stage to re-run from (process_cv, rank, apply); defaults to the first unfinished stage')
+    }))
+    @resumes_ns.response(HTTPStatus.ACCEPTED.value, 'Job re-queued')
+    @resumes_ns.response(HTTPStatus.BAD_REQUEST.value, 'Job cannot be retried')
+    def post(self, job_id):
+        """
+        POST endpoint to re-queue a pipeline job from a given stage.
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            stage = retry_pipeline_job(job_id, stage=data.get('stage'))
+            return {"success": True, "job_id": job_id, "stage": stage}, HTTPStatus.ACCEPTED.value
+        except ValueError as ve:
+            return {"success": False, "message": "Cannot retry job", "error": str(ve)}, HTTPStatus.BAD_REQUEST.value
+        except Exception as e:
+            return {"success": False, "message": "Failed to retry job", "error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+
 @resumes_ns.route('/update_client')
 class UpdateClient(Resource):
     @resumes_ns.expect(update_client_parser)
@@ -1294,7 +1300,8 @@ class UpdateClient(Resource):
             if not email_updated:
                 raise ValueError("Failed to update client. Email may not exist.")
 
-            ranking_result = run_ranking_main(client_email=email)
+            # The profile changed, so every job in the window is scored again
+            ranking_result = run_ranking_main(client_email=email, full=True)
             if not ranking_result:
                 raise ValueError("Failed to rank jobs after update")
 
@@ -1831,14 +1838,24 @@ class Jobs(Resource):
                 if not found_mode:
                     actual_cities.append(loc)
 
+            # Jobs whose gazetteer ids (job_features.location_ids) include any of the given places
+            place_filter = ("EXISTS (SELECT 1 FROM job_features jf "
+                            "WHERE jf.job_id = jobs.id::text AND jf.location_ids && %s::text[])")
+
             # Filter by Cities
             if actual_cities:
                 placeholders = ', '.join(['LOWER(%s)'] * len(actual_cities))
                 if language == 'ar':
-                    where_clauses.append(f"LOWER(COALESCE(vacancy_city_ar, vacancy_city)) IN ({placeholders})")
+                    city_clause = f"LOWER(COALESCE(vacancy_city_ar, vacancy_city)) IN ({placeholders})"
                 else:
-                    where_clauses.append(f"LOWER(vacancy_city) IN ({placeholders})")
+                    city_clause = f"LOWER(vacancy_city) IN ({placeholders})"
                 params.extend(actual_cities)
+                # Known places also match their spelling variants, Arabic names and districts
+                place_ids = sorted({place for city in actual_cities for place in resolve_locations(city)})
+                if place_ids:
+                    city_clause = f"({city_clause} OR {place_filter})"
+                    params.append(place_ids)
+                where_clauses.append(city_clause)
 
             # Filter by Work Modes (searched in description and working_hours)
             if detected_work_modes:
@@ -1863,8 +1880,10 @@ class Jobs(Resource):
                     city_clauses = ["LOWER(COALESCE(vacancy_city_ar, vacancy_city)) ILIKE %s" for _ in emirates]
                 else:
                     city_clauses = ["LOWER(vacancy_city) ILIKE %s" for _ in emirates]
+                city_clauses.append(place_filter)
                 where_clauses.append("(" + " OR ".join(city_clauses) + ")")
                 params.extend([f"%{city}%" for city in emirates])
+                params.append(list(EMIRATE_IDS))
 
             # 2. Search functionality - language specific
             if search:
@@ -2028,36 +2047,16 @@ class Jobs(Resource):
             rows = cursor.fetchall()
             jobs = [dict(zip(columns, row)) for row in rows]
 
-            # On-demand translation for current page (Arabic only)
+            # Untranslated jobs are shown in English for now and moved to the front of the translation queue
             if language == 'ar' and jobs:
-                try:
-                    ids_to_translate = [j['id'] for j in jobs if (j.get('translation_status') or '').lower() != 'completed']
-                    if ids_to_translate:
-                        from app.services.job_translation_worker import translate_job_now
-                        for jid in ids_to_translate:
-                            try:
-                                translate_job_now(jid)
-                            except Exception:
-                                pass
-
-                        # Re-fetch translated jobs and merge
-                        placeholders = ','.join(['%s'] * len(ids_to_translate))
-                        refetch_query = f"""
-                            SELECT {select_fields}
-                            FROM jobs
-                            WHERE id IN ({placeholders})
-                        """
-                        cursor.execute(refetch_query, tuple(ids_to_translate))
-                        refetch_columns = [desc[0] for desc in cursor.description]
-                        refetched = [dict(zip(refetch_columns, r)) for r in cursor.fetchall()]
-                        id_to_job = {j['id']: j for j in refetched}
-                        for idx, job in enumerate(jobs):
-                            updated = id_to_job.get(job['id'])
-                            if updated:
-                                jobs[idx] = updated
-                except Exception:
-                    # If anything fails, proceed with existing data
-                    pass
+                ids_to_translate = [j['id'] for j in jobs if (j.get('translation_status') or '').lower() != 'completed']
+                if ids_to_translate:
+                    try:
+                        request_translation(ids_to_translate)
+                    except Exception as e:
+                        print(f"[JOBS_NS] Could not queue translation of jobs {ids_to_translate}: {e}")
+            for job in jobs:
+                job['translation_status'] = job.get('translation_status') or 'pending'
 
             # Normalize IDs and convert datetime objects to strings
             for job in jobs:
@@ -2132,8 +2131,15 @@ class Jobs(Resource):
                 except Exception as e:
                     print(f"[JOBS_NS] Error fetching rankings for jobs list: {e}")
 
-            # Collect fallback-calculated scores to cache into rankings table
-            scores_to_cache = []  # list of (job_id, score_float)
+            # Score every job that needs the fallback in one batch, through the match-score cache
+            match_scores = {}
+            if match_profile:
+                fallback_jobs = [job for job in jobs if ranking_map.get(str(job.get('id'))) is None]
+                try:
+                    match_scores = dict(zip((str(job.get('id')) for job in fallback_jobs),
+                                            score_jobs_cached(email, match_profile, fallback_jobs)))
+                except Exception as e:
+                    print(f"[JOBS_NS] Error scoring jobs list: {e}")
 
             for job in jobs:
                 job['is_saved'] = str(job['id']) in saved_job_ids
@@ -2146,14 +2152,7 @@ class Jobs(Resource):
                 # Priority 2: AI Matching Calculation (Fallback)
                 elif match_profile:
                     try:
-                        title_score = title_position_match(job.get('job_title', ''), match_profile['positions'])
-                        job_desc = job.get('job_description') or ''
-                        skill_score = calculate_skills_match(job_desc if job_desc else job.get('job_title', ''), match_profile['skills'])
-                        location_score = semantic_location_match(job.get('vacancy_city', ''), match_profile['location'])
-                        final_score = round((0.4 * title_score + 0.4 * skill_score + 0.2 * location_score), 3)
-                        pct = int(round(final_score * 100, 0))
-                        job['match_percentage'] = str(pct)
-                        scores_to_cache.append((str(job['id']), float(final_score * 100)))
+                        job['match_percentage'] = str(match_scores[str(job.get('id'))]['percentage'])
                     except Exception:
                         job['match_percentage'] = None  # Return null instead of '0' when matching fails
                 else:
@@ -2166,32 +2165,6 @@ class Jobs(Resource):
                 if 'job_description' in job:
                     del job['job_description']
 
-            # Cache fallback scores into rankings so next request uses Priority 1
-            # NOTE: rankings has no unique constraint on (email, job_id), so we use
-            # INSERT ... WHERE NOT EXISTS to safely avoid duplicates.
-            if scores_to_cache and email:
-                try:
-                    from datetime import datetime as _dt
-                    today = _dt.now().strftime('%Y-%m-%d')
-                    inserted_count = 0
-                    for _job_id, _score in scores_to_cache:
-                        cursor.execute("""
-                            INSERT INTO rankings (email, job_id, score, status, date)
-                            SELECT %s, %s, %s, 'cached', %s
-                            WHERE NOT EXISTS (
-                                SELECT 1 FROM rankings
-                                WHERE LOWER(email) = LOWER(%s) AND job_id::text = %s::text
-                            )
-                        """, (email, _job_id, _score, today, email, str(_job_id)))
-                        inserted_count += cursor.rowcount
-                    conn.commit()
-                except Exception as cache_err:
-                    logger.warning(f"[CACHE] Failed to write rankings cache: {cache_err}")
-                    try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-
             return {
                 "success": True,
                 "jobs": jobs,
@@ -2291,19 +2264,21 @@ class Jobs(Resource):
             new_id = cursor.fetchone()[0]
             conn.commit()
 
-            # Trigger translation for the new job (async)
+            # Precompute scoring features for the new job
+            try:
+                store_job_features([{**data, 'id': new_id}], conn=conn)
+            except Exception as e:
+                print(f"Failed to store features for job {new_id}: {e}")
+
+            # Score the new job against active clients without waiting for their next run
+            rank_new_jobs_async([new_id])
+
+            # Queue the new job for translation ahead of the backlog
             try:
-                from app.services.job_translation_worker import translate_job_now
-                # Run translation in background thread
-                import threading
-                threading.Thread(
-                    target=translate_job_now, 
-                    args=(new_id,), 
-                    daemon=True
-                ).start()
+                request_translation([new_id])
             except Exception as e:
                 # Log error but don't fail the job creation
-                print(f"Failed to trigger translation for job {new_id}: {e}")
+                print(f"Failed to queue translation for job {new_id}: {e}")
 
             return {
                 "success": True,
@@ -2393,19 +2368,12 @@ class JobById(Resource):
                 columns = [desc[0] for desc in cursor.description]
                 job = dict(zip(columns, row))
 
-                # If Arabic is requested and translation not completed, translate immediately then refetch
+                # Until it is translated the job is shown in English; put it at the front of the queue
                 if (job.get('translation_status') or '').lower() != 'completed':
                     try:
-                        from app.services.job_translation_worker import translate_job_now
-                        did_translate = translate_job_now(job_id)
-                        if did_translate:
-                            cursor.execute(select_query_ar, (job_id,))
-                            row = cursor.fetchone()
-                            columns = [desc[0] for desc in cursor.description]
-                            job = dict(zip(columns, row))
-                    except Exception:
-                        # If translation fails, we still return available data
-                        pass
+                        request_translation([job_id])
+                    except Exception as e:
+                        print(f"[JOBS_NS] Could not queue translation of job {job_id}: {e}")
             else:
                 select_query_en = """
                     SELECT id, entity, nationality, gender,
@@ -2438,6 +2406,7 @@ class JobById(Resource):
                     "success": False,
                     "message": f"No job found with id {job_id}"
                 }, HTTPStatus.NOT_FOUND
+            job['translation_status'] = job.get('translation_status') or 'pending'
 
             # --- MATCH SCORE LOGIC ---
             email = request.args.get('email')
@@ -2482,12 +2451,8 @@ class JobById(Resource):
                                     "location": profile_row[2] or ""
                                 }
 
-                            from app.services.job_apply.ai_matching import title_position_match, calculate_skills_match, semantic_location_match
-                            title_score = title_position_match(job.get('job_title', ''), match_profile['positions'])
-                            skill_score = calculate_skills_match(job.get('job_description', ''), match_profile['skills'])
-                            location_score = semantic_location_match(job.get('vacancy_city', ''), match_profile['location'])
-                            final_score = round((0.4 * title_score + 0.4 * skill_score + 0.2 * location_score), 3)
-                            job['match_percentage'] = str(int(round(final_score * 100, 0)))
+                            match = score_jobs_cached(email, match_profile, [job])[0]
+                            job['match_percentage'] = str(match['percentage'])
                 except Exception as e:
                     print(f"[JOBS_NS] Error calculating match for job details from main DB: {e}")
 
@@ -2558,7 +2523,10 @@ class JobById(Resource):
             set_clause = ', '.join(f"{key} = %s" for key in fields_to_update)
             values = list(fields_to_update.values()) + [job_id]
 
-            query = f"UPDATE jobs SET {set_clause} WHERE id = %s"
+            # A new ingest_seq and ingest_xid put the edited job past every client's ranking watermark
+            query = f"""UPDATE jobs SET {set_clause}, ingest_seq = nextval(pg_get_serial_sequence('jobs', 'ingest_seq')),
+                               ingest_xid = pg_current_xact_id()
+                        WHERE id = %s"""
             cursor.execute(query, values)
             conn.commit()
 
@@ -2568,6 +2536,9 @@ class JobById(Resource):
                     "message": f"No job found with id {job_id}"
                 }, HTTPStatus.NOT_FOUND
 
+            invalidate_job(job_id)
+            rank_new_jobs_async([job_id])
+
             return {
                 "success": True,
                 "message": "Job updated successfully"
@@ -2795,11 +2766,15 @@ class JobsMonthlyCount(Resource):
 @resumes_ns.route('/jobs/count-by-city')
 class JobsCountByCity(Resource):
     @resumes_ns.doc(params={
-        'job_title': 'Keyword to match in job title (case-insensitive, partial match)'
+        'job_title': 'Keyword to match in job title (case-insensitive, partial match)',
+        'lang': 'Language of city names: en (default) | ar',
     })
     def get(self):
         """
         Get counts of jobs grouped by vacancy_city for a given job title keyword.
+
+        Spellings of the same UAE city ("Abu Dhabi, AE", "أبوظبي", "AUH") are
+        counted together under its canonical name; districts roll up to their city.
         """
         conn = get_ai_db_connection()
         cursor = conn.cursor()
@@ -2827,13 +2802,16 @@ class JobsCountByCity(Resource):
                 like_pattern = f"%{keyword}%"
                 cursor.execute(query, (like_pattern,))
 
+            language = request.args.get('lang', 'en').strip().lower()
             rows = cursor.fetchall()
-            result = []
+            counts = {}
             for vacancy_city, count in rows:
-                result.append({
-                    "vacancy_city": vacancy_city if vacancy_city else "Unknown",
-                    "count": count
-                })
+                place_id = resolve_location(vacancy_city) if vacancy_city else None
+                city_id = city_of(place_id) if place_id else None
+                name = place_name(city_id, language) if city_id else (vacancy_city or "Unknown")
+                entry = counts.setdefault(city_id or name, {"vacancy_city": name, "location_id": city_id, "count": 0})
+                entry["count"] += count
+            result = sorted(counts.values(), key=lambda entry: entry["count"], reverse=True)
 
             return {
                 "success": True,
@@ -2921,19 +2899,15 @@ class MatchedJobs(Resource):
             print(f"Filter term for semantic match: '{filter_term}'")
             print(f"Filtered Jobs Before Scoring: {len(jobs)}")
 
-            # Score and rank jobs
+            # Standardize aliases for mobile model compatibility
             for job in jobs:
-                # Standardize aliases for mobile model compatibility
                 job['entity'] = job.get('company_name', '')
                 job['job_title'] = job.get('job_title', '') or job.get('title', '')
                 job['vacancy_city'] = job.get('vacancy_city', '') or job.get('location', '')
-                
-                title_score = title_position_match(job['job_title'], user_profile['positions'])
-                skill_score = calculate_skills_match(job['job_description'], user_profile['skills'])
-                location_score = semantic_location_match(job['vacancy_city'], user_profile['location'])
 
-                final_score = round((0.4 * title_score + 0.4 * skill_score + 0.2 * location_score), 3)
-                job['match_percentage'] = str(int(round(final_score * 100, 0)))  # percentage as integer string
+            # Score and rank jobs
+            for job, match in zip(jobs, score_jobs_cached(email, user_profile, jobs)):
+                job['match_percentage'] = str(match['percentage'])  # percentage as integer string
 
             sorted_matches = sorted(jobs, key=lambda x: (-float(x['match_percentage']), x['id']))
             total_matches = len(sorted_matches)
@@ -1,78 +1,360 @@
-import openai
+"""
+DOCX translation to Arabic that keeps the document's layout.
+
+The document is split into segments: every paragraph of the body, of table
+cells (nested tables included) and of headers and footers, translated whole
+so the model sees each sentence in context. Where formatting changes inside a
+paragraph ("Experienced in **Python** and Django"), each differently
+formatted part is wrapped in a tag (<r0>...</r0>, <r1>...</r1>) that the
+model keeps around its translation, possibly in another order; each part is
+written back into the first run of its group, the group's other runs are
+emptied, and the groups are reordered to follow the Arabic. Styles, run
+formatting, tables and images stay as they were.
+
+Distinct segment texts get stable ids ("s0", "s1", ...) and are sent in
+batches of up to DOCX_TRANSLATION_SEGMENTS_PER_CALL segments /
+DOCX_TRANSLATION_CHARS_PER_CALL characters, all batches at once, so a long CV
+takes about as long as its slowest batch.
+
+Short boilerplate (headings, month names, "Present") is reused from the
+translation memory (app/services/translation_memory.py). Segments already in
+Arabic or without letters are left alone.
+"""
+
+import json
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 from docx import Document
-from docx.shared import Pt, RGBColor
+from docx.oxml.ns import qn
+from docx.table import Table
+from lxml import etree
 
 from app import Config
 from app.services.cv_processor import get_openai_client
+from app.services.llm_cache import cached_chat_completion
+from app.services.translation_memory import is_target_script, lookup_translations, store_translations
+from app.services.translation_service import ARABIC_SCRIPT, KEEP_AS_IS_MAX_CHARS
+
+# Translation memory field for CV segments, and the segments worth remembering:
+# short, and free of digits and '@' (so dates, phones and emails are not stored)
+MEMORY_FIELD = 'cv_segment'
+MEMORY_MAX_CHARS = 60
+
+SEGMENT_PROMPT = """Translate the values of the JSON object below from English to Arabic. They are the
+paragraphs of a CV, in order. Use Modern Standard Arabic and a professional tone. Keep names of
+people, companies, products and technologies, email addresses and URLs in English.
+Some values mark differently formatted parts with tags such as <r0>...</r0><r1>...</r1>. Keep every
+tag exactly once, around the translation of the text it wraps, in whatever order Arabic needs.
+Return ONLY a JSON object with exactly the same keys, each mapped to its Arabic translation."""
+
+SINGLE_PROMPT = ("Translate this to Arabic. Return only the translation. "
+                 "Keep any <rN>...</rN> tags around the translation of the text they wrap.")
+
+# Formatting groups of a paragraph in the text sent to the model
+MARKUP_TAG = re.compile(r'<r(\d+)>(.*?)</r\1>', re.S)
+ANY_TAG = re.compile(r'</?r\d+>')
+
+Segment = namedtuple('Segment', 'text groups')
+
+
+def _run_format(run):
+    """Formatting that must not be merged across a segment boundary."""
+    font = run.font
+    return (run.style.name if run.style is not None else None, run.bold, run.italic, run.underline,
+            font.name, font.size, font.color.rgb, font.highlight_color, font.superscript, font.subscript)
+
+
+def _paragraphs(container, seen):
+    """Paragraphs of a body, cell, header or footer in reading order, including those of nested tables."""
+    for block in container.iter_inner_content():
+        if isinstance(block, Table):
+            for row in block.rows:
+                # Merged cells repeat across the grid; `seen` skips their paragraphs after the first
+                for cell in row.cells:
+                    yield from _paragraphs(cell, seen)
+        elif block._p not in seen:
+            seen.add(block._p)
+            yield block
+
+
+def _document_paragraphs(document):
+    seen = set()
+    yield from _paragraphs(document, seen)
+    for section in document.sections:
+        for part in (section.header, section.footer, section.first_page_header, section.first_page_footer,
+                     section.even_page_header, section.even_page_footer):
+            # A linked header has no content of its own; touching it would create one
+            if not part.is_linked_to_previous:
+                yield from _paragraphs(part, seen)
+
+
+def _needs_translation(text):
+    return any(ch.isalpha() for ch in text) and not is_target_script(text)
+
+
+def _text(runs):
+    return ''.join(run.text for run in runs)
+
+
+def _run_groups(paragraph):
+    """A paragraph's runs with text, grouped where formatting changes; whitespace joins a neighbouring group."""
+    groups = []
+    for run in paragraph.runs:
+        if not run.text:
+            continue
+        key = _run_format(run)
+        if groups and (groups[-1][0] == key or not run.text.strip()):
+            groups[-1][1].append(run)
+        elif groups and not _text(groups[-1][1]).strip():
+            groups[-1] = (key, groups[-1][1] + [run])
+        else:
+            groups.append((key, [run]))
+    return [runs for _, runs in groups]
+
+
+def extract_segments(document):
+    """
+    Translatable segments of a document, in order.
+
+    Returns:
+        Segment(text, groups) per paragraph with letters to translate; `groups`
+        are its runs split by formatting, tagged <rN> in `text` when there are several
+    """
+    segments = []
+    for paragraph in _document_paragraphs(document):
+        groups = _run_groups(paragraph)
+        if not groups or not _needs_translation(''.join(_text(runs) for runs in groups)):
+            continue
+        if len(groups) == 1:
+            text = _text(groups[0])
+        else:
+            text = ''.join(f"<r{index}>{_text(runs)}</r{index}>" for index, runs in enumerate(groups))
+        segments.append(Segment(text, groups))
+    return segments
+
+
+def _set_run_text(run, text):
+    """Replace a run's text, keeping its tabs, breaks and drawings."""
+    texts = run._r.findall(qn('w:t'))
+    if not texts:
+        if text:
+            run._r.add_t(text)
+        return
+    texts[0].text = text
+    texts[0].set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+    for element in texts[1:]:
+        run._r.remove(element)
 
 
-def extract_text_with_format(file_path):
+def _write_group(runs, translation):
+    """Put a translation into the group's first run with text, keeping the group's surrounding spaces."""
+    target = next((run for run in runs if run.text.strip()), runs[0])
+    original = _text(runs)
+    lead = original[:len(original) - len(original.lstrip())]
+    trail = original[len(original.rstrip()):]
+    for run in runs:
+        _set_run_text(run, '')
+    if translation.strip():
+        _set_run_text(target, lead + translation.strip() + trail)
+    return target
+
+
+def split_markup(translation, count):
+    """
+    The translated text of each formatting group, in the order of the translation.
+
+    Returns:
+        [(group index, text)], or None when the tags do not match the `count` groups
     """
-    Extracts text and formatting from a DOCX file.
+    if count == 1:
+        return [(0, ANY_TAG.sub('', translation))]
+    pieces = [(int(index), text) for index, text in MARKUP_TAG.findall(translation)]
+    if sorted(index for index, _ in pieces) != list(range(count)):
+        return None
+    if any(ch.isalpha() for ch in MARKUP_TAG.sub('', translation)):
+        return None
+    return pieces
+
+
+def write_segment(segment, translation):
     """
-    doc = Document(file_path)
-    content = []
-    for paragraph in doc.paragraphs:
-        formatted_text = []
-        for run in paragraph.runs:
-            formatted_text.append({
-                "text": run.text,
-                "bold": run.bold,
-                "italic": run.italic,
-                "underline": run.underline,
-                "font_name": run.font.name,
-                "font_size": run.font.size.pt if run.font.size else None,
-                "font_color": run.font.color.rgb if run.font.color else None
-            })
-        content.append(formatted_text)
-    return content
-
-
-def translate_text_to_arabic(text):
+    Write a translation back into the segment's runs. Groups follow the order
+    of their tags in the translation; if the tags were lost, the whole
+    translation goes into the first group.
     """
-    Translates text to Arabic using OpenAI's GPT API.
+    pieces = split_markup(translation, len(segment.groups))
+    if pieces is None:
+        pieces = [(0, ANY_TAG.sub('', translation))] + [(index, '') for index in range(1, len(segment.groups))]
+    targets = {index: _write_group(segment.groups[index], text) for index, text in pieces}
+
+    order = [index for index, _ in pieces]
+    if order != sorted(order):
+        # Move the written runs into the translation's order, through placeholders at their old positions
+        placeholders = []
+        for index in sorted(order):
+            placeholder = etree.Element('placeholder')
+            targets[index]._r.addprevious(placeholder)
+            placeholders.append(placeholder)
+        for placeholder, index in zip(placeholders, order):
+            placeholder.addnext(targets[index]._r)
+            placeholder.getparent().remove(placeholder)
+
+
+def _is_memorable(text):
+    return (len(text) <= MEMORY_MAX_CHARS and '@' not in text and not any(ch.isdigit() for ch in text)
+            and not ANY_TAG.search(text))
+
+
+def _is_valid(source, value):
+    if not isinstance(value, str) or not value.strip():
+        return False
+    return bool(ARABIC_SCRIPT.search(value)) or len(source) <= KEEP_AS_IS_MAX_CHARS
+
+
+def _parse_json_object(content):
+    text = (content or '').strip()
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in segment translation response")
+    parsed = json.loads(text[start:end + 1])
+    if not isinstance(parsed, dict):
+        raise ValueError("Segment translation response is not a JSON object")
+    return parsed
+
+
+def translate_text_to_arabic(text, llm=None):
     """
-    client, model = get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "Translate this to Arabic."},
+    Translates text to Arabic using the configured LLM.
+    """
+    client, model = llm or get_openai_client()
+    return cached_chat_completion(
+        client, model,
+        [
+            {"role": "system", "content": SINGLE_PROMPT},
             {"role": "user", "content": text}
-        ]
+        ],
+        call_site='cv_translation',
+        timeout=Config.DOCX_TRANSLATION_TIMEOUT_SECONDS
     )
-    return response.choices[0].message.content
 
 
-def save_translated_docx(translated_text, format_template, output_path):
+def translate_segment_batch(batch, llm):
     """
-    Saves translated a text into a DOCX file while preserving the formatting from the original.
+    Translate {segment id: text} in one call; ids missing from or invalid in
+    the reply are translated one by one, and left out if that fails too.
+
+    Returns:
+        {segment id: Arabic text}
     """
-    doc = Document()
-    translated_lines = translated_text.split("\n")
-
-    for i, original_paragraph in enumerate(format_template):
-        if i < len(translated_lines):
-            paragraph = doc.add_paragraph()
-            for run_format in original_paragraph:
-                run = paragraph.add_run(translated_lines[i])
-                run.bold = run_format["bold"]
-                run.italic = run_format["italic"]
-                run.underline = run_format["underline"]
-                if run_format["font_name"]:
-                    run.font.name = run_format["font_name"]
-                if run_format["font_size"]:
-                    run.font.size = Pt(run_format["font_size"])
-                if run_format["font_color"]:
-                    run.font.color.rgb = RGBColor(*run_format["font_color"])
-            # One line per paragraph
-    doc.save(output_path)
+    started = time.time()
+    client, model = llm
+    try:
+        parsed = _parse_json_object(cached_chat_completion(
+            client, model,
+            [
+                {"role": "system", "content": SEGMENT_PROMPT},
+                {"role": "user", "content": json.dumps(batch, ensure_ascii=False)}
+            ],
+            call_site='cv_translation',
+            temperature=0.3,
+            timeout=Config.DOCX_TRANSLATION_TIMEOUT_SECONDS
+        ))
+    except Exception as e:
+        print(f"[DOCX_TRANSLATE] Batch of {len(batch)} segments failed, translating one by one: {e}")
+        parsed = {}
+
+    translations = {}
+    for segment_id, text in batch.items():
+        value = parsed.get(segment_id)
+        if not _is_valid(text, value):
+            try:
+                value = translate_text_to_arabic(text, llm)
+            except Exception as e:
+                print(f"[DOCX_TRANSLATE] Segment {segment_id} left untranslated: {e}")
+                continue
+        if _is_valid(text, value):
+            translations[segment_id] = value.strip()
+    print(f"[DOCX_TRANSLATE] {len(translations)}/{len(batch)} segments translated in {time.time() - started:.2f}s")
+    return translations
+
+
+def _batches(texts):
+    """Split {segment id: text} into dicts within the per-call segment and character budgets."""
+    batch, chars = {}, 0
+    for segment_id, text in texts.items():
+        if batch and (len(batch) >= Config.DOCX_TRANSLATION_SEGMENTS_PER_CALL
+                      or chars + len(text) > Config.DOCX_TRANSLATION_CHARS_PER_CALL):
+            yield batch
+            batch, chars = {}, 0
+        batch[segment_id] = text
+        chars += len(text)
+    if batch:
+        yield batch
+
+
+def _memory_lookup(texts):
+    if not Config.TRANSLATION_MEMORY:
+        return {}
+    try:
+        found = lookup_translations([(MEMORY_FIELD, text) for text in texts if _is_memorable(text)])
+    except Exception as e:
+        print(f"[DOCX_TRANSLATE] ⚠️ Could not read translation memory: {e}")
+        return {}
+    return {text: translation for (_, text), translation in found.items()}
+
+
+def _memory_store(translated):
+    if not Config.TRANSLATION_MEMORY:
+        return
+    try:
+        store_translations([(MEMORY_FIELD, text, translation)
+                            for text, translation in translated.items() if _is_memorable(text)])
+    except Exception as e:
+        print(f"[DOCX_TRANSLATE] ⚠️ Could not store translation memory: {e}")
 
 
 def translate_docx_to_arabic(input_path, output_path):
     """
-    calls related methods to translate a DOCX file to Arabic.
+    Translates a DOCX file to Arabic segment by segment, keeping its formatting.
+
+    Returns:
+        dict with segment, batch and memory-hit counts and the elapsed seconds
     """
-    original_format = extract_text_with_format(input_path)
-    content = "\n".join([run["text"] for para in original_format for run in para if run["text"]])
-    translated = translate_text_to_arabic(content)
-    save_translated_docx(translated, original_format, output_path)
+    started = time.time()
+    document = Document(input_path)
+    segments = extract_segments(document)
+
+    # Repeated paragraphs are translated once
+    unique = list(dict.fromkeys(segment.text.strip() for segment in segments))
+    translated = _memory_lookup(unique)
+    pending = {f"s{index}": text for index, text in enumerate(unique) if text not in translated}
+
+    batches = list(_batches(pending))
+    if batches:
+        llm = get_openai_client()
+        with ThreadPoolExecutor(max_workers=max(1, min(Config.DOCX_TRANSLATION_WORKERS, len(batches)))) as executor:
+            for result in executor.map(lambda batch: translate_segment_batch(batch, llm), batches):
+                fresh = {pending[segment_id]: translation for segment_id, translation in result.items()}
+                translated.update(fresh)
+                _memory_store(fresh)
+
+    for segment in segments:
+        translation = translated.get(segment.text.strip())
+        if translation:
+            write_segment(segment, translation)
+    document.save(output_path)
+
+    stats = {
+        'segments': len(segments),
+        'unique_segments': len(unique),
+        'memory_hits': len(unique) - len(pending),
+        'batches': len(batches),
+        'untranslated': sum(1 for text in unique if text not in translated),
+        'seconds': round(time.time() - started, 2),
+    }
+    print(f"[DOCX_TRANSLATE] {stats['segments']} segments ({stats['unique_segments']} distinct, "
+          f"{stats['memory_hits']} from memory) in {stats['batches']} batches, {stats['seconds']}s")
+    return stats
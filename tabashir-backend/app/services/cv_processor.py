@@ -1,10 +1,14 @@
 import ast
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import current_app
 from openai import OpenAI
 
+from app import Config
 from app.models.cv_models import *
+from app.services.llm_cache import cached_chat_completion
 
 
 def get_openai_client():
@@ -35,16 +39,15 @@ def get_openai_client():
     )
     return client, model
 
-def chat_with_model(messages) -> str:
-    """Helper function to create a conversation and get AI-generated responses."""
-    client, model = get_openai_client()
+def chat_with_model(messages, llm=None) -> str:
+    """Helper function to create a conversation and get AI-generated responses.
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages
-    )
+    `llm` is an optional (client, model) pair from get_openai_client(), so callers
+    running outside the Flask app context (e.g. worker threads) can resolve it once.
+    """
+    client, model = llm or get_openai_client()
 
-    return response.choices[0].message.content
+    return cached_chat_completion(client, model, messages, call_site='cv_formatter')
 
 
 def safe_parse_ai_response(response_str):
@@ -146,12 +149,24 @@ def cv_formatter(cv_txt: str, translate_to_english=False) -> Resume:
         "keywords": "Extract the 25 main keywords from this person's CV related ONLY to hard, working skills, positions, and abilities as a list [Keyword1, Keyword2, Keyword3, ...]. These keywords should be extracted from the Work Experience, Leadership Experience, Projects, and Skills sections of the CV. Examples of keywords/phrases include: Engineer, Doctor, AI, AutoCAD, Matlab, Excel, Microsoft Office, ISO Certifications, etc... Make sure to close all parentheses properly and return 25 Keywords, you can be creative."
     }
 
-    for key in queries:
-        conversation.append({"role": "user", "content": queries[key]})
-        formatted_query_data = chat_with_model(conversation)
-        conversation.append({"role": "assistant", "content": formatted_query_data})
-        queries[key] = safe_parse_ai_response(formatted_query_data)
-        print(f"{key}: {formatted_query_data}")
+    # Each section is extracted independently against the transformed CV only,
+    # so requests run in parallel and never resend earlier sections' answers.
+    llm = get_openai_client()
+
+    def extract_section(key, query):
+        started = time.time()
+        formatted_query_data = chat_with_model(conversation + [{"role": "user", "content": query}], llm=llm)
+        print(f"[CV_FORMATTER] {key} extracted in {time.time() - started:.2f}s")
+        return formatted_query_data
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=Config.CV_SECTION_WORKERS) as executor:
+        futures = {key: executor.submit(extract_section, key, query) for key, query in queries.items()}
+        for key, future in futures.items():
+            formatted_query_data = future.result()
+            queries[key] = safe_parse_ai_response(formatted_query_data)
+            print(f"{key}: {formatted_query_data}")
+    print(f"[CV_FORMATTER] {len(queries)} sections extracted in {time.time() - started:.2f}s")
 
     # Create Each Individual Section as an Object
     print("Formulating Header Section") 
@@ -6,10 +6,9 @@ from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-import psycopg2
-
-from app import Config
+from app.database.db import get_ai_db_connection, release_ai_db_connection
 from app.services.cv_processor import get_openai_client
+from app.services.llm_cache import cached_chat_completion
 
 # Email credentials
 SMTP_SERVER = "smtp.hostinger.com"
@@ -60,13 +59,9 @@ def generate_cover_letter(client_details, job_description):
         {"role": "user", "content": prompt}
     ]
     client, model = get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0.7
-    )
-
-    cover_letter = response.choices[0].message.content
+    # Sampled at temperature 0.7 on purpose, so never served from cache
+    cover_letter = cached_chat_completion(client, model, messages, call_site='cover_letter',
+                                          bypass=True, temperature=0.7)
 
     return cover_letter
 
@@ -148,11 +143,9 @@ def decrement_jobs_to_apply(conn, client_email):
 
 def apply(email, file_path):
     current_date = datetime.now().strftime("%Y-%m-%d")
+    conn = None
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER, password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT,
-        )
+        conn = get_ai_db_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -200,8 +193,6 @@ def apply(email, file_path):
             except Exception as e:
                 print(f"Error processing match ID {match_id}: {e}")
 
-        conn.close()
-
         return {
             "email": email,
             "date": current_date,
@@ -210,20 +201,19 @@ def apply(email, file_path):
 
     except Exception as e:
         print(f"Failed to fetch matches: {e}")
+    finally:
+        if conn:
+            release_ai_db_connection(conn)
 
 
 def apply_single_job(email, file_path, job_id):
     from psycopg2.extras import RealDictCursor
     current_date = datetime.now().strftime("%Y-%m-%d")
     inserted_ranking_id = None
+    conn = None
 
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER,
-            password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT,
-        )
-        conn.autocommit = False
+        conn = get_ai_db_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
 
         # Fetch client and job data
@@ -310,5 +300,5 @@ def apply_single_job(email, file_path, job_id):
         raise
     finally:
         if conn:
-            conn.close()
+            release_ai_db_connection(conn)
 
@@ -1,12 +1,18 @@
 
 import logging
 import warnings
-from typing import Dict
+from collections import Counter
+from typing import Dict, List
 
 import numpy as np
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from app.config import Config
+from app.services.job_apply.gazetteer import job_places, location_path, most_specific, resolve_locations
+from app.services.job_apply.job_features import JOB_FIELDS, load_job_features, tfidf_terms
+from app.services.job_apply.skill_model import score_skills
+from app.services.job_apply.title_taxonomy import related_roles
+from app.services.job_apply.word_vectors import get_word_vectors
+from app.services.model_registry import get_model
 
 # Suppress spaCy W007 warning — en_core_web_sm has no word vectors (expected behaviour)
 warnings.filterwarnings("ignore", message=".*W007.*")
@@ -16,29 +22,74 @@ logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("Loaded spaCy model")
-except OSError:
-    logger.error("Failed to load spaCy model. Please run: python -m spacy download en_core_web_sm")
-    nlp = None
-
 from functools import lru_cache
 
+
+def get_nlp():
+    """The spaCy pipeline, loaded on first use (see model_registry), or None if not installed"""
+    return get_model('spacy')
+
 @lru_cache(maxsize=128)
 def get_spacy_doc(text):
     """Cache spaCy document processing to avoid redundant parsing for candidate profiles"""
+    nlp = get_nlp()
     if nlp is None or not text:
         return None
     return nlp(text)
 
+def semantic_similarity(text_a: str, text_b: str):
+    """
+    Semantic similarity of two short texts using the configured backend
+    (Config.SIMILARITY_BACKEND), or None when it is off or cannot score them.
+
+    "static" averages memory-mapped word vectors (see word_vectors.py), and
+    falls back to spaCy when the table has not been built;
+    "spacy" keeps the original Doc.similarity behaviour.
+    """
+    if not text_a or not text_b:
+        return None
+    backend, model = _similarity_backend()
+    if backend == 'static':
+        return model.similarity(text_a, text_b)
+    if backend == 'spacy':
+        return get_spacy_doc(text_a).similarity(get_spacy_doc(text_b))
+    return None
+
+def _similarity_backend():
+    """(backend, model) semantic_similarity runs on: ('static', table), ('spacy', nlp) or (None, None)"""
+    backend = Config.SIMILARITY_BACKEND
+    if backend == 'static':
+        vectors = get_word_vectors()
+        if vectors is not None:
+            return 'static', vectors
+        backend = 'spacy'
+    if backend == 'spacy':
+        nlp = get_nlp()
+        if nlp is not None:
+            return 'spacy', nlp
+    return None, None
+
+def similarity_backend_id() -> str:
+    """
+    Identity of the backend and model semantic_similarity runs on, e.g.
+    "static-<table hash>", "spacy-en_core_web_sm-3.7.1" or "off". Title and
+    location scores change with it, so cached scores are keyed by it.
+    """
+    backend, model = _similarity_backend()
+    if backend == 'static':
+        return f"static-{model.identity}"
+    if backend == 'spacy':
+        meta = getattr(model, 'meta', None) or {}
+        return f"spacy-{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+    return 'off'
+
 def extract_job_title(description: str) -> str:
     """Extract job title using NLP techniques"""
     try:
         logger.info(f"Extracting job title from description: {description[:100]}...")
         
         # Use NLP to extract job titles
+        nlp = get_nlp()
         if nlp is not None:
             doc = nlp(description[:500])  # Process first 500 chars for efficiency
             
@@ -81,45 +132,35 @@ def extract_job_title(description: str) -> str:
         return description[:50].strip()
 
 def calculate_skills_match(job_text: str, candidate_skills: str) -> float:
-    """Calculate skills match score using NLP"""
+    """Calculate skills match score against the corpus TF-IDF model"""
     try:
-        logger.info("Calculating skills match using NLP")
-        
-        # Use TF-IDF and cosine similarity
         if not job_text or not candidate_skills:
             return 0.0
-            
-        vectorizer = TfidfVectorizer(stop_words='english')
-        try:
-            tfidf_matrix = vectorizer.fit_transform([job_text, candidate_skills])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        except:
-            # Fallback for vectorizer failures
-            return 0.5
-            
-        # Enhance with spaCy similarity if available
-        if nlp is not None:
-            doc1 = nlp(job_text[:5000])  # Limit text size for performance
-            doc2 = get_spacy_doc(candidate_skills[:5000])
-            spacy_similarity = doc1.similarity(doc2)
-            
-            # Combine TF-IDF and spaCy similarity
-            combined_score = (similarity + spacy_similarity) / 2
-            logger.info(f"Skills match score: {combined_score:.2f}")
-            return combined_score
-        
-        logger.info(f"Skills match score (TF-IDF only): {similarity:.2f}")
-        return similarity
+        return float(score_skills(candidate_skills, [job_text])[0])
     except Exception as e:
         logger.error(f"Error calculating skills match: {e}")
         return 0.5
 
+def calculate_skills_matches(job_texts: List[str], candidate_skills: str, job_keys: List[str] = None) -> List[float]:
+    """
+    Skills match scores for one candidate against many jobs.
+
+    Uses precomputed job vectors from the corpus TF-IDF model, so the whole
+    batch costs one sparse matrix product instead of a vectorizer per job.
+    """
+    try:
+        return [float(score) for score in score_skills(candidate_skills, job_texts, job_keys)]
+    except Exception as e:
+        logger.error(f"Error calculating skills matches: {e}")
+        return [0.5 if text and candidate_skills else 0.0 for text in job_texts]
+
 def analyze_job_requirements(description: str) -> Dict:
     """Analyze job requirements using NLP"""
     try:
         logger.info(f"Analyzing job requirements: {description[:100]}...")
         requirements = []
         
+        nlp = get_nlp()
         if nlp is not None:
             doc = nlp(description[:10000])  # Limit size for performance
             
@@ -160,150 +201,254 @@ def analyze_job_requirements(description: str) -> Dict:
 
 def semantic_location_match(job_location: str, candidate_location: str) -> float:
     """Calculate semantic location match score using NLP with strong preference for exact matches"""
-    try:
-        logger.info(f"Calculating location match between {job_location} and {candidate_location}")
-        
-        # Handle empty values
-        if not job_location or not candidate_location:
-            return 0.0  # Changed from 0.5 to be more strict
-            
-        # Direct match - exact match is highly preferred
-        if job_location.lower() == candidate_location.lower():
-            return 1.0
-            
-        # Substring match (e.g., "New York" matches "New York City")
-        if job_location.lower() in candidate_location.lower():
-            return 0.95  # High score for contains relationship
-        elif candidate_location.lower() in job_location.lower():
-            return 0.85  # Good score for reverse contains
-            
-        # Word overlap - e.g., "San Francisco" and "San Jose" both have "San"
-        job_words = set(job_location.lower().split())
-        candidate_words = set(candidate_location.lower().split())
-        word_overlap = len(job_words.intersection(candidate_words))
-        
-        if word_overlap > 0:
-            overlap_ratio = word_overlap / max(len(job_words), len(candidate_words))
-            # Stricter scoring - require more overlap
-            if overlap_ratio >= 0.5:  # At least half the words match
-                return 0.7
-            elif overlap_ratio >= 0.25:  # At least a quarter of words match
-                return 0.5
-            else:
-                return 0.3  # Just a few words match
-        
-        # Use spaCy similarity as fallback for remaining cases
-        if nlp is not None:
-            doc1 = nlp(job_location)
-            doc2 = get_spacy_doc(candidate_location)
-            similarity = doc1.similarity(doc2)
-            # Scale down NLP similarity a bit to prefer exact matches
-            return similarity * 0.8
-            
-        return 0.2  # Lower match if nothing else works - more strict
-    except Exception as e:
-        logger.error(f"Error calculating location match: {e}")
-        return 0.0  # Changed from 0.5 to be more strict on errors
+    return MatchProfile(location=candidate_location).location_score(job_location)
 
 def title_position_match(job_title: str, candidate_positions: str) -> float:
     """Calculate job title to preferred positions match score with extreme emphasis on exact matches"""
-    try:
-        logger.info(f"Calculating title match between '{job_title}' and '{candidate_positions}'")
-        
-        # Handle empty values
-        if not job_title or not candidate_positions:
-            return 0.2  # Give a small base score even if empty to ensure inclusion
-        
-        # Split candidate positions to check each one separately
-        candidate_position_list = [pos.strip() for pos in candidate_positions.split(',')]
-        
-        # Clean up job title and positions for better matching
-        job_title_lower = job_title.lower().strip()
-        
-        # Print debug info
-        logger.info(f"Candidate positions: {candidate_position_list}")
-        logger.info(f"Job title: {job_title_lower}")
-        
-        # Exact match check - highest priority
-        if any(pos.lower().strip() == job_title_lower for pos in candidate_position_list):
-            logger.info("EXACT MATCH FOUND!")
-            return 1.0  # Perfect match
-            
-        # Check partial word matches with high importance
-        # E.g. "Software Engineer" should match with "Engineer"
-        # Check if job title appears in any of the candidate positions (more specific match)
-        if any(job_title_lower in pos.lower().strip() for pos in candidate_position_list):
-            logger.info("JOB TITLE CONTAINED IN POSITION")
-            return 0.98  # Very strong match, increased priority
-            
-        # Check if any candidate position appears in the job title
-        if any(pos.lower().strip() in job_title_lower for pos in candidate_position_list):
-            logger.info("POSITION CONTAINED IN JOB TITLE")
-            return 0.95  # Strong match, increased priority
-            
-        # Check word-level matches (e.g. "Software Engineer" matches "Senior Software Engineer")
-        job_title_words = set(job_title_lower.split())
-        
-        best_word_match = 0.0
-        for position in candidate_position_list:
-            position_words = set(position.lower().split())
-            common_words = job_title_words.intersection(position_words)
-            
-            if common_words:
-                # Calculate word overlap ratio
-                match_ratio = len(common_words) / max(len(job_title_words), len(position_words))
-                best_word_match = max(best_word_match, match_ratio)
-        
-        if best_word_match > 0.5:  # More than half of words match
-            return 0.7 * best_word_match + 0.3  # Scale between 0.65-1.0
-        elif best_word_match > 0.0:  # At least some words match
-            return 0.5 * best_word_match + 0.2  # Ensure some score for partial matches
-            
-        # Check for related roles that might not share exact words (e.g. "Developer" and "Programmer")
-        related_role_mappings = {
-            "developer": ["programmer", "coder", "engineer", "software"],
-            "engineer": ["developer", "programmer", "technician"],
-            "manager": ["lead", "head", "director", "supervisor"],
-            "analyst": ["specialist", "consultant", "advisor"],
-            "marketing": ["seo", "content", "digital", "social media"],
-            "sales": ["business development", "account manager"],
-            "finance": ["accounting", "financial", "accountant"],
-            "hr": ["human resources", "talent", "recruitment"]
-        }
-        
-        # Check for related roles
-        for key, related_terms in related_role_mappings.items():
-            if key in job_title_lower:
-                if any(term in candidate_positions.lower() for term in related_terms):
-                    logger.info(f"RELATED ROLE MATCH: {key}")
-                    return 0.7  # Good match for related roles
-            elif any(term in job_title_lower for term in related_terms):
-                if key in candidate_positions.lower():
-                    logger.info(f"RELATED ROLE MATCH: {key}")
-                    return 0.7  # Good match for related roles
-        
-        # If no good word matches, use semantic similarity
-        # TF-IDF similarity between job title and all positions
-        vectorizer = TfidfVectorizer(stop_words='english')
+    return MatchProfile(positions=candidate_positions).title_score(job_title)
+
+
+# Weights of the title, skills and location scores in the final match score
+TITLE_WEIGHT = 0.4
+SKILLS_WEIGHT = 0.4
+LOCATION_WEIGHT = 0.2
+
+# Bump when score_jobs would score the same job differently; cached match
+# scores (match_cache.py) from other versions are ignored
+SCORING_VERSION = 1
+
+
+_tfidf_analyzer = tfidf_terms
+
+
+def _pair_tfidf_similarity(job_terms: Counter, profile_terms: Counter):
+    """
+    Cosine similarity of a TfidfVectorizer fitted on just these two documents.
+
+    Same result as fit_transform([job, profile]) with the default smooth idf:
+    terms in both documents weigh 1, terms in one weigh ln(3/2) + 1. Returns
+    None where the vectorizer would fail on an empty vocabulary.
+    """
+    if not job_terms and not profile_terms:
+        return None
+    shared = job_terms.keys() & profile_terms.keys()
+    single_idf = np.log(1.5) + 1.0
+
+    def norm(terms):
+        return np.sqrt(sum((count * (1.0 if term in shared else single_idf)) ** 2 for term, count in terms.items()))
+
+    denominator = norm(job_terms) * norm(profile_terms)
+    if denominator == 0:
+        return 0.0
+    return sum(job_terms[term] * profile_terms[term] for term in shared) / denominator
+
+
+class MatchProfile:
+    """Candidate-side preprocessing, done once and reused for every job scored against it."""
+
+    def __init__(self, positions: str = "", skills: str = "", location: str = ""):
+        self.positions = positions or ""
+        self.skills = skills or ""
+        self.location = location or ""
+
+        self.positions_lower = self.positions.lower()
+        self.position_list = [pos.lower().strip() for pos in self.positions.split(',')]
+        self.position_word_sets = [set(pos.split()) for pos in self.position_list]
+        self._position_terms = None
+
+        self.location_lower = self.location.lower()
+        self.location_words = set(self.location_lower.split())
+        self.places = resolve_locations(self.location)
+
+    @classmethod
+    def from_dict(cls, profile: Dict) -> "MatchProfile":
+        if isinstance(profile, cls):
+            return profile
+        return cls(profile.get('positions'), profile.get('skills'), profile.get('location'))
+
+    @property
+    def position_terms(self) -> Counter:
+        if self._position_terms is None:
+            self._position_terms = Counter(_tfidf_analyzer(self.positions))
+        return self._position_terms
+
+    def title_score(self, job_title: str, features: Dict = None) -> float:
+        """
+        Job title to preferred positions score (see title_position_match).
+
+        `features` are the job's stored features (job_features), which save
+        re-normalising and re-tokenising the title.
+        """
         try:
-            tfidf_matrix = vectorizer.fit_transform([job_title, candidate_positions])
-            tfidf_similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        except:
-            tfidf_similarity = 0.3  # Higher default to ensure inclusion
-            
-        # spaCy semantic similarity
-        if nlp is not None:
-            doc1 = nlp(job_title)
-            doc2 = get_spacy_doc(candidate_positions)
-            spacy_similarity = doc1.similarity(doc2)
-            
-            # Return weighted average of similarities
-            combined_score = (0.6 * tfidf_similarity + 0.4 * spacy_similarity)
-            logger.info(f"Title-Position match score: {combined_score:.2f}")
-            return max(0.3, combined_score)  # Ensure minimum score of 0.3
-            
-        logger.info(f"Title-Position match score (TF-IDF only): {tfidf_similarity:.2f}")
-        return max(0.3, tfidf_similarity)  # Ensure minimum score of 0.3
+            # Handle empty values
+            if not job_title or not self.positions:
+                return 0.2  # Give a small base score even if empty to ensure inclusion
+
+            job_title_lower = features['title_norm'] if features else job_title.lower().strip()
+
+            # Exact match check - highest priority
+            if any(pos == job_title_lower for pos in self.position_list):
+                return 1.0  # Perfect match
+
+            # Check if job title appears in any of the candidate positions (more specific match)
+            if any(job_title_lower in pos for pos in self.position_list):
+                return 0.98  # Very strong match, increased priority
+
+            # Check if any candidate position appears in the job title
+            if any(pos in job_title_lower for pos in self.position_list):
+                return 0.95  # Strong match, increased priority
+
+            # Check word-level matches (e.g. "Software Engineer" matches "Senior Software Engineer")
+            job_title_words = set(features['title_tokens']) if features else set(job_title_lower.split())
+
+            best_word_match = 0.0
+            for position_words in self.position_word_sets:
+                common_words = job_title_words.intersection(position_words)
+                if common_words:
+                    # Calculate word overlap ratio
+                    match_ratio = len(common_words) / max(len(job_title_words), len(position_words))
+                    best_word_match = max(best_word_match, match_ratio)
+
+            if best_word_match > 0.5:  # More than half of words match
+                return 0.7 * best_word_match + 0.3  # Scale between 0.65-1.0
+            elif best_word_match > 0.0:  # At least some words match
+                return 0.5 * best_word_match + 0.2  # Ensure some score for partial matches
+
+            # Check for related roles
+            if related_roles(job_title_lower, self.positions_lower):
+                return 0.7  # Good match for related roles
+
+            # If no good word matches, use semantic similarity
+            job_terms = Counter(features['title_terms'] if features else _tfidf_analyzer(job_title))
+            tfidf_similarity = _pair_tfidf_similarity(job_terms, self.position_terms)
+            if tfidf_similarity is None:
+                tfidf_similarity = 0.3  # Higher default to ensure inclusion
+
+            # Word-vector semantic similarity
+            vector_similarity = semantic_similarity(job_title, self.positions)
+            if vector_similarity is not None:
+                # Return weighted average of similarities
+                combined_score = (0.6 * tfidf_similarity + 0.4 * vector_similarity)
+                return max(0.3, combined_score)  # Ensure minimum score of 0.3
+
+            return max(0.3, tfidf_similarity)  # Ensure minimum score of 0.3
+        except Exception as e:
+            logger.error(f"Error calculating title match: {e}")
+            return 0.3  # Provide a base score to ensure inclusion
+
+    def _place_score(self, job_place: str) -> float:
+        """Gazetteer score of one job place against the preferred places."""
+        job_path = location_path(job_place)
+        if job_place in self.places:
+            return 1.0
+        if any(place in job_path for place in self.places):
+            return 0.95  # Job is inside a preferred place (e.g. Dubai Marina for Dubai)
+        if any(job_place in location_path(place) for place in self.places):
+            return 0.85  # Job is listed at a wider place containing a preferred one
+        if any(location_path(place)[-1] == job_path[-1] for place in self.places):
+            return 0.7  # Same emirate
+        return 0.2
+
+    def location_score(self, job_location: str, features: Dict = None) -> float:
+        """
+        Job location to preferred location score (see semantic_location_match).
+
+        Known UAE places are compared by gazetteer id; `features` (job_features)
+        carry the job's ids so its location is not resolved again.
+        """
+        try:
+            # Handle empty values
+            if not job_location or not self.location:
+                return 0.0  # Changed from 0.5 to be more strict
+
+            if features and features.get('location_ids'):
+                places_in_job = most_specific(features['location_ids'])
+            else:
+                places_in_job = job_places(job_location)
+            if places_in_job and self.places:
+                # A job naming several places scores by its best one, and only a
+                # single unmatched place is final; otherwise the text checks decide
+                best = max(self._place_score(job_place) for job_place in places_in_job)
+                if best > 0.2 or len(places_in_job) == 1:
+                    return best
+
+            job_location_lower = job_location.lower()
+
+            # Direct match - exact match is highly preferred
+            if job_location_lower == self.location_lower:
+                return 1.0
+
+            # Substring match (e.g., "New York" matches "New York City")
+            if job_location_lower in self.location_lower:
+                return 0.95  # High score for contains relationship
+            elif self.location_lower in job_location_lower:
+                return 0.85  # Good score for reverse contains
+
+            # Word overlap - e.g., "San Francisco" and "San Jose" both have "San"
+            job_words = set(job_location_lower.split())
+            word_overlap = len(job_words.intersection(self.location_words))
+
+            if word_overlap > 0:
+                overlap_ratio = word_overlap / max(len(job_words), len(self.location_words))
+                # Stricter scoring - require more overlap
+                if overlap_ratio >= 0.5:  # At least half the words match
+                    return 0.7
+                elif overlap_ratio >= 0.25:  # At least a quarter of words match
+                    return 0.5
+                else:
+                    return 0.3  # Just a few words match
+
+            # Use word-vector similarity as fallback for remaining cases
+            similarity = semantic_similarity(job_location, self.location)
+            if similarity is not None:
+                # Scale down NLP similarity a bit to prefer exact matches
+                return similarity * 0.8
+
+            return 0.2  # Lower match if nothing else works - more strict
+        except Exception as e:
+            logger.error(f"Error calculating location match: {e}")
+            return 0.0  # Changed from 0.5 to be more strict on errors
+
+
+def score_jobs(profile, jobs: List[Dict], fields: Dict = None) -> List[Dict]:
+    """
+    Score a list of jobs against one candidate profile in a single pass.
+
+    Args:
+        profile: dict with 'positions', 'skills' and 'location' (or a MatchProfile)
+        jobs: Job dicts
+        fields: Keys of the job's 'id', 'title', 'description' and 'location'
+            in each dict (defaults to job_features.JOB_FIELDS)
+
+    Returns:
+        One dict per job, in order, with 'title_score', 'skill_score',
+        'location_score', the weighted 'score' (0-1, 3 decimals) and its
+        integer 'percentage'
+    """
+    profile = MatchProfile.from_dict(profile)
+    fields = {**JOB_FIELDS, **(fields or {})}
+
+    try:
+        features = load_job_features(jobs, fields)
     except Exception as e:
-        logger.error(f"Error calculating title match: {e}")
-        return 0.3  # Provide a base score to ensure inclusion
+        logger.error(f"Error loading job features: {e}")
+        features = [None] * len(jobs)
+
+    titles = [job.get(fields['title']) or '' for job in jobs]
+    skill_texts = [job.get(fields['description']) or title for job, title in zip(jobs, titles)]
+    skill_keys = [feature['skill_key'] if feature else None for feature in features]
+    skill_scores = calculate_skills_matches(skill_texts, profile.skills, skill_keys)
+
+    results = []
+    for job, title, feature, skill_score in zip(jobs, titles, features, skill_scores):
+        title_score = profile.title_score(title, feature)
+        location_score = profile.location_score(job.get(fields['location']) or '', feature)
+        score = round(TITLE_WEIGHT * title_score + SKILLS_WEIGHT * skill_score + LOCATION_WEIGHT * location_score, 3)
+        results.append({
+            'title_score': title_score,
+            'skill_score': skill_score,
+            'location_score': location_score,
+            'score': score,
+            'percentage': int(round(score * 100, 0)),
+        })
+    return results
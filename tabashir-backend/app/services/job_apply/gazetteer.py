@@ -0,0 +1,242 @@
+"""
+UAE location gazetteer: canonical ids for emirates, cities and districts.
+
+Free-text locations ("Abu Dhabi, AE", "أبوظبي", "AUH", "Dubai Marina - Dubai")
+resolve to a canonical place id through one compiled alias pattern, in English
+and Arabic. Every place knows its parent, so matching becomes a comparison of
+ids and their ancestors instead of substring checks or NLP similarity.
+
+Ids are resolved once when data is written - jobs through the job feature
+store (`location_ids`: every place named, plus ancestors), clients on profile
+save (`clients.location_ids`) - and read back by the ranker, the request-path
+matcher and the /jobs filters.
+Locations outside the gazetteer (other countries, "Remote") resolve to
+nothing and callers fall back to their string comparison, as they do when a
+job names several places and none of them matches.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+EMIRATE, CITY, DISTRICT = 'emirate', 'city', 'district'
+
+# id: (kind, parent id, English name, Arabic name, extra aliases)
+PLACES = {
+    'abu-dhabi': (EMIRATE, None, 'Abu Dhabi', 'أبوظبي',
+                  ['abu dhabi', 'abudhabi', 'abu dhabi city', 'abu zabi', 'auh', 'أبو ظبي', 'ابوظبي', 'ابو ظبي']),
+    'dubai': (EMIRATE, None, 'Dubai', 'دبي', ['dubai city', 'dubayy', 'dxb']),
+    'sharjah': (EMIRATE, None, 'Sharjah', 'الشارقة', ['sharjah city', 'shj', 'شارقة']),
+    'ajman': (EMIRATE, None, 'Ajman', 'عجمان', ['ajman city']),
+    'umm-al-quwain': (EMIRATE, None, 'Umm Al Quwain', 'أم القيوين',
+                      ['umm al quwain', 'umm al qaiwain', 'umm al-quwain', 'umm alquwain', 'uaq', 'ام القيوين']),
+    'ras-al-khaimah': (EMIRATE, None, 'Ras Al Khaimah', 'رأس الخيمة',
+                       ['ras al khaimah', 'ras al-khaimah', 'ras alkhaimah', 'rak', 'rkt', 'راس الخيمة']),
+    'fujairah': (EMIRATE, None, 'Fujairah', 'الفجيرة', ['al fujairah', 'fujeirah', 'fjr', 'فجيرة']),
+
+    # Cities outside the emirate capitals
+    'al-ain': (CITY, 'abu-dhabi', 'Al Ain', 'العين', ['al ain', 'alain', 'al-ain', 'aan']),
+    'ruwais': (CITY, 'abu-dhabi', 'Ruwais', 'الرويس', ['al ruwais', 'ar ruwais']),
+    'madinat-zayed': (CITY, 'abu-dhabi', 'Madinat Zayed', 'مدينة زايد', ['madinat zayed', 'madinat zayid']),
+    'liwa': (CITY, 'abu-dhabi', 'Liwa', 'ليوا', ['liwa oasis']),
+    'khor-fakkan': (CITY, 'sharjah', 'Khor Fakkan', 'خورفكان', ['khor fakkan', 'khorfakkan', 'خور فكان']),
+    'kalba': (CITY, 'sharjah', 'Kalba', 'كلباء', ['kalbaa']),
+    'dhaid': (CITY, 'sharjah', 'Al Dhaid', 'الذيد', ['al dhaid', 'dhaid', 'adh dhayd']),
+    'dibba': (CITY, 'fujairah', 'Dibba', 'دبا', ['dibba al fujairah', 'dibba al-fujairah', 'دبا الفجيرة']),
+    'masafi': (CITY, 'fujairah', 'Masafi', 'مسافي', []),
+
+    # Dubai districts and free zones
+    'dubai-marina': (DISTRICT, 'dubai', 'Dubai Marina', 'دبي مارينا', ['marina dubai', 'مرسى دبي']),
+    'jlt': (DISTRICT, 'dubai', 'Jumeirah Lake Towers', 'أبراج بحيرات جميرا',
+            ['jumeirah lake towers', 'jumeirah lakes towers', 'jlt']),
+    'downtown-dubai': (DISTRICT, 'dubai', 'Downtown Dubai', 'وسط مدينة دبي', ['downtown dubai', 'dubai downtown']),
+    'business-bay': (DISTRICT, 'dubai', 'Business Bay', 'الخليج التجاري', []),
+    'difc': (DISTRICT, 'dubai', 'DIFC', 'مركز دبي المالي العالمي',
+             ['difc', 'dubai international financial centre', 'dubai international financial center']),
+    'deira': (DISTRICT, 'dubai', 'Deira', 'ديرة', []),
+    'bur-dubai': (DISTRICT, 'dubai', 'Bur Dubai', 'بر دبي', []),
+    'karama': (DISTRICT, 'dubai', 'Al Karama', 'الكرامة', ['al karama', 'karama']),
+    'al-qusais': (DISTRICT, 'dubai', 'Al Qusais', 'القصيص', ['al qusais', 'qusais']),
+    'al-barsha': (DISTRICT, 'dubai', 'Al Barsha', 'البرشاء', ['al barsha', 'barsha']),
+    'al-quoz': (DISTRICT, 'dubai', 'Al Quoz', 'القوز', ['al quoz', 'al qouz']),
+    'jumeirah': (DISTRICT, 'dubai', 'Jumeirah', 'جميرا', ['jumeira', 'jumeirah beach residence', 'jbr']),
+    'jebel-ali': (DISTRICT, 'dubai', 'Jebel Ali', 'جبل علي', ['jebel ali', 'jabal ali', 'jafza', 'jebel ali free zone']),
+    'dubai-south': (DISTRICT, 'dubai', 'Dubai South', 'دبي الجنوب', ['dubai world central', 'dwc']),
+    'dubai-silicon-oasis': (DISTRICT, 'dubai', 'Dubai Silicon Oasis', 'واحة دبي للسيليكون', ['dso']),
+    'dubai-internet-city': (DISTRICT, 'dubai', 'Dubai Internet City', 'مدينة دبي للإنترنت', []),
+    'dubai-media-city': (DISTRICT, 'dubai', 'Dubai Media City', 'مدينة دبي للإعلام', []),
+    'dubai-healthcare-city': (DISTRICT, 'dubai', 'Dubai Healthcare City', 'مدينة دبي الطبية', ['dhcc']),
+    'dubai-investments-park': (DISTRICT, 'dubai', 'Dubai Investments Park', 'مجمع دبي للاستثمار', ['dip']),
+    'dubai-airport-freezone': (DISTRICT, 'dubai', 'Dubai Airport Freezone', 'المنطقة الحرة لمطار دبي',
+                               ['dubai airport free zone', 'dafza']),
+    'international-city': (DISTRICT, 'dubai', 'International City', 'المدينة العالمية', []),
+    'motor-city': (DISTRICT, 'dubai', 'Motor City', 'موتور سيتي', []),
+    'dubai-sports-city': (DISTRICT, 'dubai', 'Dubai Sports City', 'مدينة دبي الرياضية', ['sports city']),
+    'al-warqa': (DISTRICT, 'dubai', 'Al Warqa', 'الورقاء', ['al warqaa', 'warqa']),
+    'mirdif': (DISTRICT, 'dubai', 'Mirdif', 'مردف', ['mirdiff']),
+
+    # Abu Dhabi districts and free zones
+    'mussafah': (DISTRICT, 'abu-dhabi', 'Mussafah', 'مصفح', ['musaffah', 'mussafah industrial area', 'icad']),
+    'khalifa-city': (DISTRICT, 'abu-dhabi', 'Khalifa City', 'مدينة خليفة', ['khalifa city a']),
+    'yas-island': (DISTRICT, 'abu-dhabi', 'Yas Island', 'جزيرة ياس', []),
+    'saadiyat-island': (DISTRICT, 'abu-dhabi', 'Saadiyat Island', 'جزيرة السعديات', ['saadiyat']),
+    'al-reem-island': (DISTRICT, 'abu-dhabi', 'Al Reem Island', 'جزيرة الريم', ['reem island']),
+    'al-maryah-island': (DISTRICT, 'abu-dhabi', 'Al Maryah Island', 'جزيرة الماريه', ['adgm', 'abu dhabi global market']),
+    'masdar-city': (DISTRICT, 'abu-dhabi', 'Masdar City', 'مدينة مصدر', []),
+    'kizad': (DISTRICT, 'abu-dhabi', 'KIZAD', 'كيزاد', ['khalifa industrial zone', 'khalifa port']),
+
+    # Northern emirates districts and free zones
+    'sharjah-industrial-area': (DISTRICT, 'sharjah', 'Sharjah Industrial Area', 'المنطقة الصناعية بالشارقة', []),
+    'muwaileh': (DISTRICT, 'sharjah', 'Muwaileh', 'مويلح', ['muweilah', 'university city sharjah']),
+    'al-majaz': (DISTRICT, 'sharjah', 'Al Majaz', 'المجاز', []),
+    'saif-zone': (DISTRICT, 'sharjah', 'SAIF Zone', 'المنطقة الحرة بمطار الشارقة',
+                  ['saif zone', 'sharjah airport free zone', 'hamriyah free zone']),
+    'ajman-free-zone': (DISTRICT, 'ajman', 'Ajman Free Zone', 'المنطقة الحرة بعجمان', []),
+    'rakez': (DISTRICT, 'ras-al-khaimah', 'RAKEZ', 'راكز', ['rak economic zone', 'ras al khaimah economic zone']),
+    'fujairah-free-zone': (DISTRICT, 'fujairah', 'Fujairah Free Zone', 'المنطقة الحرة بالفجيرة', []),
+}
+
+EMIRATE_IDS = tuple(place_id for place_id, (kind, *_) in PLACES.items() if kind == EMIRATE)
+
+# Country suffixes dropped before matching ("Dubai, UAE")
+COUNTRY_WORDS = ('united arab emirates', 'uae', 'u.a.e', 'ae', 'الإمارات العربية المتحدة', 'الامارات', 'الإمارات')
+
+_ARABIC_DIACRITICS = re.compile(r'[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_ARABIC_LETTERS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي'})
+_SEPARATORS = re.compile(r"[\s,.;:/\\|()\[\]_'’\-–—،؛]+")
+_LEVELS = {EMIRATE: 0, CITY: 1, DISTRICT: 2}
+
+
+def normalize_place(text):
+    """Lowercase, unify Arabic letter variants and collapse punctuation to single spaces."""
+    if not isinstance(text, str):
+        return ''
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = _ARABIC_DIACRITICS.sub('', text).translate(_ARABIC_LETTERS)
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def _build_aliases():
+    aliases = {}
+    for place_id, (_, _, name_en, name_ar, extra) in PLACES.items():
+        for alias in (place_id, name_en, name_ar, *extra):
+            key = normalize_place(alias)
+            if key:
+                aliases.setdefault(key, place_id)
+    return aliases
+
+
+ALIASES = _build_aliases()
+
+# Longest alias first so "dubai marina" wins over "dubai"
+_ALIAS_PATTERN = re.compile(
+    r'(?<!\w)(' + '|'.join(re.escape(alias) for alias in sorted(ALIASES, key=len, reverse=True)) + r')(?!\w)'
+)
+_COUNTRY_PATTERN = re.compile(
+    r'(?<!\w)(' + '|'.join(re.escape(normalize_place(word)) for word in COUNTRY_WORDS) + r')(?!\w)'
+)
+
+
+@lru_cache(maxsize=8192)
+def resolve_locations(text):
+    """
+    Every gazetteer place mentioned in `text`, in order of appearance.
+
+    Returns:
+        Tuple of place ids (empty if nothing is recognised)
+    """
+    normalized = _COUNTRY_PATTERN.sub(' ', normalize_place(text)).strip()
+    if not normalized:
+        return ()
+    exact = ALIASES.get(normalized)
+    if exact:
+        return (exact,)
+    return tuple(dict.fromkeys(ALIASES[match] for match in _ALIAS_PATTERN.findall(normalized)))
+
+
+def resolve_location(text):
+    """The most specific place in `text` ("Dubai Marina, Dubai" -> 'dubai-marina'), or None."""
+    places = resolve_locations(text)
+    if not places:
+        return None
+    return max(places, key=lambda place_id: _LEVELS[PLACES[place_id][0]])
+
+
+@lru_cache(maxsize=None)
+def location_path(place_id):
+    """The place and its ancestors, most specific first."""
+    path = []
+    while place_id:
+        path.append(place_id)
+        place_id = PLACES[place_id][1]
+    return tuple(path)
+
+
+def most_specific(place_ids):
+    """Drop places that contain another of `place_ids` (('dubai-marina', 'dubai') -> ('dubai-marina',))."""
+    containing = {ancestor for place_id in place_ids for ancestor in location_path(place_id)[1:]}
+    return tuple(place_id for place_id in place_ids if place_id not in containing)
+
+
+def job_places(text):
+    """The distinct places a job location names ("Sharjah / Dubai" -> ('sharjah', 'dubai'))."""
+    return most_specific(resolve_locations(text))
+
+
+def location_ids(text):
+    """Ids stored for a job location: every place it names and their ancestors."""
+    return list(dict.fromkeys(ancestor for place_id in job_places(text) for ancestor in location_path(place_id)))
+
+
+def client_location_ids(text):
+    """Ids stored for a client's (possibly comma-separated) preferred locations."""
+    return list(resolve_locations(text))
+
+
+def client_places(stored_ids, location_text):
+    """A client's places: ids stored at profile save, else resolved from the location text now."""
+    if isinstance(stored_ids, (list, tuple)) and stored_ids:
+        return tuple(stored_ids)
+    return resolve_locations(location_text)
+
+
+def emirate_of(place_id):
+    return location_path(place_id)[-1]
+
+
+def city_of(place_id):
+    """Nearest ancestor-or-self that is a city or an emirate (districts roll up)."""
+    for ancestor in location_path(place_id):
+        if PLACES[ancestor][0] != DISTRICT:
+            return ancestor
+    return place_id
+
+
+def place_name(place_id, language='en'):
+    _, _, name_en, name_ar, _ = PLACES[place_id]
+    return name_ar if language == 'ar' else name_en
+
+
+@lru_cache(maxsize=8192)
+def matching_places(client_places):
+    """
+    Every place a job may be in to match a client who wants `client_places`:
+    each wanted place, everything inside it, and the places containing it
+    (a job listed only as "Dubai" still matches a client asking for Dubai Marina).
+    """
+    containing = {ancestor for place_id in client_places for ancestor in location_path(place_id)}
+    return frozenset(
+        place_id for place_id in PLACES
+        if place_id in containing or set(client_places).intersection(location_path(place_id))
+    )
+
+
+def locations_match(job_place, client_places):
+    """True when the job's place is one of, inside, or contains one of the client's places."""
+    return bool(job_place) and job_place in matching_places(tuple(client_places))
+
+
+def any_location_match(job_places, client_places):
+    """True when any of a job's places matches the client (see locations_match)."""
+    wanted = matching_places(tuple(client_places))
+    return any(place_id in wanted for place_id in job_places)
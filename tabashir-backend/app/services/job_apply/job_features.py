@@ -0,0 +1,224 @@
+"""
+Per-job feature store shared by the ranker and the request-path matcher.
+
+Everything the scorers derive from a job's raw text - normalised title, its
+distinct words and TF-IDF terms, the engineering discipline bucket, the
+normalised city and the key of the job's skill vector - is computed once and
+kept in the AI database's `job_features` table (migrations/ai/0006), keyed by
+job id plus a hash of the job's text. Rows are written at ingest time (Apify
+sync, POST /resumes/jobs, legacy job sync) and by the ranker for any job it
+finds missing or stale. A bounded in-process cache sits in front of the table.
+
+Features are only derived from title, description and city; gender and
+nationality flags stay cheap vectorised column operations in `JobMatrix`.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from app.config import Config
+from app.services.job_apply.gazetteer import location_ids
+from app.services.job_apply.scoring import JobMatrix
+from app.services.job_apply.skill_model import job_skill_text, text_key
+
+# Bump when the way features are computed changes; older rows are recomputed
+FEATURE_VERSION = 3
+
+# Keys of the raw fields in an AI database "jobs" row
+JOB_FIELDS = {'id': 'id', 'title': 'job_title', 'description': 'job_description', 'location': 'vacancy_city'}
+
+FEATURE_COLUMNS = ('title_norm', 'title_tokens', 'title_terms', 'is_engineering', 'discipline', 'city_norm',
+                   'location_ids', 'skill_key')
+
+@lru_cache(maxsize=1)
+def _tfidf_analyzer():
+    # sklearn is imported on first use so it stays out of app start-up
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words='english').build_analyzer()
+
+
+def tfidf_terms(text):
+    """Same tokenisation, lowercasing and stop words as TfidfVectorizer(stop_words='english')."""
+    return _tfidf_analyzer()(text)
+
+
+def _normalize(value):
+    return value.lower().strip() if isinstance(value, str) else ''
+
+
+def content_hash(title, description, city):
+    """Hash of the job text every feature is derived from."""
+    payload = '\x1f'.join(value if isinstance(value, str) else '' for value in (title, description, city))
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def compute_job_features(jobs, fields=None):
+    """
+    Derive features for a batch of jobs.
+
+    Args:
+        jobs: Job dicts with raw title, description and city
+        fields: Overrides for JOB_FIELDS key names
+
+    Returns:
+        One feature dict per job, in order
+    """
+    fields = {**JOB_FIELDS, **(fields or {})}
+    if not jobs:
+        return []
+
+    titles = [job.get(fields['title']) for job in jobs]
+    frame = pd.DataFrame({
+        'job_title': [_normalize(title) for title in titles],
+        'vacancy_city': [_normalize(job.get(fields['location'])) for job in jobs],
+    })
+    # The ranker's own column logic, so stored features cannot drift from it
+    matrix = JobMatrix(frame)
+    tokens = [[] for _ in jobs]
+    for row, token in zip(matrix.title_tokens.index, matrix.title_tokens.to_numpy()):
+        tokens[int(row)].append(token)
+
+    features = []
+    for row, job in enumerate(jobs):
+        title = titles[row] if isinstance(titles[row], str) else ''
+        skill_text = job_skill_text(job.get(fields['description']), title)
+        features.append({
+            'title_norm': matrix.titles.iat[row],
+            'title_tokens': tokens[row],
+            'title_terms': tfidf_terms(title),
+            'is_engineering': bool(matrix.is_engineering[row]),
+            'discipline': matrix.disciplines[row] or '',
+            'city_norm': matrix.cities.iat[row],
+            'location_ids': location_ids(job.get(fields['location'])),
+            'skill_key': text_key(skill_text) if skill_text else None,
+        })
+    return features
+
+
+def store_job_features(jobs, features=None, fields=None, conn=None):
+    """Upsert features for jobs that have an id; computes them when not given."""
+    fields = {**JOB_FIELDS, **(fields or {})}
+    features = features or compute_job_features(jobs, fields)
+    values = [
+        (str(job[fields['id']]),
+         content_hash(job.get(fields['title']), job.get(fields['description']), job.get(fields['location'])),
+         FEATURE_VERSION, *[feature[column] for column in FEATURE_COLUMNS])
+        for job, feature in zip(jobs, features) if job.get(fields['id']) is not None
+    ]
+    if not values:
+        return 0
+
+    query = f"""
+        INSERT INTO job_features (job_id, content_hash, feature_version, {', '.join(FEATURE_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (job_id) DO UPDATE SET
+            content_hash = EXCLUDED.content_hash,
+            feature_version = EXCLUDED.feature_version,
+            {', '.join(f'{column} = EXCLUDED.{column}' for column in FEATURE_COLUMNS)},
+            computed_at = NOW()
+    """
+    if conn is not None:
+        _upsert(conn, query, values)
+    else:
+        from app.database.db import ai_db_connection
+        with ai_db_connection() as pooled:
+            _upsert(pooled, query, values)
+    return len(values)
+
+
+def _upsert(conn, query, values):
+    cursor = conn.cursor()
+    try:
+        execute_values(cursor, query, values, page_size=1000)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        feature = _cache.get(key)
+        if feature is not None:
+            _cache.move_to_end(key)
+        return feature
+
+
+def _cache_put(key, feature):
+    with _cache_lock:
+        _cache[key] = feature
+        _cache.move_to_end(key)
+        while len(_cache) > Config.JOB_FEATURE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _fetch_stored(keys):
+    from app.database.db import execute_ai_query
+    rows = execute_ai_query(f"""
+        SELECT job_id, content_hash, {', '.join(FEATURE_COLUMNS)}
+        FROM job_features
+        WHERE job_id = ANY(%s) AND feature_version = %s
+    """, ([job_id for job_id, _ in keys], FEATURE_VERSION), fetch_all=True) or []
+    return {(row['job_id'], row['content_hash']): {column: row[column] for column in FEATURE_COLUMNS}
+            for row in rows}
+
+
+def load_job_features(jobs, fields=None, store_missing=False):
+    """
+    Features for each job, from the in-process cache, the feature table, or
+    computed on the spot - in that order.
+
+    Args:
+        jobs: Job dicts with id, title, description and city
+        fields: Overrides for JOB_FIELDS key names
+        store_missing: Persist features computed here (the ranker does; request
+            handlers leave that to ingestion)
+
+    Returns:
+        One feature dict per job, in order
+    """
+    fields = {**JOB_FIELDS, **(fields or {})}
+    keys = [
+        (str(job[fields['id']]) if job.get(fields['id']) is not None else None,
+         content_hash(job.get(fields['title']), job.get(fields['description']), job.get(fields['location'])))
+        for job in jobs
+    ]
+    features = [_cache_get(key) if key[0] is not None else None for key in keys]
+
+    lookup = [key for key, feature in zip(keys, features) if feature is None and key[0] is not None]
+    if lookup:
+        try:
+            stored = _fetch_stored(lookup)
+        except Exception as e:
+            print(f"[JOB_FEATURES] ⚠️ Could not read feature table: {e}")
+            stored = {}
+        for i, key in enumerate(keys):
+            if features[i] is None and key in stored:
+                features[i] = stored[key]
+                _cache_put(key, features[i])
+
+    missing = [i for i, feature in enumerate(features) if feature is None]
+    if missing:
+        computed = compute_job_features([jobs[i] for i in missing], fields)
+        for i, feature in zip(missing, computed):
+            features[i] = feature
+            if keys[i][0] is not None:
+                _cache_put(keys[i], feature)
+        if store_missing:
+            try:
+                stored_count = store_job_features([jobs[i] for i in missing], computed, fields)
+                print(f"[JOB_FEATURES] Stored features for {stored_count} new or changed jobs")
+            except Exception as e:
+                print(f"[JOB_FEATURES] ⚠️ Could not store features: {e}")
+    return features
@@ -0,0 +1,172 @@
+"""
+Cache of match scores computed on the request path.
+
+Endpoints that show a candidate's match percentage for jobs the ranker has not
+ranked for them score those jobs with `score_jobs`. The results are kept in
+the AI database's `match_scores` table (migrations/ai/0008), keyed by client,
+job and scoring version, apart from the auto-apply `rankings` table. A page of
+jobs is read with one query, and its misses are written with one bulk upsert.
+
+Each row records hashes of the profile and of the job text it was scored
+from, so an edited profile or job (or the Arabic text of a job scored after
+the English one) reads as a miss and is overwritten. Rows are also dropped
+when the client's profile is saved, when a job is edited or deleted, and, for
+older scoring versions, after migrations run.
+
+The version also names the active title/location similarity backend, so
+building the word-vector table (or changing the spaCy model) stops the old
+scores from being read, and the next prune removes them.
+"""
+
+import hashlib
+import json
+
+from psycopg2.extras import execute_values
+
+from app.services.job_apply.ai_matching import SCORING_VERSION, score_jobs, similarity_backend_id
+from app.services.job_apply.job_features import FEATURE_VERSION, JOB_FIELDS, content_hash
+
+SCORE_COLUMNS = ('score', 'title_score', 'skill_score', 'location_score')
+PROFILE_FIELDS = ('positions', 'skills', 'location', 'location_ids')
+
+
+def cache_version():
+    """Scores depend on the matcher, the stored job features it reads and the similarity backend."""
+    return f"{SCORING_VERSION}.{FEATURE_VERSION}.{similarity_backend_id()}"
+
+
+def client_key(email):
+    """Cache key of a client: the lowercased email, or None."""
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def profile_hash(profile):
+    """Hash of the profile fields a match score depends on."""
+    payload = json.dumps({field: profile.get(field) for field in PROFILE_FIELDS}, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def _result(row):
+    """A score_jobs result dict from a stored row."""
+    result = {column: row[column] for column in SCORE_COLUMNS}
+    result['percentage'] = int(round(result['score'] * 100, 0))
+    return result
+
+
+def fetch_scores(client, job_ids, digest):
+    """{(job_id, content_hash): score_jobs result} of the cached scores for this profile."""
+    from app.database.db import execute_ai_query
+    rows = execute_ai_query(f"""
+        SELECT job_id, content_hash, {', '.join(SCORE_COLUMNS)}
+        FROM match_scores
+        WHERE client_key = %s AND scoring_version = %s AND profile_hash = %s AND job_id = ANY(%s)
+    """, (client, cache_version(), digest, list(job_ids)), fetch_all=True) or []
+    return {(row['job_id'], row['content_hash']): _result(row) for row in rows}
+
+
+def store_scores(client, digest, scores):
+    """Upsert {(job_id, content_hash): score_jobs result} for a client in one statement."""
+    version = cache_version()
+    values = [(client, job_id, version, digest, job_hash, *[result[column] for column in SCORE_COLUMNS])
+              for (job_id, job_hash), result in scores.items()]
+    if not values:
+        return 0
+
+    from app.database.db import ai_db_connection
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_values(cursor, f"""
+                INSERT INTO match_scores (client_key, job_id, scoring_version, profile_hash, content_hash,
+                                          {', '.join(SCORE_COLUMNS)})
+                VALUES %s
+                ON CONFLICT (client_key, job_id, scoring_version) DO UPDATE SET
+                    profile_hash = EXCLUDED.profile_hash,
+                    content_hash = EXCLUDED.content_hash,
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in SCORE_COLUMNS)},
+                    computed_at = NOW()
+            """, values, page_size=1000)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return len(values)
+
+
+def score_jobs_cached(email, profile, jobs, fields=None):
+    """
+    `score_jobs` with results cached per (client, job, scoring version).
+
+    Args:
+        email: Client whose scores these are; without one nothing is cached
+        profile: dict with 'positions', 'skills' and 'location'
+        jobs: Job dicts
+        fields: Keys of the job's 'id', 'title', 'description' and 'location'
+
+    Returns:
+        One score_jobs result dict per job, in order
+    """
+    fields = {**JOB_FIELDS, **(fields or {})}
+    client = client_key(email)
+    if client is None:
+        return score_jobs(profile, jobs, fields)
+
+    keys = [
+        (str(job[fields['id']]) if job.get(fields['id']) is not None else None,
+         content_hash(job.get(fields['title']), job.get(fields['description']), job.get(fields['location'])))
+        for job in jobs
+    ]
+    digest = profile_hash(profile)
+    try:
+        cached = fetch_scores(client, {job_id for job_id, _ in keys if job_id}, digest)
+    except Exception as e:
+        print(f"[MATCH_CACHE] ⚠️ Could not read match scores: {e}")
+        cached = {}
+
+    results = [cached.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        scored = score_jobs(profile, [jobs[i] for i in missing], fields)
+        for i, result in zip(missing, scored):
+            results[i] = result
+        try:
+            store_scores(client, digest, {keys[i]: result for i, result in zip(missing, scored) if keys[i][0]})
+        except Exception as e:
+            print(f"[MATCH_CACHE] ⚠️ Could not store match scores: {e}")
+    return results
+
+
+def invalidate_client(email):
+    """Drop every cached score of a client (profile saved or account deleted)."""
+    client = client_key(email)
+    if client is None:
+        return
+    from app.database.db import execute_ai_query
+    try:
+        execute_ai_query("DELETE FROM match_scores WHERE client_key = %s", (client,), commit=True)
+    except Exception as e:
+        print(f"[MATCH_CACHE] ⚠️ Could not invalidate scores for {client}: {e}")
+
+
+def invalidate_job(job_id):
+    """Drop every cached score of a job (edited or deleted)."""
+    from app.database.db import execute_ai_query
+    try:
+        execute_ai_query("DELETE FROM match_scores WHERE job_id = %s", (str(job_id),), commit=True)
+    except Exception as e:
+        print(f"[MATCH_CACHE] ⚠️ Could not invalidate scores for job {job_id}: {e}")
+
+
+def prune_match_scores():
+    """Delete scores from other scoring versions or similarity backends; returns the number of rows removed."""
+    from app.database.db import ai_db_connection
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM match_scores WHERE scoring_version <> %s", (cache_version(),))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
@@ -0,0 +1,428 @@
+"""
+Durable background pipeline for /resumes/apply and /resumes/add_client.
+
+The HTTP handlers only store the uploaded CV and insert a row into the AI
+database's `pipeline_jobs` table (migrations/ai/0005), then return the job id.
+Worker threads - in `python -m app.commands.pipeline_worker` processes, not
+in the web workers unless PIPELINE_WORKERS is set for local development -
+claim queued rows with `FOR UPDATE SKIP LOCKED` and run the stages in order:
+
+    process_cv -> rank -> apply
+
+Each stage's status, attempts and duration are kept in the row's `stages`
+JSON and its output in `result`, so GET /resumes/pipeline/<id> reports
+progress. A failed stage is retried with exponential backoff without re-running
+the stages before it, and a job whose worker died is reclaimed once its lease
+(renewed while a stage runs) expires.
+"""
+
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+from psycopg2.extras import Json
+from werkzeug.utils import secure_filename
+
+from app.config import Config
+from app.database.db import execute_ai_query
+from app.services.job_apply.process_cv import process_ai_job_input, process_ai_job_input_not_active
+from app.services.job_apply.ranking import main as run_ranking_main
+from app.services.job_apply.ai_job_apply import apply as apply_jobs
+
+KINDS = ('apply', 'add_client')
+STAGES = ('process_cv', 'rank', 'apply')
+
+
+def _json(value):
+    # Ranking/apply summaries may hold numpy scalars or datetimes
+    return Json(value, dumps=lambda obj: json.dumps(obj, default=str))
+
+
+def _now():
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+
+
+def _resume_path(job):
+    return Path(job['payload']['resume_path'])
+
+
+def _stage_process_cv(job):
+    payload = job['payload']
+    process = process_ai_job_input if job['kind'] == 'apply' else process_ai_job_input_not_active
+    email = process(
+        email=payload['email'], resume_path=_resume_path(job), nationality=payload['nationality'],
+        gender=payload['gender'], location_preferred=payload['locations'], preferred_positions=payload['positions']
+    )
+    if not email:
+        raise RuntimeError("Failed to process resume. Please ensure the file is a valid PDF or DOCX and contains your contact information.")
+    return {'email': email}
+
+
+def _stage_rank(job):
+    ranking_result = run_ranking_main(client_email=job['email'])
+    if not ranking_result:
+        raise RuntimeError("Failed to rank jobs")
+    return ranking_result
+
+
+def _stage_apply(job):
+    apply_result = apply_jobs(email=job['email'], file_path=_resume_path(job))
+    if not apply_result:
+        raise RuntimeError("Failed to apply for jobs")
+    return apply_result
+
+
+STAGE_HANDLERS = {
+    'process_cv': _stage_process_cv,
+    'rank': _stage_rank,
+    'apply': _stage_apply,
+}
+
+
+def enqueue_pipeline_job(kind, email, file, nationality, gender, positions, locations):
+    """
+    Store the uploaded CV and queue a pipeline job.
+
+    Args:
+        kind: 'apply' (active client) or 'add_client' (inactive client)
+        email: Client email from the form
+        file: Uploaded FileStorage
+        nationality, gender: Normalised form values
+        positions, locations: Comma-joined preferences
+
+    Returns:
+        The new job id
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown pipeline kind: {kind}")
+
+    job_id = str(uuid.uuid4())
+    job_dir = Config.PIPELINE_FOLDER / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    # Keep the original name: it becomes the client's stored CV filename
+    resume_path = job_dir / secure_filename(file.filename)
+    file.save(resume_path)
+
+    payload = {
+        'email': email,
+        'resume_path': str(resume_path),
+        'nationality': nationality,
+        'gender': gender,
+        'positions': positions,
+        'locations': locations,
+    }
+    stages = {name: {'status': 'pending', 'attempts': 0} for name in STAGES}
+    try:
+        execute_ai_query("""
+            INSERT INTO pipeline_jobs (id, kind, email, payload, status, stages)
+            VALUES (%s, %s, %s, %s, 'queued', %s)
+        """, (job_id, kind, email, _json(payload), _json(stages)), commit=True)
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    print(f"[PIPELINE] Queued {kind} job {job_id} for {email}")
+    return job_id
+
+
+def _serialize_job(row):
+    job = dict(row)
+    job.pop('payload', None)
+    job.pop('locked_by', None)
+    job.pop('locked_until', None)
+    for key in ('run_after', 'created_at', 'updated_at', 'finished_at'):
+        if job.get(key) is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+def get_pipeline_job(job_id):
+    """Return a job's status, per-stage progress and results, or None if unknown."""
+    row = execute_ai_query("""
+        SELECT j.*,
+               CASE WHEN j.status = 'queued' THEN (
+                   SELECT COUNT(*) FROM pipeline_jobs q
+                   WHERE q.status = 'queued' AND q.created_at < j.created_at
+               ) END AS queue_position
+        FROM pipeline_jobs j
+        WHERE j.id = %s
+    """, (job_id,), fetch_one=True)
+    return _serialize_job(row) if row else None
+
+
+def retry_pipeline_job(job_id, stage=None):
+    """
+    Re-queue a job from `stage` (default: its first unfinished stage).
+
+    That stage and every later one are reset; earlier stages keep their results.
+
+    Raises:
+        ValueError: Unknown job or stage, job still running, or CV no longer stored
+    """
+    row = execute_ai_query("SELECT * FROM pipeline_jobs WHERE id = %s", (job_id,), fetch_one=True)
+    if not row:
+        raise ValueError("Pipeline job not found")
+    if row['status'] == 'running':
+        raise ValueError("Pipeline job is still running")
+
+    stages = row['stages'] or {}
+    if stage is None:
+        stage = next((name for name in STAGES if stages.get(name, {}).get('status') != 'succeeded'), None)
+        if stage is None:
+            raise ValueError("All stages already succeeded; pass a stage to re-run")
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage '{stage}'. Valid stages: {', '.join(STAGES)}")
+    if stage in ('process_cv', 'apply') and not _resume_path(row).exists():
+        raise ValueError("The uploaded CV is no longer stored; submit a new request")
+
+    result = row['result'] or {}
+    for name in STAGES[STAGES.index(stage):]:
+        stages[name] = {'status': 'pending', 'attempts': 0}
+        result.pop(name, None)
+
+    execute_ai_query("""
+        UPDATE pipeline_jobs
+        SET status = 'queued', current_stage = NULL, stages = %s, result = %s, error = NULL,
+            run_after = NOW(), finished_at = NULL, updated_at = NOW()
+        WHERE id = %s AND status <> 'running'
+    """, (_json(stages), _json(result), job_id), commit=True)
+    print(f"[PIPELINE] Job {job_id} re-queued from stage {stage}")
+    return stage
+
+
+class PipelineWorker:
+    """Pool of threads that claim and run pipeline jobs from the AI database."""
+
+    def __init__(self, threads=None, poll_interval=None):
+        self.threads = max(1, threads or Config.PIPELINE_WORKERS)
+        self.poll_interval = poll_interval or Config.PIPELINE_POLL_INTERVAL
+        self.is_running = False
+        self._threads = []
+        self._stop = threading.Event()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._stop.clear()
+        for index in range(self.threads):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+            thread = threading.Thread(target=self._run, args=(worker_id,), daemon=True,
+                                      name=f"pipeline-worker-{index}")
+            thread.start()
+            self._threads.append(thread)
+        print(f"[PIPELINE] Started {self.threads} worker thread(s)")
+
+    def stop(self, timeout=10):
+        self.is_running = False
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        print("[PIPELINE] Workers stopped")
+
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                job = self.claim(worker_id)
+            except Exception as e:
+                print(f"[PIPELINE] ❌ Claim failed: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                self.run_job(job, worker_id)
+            except Exception as e:
+                # Bookkeeping failed; the lease expires and another worker reclaims the job
+                print(f"[PIPELINE] ❌ Job {job['id']} aborted: {e}")
+                traceback.print_exc()
+
+    def claim(self, worker_id):
+        """Lock the oldest runnable job (or one whose lease expired) for this worker."""
+        return execute_ai_query("""
+            UPDATE pipeline_jobs
+            SET status = 'running', locked_by = %s,
+                locked_until = NOW() + %s * INTERVAL '1 second', updated_at = NOW()
+            WHERE id = (
+                SELECT id FROM pipeline_jobs
+                WHERE (status = 'queued' AND run_after <= NOW())
+                   OR (status = 'running' AND locked_until < NOW())
+                ORDER BY created_at
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING *
+        """, (worker_id, Config.PIPELINE_LEASE_SECONDS), fetch_one=True, commit=True)
+
+    def _save(self, job, worker_id, status='running', extra_sql='', extra_params=()):
+        execute_ai_query(f"""
+            UPDATE pipeline_jobs
+            SET status = %s, email = %s, current_stage = %s, stages = %s, result = %s,
+                locked_until = NOW() + %s * INTERVAL '1 second', updated_at = NOW(){extra_sql}
+            WHERE id = %s AND locked_by = %s
+        """, (status, job['email'], job.get('current_stage'), _json(job['stages']), _json(job['result']),
+              Config.PIPELINE_LEASE_SECONDS, *extra_params, job['id'], worker_id), commit=True)
+
+    def _renew_lease(self, job_id, worker_id, done):
+        while not done.wait(Config.PIPELINE_LEASE_SECONDS / 3):
+            try:
+                execute_ai_query("""
+                    UPDATE pipeline_jobs SET locked_until = NOW() + %s * INTERVAL '1 second'
+                    WHERE id = %s AND locked_by = %s
+                """, (Config.PIPELINE_LEASE_SECONDS, job_id, worker_id), commit=True)
+            except Exception as e:
+                print(f"[PIPELINE] ⚠️ Lease renewal failed for {job_id}: {e}")
+
+    def _record(self, stage, duration, ok):
+        with self._stats_lock:
+            stats = self._stats.setdefault(stage, {'runs': 0, 'failures': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['runs'] += 1
+            stats['failures'] += 0 if ok else 1
+            stats['total_seconds'] += duration
+            stats['max_seconds'] = max(stats['max_seconds'], duration)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'threads': len(self._threads),
+                'stages': {stage: dict(values) for stage, values in self._stats.items()},
+            }
+
+    def run_job(self, job, worker_id):
+        """Run every unfinished stage of a claimed job, persisting progress after each."""
+        job['stages'] = job.get('stages') or {}
+        job['result'] = job.get('result') or {}
+        print(f"[PIPELINE] {worker_id} running {job['kind']} job {job['id']}")
+
+        for name in STAGES:
+            state = job['stages'].setdefault(name, {'status': 'pending', 'attempts': 0})
+            if state['status'] == 'succeeded':
+                continue
+
+            state.update(status='running', attempts=state.get('attempts', 0) + 1, started_at=_now(), error=None)
+            job['current_stage'] = name
+            self._save(job, worker_id)
+
+            done = threading.Event()
+            renewer = threading.Thread(target=self._renew_lease, args=(job['id'], worker_id, done), daemon=True)
+            renewer.start()
+            started = time.time()
+            try:
+                output = STAGE_HANDLERS[name](job)
+                error = None
+            except Exception as e:
+                traceback.print_exc()
+                output, error = None, str(e)
+            finally:
+                done.set()
+            duration = round(time.time() - started, 3)
+            self._record(name, duration, ok=error is None)
+            state.update(finished_at=_now(), duration_seconds=duration)
+
+            if error is not None:
+                state.update(status='failed', error=error)
+                self._fail_stage(job, worker_id, name, state['attempts'], error)
+                return
+
+            state['status'] = 'succeeded'
+            job['result'][name] = output
+            if name == 'process_cv':
+                job['email'] = output['email']
+            print(f"[PIPELINE] Job {job['id']} stage {name} done in {duration}s")
+
+        job['current_stage'] = None
+        self._save(job, worker_id, status='succeeded', extra_sql=', error = NULL, finished_at = NOW(), locked_by = NULL')
+        shutil.rmtree(_resume_path(job).parent, ignore_errors=True)
+        print(f"[PIPELINE] ✅ Job {job['id']} completed")
+
+    def _fail_stage(self, job, worker_id, stage, attempts, error):
+        if attempts < Config.PIPELINE_STAGE_MAX_ATTEMPTS:
+            delay = Config.PIPELINE_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            print(f"[PIPELINE] ⚠️ Job {job['id']} stage {stage} failed (attempt {attempts}), retrying in {delay}s: {error}")
+            self._save(job, worker_id, status='queued',
+                       extra_sql=", error = %s, run_after = NOW() + %s * INTERVAL '1 second', locked_by = NULL",
+                       extra_params=(error, delay))
+        else:
+            print(f"[PIPELINE] ❌ Job {job['id']} stage {stage} failed after {attempts} attempts: {error}")
+            self._save(job, worker_id, status='failed',
+                       extra_sql=', error = %s, finished_at = NOW(), locked_by = NULL',
+                       extra_params=(error,))
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_pipeline_workers(threads=None):
+    """Start this process's pipeline worker threads (idempotent)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PipelineWorker(threads=threads)
+        _worker.start()
+    return _worker
+
+
+def stop_pipeline_workers():
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+
+
+def get_pipeline_stats(window_minutes=60):
+    """
+    Queue depth across all processes plus recent stage durations.
+
+    Returns:
+        dict with 'queue' (jobs per status, oldest queued age), 'stages'
+        (runs, failures, average and p95 seconds over the window) and
+        'workers' (this process's threads and counters)
+    """
+    counts = execute_ai_query("""
+        SELECT status, COUNT(*) AS jobs,
+               EXTRACT(EPOCH FROM NOW() - MIN(created_at)) AS oldest_seconds
+        FROM pipeline_jobs
+        WHERE status IN ('queued', 'running') OR updated_at > NOW() - %s * INTERVAL '1 minute'
+        GROUP BY status
+    """, (window_minutes,), fetch_all=True) or []
+    queue = {row['status']: int(row['jobs']) for row in counts}
+    oldest_queued = next((row['oldest_seconds'] for row in counts if row['status'] == 'queued'), None)
+
+    durations = execute_ai_query("""
+        SELECT s.key AS stage,
+               COUNT(*) AS runs,
+               COUNT(*) FILTER (WHERE s.value->>'status' = 'failed') AS failures,
+               AVG((s.value->>'duration_seconds')::float) AS avg_seconds,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY (s.value->>'duration_seconds')::float) AS p95_seconds
+        FROM pipeline_jobs, jsonb_each(stages) s
+        WHERE updated_at > NOW() - %s * INTERVAL '1 minute'
+          AND s.value ? 'duration_seconds'
+        GROUP BY s.key
+    """, (window_minutes,), fetch_all=True) or []
+
+    return {
+        'queue': {
+            **queue,
+            'oldest_queued_seconds': round(float(oldest_queued), 1) if oldest_queued is not None else None,
+        },
+        'stages': {
+            row['stage']: {
+                'runs': int(row['runs']),
+                'failures': int(row['failures']),
+                'avg_seconds': round(float(row['avg_seconds']), 3) if row['avg_seconds'] is not None else None,
+                'p95_seconds': round(float(row['p95_seconds']), 3) if row['p95_seconds'] is not None else None,
+            }
+            for row in durations
+        },
+        'window_minutes': window_minutes,
+        'workers': _worker.stats() if _worker is not None else {'threads': 0, 'stages': {}},
+    }
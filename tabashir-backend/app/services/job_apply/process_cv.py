@@ -5,26 +5,25 @@ import uuid
 from datetime import datetime, date
 
 import psycopg2
+from psycopg2.extras import RealDictCursor
 from docx import Document
 from PyPDF2 import PdfReader
 
 from app import Config
 from app.services.cv_processor import get_openai_client
-from app.database.db import execute_query
+from app.services.llm_cache import cached_chat_completion
+from app.database.db import execute_query, get_ai_db_connection, release_ai_db_connection
+from app.services.job_apply.gazetteer import client_location_ids
+from app.services.job_apply.match_cache import invalidate_client
 from pathlib import Path
 import shutil
 from datetime import datetime
 import subprocess
 
-def cv_parsing_model_chat(messages):
+def cv_parsing_model_chat(messages, call_site='cv_parsing'):
     """Chat with model specifically for CV parsing with temperature control."""
     client, model = get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0.2
-    )
-    return response.choices[0].message.content
+    return cached_chat_completion(client, model, messages, call_site=call_site, temperature=0.2)
 
 
 def clean_text(text):
@@ -82,16 +81,6 @@ def parse_cv_data(cv_text):
 def mark_timestamp_as_processed(conn, timestamp):
     try:
         cursor = conn.cursor()
-        # Ensure the table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ProcessedTimestamps (
-                id SERIAL PRIMARY KEY,
-                timestamp TEXT,
-                created_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        conn.commit()
-
         query = "INSERT INTO ProcessedTimestamps (timestamp) VALUES (%s)"
         cursor.execute(query, (timestamp,))
         conn.commit()
@@ -101,6 +90,7 @@ def mark_timestamp_as_processed(conn, timestamp):
 
 
 def process_ai_job_input(email, resume_path, nationality, gender, location_preferred, preferred_positions):
+    conn = None
     try:
         SERVER_CV_DIR = str(Config.CV_STORAGE_PATH)
         os.makedirs(SERVER_CV_DIR, exist_ok=True)
@@ -134,44 +124,16 @@ def process_ai_job_input(email, resume_path, nationality, gender, location_prefe
             'GPA': cv_data.get('GPA', ''),
             'job_matching': 1,
             'job_location_based': ', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based,
+            'location_ids': client_location_ids(', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based),
             'gender': gender,
             'nationality': nationality,
             'jobs_to_apply_number': 100,
             'positions': ', '.join(positions.split(', ')) if isinstance(positions, str) else positions
         }
 
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER, password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT
-        )
-        conn.autocommit = False
+        conn = get_ai_db_connection()
         cursor = conn.cursor()
 
-        # Ensure clients table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS clients (
-                id SERIAL PRIMARY KEY,
-                email TEXT UNIQUE,
-                name TEXT,
-                positions TEXT,
-                skills TEXT,
-                location TEXT,
-                major TEXT,
-                keywords TEXT,
-                gender TEXT,
-                nationality TEXT,
-                degree TEXT,
-                filename TEXT,
-                jobs_to_apply_number INTEGER DEFAULT 0,
-                job_location_based TEXT,
-                job_matching INTEGER DEFAULT 0,
-                fcv_as_string TEXT,
-                phone_number TEXT,
-                date_in TEXT,
-                gpa TEXT
-            );
-        """)
-        conn.commit()
 
         cursor.execute("SELECT 1 FROM clients WHERE email = %s", (data['email'],))
         if cursor.fetchone():
@@ -183,6 +145,7 @@ def process_ai_job_input(email, resume_path, nationality, gender, location_prefe
             values.append(data['email'])
             cursor.execute(query, tuple(values))
             conn.commit()
+            invalidate_client(data['email'])
             mark_timestamp_as_processed(conn, timestamp)
             return data['email']
 
@@ -197,8 +160,12 @@ def process_ai_job_input(email, resume_path, nationality, gender, location_prefe
     except Exception as e:
         print(f"Error processing CV: {e}")
         return None
+    finally:
+        if conn:
+            release_ai_db_connection(conn)
 
 def process_ai_job_input_not_active(email, resume_path, nationality, gender, location_preferred, preferred_positions):
+   conn = None
    try:
         SERVER_CV_DIR = str(Config.CV_STORAGE_PATH / "temp_CVs")
         os.makedirs(SERVER_CV_DIR, exist_ok=True)
@@ -232,44 +199,16 @@ def process_ai_job_input_not_active(email, resume_path, nationality, gender, loc
             'GPA': cv_data.get('GPA', ''),
             'job_matching': 0,
             'job_location_based': ', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based,
+            'location_ids': client_location_ids(', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based),
             'gender': gender,
             'nationality': nationality,
             'jobs_to_apply_number': 10,  # Set to 10 to enable ranking (query requires > 0)
             'positions': ', '.join(positions.split(', ')) if isinstance(positions, str) else positions
         }
 
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER, password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT
-        )
-        conn.autocommit = False
+        conn = get_ai_db_connection()
         cursor = conn.cursor()
 
-        # Ensure clients table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS clients (
-                id SERIAL PRIMARY KEY,
-                email TEXT UNIQUE,
-                name TEXT,
-                positions TEXT,
-                skills TEXT,
-                location TEXT,
-                major TEXT,
-                keywords TEXT,
-                gender TEXT,
-                nationality TEXT,
-                degree TEXT,
-                filename TEXT,
-                jobs_to_apply_number INTEGER DEFAULT 0,
-                job_location_based TEXT,
-                job_matching INTEGER DEFAULT 0,
-                fcv_as_string TEXT,
-                phone_number TEXT,
-                date_in TEXT,
-                gpa TEXT
-            );
-        """)
-        conn.commit()
 
         cursor.execute("SELECT 1 FROM clients WHERE email = %s", (data['email'],))
         if cursor.fetchone():
@@ -284,6 +223,7 @@ def process_ai_job_input_not_active(email, resume_path, nationality, gender, loc
             values.append(data['email'])
             cursor.execute(query, tuple(values))
             conn.commit()
+            invalidate_client(data['email'])
             mark_timestamp_as_processed(conn, timestamp)
             
             # Sync to main PostgreSQL CandidateProfile for mobile app access
@@ -322,8 +262,12 @@ def process_ai_job_input_not_active(email, resume_path, nationality, gender, loc
    except Exception as e:
         print(f"Error processing CV: {e}")
         return None
+   finally:
+       if conn:
+           release_ai_db_connection(conn)
 
 def update_ai_job_input_not_active(email, resume_path, nationality, gender, location_preferred, preferred_positions):
+   conn = None
    try:
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         if resume_path:
@@ -355,6 +299,7 @@ def update_ai_job_input_not_active(email, resume_path, nationality, gender, loca
                 'degree': cv_data.get('Degree', ''),
                 'GPA': cv_data.get('GPA', ''),
                 'job_location_based': ', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based,
+                'location_ids': client_location_ids(', '.join(job_location_based) if isinstance(job_location_based, list) else job_location_based),
                 'gender': gender,
                 'nationality': nationality,
                 'positions': ', '.join(positions.split(', ')) if isinstance(positions, str) else positions
@@ -365,14 +310,11 @@ def update_ai_job_input_not_active(email, resume_path, nationality, gender, loca
                 'nationality': nationality,
                 'location': location_preferred,
                 'job_location_based': location_preferred,
+                'location_ids': client_location_ids(', '.join(location_preferred) if isinstance(location_preferred, list) else location_preferred),
                 'positions': preferred_positions
             }
 
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER, password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT
-        )
-        conn.autocommit = False
+        conn = get_ai_db_connection()
         cursor = conn.cursor()
 
         set_clause = ", ".join([f"{k} = %s" for k in data.keys()])
@@ -389,23 +331,22 @@ def update_ai_job_input_not_active(email, resume_path, nationality, gender, loca
             return None
 
         conn.commit()
+        invalidate_client(email)
 
         mark_timestamp_as_processed(conn, timestamp)
         return email
    except Exception as e:
         print(f"Error processing CV for update: {e}")
         return None
+   finally:
+       if conn:
+           release_ai_db_connection(conn)
    
 def activate_client_job_apply(email, jobs_number):
+    conn = None
+    cursor = None
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB,
-            user=Config.AI_POSTGRES_USER,
-            password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST,
-            port=Config.AI_POSTGRES_PORT
-        )
-        conn.autocommit = False
+        conn = get_ai_db_connection()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -434,7 +375,7 @@ def activate_client_job_apply(email, jobs_number):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_ai_db_connection(conn)
 
 
 def get_jobs_by_email(email: str):
@@ -451,13 +392,7 @@ def get_jobs_by_email(email: str):
         ORDER BY score DESC
     """
 
-    conn = psycopg2.connect(
-        dbname=Config.AI_POSTGRES_DB,
-        user=Config.AI_POSTGRES_USER,
-        password=Config.AI_POSTGRES_PASSWORD,
-        host=Config.AI_POSTGRES_HOST,
-        port=Config.AI_POSTGRES_PORT
-    )
+    conn = get_ai_db_connection()
 
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cursor:
@@ -471,7 +406,7 @@ def get_jobs_by_email(email: str):
             }
 
     finally:
-        conn.close()
+        release_ai_db_connection(conn)
 
 def serialize_row(row: dict):
     for key, value in row.items():
@@ -528,7 +463,7 @@ def suggest_job_titles_from_resume(resume_path):
         }
     ]
 
-    response = cv_parsing_model_chat(messages)
+    response = cv_parsing_model_chat(messages, call_site='job_title_suggestions')
 
     # Normalize output
     job_titles = [
@@ -544,13 +479,7 @@ def suggest_job_titles_from_resume(resume_path):
 def get_client_cv_filename(email):
     conn = None
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB,
-            user=Config.AI_POSTGRES_USER,
-            password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST,
-            port=Config.AI_POSTGRES_PORT
-        )
+        conn = get_ai_db_connection()
 
         query = """
             SELECT filename
@@ -570,50 +499,15 @@ def get_client_cv_filename(email):
 
     finally:
         if conn:
-            conn.close()
+            release_ai_db_connection(conn)
 
 
 import subprocess
-import platform
-
-# Cross-platform LibreOffice path detection
-def get_libreoffice_path():
-    """Get the correct LibreOffice path for the current OS"""
-    system = platform.system()
-    
-    if system == "Darwin":  # macOS
-        # Common macOS paths
-        paths = [
-            "/Applications/LibreOffice.app/Contents/MacOS/soffice",
-            "/usr/local/bin/soffice",
-            "/opt/homebrew/bin/soffice"
-        ]
-    elif system == "Windows":
-        paths = [
-            r"C:\Program Files\LibreOffice\program\soffice.exe",
-            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
-        ]
-    else:  # Linux
-        paths = [
-            "/usr/lib/libreoffice/program/soffice.bin",
-            "/usr/bin/soffice",
-            "/usr/local/bin/soffice"
-        ]
-    
-    # Return first existing path
-    for path in paths:
-        if os.path.exists(path):
-            return path
-    
-    # Default fallback
-    return "/usr/lib/libreoffice/program/soffice.bin"
-
-LIBREOFFICE_BIN = get_libreoffice_path()
+from app.services.pdf_converter import LIBREOFFICE_BIN
+from app.services.pdf_converter import convert_docx_to_pdf as pool_convert_docx_to_pdf
 
 def convert_docx_to_pdf(docx_path: Path) -> Path:
-    """Convert DOCX to PDF using LibreOffice or alternative methods"""
-    pdf_path = docx_path.with_suffix(".pdf")
-    
+    """Convert DOCX to PDF using the shared LibreOffice pool"""
     # Check if LibreOffice is installed
     if not os.path.exists(LIBREOFFICE_BIN):
         # LibreOffice not found, provide helpful error
@@ -625,30 +519,8 @@ def convert_docx_to_pdf(docx_path: Path) -> Path:
             f"  Windows: Download from https://www.libreoffice.org\n"
             f"\nJob credits have been successfully added to your account."
         )
-    
-    # Try LibreOffice conversion
-    cmd = [
-        LIBREOFFICE_BIN,
-        "--headless",
-        "--convert-to", "pdf",
-        "--outdir", str(docx_path.parent),
-        str(docx_path)
-    ]
 
-    result = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        env={"PATH": "/usr/bin:/bin"}  # force basic tools
-    )
-
-    if result.returncode != 0:
-        raise RuntimeError(
-            "LibreOffice failed:\n" + result.stderr.decode()
-        )
-
-    if not pdf_path.exists():
-        raise RuntimeError("PDF not created")
+    pdf_path = pool_convert_docx_to_pdf(docx_path)
 
     print(f"PDF conversion successful using LibreOffice")
     return pdf_path
@@ -677,13 +549,7 @@ import psycopg2
 def update_client_cv_filename(email, new_filename):
     conn = None
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB,
-            user=Config.AI_POSTGRES_USER,
-            password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST,
-            port=Config.AI_POSTGRES_PORT
-        )
+        conn = get_ai_db_connection()
 
         query = """
             UPDATE clients
@@ -706,19 +572,13 @@ def update_client_cv_filename(email, new_filename):
 
     finally:
         if conn:
-            conn.close()
+            release_ai_db_connection(conn)
 
 def get_client_data(email):
     """Fetch client profile data from the AI database clients table."""
     conn = None
     try:
-        conn = psycopg2.connect(
-            dbname=Config.AI_POSTGRES_DB,
-            user=Config.AI_POSTGRES_USER,
-            password=Config.AI_POSTGRES_PASSWORD,
-            host=Config.AI_POSTGRES_HOST,
-            port=Config.AI_POSTGRES_PORT
-        )
+        conn = get_ai_db_connection()
 
         query = """
             SELECT nationality, gender, job_location_based, positions, filename, jobs_to_apply_number, job_matching
@@ -756,7 +616,7 @@ def get_client_data(email):
 
     finally:
         if conn:
-            conn.close()
+            release_ai_db_connection(conn)
 
 
 def sync_client_to_candidate_profile(email, cv_data, nationality, gender, preferred_positions, location_preferred):
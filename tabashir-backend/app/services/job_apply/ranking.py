@@ -1,16 +1,34 @@
+import hashlib
+import json
 import multiprocessing
+import os
+import threading
 import traceback
+from collections import namedtuple
 
 import time
 from datetime import datetime, timedelta
 
 import pandas as pd
-import psycopg2
 
 from psycopg2.extras import execute_values
 
-from app import Config
+from app.config import Config
+from app.database.db import ai_db_connection, get_ai_db_connection, release_ai_db_connection, reset_pools_after_fork
 from app.services.notification_service import NotificationService
+from app.services.job_apply.gazetteer import any_location_match, client_places, job_places
+from app.services.job_apply.scoring import score_jobs, JobMatrix
+from app.services.job_apply.title_taxonomy import major_disciplines, title_discipline
+from app.services.job_apply.title_index import TitleIndex
+from app.services.job_apply.job_features import FEATURE_VERSION, load_job_features
+
+
+# Bump when the ranker would accept or reject the same pair differently; clients are then fully re-ranked
+RANKING_VERSION = 1
+
+# Client columns that decide which jobs match
+RANKING_PROFILE_FIELDS = ('positions', 'major', 'job_location_based', 'location', 'location_ids', 'gender',
+                          'nationality')
 
 
 def preprocess_text(text):
@@ -21,43 +39,8 @@ def preprocess_text(text):
 
 def match_engineering_discipline(job_title, client_major):
     """Dedicated function to match engineering disciplines between job title and major"""
-    # Define engineering disciplines with their related terms
-    engineering_disciplines = {
-        'mechanical': ['mechanical', 'mech'],
-        'electrical': ['electrical', 'electronic', 'electronics'],
-        'civil': ['civil', 'structural', 'construction'],
-        'software': ['software', 'coding', 'programming', 'web', 'app'],
-        'chemical': ['chemical', 'process', 'chemical process'],
-        'industrial': ['industrial', 'manufacturing', 'production'],
-        'systems': ['system', 'systems integration', 'control systems'],
-        'environmental': ['environmental', 'sustainability', 'green'],
-        'biomedical': ['biomedical', 'bioengineering', 'medical'],
-        'aerospace': ['aerospace', 'aeronautical', 'aviation', 'aircraft'],
-        'computer': ['computer', 'computing', 'information technology', 'it'],
-        'telecommunications': ['telecommunications', 'telecom', 'network'],
-        'mechatronics': ['mechatronics', 'robotics', 'automation'],
-        'materials': ['materials', 'metallurgical', 'metallurgy'],
-        'mining': ['mining', 'minerals', 'extraction'],
-        'petroleum': ['petroleum', 'oil', 'gas', 'petroleum process'],
-        'agricultural': ['agricultural', 'agriculture', 'farm'],
-        'marine': ['marine', 'naval', 'ocean'],
-        'safety': ['safety', 'health', 'occupational'],
-        'quality': ['quality', 'qa', 'qc']
-    }
-
-    # Check if job contains any engineering discipline
-    job_title = job_title.lower()
-    job_discipline = None
-
-    # First check for exact "<discipline> engineer" patterns
-    for discipline, keywords in engineering_disciplines.items():
-        for keyword in keywords:
-            if f"{keyword} engineer" in job_title:
-                job_discipline = discipline
-                print(f"Found specific discipline in job title: {discipline} engineer")
-                break
-        if job_discipline:
-            break
+    # Disciplines come from the compiled title taxonomy, cached per distinct title/major
+    job_discipline = title_discipline(job_title)
 
     # If no discipline was found, return None
     if not job_discipline:
@@ -68,21 +51,10 @@ def match_engineering_discipline(job_title, client_major):
         return job_discipline, None, False
 
     client_major = client_major.lower()
-    client_discipline = None
-
-    # Check client major for the matching discipline
-    for keyword in engineering_disciplines.get(job_discipline, []):
-        # Check for both "X engineer" and "X engineering" in major
-        if (f"{keyword} engineer" in client_major or
-                f"{keyword} engineering" in client_major):
-            client_discipline = job_discipline
-            print(f"Found matching discipline in client major: {client_discipline}")
-            break
+    client_discipline = job_discipline if job_discipline in major_disciplines(client_major) else None
 
     # Check if client has any engineering background
-    has_engineering_background = False
-    if 'engineer' in client_major or 'engineering' in client_major:
-        has_engineering_background = True
+    has_engineering_background = 'engineer' in client_major
 
     return job_discipline, client_discipline, has_engineering_background
 
@@ -107,18 +79,12 @@ def check_position_match_fast(job_title, client_positions, client_major=None):
             if job_discipline:
                 # Perfect match - exact same discipline
                 if client_discipline == job_discipline:
-                    print(
-                        f"PERFECT MATCH: Job requires '{job_discipline} engineer' and client majored in '{job_discipline} engineering'")
                     return 1.0
 
                 # Client has engineering background but different discipline
                 elif has_engineering_background:
-                    print(
-                        f"DISCIPLINE MISMATCH: Job requires '{job_discipline} engineer' but client has different engineering major")
                     return 0.0  # Very low score for different engineering disciplines
                 else:
-                    print(
-                        f"NO ENGINEERING BACKGROUND: Job requires '{job_discipline} engineer' but client has no engineering degree")
                     return 0.0  # Nearly disqualifying for non-engineering background
 
             # Generic engineering position (no specific discipline detected)
@@ -149,11 +115,22 @@ def check_position_match_fast(job_title, client_positions, client_major=None):
     return 0.0  # No match
 
 
-def check_location_match_fast(job_location, client_location):
+def check_location_match_fast(job_location, client_location, client_location_ids=None):
     """Fast location matching"""
     if not job_location or not client_location:
         return 0.5
 
+    # Known UAE places on both sides: compare gazetteer ids. A job naming
+    # several places matches through any of them; if none does, the string
+    # check below still gets a say
+    places_in_job = job_places(job_location)
+    places = client_places(client_location_ids, client_location)
+    if places_in_job and places:
+        if any_location_match(places_in_job, places):
+            return 1.0
+        if len(places_in_job) == 1:
+            return 0.3
+
     job_location = job_location.lower()
 
     # Handle multiple client locations
@@ -189,7 +166,7 @@ def check_nationality_match_fast(job_nationality, client_nationality):
 
 
 def process_job_chunk(chunk_data):
-    """Process a chunk of jobs"""
+    """Process a chunk of jobs (per-pair reference implementation, see scoring.score_jobs)"""
     job_chunk, clients_data, existing_matches = chunk_data
     chunk_matches = []
 
@@ -240,7 +217,7 @@ def process_job_chunk(chunk_data):
 
             # Fast location matching
             client_location = client.get('job_location_based', client.get('location', ''))
-            location_score = check_location_match_fast(job_location, client_location)
+            location_score = check_location_match_fast(job_location, client_location, client.get('location_ids'))
 
             # Fast gender matching
             client_gender = client.get('gender', '')
@@ -266,7 +243,7 @@ def process_job_chunk(chunk_data):
     return chunk_matches
 
 
-def main(client_email):
+def main(client_email, full=False):
     print("\n" + "="*60)
     print(f"[RANKING] === run_ranking_main() STARTED ===")
     print(f"[RANKING] Client Email: {client_email}")
@@ -280,118 +257,40 @@ def main(client_email):
         raise ValueError("Email must be provided")
 
     print(f"[RANKING] 🔄 Connecting to database...")
-    conn = psycopg2.connect(
-        dbname=Config.AI_POSTGRES_DB, user=Config.AI_POSTGRES_USER, password=Config.AI_POSTGRES_PASSWORD,
-        host=Config.AI_POSTGRES_HOST, port=Config.AI_POSTGRES_PORT,
-    )
-    conn.autocommit = False
-    cursor = conn.cursor()
+    conn = get_ai_db_connection()
     print(f"[RANKING] ✅ Database connected")
+    try:
+        return _rank_client(conn, client_email, start_time, full=full)
+    finally:
+        release_ai_db_connection(conn)
 
-    # Only load necessary columns to reduce memory usage
-    print("[RANKING] Loading data from database...")
 
-    # Ensure tables exist
-    print("[RANKING] Ensuring tables exist...")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id SERIAL PRIMARY KEY,
-            job_title TEXT,
-            job_description TEXT,
-            vacancy_city TEXT,
-            gender TEXT,
-            nationality TEXT,
-            application_email TEXT,
-            job_date TEXT
-        );
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS clients (
-            id SERIAL PRIMARY KEY,
-            email TEXT UNIQUE,
-            name TEXT,
-            positions TEXT,
-            skills TEXT,
-            location TEXT,
-            major TEXT,
-            keywords TEXT,
-            gender TEXT,
-            nationality TEXT,
-            degree TEXT,
-            filename TEXT,
-            jobs_to_apply_number INTEGER DEFAULT 0,
-            job_location_based TEXT,
-            job_matching INTEGER DEFAULT 0,
-            fcv_as_string TEXT,
-            phone_number TEXT,
-            date_in TEXT,
-            gpa TEXT
-        );
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS rankings (
-            id SERIAL PRIMARY KEY,
-            client_id TEXT,
-            job_id TEXT,
-            name TEXT,
-            email TEXT,
-            major TEXT,
-            location TEXT,
-            skills TEXT,
-            keywords TEXT,
-            job_title TEXT,
-            job_description TEXT,
-            job_application_email TEXT,
-            filename TEXT,
-            status TEXT DEFAULT 'pending',
-            date TEXT,
-            score REAL,
-            degree TEXT
-        );
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS blocked (
-            id SERIAL PRIMARY KEY,
-            email TEXT,
-            job_title TEXT,
-            created_at TIMESTAMP DEFAULT NOW()
-        );
-    """)
-    conn.commit()
-    print("[RANKING] ✅ Tables verified")
-
-    # Check if Nationality column exists in jobs
-    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'jobs'")
-    columns = [row[0] for row in cursor.fetchall()]
-    two_months_ago = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d")
+def client_profile_hash(client):
+    """Hash of the client fields the ranker reads; when it changes every job is re-scored."""
+    payload = {field: client.get(field) for field in RANKING_PROFILE_FIELDS}
+    payload['version'] = (RANKING_VERSION, FEATURE_VERSION)
+    return hashlib.md5(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
 
-    if 'nationality' in columns:
-        jobs_query = """
-                     SELECT id, \
-                            job_title, \
-                            job_description, \
-                            vacancy_city,
-                            gender, \
-                            nationality, \
-                            application_email
-                     FROM jobs \
-                     WHERE job_date >= %s \
-                     """
-    else:
-        print("Nationality column not found, using query without it")
-        jobs_query = """
-                     SELECT id, \
-                            job_title, \
-                            job_description, \
-                            vacancy_city,
-                            gender, \
-                            application_email
-                     FROM jobs \
-                     WHERE job_date >= %s \
-                     """
+
+def _load_jobs(cursor, scope_sql='', scope_params=()):
+    """Jobs of the last 60 days (narrowed by `scope_sql`) and their stored text features."""
+    # Schema and indexes are owned by migrations/ai (python -m app.commands.migrate)
+    two_months_ago = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d")
+    jobs_query = """
+                 SELECT id, \
+                        job_title, \
+                        job_description, \
+                        vacancy_city,
+                        gender, \
+                        nationality, \
+                        application_email, \
+                        ingest_seq
+                 FROM jobs \
+                 WHERE job_date >= %s \
+                 """ + scope_sql
 
     # Execute the query and fetch results into a DataFrame
-    cursor.execute(jobs_query, (two_months_ago,))
+    cursor.execute(jobs_query, (two_months_ago, *scope_params))
     rows = cursor.fetchall()
     columns = [desc[0] for desc in cursor.description]
     jobs_df = pd.DataFrame(rows, columns=columns)
@@ -400,16 +299,86 @@ def main(client_email):
     if 'nationality' not in jobs_df.columns:
         jobs_df['nationality'] = ''
 
-    query = f"""
-        SELECT id, name, email, positions, job_location_based, location,
+    # Text-derived features come from the feature store; new or edited jobs are computed and stored now
+    job_features = load_job_features(
+        jobs_df[['id', 'job_title', 'job_description', 'vacancy_city']].to_dict('records'), store_missing=True
+    )
+    return jobs_df, job_features
+
+
+def _load_clients(conn, scope_sql='', scope_params=()):
+    query = """
+        SELECT id, name, email, positions, job_location_based, location, location_ids,
                skills, keywords, gender, nationality, degree, jobs_to_apply_number,
                filename, major
         FROM clients
-        WHERE jobs_to_apply_number > 0  AND email = '{client_email}'
+        WHERE jobs_to_apply_number > 0
+    """ + scope_sql
+    return pd.read_sql_query(query, conn, params=tuple(scope_params))
+
+
+def _get_watermark(cursor, client_email):
+    cursor.execute(
+        "SELECT last_seq, profile_hash, snapshot_xmin::text FROM ranking_watermarks WHERE email = %s",
+        (client_email,),
+    )
+    return cursor.fetchone()
+
+
+def _snapshot_xmin(cursor):
     """
+    xmin of a snapshot taken before the jobs are read.
+
+    Every job written by a transaction below it had committed (or aborted) by
+    then, so the load that follows saw it; jobs from transactions at or above
+    it may still have been in flight and are picked up by the next run.
+    """
+    cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")
+    return cursor.fetchone()[0]
+
+
+def _loaded_seq(jobs_df, floor=0):
+    """Highest ingest_seq among the jobs actually loaded, never below `floor`."""
+    if len(jobs_df) == 0:
+        return floor
+    return max(floor, int(jobs_df['ingest_seq'].max()))
+
+
+def _set_watermarks(conn, rows):
+    """Upsert (email, last_seq, profile_hash, snapshot_xmin) rows."""
+    cursor = conn.cursor()
+    try:
+        execute_values(cursor, """
+            INSERT INTO ranking_watermarks (email, last_seq, profile_hash, snapshot_xmin, updated_at)
+            VALUES %s
+            ON CONFLICT (email) DO UPDATE SET
+                last_seq = EXCLUDED.last_seq, profile_hash = EXCLUDED.profile_hash,
+                snapshot_xmin = EXCLUDED.snapshot_xmin, updated_at = NOW()
+        """, rows, template="(%s, %s, %s, %s::xid8, NOW())")
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def _rank_client(conn, client_email, start_time, full=False):
+    """
+    Body of a ranking run on a checked-out AI DB connection.
+
+    Only jobs ingested after the client's watermark are scored, unless `full`
+    is set, the client has no watermark yet, or their profile changed since
+    it was recorded. Every job at or below the watermark was already scored
+    against this profile, so it is either in rankings or was rejected, and a
+    full run would give the same result. Jobs whose transaction had not
+    committed when the watermark was taken are rescored via its snapshot xmin
+    (already ranked ones are skipped as existing matches).
+    """
+    cursor = conn.cursor()
+
+    # Only load necessary columns to reduce memory usage
+    print("[RANKING] Loading data from database...")
 
     print(f"[RANKING] 📋 Fetching client data for: {client_email}")
-    clients_df = pd.read_sql_query(query, conn)
+    clients_df = _load_clients(conn, "AND email = %s", (client_email,))
     print(f"[RANKING] 📊 Clients loaded: {len(clients_df)} rows")
     
     if len(clients_df) == 0:
@@ -424,14 +393,214 @@ def main(client_email):
             print(f"[RANKING]   Location: {row.get('location', 'N/A')}")
             print(f"[RANKING]   jobs_to_apply_number: {row.get('jobs_to_apply_number', 'N/A')}")
 
-    print(f"[RANKING] 📊 Loaded {len(jobs_df)} jobs and {len(clients_df)} clients")
+    # Decide between an incremental and a full run before the jobs are read
+    profile_hash = client_profile_hash(clients_df.iloc[0]) if len(clients_df) else None
+    since_seq = since_xmin = None
+    if profile_hash and not full:
+        watermark = _get_watermark(cursor, client_email)
+        if watermark and watermark[1] == profile_hash:
+            since_seq, since_xmin = watermark[0], watermark[2]
+
+    snapshot_xmin = _snapshot_xmin(cursor)
+    if since_seq is None:
+        print(f"[RANKING] 🔁 Full run over the 60-day job window")
+        jobs_df, job_features = _load_jobs(cursor)
+    else:
+        print(f"[RANKING] ⏩ Incremental run over jobs after #{since_seq}")
+        jobs_df, job_features = _load_jobs(
+            cursor, "AND (ingest_seq > %s OR ingest_xid >= %s::xid8)", (since_seq, since_xmin)
+        )
+    cursor.close()
+    high_seq = _loaded_seq(jobs_df, since_seq or 0)
+
+    summary = _rank(conn, _prepare_jobs(jobs_df, job_features), clients_df, start_time)
+    summary.update(client_email=client_email, incremental=since_seq is not None, since_seq=since_seq)
+
+    # Jobs that arrive later carry a higher ingest_seq; a failed insert keeps the old mark so they are retried
+    insert_failed = summary.pop('insert_failed')
+    if profile_hash and not insert_failed:
+        try:
+            _set_watermarks(conn, [(client_email, high_seq, profile_hash, snapshot_xmin)])
+        except Exception as e:
+            conn.rollback()
+            print(f"[RANKING] ⚠️ Could not store watermark: {e}")
+    return summary
+
+
+def rank_new_jobs(job_ids):
+    """
+    Score just-arrived (or edited) jobs against every active client.
+
+    Called after ingestion so new jobs reach clients without waiting for their
+    next ranking run. Watermarks are left alone: the client's next run scores
+    these jobs again and finds them in rankings or rejects them as before.
+    """
+    # jobs.id is an integer; rankings.job_id keeps it as text
+    numeric_ids = sorted({int(job_id) for job_id in job_ids if job_id is not None and str(job_id).isdigit()})
+    job_ids = [str(job_id) for job_id in numeric_ids]
+    if not job_ids:
+        return None
+
+    start_time = time.time()
+    print(f"[RANKING] === Ranking {len(job_ids)} new jobs against active clients ===")
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            jobs_df, job_features = _load_jobs(cursor, "AND id = ANY(%s::integer[])", (numeric_ids,))
+        finally:
+            cursor.close()
+        if len(jobs_df) == 0:
+            return None
+        clients_df = _load_clients(conn)
+        summary = _rank(conn, _prepare_jobs(jobs_df, job_features), clients_df, start_time, job_ids=job_ids)
+    summary.pop('insert_failed', None)
+    return summary
+
+
+def rank_new_jobs_async(job_ids):
+    """`rank_new_jobs` in a daemon thread, so ingestion does not wait for it."""
+    def _run():
+        try:
+            rank_new_jobs(job_ids)
+        except Exception as e:
+            print(f"[RANKING] ❌ Ranking new jobs failed: {e}")
+            traceback.print_exc()
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
+def rank_client_async(client_email):
+    """Fully re-rank one client in a daemon thread (their profile changed)."""
+    def _run():
+        try:
+            main(client_email, full=True)
+        except Exception as e:
+            print(f"[RANKING] ❌ Re-ranking {client_email} failed: {e}")
+            traceback.print_exc()
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
+# Set in the parent before the batch pool forks; workers read it copy-on-write
+_batch_jobs = None
+
+
+def _rank_batch_task(clients_df):
+    """Rank one slice of clients in a pool worker against the shared _batch_jobs."""
+    start_time = time.time()
+    emails = clients_df['email'].tolist()
+    try:
+        with ai_db_connection() as conn:
+            summary = _rank(conn, _batch_jobs, clients_df, start_time)
+    except Exception as e:
+        print(f"[RANKING] ❌ Batch task for {len(emails)} clients failed: {e}")
+        traceback.print_exc()
+        summary = {'matches_found': 0, 'matches_inserted': 0, 'pairs_scored': 0, 'insert_failed': True}
+    summary['emails'] = emails
+    return summary
+
+
+def rank_all_clients(workers=None, clients_per_task=None, progress=None):
+    """
+    Fully re-rank every client with jobs_to_apply_number > 0.
+
+    Jobs are loaded, preprocessed and indexed once in this process, then
+    slices of clients are ranked by a fork-based process pool that shares the
+    job matrix read-only. Each task inserts its matches with the same batched
+    insert as a single-client run, and clients whose task succeeded get their
+    watermark moved to the jobs that were read and the snapshot they were read under.
+
+    Args:
+        workers: Process count (default Config.RANKING_WORKERS, 0 = one per CPU)
+        clients_per_task: Clients per task (default Config.RANKING_CLIENTS_PER_TASK)
+        progress: Called with the running totals dict after each finished task
+
+    Returns:
+        Totals: clients, jobs, matches found/inserted, pairs scored, failed tasks, seconds
+    """
+    global _batch_jobs
+    start_time = time.time()
+    workers = workers if workers is not None else Config.RANKING_WORKERS
+    workers = workers or os.cpu_count() or 1
+    clients_per_task = clients_per_task or Config.RANKING_CLIENTS_PER_TASK
+
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            snapshot_xmin = _snapshot_xmin(cursor)
+            jobs_df, job_features = _load_jobs(cursor)
+        finally:
+            cursor.close()
+        clients_df = _load_clients(conn)
+
+    high_seq = _loaded_seq(jobs_df)
+    profile_hashes = {client['email']: client_profile_hash(client) for _, client in clients_df.iterrows()}
+    tasks = [clients_df.iloc[i:i + clients_per_task].reset_index(drop=True)
+             for i in range(0, len(clients_df), clients_per_task)]
+    totals = {'clients': len(clients_df), 'clients_done': 0, 'jobs': len(jobs_df), 'matches_found': 0,
+              'matches_inserted': 0, 'pairs_scored': 0, 'failed_tasks': 0, 'workers': workers}
+    print(f"[RANKING] === Batch ranking {len(clients_df)} clients against {len(jobs_df)} jobs "
+          f"with {workers} workers ({len(tasks)} tasks) ===")
+
+    _batch_jobs = _prepare_jobs(jobs_df, job_features)
+    ranked = []
+    try:
+        # fork: workers inherit the prepared jobs instead of unpickling a copy each
+        with multiprocessing.get_context('fork').Pool(workers, initializer=reset_pools_after_fork) as pool:
+            for summary in pool.imap_unordered(_rank_batch_task, tasks):
+                totals['clients_done'] += len(summary['emails'])
+                for key in ('matches_found', 'matches_inserted', 'pairs_scored'):
+                    totals[key] += summary[key]
+                if summary['insert_failed']:
+                    totals['failed_tasks'] += 1
+                else:
+                    ranked.extend(summary['emails'])
+                totals['seconds'] = round(time.time() - start_time, 2)
+                if progress:
+                    progress(dict(totals))
+    finally:
+        _batch_jobs = None
+
+    if ranked:
+        with ai_db_connection() as conn:
+            try:
+                _set_watermarks(conn, [(email, high_seq, profile_hashes[email], snapshot_xmin) for email in ranked])
+            except Exception as e:
+                conn.rollback()
+                print(f"[RANKING] ⚠️ Could not store watermarks: {e}")
 
-    # Preprocess data - minimal processing
+    totals['seconds'] = round(time.time() - start_time, 2)
+    return totals
+
+
+# Jobs preprocessed once per run and shared by every client scored against them
+PreparedJobs = namedtuple('PreparedJobs', 'df matrix index by_id')
+
+
+def _prepare_jobs(jobs_df, job_features):
+    """Preprocess jobs and build the matrix, title index and id lookup every client is scored against."""
     print("Preprocessing data...")
     for col in ['job_title', 'vacancy_city', 'gender', 'nationality']:
         if col in jobs_df.columns:
             jobs_df[col] = jobs_df[col].apply(preprocess_text)
 
+    job_matrix = JobMatrix(jobs_df, features=job_features)
+    return PreparedJobs(jobs_df, job_matrix, TitleIndex(job_matrix), {row['id']: row for _, row in jobs_df.iterrows()})
+
+
+def _rank(conn, jobs, clients_df, start_time, job_ids=None):
+    """
+    Score prepared jobs against clients and insert new matches into rankings.
+
+    Args:
+        jobs: PreparedJobs from _prepare_jobs
+        job_ids: When the run covers a few jobs for many clients, limits the
+            existing-match lookups to those jobs
+    """
+    cursor = conn.cursor()
+    jobs_df = jobs.df
+    print(f"[RANKING] 📊 Loaded {len(jobs_df)} jobs and {len(clients_df)} clients")
+
     for col in ['positions', 'job_location_based', 'location', 'gender', 'nationality']:
         if col in clients_df.columns:
             clients_df[col] = clients_df[col].apply(preprocess_text)
@@ -442,11 +611,21 @@ def main(client_email):
         axis=1
     )
 
+    # Only state for the clients in this run is loaded; all lookups below are
+    # indexed so load time does not grow with the size of rankings/blocked.
+
+    client_emails = [email for email in clients_df['email'].tolist() if email]
+    client_emails_lower = sorted({email.lower() for email in client_emails})
+
     # Load existing matches to avoid duplicates
     print("Loading existing matches...")
     existing_matches = set()
     try:
-        cursor.execute("SELECT email, job_id FROM rankings")
+        if job_ids is None:
+            cursor.execute("SELECT email, job_id FROM rankings WHERE email = ANY(%s)", (client_emails,))
+        else:
+            cursor.execute("SELECT email, job_id FROM rankings WHERE email = ANY(%s) AND job_id = ANY(%s)",
+                           (client_emails, job_ids))
         for email, job_id in cursor.fetchall():
             existing_matches.add(f"{email}_{job_id}")
         print(f"Loaded {len(existing_matches)} existing matches")
@@ -458,7 +637,7 @@ def main(client_email):
     print("Loading email to userId mapping for notifications...")
     email_to_userid = {}
     try:
-        cursor.execute("SELECT email, id FROM \"User\"")
+        cursor.execute("SELECT email, id FROM \"User\" WHERE LOWER(email) = ANY(%s)", (client_emails_lower,))
         for email, user_id in cursor.fetchall():
             if email:
                 email_to_userid[email.lower()] = user_id
@@ -471,7 +650,7 @@ def main(client_email):
     print("Loading blocked job-client pairs...")
     blocked_pairs = set()
     try:
-        cursor.execute("SELECT email, job_title FROM blocked")
+        cursor.execute("SELECT email, job_title FROM blocked WHERE LOWER(email) = ANY(%s)", (client_emails_lower,))
         for email, job_title in cursor.fetchall():
             blocked_pairs.add((email.lower(), job_title.lower()))
         print(f"Loaded {len(blocked_pairs)} blocked pairs")
@@ -480,8 +659,11 @@ def main(client_email):
         conn.rollback() # Reset transaction after error
 
     print("Starting synchronous processing...")
-    all_jobs_data = (jobs_df, clients_df, existing_matches)
-    all_matches = process_job_chunk(all_jobs_data)
+    scoring_stats = {}
+    all_jobs_data = (jobs.matrix, clients_df, existing_matches)
+    all_matches = score_jobs(all_jobs_data, index=jobs.index, stats=scoring_stats)
+    print(f"[RANKING] 🔎 Scored {scoring_stats['scored_pairs']} job-client pairs, "
+          f"pruned {scoring_stats['pruned_pairs']} with no shared title token or discipline")
 
     print(f"[RANKING] ✅ Synchronous processing completed. Found {len(all_matches)} matches in {time.time() - start_time:.1f}s")
     
@@ -493,16 +675,13 @@ def main(client_email):
         print(f"[RANKING]   3. All matches already exist in rankings table")
         print(f"[RANKING]   4. Client data is incomplete (missing positions, skills, etc.)")
 
-    # Create indexes for faster lookups
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_email_job ON rankings(email, job_id)")
-    conn.commit()
-
     # Prepare for batch insertion
     inserted = 0
+    insert_failed = False
     current_date = datetime.now().strftime('%Y-%m-%d')
 
     # Create a mapping of IDs to rows for faster lookups
-    jobs_dict = {row['id']: row for _, row in jobs_df.iterrows()}
+    jobs_dict = jobs.by_id
     clients_dict = {row['email']: row for _, row in clients_df.iterrows()}
 
     # Insert matches in batches
@@ -512,12 +691,6 @@ def main(client_email):
     print(f"[RANKING] 🔄 Starting batch insertion...")
     print(f"[RANKING] Total matches to insert: {len(all_matches)}")
 
-    # Reset the sequence for the rankings table
-    cursor.execute("""
-                   SELECT setval(pg_get_serial_sequence('rankings', 'id'), COALESCE(MAX(id), 1))
-                   FROM rankings;
-                   """)
-    conn.commit()
     insert_query = """
                    INSERT INTO rankings (client_id, job_id, name, email, major, location, skills, keywords, job_title, \
                                          job_description, job_application_email, filename, status, date, score, degree) \
@@ -529,10 +702,13 @@ def main(client_email):
         unique_matches = set()
 
         # Pre-fetch existing matches to avoid duplicate database queries
+        # Only rows sharing an application email with these jobs can collide with them
         cursor.execute("""
                        SELECT client_id, job_title, job_application_email
                        FROM rankings
-                       """)
+                       WHERE client_id = ANY(%s) AND job_application_email = ANY(%s)
+                       """, ([str(client_id) for client_id in clients_df['id'].tolist()],
+                             [email for email in jobs_df['application_email'].dropna().unique().tolist()]))
         existing_match_records = set()
         for row in cursor.fetchall():
             existing_match_records.add((row[0], row[1], row[2]))
@@ -631,6 +807,7 @@ def main(client_email):
                     traceback.print_exc()
                     # Continue with next batch rather than aborting completely
                     conn.rollback()
+                    insert_failed = True
                 batch_values = []
 
         # Insert any remaining records
@@ -642,6 +819,7 @@ def main(client_email):
                 print(f"[RANKING] ✅ Successfully inserted final batch of {len(batch_values)} rankings")
             except Exception as e:
                 conn.rollback()
+                insert_failed = True
                 print(f"[RANKING] ❌ Error inserting final batch: {e}")
                 traceback.print_exc()
 
@@ -650,6 +828,7 @@ def main(client_email):
 
     except Exception as e:
         conn.rollback()
+        insert_failed = True
         print(f"[RANKING] ❌ Error in insertion process: {e}")
         traceback.print_exc()
 
@@ -676,9 +855,7 @@ def main(client_email):
     print(f"[RANKING] Average time per job: {elapsed_time / max(1, len(jobs_df)):.4f} seconds")
     print(f"[RANKING] =============================================================\n")
 
-    # Close connection
     cursor.close()
-    conn.close()
 
     # Continue with job application process
     print("[RANKING] ✅ run_ranking_main() COMPLETED")
@@ -687,9 +864,11 @@ def main(client_email):
         'jobs_processed': len(jobs_df),
         'clients_processed': len(clients_df),
         'matches_found': len(all_matches),
+        'pairs_scored': scoring_stats['scored_pairs'],
+        'pairs_pruned': scoring_stats['pruned_pairs'],
         'matches_inserted': inserted,
         'existing_matches_skipped': len(existing_matches),
         'blocked_pairs_count': len(blocked_pairs),
-        'client_email': client_email,
-        'processing_date': current_date
+        'processing_date': current_date,
+        'insert_failed': insert_failed
     }
@@ -0,0 +1,289 @@
+"""
+Columnar job x client scoring for the auto-apply ranker.
+
+Computes the same position, location, gender and nationality components as
+`ranking.process_job_chunk`, but over whole job columns at once instead of
+per (job, client) pair, so a ranking run costs a handful of array operations
+per client rather than one Python call chain per job.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.services.job_apply.gazetteer import client_places, job_places, matching_places, most_specific
+from app.services.job_apply.title_taxonomy import major_disciplines, title_discipline
+
+UAE_NATIONALITY_KEYWORDS = ['emarati', 'emirati', 'uae national', 'uae', 'Civil Status Summary']
+ANY_GENDER_VALUES = ['any', 'male and female']
+
+POSITION_WEIGHT = 0.5
+LOCATION_WEIGHT = 0.3
+GENDER_WEIGHT = 0.2
+MIN_POSITION_SCORE = 0.5
+MATCH_THRESHOLD = 0.85
+
+
+def _text_column(df, column):
+    """Return a column as lowercase strings, with missing/non-string values as ''."""
+    if column not in df.columns:
+        return pd.Series([''] * len(df), index=df.index, dtype=object)
+    return df[column].map(lambda v: v.lower() if isinstance(v, str) else '')
+
+
+def _text_value(value):
+    return value if isinstance(value, str) else ''
+
+
+def detect_job_disciplines(titles):
+    """
+    Job side of `match_engineering_discipline` for a column of titles.
+
+    Args:
+        titles: Series of lowercase job titles
+
+    Returns:
+        Object ndarray with the discipline name per title, or '' if none
+    """
+    return np.array([title_discipline(title) or '' for title in titles], dtype=object)
+
+
+def client_disciplines(client_major):
+    """Set of engineering disciplines a client's major qualifies for."""
+    return set(major_disciplines(client_major))
+
+
+class JobMatrix:
+    """Read-only, per-run columnar view of the jobs being ranked."""
+
+    def __init__(self, jobs_df, features=None):
+        """
+        Args:
+            jobs_df: Jobs with lowercased/stripped text columns
+            features: Optional precomputed text features per row, from the
+                job feature store, used instead of deriving them here
+        """
+        self.size = len(jobs_df)
+        self.ids = jobs_df['id'].tolist() if 'id' in jobs_df.columns else [None] * self.size
+        self.id_strings = pd.Series([str(job_id) for job_id in self.ids], dtype=object)
+
+        emails = jobs_df['application_email'] if 'application_email' in jobs_df.columns \
+            else pd.Series([None] * self.size, index=jobs_df.index)
+        self.application_emails = emails.tolist()
+        self.has_application_email = np.array(
+            [bool(email) and not pd.isna(email) for email in self.application_emails], dtype=bool
+        )
+
+        if features is not None:
+            self.titles = pd.Series([feature['title_norm'] for feature in features], dtype=object)
+            self.cities = pd.Series([feature['city_norm'] for feature in features], dtype=object)
+        else:
+            self.titles = _text_column(jobs_df, 'job_title').reset_index(drop=True)
+            self.cities = _text_column(jobs_df, 'vacancy_city').reset_index(drop=True)
+        self.genders = _text_column(jobs_df, 'gender').reset_index(drop=True)
+        nationalities = _text_column(jobs_df, 'nationality').reset_index(drop=True)
+
+        self.city_array = self.cities.to_numpy(dtype=str) if self.size else np.array([], dtype=str)
+        # Gazetteer places each job names, () where the city is not a known UAE place
+        if features is not None:
+            places = [most_specific(feature.get('location_ids') or ()) for feature in features]
+        else:
+            places = [job_places(city) for city in self.city_array]
+        self.place_array = np.empty(self.size, dtype=object)
+        self.place_array[:] = places
+        self.place_counts = np.array([len(job) for job in places], dtype=np.int64)
+        self.has_title = self.titles.to_numpy() != ''
+        self.has_city = self.cities.to_numpy() != ''
+        if features is not None:
+            self.is_engineering = np.array([feature['is_engineering'] for feature in features], dtype=bool)
+            self.disciplines = np.array([feature['discipline'] or '' for feature in features], dtype=object)
+        else:
+            self.is_engineering = self.titles.str.contains('engineer', regex=False).to_numpy(dtype=bool)
+            self.disciplines = detect_job_disciplines(self.titles)
+
+        self.is_uae_only = np.zeros(self.size, dtype=bool)
+        for keyword in UAE_NATIONALITY_KEYWORDS:
+            self.is_uae_only |= nationalities.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+
+        gender_values = self.genders.to_numpy()
+        self.gender_is_open = (gender_values == '') | np.isin(gender_values, ANY_GENDER_VALUES)
+        self.gender_values = gender_values
+
+        # One row per distinct (job, title word) for word-overlap counting
+        if features is not None:
+            rows = [row for row, feature in enumerate(features) for _ in feature['title_tokens']]
+            words = [token for feature in features for token in feature['title_tokens']]
+            self.title_tokens = pd.Series(np.array(words, dtype=object), index=np.array(rows, dtype=np.int64))
+        else:
+            tokens = self.titles.str.split().explode().dropna().reset_index().drop_duplicates()
+            self.title_tokens = pd.Series(tokens.iloc[:, 1].to_numpy(), index=tokens.iloc[:, 0].to_numpy())
+
+    def take(self, rows):
+        """Return a JobMatrix restricted to the given row positions, in order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        subset = object.__new__(JobMatrix)
+        subset.size = len(rows)
+        subset.ids = [self.ids[row] for row in rows]
+        subset.id_strings = pd.Series(self.id_strings.to_numpy()[rows], dtype=object)
+        subset.application_emails = [self.application_emails[row] for row in rows]
+        for name in ('has_application_email', 'has_title', 'has_city', 'is_engineering',
+                     'disciplines', 'is_uae_only', 'gender_is_open', 'gender_values', 'place_array', 'place_counts'):
+            setattr(subset, name, getattr(self, name)[rows])
+        for name in ('titles', 'cities', 'genders'):
+            setattr(subset, name, pd.Series(getattr(self, name).to_numpy()[rows], dtype=object))
+        subset.city_array = self.city_array[rows]
+
+        # Re-key title tokens from old row positions to positions in the subset
+        new_positions = pd.Series(np.arange(len(rows)), index=rows)
+        tokens = self.title_tokens[self.title_tokens.index.isin(rows)]
+        subset.title_tokens = pd.Series(tokens.to_numpy(),
+                                        index=new_positions.loc[tokens.index].to_numpy())
+        return subset
+
+    def position_scores(self, client_positions, client_major):
+        """Vectorized `check_position_match_fast` for one client over every job."""
+        scores = np.zeros(self.size, dtype=float)
+        if not client_positions or self.size == 0:
+            return scores
+
+        positions = client_positions.lower()
+        client_titles = [title.strip().lower() for title in positions.split(',') if title.strip()]
+        unresolved = self.has_title.copy()
+
+        if client_major:
+            # Engineering titles are settled by discipline alone. Generic
+            # "engineer" titles score 0 here, as `match_engineering_discipline`
+            # reports no engineering background when no discipline is found.
+            engineering = unresolved & self.is_engineering
+            matched = client_disciplines(client_major)
+            if matched:
+                scores[engineering & np.isin(self.disciplines, list(matched))] = 1.0
+            unresolved &= ~engineering
+
+        direct = unresolved & self.titles.isin(client_titles).to_numpy()
+        scores[direct] = 1.0
+        unresolved &= ~direct
+
+        position_words = set(positions.split())
+        overlap = self.title_tokens.isin(position_words).groupby(level=0).sum()
+        overlap_counts = np.zeros(self.size, dtype=int)
+        overlap_counts[overlap.index.to_numpy(dtype=int)] = overlap.to_numpy()
+        scores[unresolved & (overlap_counts >= 2)] = 0.9
+
+        return scores
+
+    def location_scores(self, client_location, places=()):
+        """Vectorized `check_location_match_fast` for one client over every job."""
+        if not client_location:
+            return np.full(self.size, 0.5)
+
+        locations = [loc.strip().lower() for loc in client_location.split(',')]
+        matched = np.zeros(self.size, dtype=bool)
+        for loc in locations:
+            matched |= self.cities.to_numpy() == loc
+            matched |= np.char.find(np.array([loc]), self.city_array) >= 0
+            matched |= self.cities.str.contains(loc, regex=False).to_numpy(dtype=bool)
+        if places:
+            # Gazetteer ids decide wherever both sides resolved to known places; a
+            # job naming several places matches through any of them, and falls
+            # back to the string checks when none does
+            wanted = matching_places(tuple(places))
+            by_id = np.array([any(place in wanted for place in job) for job in self.place_array], dtype=bool)
+            matched = np.where(by_id, True, np.where(self.place_counts == 1, False, matched))
+
+        scores = np.where(matched, 1.0, 0.3)
+        scores[~self.has_city] = 0.5
+        return scores
+
+    def gender_scores(self, client_gender):
+        """1.0 where the job accepts the client's gender, else 0.0."""
+        accepted = self.gender_is_open | (self.gender_values == client_gender)
+        return np.where(accepted, 1.0, 0.0)
+
+
+def score_client(matrix, client, existing_matches=None):
+    """
+    Score every job in `matrix` for a single client.
+
+    Args:
+        matrix: JobMatrix for the current run
+        client: Mapping with the client row (id, email, positions, major, ...)
+        existing_matches: Set of "<email>_<job_id>" keys already ranked
+
+    Returns:
+        Tuple of (final_scores ndarray, accepted mask ndarray)
+    """
+    client_email = client.get('email')
+
+    eligible = matrix.has_application_email.copy()
+    if existing_matches:
+        keys = f"{client_email}_" + matrix.id_strings
+        eligible &= ~keys.isin(existing_matches).to_numpy()
+
+    client_nationality = client.get('nationality', '')
+    if client_nationality and not ('uae' in client_nationality.lower() or
+                                   'emirati' in client_nationality.lower()):
+        eligible &= ~matrix.is_uae_only
+
+    position = matrix.position_scores(_text_value(client.get('positions', '')),
+                                      _text_value(client.get('major', '')))
+    client_location = client.get('job_location_based', client.get('location', ''))
+    client_location = _text_value(client_location)
+    location = matrix.location_scores(client_location, client_places(client.get('location_ids'), client_location))
+    gender = matrix.gender_scores(client.get('gender', ''))
+
+    final_scores = POSITION_WEIGHT * position + LOCATION_WEIGHT * location + GENDER_WEIGHT * gender
+    accepted = eligible & (position >= MIN_POSITION_SCORE) & (final_scores >= MATCH_THRESHOLD)
+    return final_scores, accepted
+
+
+def score_jobs(chunk_data, index=None, stats=None):
+    """
+    Columnar replacement for `ranking.process_job_chunk`.
+
+    Takes the same (jobs_df, clients_df, existing_matches) tuple and returns the
+    same list of match dicts, in the same job-major order.
+
+    Args:
+        chunk_data: (jobs_df or JobMatrix, clients_df, existing_matches)
+        index: Optional TitleIndex over the same JobMatrix; when given, only
+            candidate jobs sharing a title token or discipline are scored
+        stats: Optional dict updated with 'scored_pairs' and 'pruned_pairs'
+    """
+    job_chunk, clients_data, existing_matches = chunk_data
+    matrix = job_chunk if isinstance(job_chunk, JobMatrix) else JobMatrix(job_chunk)
+
+    clients = [client for _, client in clients_data.iterrows()]
+    if stats is not None:
+        stats.setdefault('scored_pairs', 0)
+        stats.setdefault('pruned_pairs', 0)
+    if not clients or matrix.size == 0:
+        return []
+
+    final_scores = np.zeros((matrix.size, len(clients)))
+    accepted = np.zeros((matrix.size, len(clients)), dtype=bool)
+    for column, client in enumerate(clients):
+        if index is None:
+            final_scores[:, column], accepted[:, column] = score_client(matrix, client, existing_matches)
+            scored = matrix.size
+        else:
+            rows = index.candidates(_text_value(client.get('positions', '')),
+                                    _text_value(client.get('major', '')))
+            if len(rows):
+                final_scores[rows, column], accepted[rows, column] = score_client(
+                    matrix.take(rows), client, existing_matches)
+            scored = len(rows)
+        if stats is not None:
+            stats['scored_pairs'] += scored
+            stats['pruned_pairs'] += matrix.size - scored
+
+    matches = []
+    for job_index, client_index in zip(*np.nonzero(accepted)):
+        client = clients[client_index]
+        matches.append({
+            'job_id': matrix.ids[job_index],
+            'client_id': client['id'],
+            'email': client['email'],
+            'application_email': matrix.application_emails[job_index],
+            'final_score': float(final_scores[job_index, client_index])
+        })
+    return matches
@@ -0,0 +1,242 @@
+"""
+Corpus-level TF-IDF model for skill matching.
+
+`calculate_skills_match` used to fit a new TfidfVectorizer on a two-document
+corpus for every (profile, job) pair. Instead, one vectorizer is fitted on the
+AI database's job corpus and persisted to `Config.SKILL_MODEL_PATH` together
+with every job's (L2-normalised) vector. Scoring a profile against N jobs is
+then a single sparse matrix product; jobs the model has not seen (new since
+the last fit, or main-database "Job" rows) are vectorised in one batch
+`transform` call.
+
+Job vectors are keyed by a hash of the job's skill text, so edited jobs are
+re-vectorised rather than scored with a stale vector. The model is refitted
+after job ingestion (`refresh_skill_model`) and in the background once it is
+older than `Config.SKILL_MODEL_REFRESH_SECONDS`; other processes pick up the
+new file by its modification time.
+"""
+
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from app.config import Config
+
+
+def job_skill_text(description, title=None):
+    """The text a job's skill vector is built from: its description, else its title."""
+    return description or title or ''
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SkillModel:
+    """Fitted TF-IDF vectorizer plus precomputed vectors for the job corpus."""
+
+    def __init__(self, vectorizer, job_keys, job_matrix, fitted_at=None):
+        self.vectorizer = vectorizer
+        self.job_matrix = job_matrix.tocsr()
+        self.rows = {key: row for row, key in enumerate(job_keys)}
+        self.fitted_at = fitted_at or time.time()
+
+    @classmethod
+    def fit(cls, texts):
+        """Fit on a corpus of job texts; empty and duplicate texts are ignored."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        unique = list(dict.fromkeys(text for text in texts if text and text.strip()))
+        vectorizer = TfidfVectorizer(stop_words='english')
+        job_matrix = vectorizer.fit_transform(unique)
+        return cls(vectorizer, [text_key(text) for text in unique], job_matrix)
+
+    @property
+    def size(self):
+        return self.job_matrix.shape[0]
+
+    def score(self, candidate_skills, job_texts, job_keys=None):
+        """
+        Cosine similarity between a profile's skills and each job.
+
+        Args:
+            candidate_skills: The candidate's skills as free text
+            job_texts: Job skill texts (see job_skill_text)
+            job_keys: Precomputed text_key() of each text (e.g. from the job feature store)
+
+        Returns:
+            ndarray of scores in [0, 1], one per job
+        """
+        scores = np.zeros(len(job_texts))
+        if not candidate_skills or not job_texts:
+            return scores
+        profile = self.vectorizer.transform([candidate_skills])
+        if profile.nnz == 0:
+            return scores
+
+        known, known_rows, unseen = [], [], []
+        for i, text in enumerate(job_texts):
+            if not text:
+                continue
+            row = self.rows.get(job_keys[i] if job_keys and job_keys[i] else text_key(text))
+            if row is None:
+                unseen.append(i)
+            else:
+                known.append(i)
+                known_rows.append(row)
+
+        # Rows are L2-normalised, so the dot product is the cosine similarity
+        if known:
+            scores[known] = (self.job_matrix[known_rows] @ profile.T).toarray().ravel()
+        if unseen:
+            fresh = self.vectorizer.transform([job_texts[i] for i in unseen])
+            scores[unseen] = (fresh @ profile.T).toarray().ravel()
+        return np.clip(scores, 0.0, 1.0)
+
+    def save(self, path):
+        """Write atomically so readers in other processes never see a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(self, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def load_job_corpus(limit=None):
+    """Skill texts of the most recent jobs in the AI database."""
+    from app.database.db import execute_ai_query
+    rows = execute_ai_query(
+        "SELECT job_title, job_description FROM jobs ORDER BY id DESC LIMIT %s",
+        (limit or Config.SKILL_MODEL_MAX_JOBS,), fetch_all=True
+    ) or []
+    return [job_skill_text(row['job_description'], row['job_title']) for row in rows]
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+_refreshing = threading.Event()
+_last_fit_failure = 0.0
+FIT_RETRY_SECONDS = 60
+
+
+def refresh_skill_model(path=None):
+    """
+    Refit the model on the current job corpus and persist it.
+
+    Only one process refits at a time; a concurrent caller returns None and
+    picks up the new file on its next get_skill_model().
+    """
+    global _model, _model_mtime
+    path = path or Config.SKILL_MODEL_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.lock", 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("[SKILL_MODEL] Refit already running in another process")
+            return None
+        started = time.time()
+        model = SkillModel.fit(load_job_corpus())
+        model.save(path)
+        with _model_lock:
+            _model, _model_mtime = model, path.stat().st_mtime
+        print(f"[SKILL_MODEL] Fitted on {model.size} jobs in {time.time() - started:.2f}s")
+        return model
+
+
+def _refresh_in_background():
+    if _refreshing.is_set():
+        return
+    _refreshing.set()
+
+    def run():
+        try:
+            refresh_skill_model()
+        except Exception as e:
+            print(f"[SKILL_MODEL] ⚠️ Background refit failed: {e}")
+        finally:
+            _refreshing.clear()
+
+    threading.Thread(target=run, daemon=True, name="skill-model-refresh").start()
+
+
+def load_persisted_skill_model():
+    """Load the model file if one exists, without fitting or touching the database."""
+    global _model, _model_mtime
+    path = Config.SKILL_MODEL_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    with _model_lock:
+        if mtime != _model_mtime:
+            _model, _model_mtime = SkillModel.load(path), mtime
+    return _model
+
+
+def get_skill_model():
+    """Return the process-wide model, loading, fitting or scheduling a refit as needed."""
+    global _model, _model_mtime, _last_fit_failure
+    path = Config.SKILL_MODEL_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = None
+
+    if mtime is not None and mtime != _model_mtime:
+        with _model_lock:
+            if mtime != _model_mtime:
+                try:
+                    _model, _model_mtime = SkillModel.load(path), mtime
+                except Exception as e:
+                    print(f"[SKILL_MODEL] ⚠️ Could not load {path}: {e}")
+
+    if _model is None:
+        # Do not hammer an unreachable database on every request
+        if time.time() - _last_fit_failure < FIT_RETRY_SECONDS:
+            return None
+        try:
+            refresh_skill_model(path)
+        except Exception as e:
+            _last_fit_failure = time.time()
+            print(f"[SKILL_MODEL] ⚠️ Could not fit on the job corpus: {e}")
+    elif time.time() - _model.fitted_at > Config.SKILL_MODEL_REFRESH_SECONDS:
+        _refresh_in_background()
+    return _model
+
+
+def score_skills(candidate_skills, job_texts, job_keys=None):
+    """
+    Skill match scores for one profile against many jobs.
+
+    Falls back to a model fitted on `job_texts` alone when the corpus model
+    is unavailable (e.g. the AI database is unreachable).
+    """
+    job_texts = [text or '' for text in job_texts]
+    if not candidate_skills or not any(job_texts):
+        return np.zeros(len(job_texts))
+    model = get_skill_model()
+    if model is None:
+        try:
+            model = SkillModel.fit(job_texts + [candidate_skills])
+        except ValueError:
+            # Nothing but stop words on either side
+            return np.zeros(len(job_texts))
+    return model.score(candidate_skills, job_texts, job_keys)
@@ -0,0 +1,70 @@
+"""
+Inverted title index for ranking candidate generation.
+
+Maps normalized job-title tokens and engineering discipline buckets to job
+row positions in a `JobMatrix`, so the ranker only fully scores jobs that
+can possibly reach the position threshold for a client. Pruning is exact:
+every job skipped here would have scored 0.0 on position in
+`JobMatrix.position_scores`.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from app.services.job_apply.scoring import client_disciplines
+
+
+class TitleIndex:
+    """Token -> job rows and discipline -> job rows lookup over one JobMatrix."""
+
+    def __init__(self, matrix):
+        self.size = matrix.size
+        token_rows = defaultdict(list)
+        for row, token in zip(matrix.title_tokens.index, matrix.title_tokens.to_numpy()):
+            token_rows[token].append(int(row))
+        self.token_rows = {token: np.array(rows, dtype=np.int64) for token, rows in token_rows.items()}
+
+        discipline_rows = defaultdict(list)
+        for row in np.nonzero(matrix.is_engineering & (matrix.disciplines != ''))[0]:
+            discipline_rows[matrix.disciplines[row]].append(int(row))
+        self.discipline_rows = {name: np.array(rows, dtype=np.int64) for name, rows in discipline_rows.items()}
+
+        self.is_engineering = matrix.is_engineering
+
+    @staticmethod
+    def position_tokens(client_positions):
+        """Tokens a job title must share with the client's positions to be scored."""
+        positions = client_positions.lower()
+        tokens = set(positions.split())
+        for title in positions.split(','):
+            tokens.update(title.split())
+        return tokens
+
+    def candidates(self, client_positions, client_major=None):
+        """
+        Sorted job row positions worth scoring for a client.
+
+        Args:
+            client_positions: The client's comma-separated preferred positions
+            client_major: The client's major, used for engineering disciplines
+
+        Returns:
+            ndarray of row positions into the indexed JobMatrix
+        """
+        if not client_positions or self.size == 0:
+            return np.array([], dtype=np.int64)
+
+        parts = [self.token_rows[token] for token in self.position_tokens(client_positions)
+                 if token in self.token_rows]
+        rows = np.unique(np.concatenate(parts)) if parts else np.array([], dtype=np.int64)
+
+        if client_major:
+            # Engineering titles are decided by discipline only when a major is known
+            rows = rows[~self.is_engineering[rows]]
+            disciplines = [self.discipline_rows[name] for name in client_disciplines(client_major)
+                           if name in self.discipline_rows]
+            if disciplines:
+                rows = np.union1d(rows, np.concatenate(disciplines))
+
+        return rows
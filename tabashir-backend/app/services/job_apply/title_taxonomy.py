@@ -0,0 +1,163 @@
+"""
+Job title taxonomy: engineering discipline, seniority and related-role families.
+
+Every keyword the matchers look for in a title is compiled into one regex at
+import time, so a title is classified with a single scan instead of the
+nested keyword loops `match_engineering_discipline`, `detect_job_disciplines`
+and the related-role check used to run per (job, client) pair. Results are
+cached per distinct title.
+
+Keywords keep the substring semantics of the loops they replace ("it
+engineer" is found inside "audit engineer"), so ranking results do not change.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Ordered: when a title names several disciplines, the first one listed wins
+ENGINEERING_DISCIPLINES = {
+    'mechanical': ['mechanical', 'mech'],
+    'electrical': ['electrical', 'electronic', 'electronics'],
+    'civil': ['civil', 'structural', 'construction'],
+    'software': ['software', 'coding', 'programming', 'web', 'app'],
+    'chemical': ['chemical', 'process', 'chemical process'],
+    'industrial': ['industrial', 'manufacturing', 'production'],
+    'systems': ['system', 'systems integration', 'control systems'],
+    'environmental': ['environmental', 'sustainability', 'green'],
+    'biomedical': ['biomedical', 'bioengineering', 'medical'],
+    'aerospace': ['aerospace', 'aeronautical', 'aviation', 'aircraft'],
+    'computer': ['computer', 'computing', 'information technology', 'it'],
+    'telecommunications': ['telecommunications', 'telecom', 'network'],
+    'mechatronics': ['mechatronics', 'robotics', 'automation'],
+    'materials': ['materials', 'metallurgical', 'metallurgy'],
+    'mining': ['mining', 'minerals', 'extraction'],
+    'petroleum': ['petroleum', 'oil', 'gas', 'petroleum process'],
+    'agricultural': ['agricultural', 'agriculture', 'farm'],
+    'marine': ['marine', 'naval', 'ocean'],
+    'safety': ['safety', 'health', 'occupational'],
+    'quality': ['quality', 'qa', 'qc']
+}
+
+# family key -> titles that count as related roles
+RELATED_ROLE_MAPPINGS = {
+    "developer": ["programmer", "coder", "engineer", "software"],
+    "engineer": ["developer", "programmer", "technician"],
+    "manager": ["lead", "head", "director", "supervisor"],
+    "analyst": ["specialist", "consultant", "advisor"],
+    "marketing": ["seo", "content", "digital", "social media"],
+    "sales": ["business development", "account manager"],
+    "finance": ["accounting", "financial", "accountant"],
+    "hr": ["human resources", "talent", "recruitment"]
+}
+
+# Ascending; the highest level named in a title wins. Matched as whole words.
+SENIORITY_LEVELS = {
+    'intern': ['intern', 'internship', 'trainee'],
+    'junior': ['junior', 'jr', 'graduate', 'entry level', 'assistant'],
+    'senior': ['senior', 'sr', 'experienced'],
+    'lead': ['lead', 'principal', 'staff', 'team leader'],
+    'manager': ['manager', 'supervisor'],
+    'director': ['director', 'head'],
+    'executive': ['chief', 'vp', 'vice president', 'ceo', 'cto', 'cfo', 'coo'],
+}
+DEFAULT_SENIORITY = 'mid'
+
+TitleInfo = namedtuple('TitleInfo', 'discipline is_engineering seniority family_keys family_terms')
+
+
+def _compile():
+    """
+    One alternation over every term, wrapped in a lookahead so that matches at
+    each position are found even where they overlap. At a position the regex
+    reports the longest term; shorter terms starting there are exactly its
+    prefixes, recorded in `implied`.
+    """
+    roles = {}  # term -> [(kind, value), ...]
+    for rank, keywords in enumerate(ENGINEERING_DISCIPLINES.values()):
+        for keyword in keywords:
+            roles.setdefault(f"{keyword} engineer", []).append(('discipline', rank))
+    for family, related_terms in RELATED_ROLE_MAPPINGS.items():
+        roles.setdefault(family, []).append(('family_key', family))
+        for term in related_terms:
+            roles.setdefault(term, []).append(('family_term', family))
+    levels = list(SENIORITY_LEVELS)
+    for level, words in SENIORITY_LEVELS.items():
+        for word in words:
+            # Titles are scanned padded with spaces, so these only match whole words
+            roles.setdefault(f" {word} ", []).append(('seniority', levels.index(level)))
+
+    terms = sorted(roles, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(term) for term in terms) + '))')
+    implied = {term: [other for other in terms if term.startswith(other)] for term in terms}
+    return pattern, roles, implied
+
+
+_PATTERN, _ROLES, _IMPLIED = _compile()
+_DISCIPLINE_NAMES = list(ENGINEERING_DISCIPLINES)
+_SENIORITY_NAMES = list(SENIORITY_LEVELS)
+_WORD_SEPARATORS = re.compile(r'[^\w&+#]+')
+
+
+def _scan(text):
+    """Every (kind, value) whose term occurs in `text`."""
+    found = set()
+    for longest in set(_PATTERN.findall(text)):
+        for term in _IMPLIED[longest]:
+            found.update(_ROLES[term])
+    return found
+
+
+@lru_cache(maxsize=65536)
+def classify_title(title):
+    """
+    Discipline, seniority and related-role families of a title, in one scan.
+
+    Args:
+        title: Job title or comma-separated preferred positions (any case)
+
+    Returns:
+        TitleInfo(discipline or None, is_engineering, seniority,
+                  family_keys, family_terms)
+    """
+    title = title.lower() if isinstance(title, str) else ''
+    # Seniority words are matched against a punctuation-free copy ("Sr. Engineer")
+    words = ' ' + _WORD_SEPARATORS.sub(' ', title) + ' '
+    found = _scan(title) | {role for role in _scan(words) if role[0] == 'seniority'}
+
+    disciplines = [value for kind, value in found if kind == 'discipline']
+    seniorities = [value for kind, value in found if kind == 'seniority']
+    return TitleInfo(
+        discipline=_DISCIPLINE_NAMES[min(disciplines)] if disciplines else None,
+        is_engineering='engineer' in title,
+        seniority=_SENIORITY_NAMES[max(seniorities)] if seniorities else DEFAULT_SENIORITY,
+        family_keys=frozenset(value for kind, value in found if kind == 'family_key'),
+        family_terms=frozenset(value for kind, value in found if kind == 'family_term'),
+    )
+
+
+def title_discipline(title):
+    """The engineering discipline a title asks for ("<keyword> engineer"), or None."""
+    return classify_title(title).discipline
+
+
+@lru_cache(maxsize=4096)
+def major_disciplines(major):
+    """Set of engineering disciplines a major qualifies for ("<keyword> engineer(ing)")."""
+    if not isinstance(major, str):
+        return frozenset()
+    found = _scan(major.lower())
+    return frozenset(_DISCIPLINE_NAMES[value] for kind, value in found if kind == 'discipline')
+
+
+def related_roles(job_title, positions):
+    """
+    True when the title and the candidate's positions are in a related-role
+    family: one names the family (e.g. "developer") and the other one of its
+    related titles (e.g. "programmer").
+    """
+    job, profile = classify_title(job_title), classify_title(positions)
+    if job.family_keys & profile.family_terms:
+        return True
+    # A title naming the family itself is only compared the other way round
+    return bool((job.family_terms - job.family_keys) & profile.family_keys)
@@ -0,0 +1,150 @@
+"""
+Memory-mapped static word vectors for title and location similarity.
+
+`en_core_web_sm` runs its full pipeline for every `Doc.similarity` call and
+has no real word vectors. Here a text's vector is the average of its words'
+static embeddings, and similarity is a dot product, so no parser runs.
+
+The table lives in `Config.WORD_VECTORS_PATH` as two .npy files, built once
+from any GloVe/fastText text file with `python -m app.commands.build_word_vectors`:
+- words.npy: sorted, fixed-width unicode array of the vocabulary;
+- vectors.npy: float32 matrix with L2-normalised rows, aligned with words.npy.
+
+Both are opened with `mmap_mode='r'`, so gunicorn workers forked from one
+master (or started separately) share the same page-cache pages instead of
+each holding a private copy.
+"""
+
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from app.config import Config
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Longer tokens are almost never real words and would widen every vocabulary entry
+MAX_WORD_LENGTH = 32
+
+
+class StaticWordVectors:
+    """Read-only embedding table opened from disk with numpy memory mapping."""
+
+    def __init__(self, directory):
+        directory = Path(directory)
+        self.words = np.load(directory / 'words.npy', mmap_mode='r')
+        self.vectors = np.load(directory / 'vectors.npy', mmap_mode='r')
+        if len(self.words) != len(self.vectors):
+            raise ValueError(f"{directory}: words.npy and vectors.npy have different lengths")
+        self.dim = self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+        # Changes whenever the table is rebuilt, so scores cached against it can be told apart
+        stats = [(directory / name).stat() for name in ('words.npy', 'vectors.npy')]
+        self.identity = hashlib.md5(repr([(s.st_size, s.st_mtime_ns) for s in stats]).encode()).hexdigest()[:12]
+
+    def __len__(self):
+        return len(self.words)
+
+    def row(self, word):
+        """Row of `word` in the table, or None if it is out of vocabulary."""
+        position = int(np.searchsorted(self.words, word))
+        if position < len(self.words) and self.words[position] == word:
+            return position
+        return None
+
+    def text_vector(self, text):
+        """Normalised mean vector of the text's in-vocabulary words, or None."""
+        if not text:
+            return None
+        rows = [row for row in (self.row(token) for token in TOKEN_PATTERN.findall(text.lower())) if row is not None]
+        if not rows:
+            return None
+        # Repeated words count once per occurrence, like spaCy's Doc.vector
+        vector = np.asarray(self.vectors[rows], dtype=np.float32).mean(axis=0)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def similarity(self, text_a, text_b):
+        """Cosine similarity of the two texts' mean vectors, or None if either has none."""
+        vector_a = _cached_text_vector(self, text_a)
+        vector_b = _cached_text_vector(self, text_b)
+        if vector_a is None or vector_b is None:
+            return None
+        return float(np.dot(vector_a, vector_b))
+
+    @staticmethod
+    def build(source, directory, max_words=None):
+        """
+        Convert a GloVe/fastText text file ("word v1 v2 ...") into the on-disk format.
+
+        Args:
+            source: Path of the text embedding file
+            directory: Output directory for words.npy and vectors.npy
+            max_words: Keep only the first N words (these files are frequency-ordered)
+
+        Returns:
+            Number of words written
+        """
+        words, vectors, dim = [], [], None
+        with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+            for line_number, line in enumerate(f):
+                parts = line.rstrip().split(' ')
+                # fastText .vec files start with a "<count> <dim>" header
+                if line_number == 0 and len(parts) == 2:
+                    continue
+                word = parts[0].lower()
+                if not word or len(word) > MAX_WORD_LENGTH or not TOKEN_PATTERN.fullmatch(word):
+                    continue
+                if dim is None:
+                    dim = len(parts) - 1
+                if len(parts) - 1 != dim:
+                    continue
+                words.append(word)
+                vectors.append(np.asarray(parts[1:], dtype=np.float32))
+                if max_words and len(words) >= max_words:
+                    break
+
+        # Keep the first (most frequent) vector for words that differ only by case
+        unique = {}
+        for word, vector in zip(words, vectors):
+            unique.setdefault(word, vector)
+        ordered = sorted(unique)
+        matrix = np.vstack([unique[word] for word in ordered]) if ordered else np.zeros((0, dim or 0), np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / 'words.npy', np.array(ordered, dtype=f'<U{MAX_WORD_LENGTH}'))
+        np.save(directory / 'vectors.npy', matrix.astype(np.float32))
+        return len(ordered)
+
+
+@lru_cache(maxsize=4096)
+def _cached_text_vector(table, text):
+    # Candidate positions and locations repeat for every job in a request
+    return table.text_vector(text)
+
+
+_vectors = None
+_vectors_loaded = False
+_vectors_lock = threading.Lock()
+
+
+def get_word_vectors():
+    """Return the process-wide table, or None if it has not been built."""
+    global _vectors, _vectors_loaded
+    if not _vectors_loaded:
+        with _vectors_lock:
+            if not _vectors_loaded:
+                try:
+                    _vectors = StaticWordVectors(Config.WORD_VECTORS_PATH)
+                    print(f"[WORD_VECTORS] Mapped {len(_vectors)} vectors from {Config.WORD_VECTORS_PATH}")
+                except (OSError, ValueError) as e:
+                    print(f"[WORD_VECTORS] ⚠️ No word vectors at {Config.WORD_VECTORS_PATH}: {e}")
+                    _vectors = None
+                _vectors_loaded = True
+    return _vectors
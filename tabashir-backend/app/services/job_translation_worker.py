@@ -1,236 +1,358 @@
 """
 Background Job Translation Worker
-Handles translation of existing jobs and new jobs using DeepSeek API
+Translates jobs to Arabic from a leased queue in the AI database
+
+Worker threads, in any number of processes on any number of hosts, claim a
+few untranslated jobs at a time with `FOR UPDATE SKIP LOCKED`, marking them
+'in_progress' under a lease (migrations/ai/0011). No connection is held while
+the model is called; the lease is renewed in the background, and each job's
+translation is committed on its own. A job whose worker died is claimed again
+once its lease expires, and a failed job is retried with backoff up to
+TRANSLATION_MAX_ATTEMPTS times.
+
+Jobs are claimed highest `translation_priority` first, then newest. Arabic
+/jobs pages raise the priority of the untranslated jobs they show
+(request_translation) instead of translating them inline, and the first
+thread of each worker periodically raises it for the newest and most-matched
+jobs (warm_translations) so they are translated before anyone asks.
 """
 
-import time
+import os
+import socket
 import threading
-from typing import Dict, List
-from app.database.db import get_ai_db_connection, release_ai_db_connection
+import time
+import traceback
+from typing import Dict, List, Optional
+from app.config import Config
+from app.database.db import execute_ai_query
 from app.services.translation_service import JobTranslationService
 
+TRANSLATABLE_FIELDS = JobTranslationService().translatable_fields
+JOB_COLUMNS = ', '.join(['id', 'translation_attempts'] + TRANSLATABLE_FIELDS + [f"{field}_ar" for field in TRANSLATABLE_FIELDS])
+
+# translation_priority levels; the queue is otherwise newest first
+PRIORITY_WARM = 1
+PRIORITY_REQUESTED = 2
+
+UNTRANSLATED_SQL = "(translation_status IS NULL OR translation_status <> 'completed')"
+
+# Jobs a worker may claim: never tried, failed and due for a retry, or abandoned by a dead worker
+CLAIMABLE_SQL = """
+    (translation_status IS NULL OR translation_status = 'pending')
+    OR (translation_status = 'failed' AND translation_attempts < %(max_attempts)s
+        AND translation_updated_at < NOW() - %(backoff)s * POWER(2, GREATEST(translation_attempts - 1, 0)) * INTERVAL '1 second')
+    OR (translation_status = 'in_progress' AND translation_locked_until < NOW())
+"""
+
 class JobTranslationWorker:
-    """Background worker for translating jobs"""
-    
-    def __init__(self, batch_size: int = 20):
+    """Pool of threads that claim and translate jobs"""
+
+    def __init__(self, batch_size: Optional[int] = None, threads: Optional[int] = None,
+                 poll_interval: Optional[float] = None):
         """
         Initialize the translation worker
-        
+
         Args:
-            batch_size: Number of jobs to process in each batch
+            batch_size: Jobs a thread claims at once (translated together in structured mode)
+            threads: Number of worker threads
+            poll_interval: Seconds to wait when nothing is claimable
         """
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size or Config.TRANSLATION_JOBS_PER_CALL)
+        self.threads = max(1, threads or Config.TRANSLATION_WORKERS)
+        self.poll_interval = poll_interval or Config.TRANSLATION_POLL_INTERVAL
         self.translation_service = JobTranslationService()
         self.is_running = False
-        self.worker_thread = None
-        
+        self._threads = []
+        self._stop = threading.Event()
+
     def start(self):
-        """Start the background translation worker"""
+        """Start the background translation worker threads"""
         if self.is_running:
             print("Translation worker is already running")
             return
-            
+
         self.is_running = True
-        self.worker_thread = threading.Thread(target=self._run_worker, daemon=True)
-        self.worker_thread.start()
-        print("Translation worker started")
-    
+        self._stop.clear()
+        for index in range(self.threads):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:translation-{index}"
+            thread = threading.Thread(target=self._run_worker, args=(worker_id, index == 0), daemon=True,
+                                      name=f"translation-worker-{index}")
+            thread.start()
+            self._threads.append(thread)
+        print(f"Translation worker started with {self.threads} thread(s)")
+
     def stop(self):
-        """Stop the background translation worker"""
+        """Stop the background translation worker threads"""
         self.is_running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=10)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._threads = []
         print("Translation worker stopped")
-    
-    def _run_worker(self):
-        """Main worker loop"""
-        while self.is_running:
+
+    def _run_worker(self, worker_id: str, warm: bool = False):
+        """Main worker loop: translate claimed batches back to back, wait when the queue is empty"""
+        next_warm = 0.0
+        while not self._stop.is_set():
+            if warm and Config.TRANSLATION_WARM_JOBS > 0 and time.time() >= next_warm:
+                next_warm = time.time() + Config.TRANSLATION_WARM_INTERVAL_SECONDS
+                try:
+                    warm_translations()
+                except Exception as e:
+                    print(f"Translation warm-up failed: {e}")
             try:
-                self.translate_pending_jobs()
-                time.sleep(10)  # Wait 10 seconds between batches
+                claimed = self.translate_pending_jobs(worker_id)
             except Exception as e:
-                print(f"Error in translation worker: {e}")
-                time.sleep(300)  # Wait 5 minutes on error
-    
-    def translate_pending_jobs(self):
-        """Translate jobs that need translation"""
-        conn = get_ai_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT * FROM jobs 
-                WHERE translation_status = 'pending' 
-                   OR translation_status IS NULL
-                   OR translation_status = 'failed'
-                ORDER BY job_date DESC
-                LIMIT %s
-            """, (self.batch_size,))
-            
-            jobs = cursor.fetchall()
-            if not jobs:
-                print("No jobs need translation")
-                return
-            
-            print(f"Processing {len(jobs)} jobs for translation")
-            
-            columns = [desc[0] for desc in cursor.description]
-            
-            translated_count = 0
-            for job_row in jobs:
+                print(f"Error in translation worker {worker_id}: {e}")
+                traceback.print_exc()
+                claimed = 0
+            if not claimed:
+                self._stop.wait(self.poll_interval)
+
+    def claim(self, worker_id: str, limit: int, job_id: Optional[int] = None) -> List[Dict]:
+        """
+        Lease up to `limit` claimable jobs (or only `job_id`) to this worker
+
+        Returns:
+            The claimed jobs' ids, attempts and English and Arabic fields
+        """
+        job_filter = "AND id = %(job_id)s" if job_id is not None else ""
+        return execute_ai_query(f"""
+            UPDATE jobs
+            SET translation_status = 'in_progress', translation_locked_by = %(worker_id)s,
+                translation_locked_until = NOW() + %(lease)s * INTERVAL '1 second',
+                translation_attempts = translation_attempts + 1
+            WHERE id IN (
+                SELECT id FROM jobs
+                WHERE ({CLAIMABLE_SQL}) {job_filter}
+                ORDER BY translation_priority DESC, NULLIF(job_date, 'Nan') DESC NULLS LAST
+                FOR UPDATE SKIP LOCKED
+                LIMIT %(limit)s
+            )
+            RETURNING {JOB_COLUMNS}
+        """, {
+            'worker_id': worker_id, 'lease': Config.TRANSLATION_LEASE_SECONDS, 'limit': limit, 'job_id': job_id,
+            'max_attempts': Config.TRANSLATION_MAX_ATTEMPTS, 'backoff': Config.TRANSLATION_RETRY_BACKOFF_SECONDS,
+        }, fetch_all=True, commit=True) or []
+
+    def _renew_lease(self, job_ids: List[int], worker_id: str, done: threading.Event):
+        while not done.wait(Config.TRANSLATION_LEASE_SECONDS / 3):
+            try:
+                execute_ai_query("""
+                    UPDATE jobs SET translation_locked_until = NOW() + %s * INTERVAL '1 second'
+                    WHERE id = ANY(%s) AND translation_locked_by = %s AND translation_status = 'in_progress'
+                """, (Config.TRANSLATION_LEASE_SECONDS, job_ids, worker_id), commit=True)
+            except Exception as e:
+                print(f"Translation lease renewal failed for jobs {job_ids}: {e}")
+
+    def translate_pending_jobs(self, worker_id: str = None) -> int:
+        """
+        Claim one batch of jobs, translate it and save each job
+
+        Returns:
+            Number of jobs claimed (0 when the queue is empty)
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:translation"
+        jobs = self.claim(worker_id, self.batch_size)
+        if not jobs:
+            return 0
+
+        print(f"{worker_id} processing {len(jobs)} jobs for translation")
+        self._translate_claimed(jobs, worker_id)
+        return len(jobs)
+
+    def _translate_claimed(self, jobs: List[Dict], worker_id: str) -> int:
+        """
+        Translate jobs leased to this worker, committing each one separately
+
+        Returns:
+            Number of jobs saved as completed
+        """
+        completed = 0
+        pending = []
+        for job_data in jobs:
+            if self.translation_service.is_translation_needed(job_data):
+                pending.append(job_data)
+            elif self._save_translation(job_data, {}, worker_id, status='completed'):
+                completed += 1
+
+        translated_count = 0
+        report = None
+        if pending:
+            done = threading.Event()
+            renewer = threading.Thread(target=self._renew_lease, args=([job['id'] for job in pending], worker_id, done),
+                                       daemon=True)
+            renewer.start()
+            try:
+                results, report = self.translation_service.translate_batch(pending)
+            except Exception as e:
+                print(f"Batch translation failed for jobs {[job['id'] for job in pending]}: {e}")
+                results = [{} for _ in pending]
+            finally:
+                done.set()
+
+            for job_data, translated_fields in zip(pending, results):
                 try:
-                    job_data = dict(zip(columns, job_row))
-                    
-                    if not self.translation_service.is_translation_needed(job_data):
-                        cursor.execute("""
-                            UPDATE jobs 
-                            SET translation_status = 'completed', translation_updated_at = NOW()
-                            WHERE id = %s
-                        """, (job_data['id'],))
-                        continue
-                    
-                    self._translate_single_job(job_data, cursor)
-                    translated_count += 1
-                    
-                    time.sleep(1)
-                    
+                    if self._save_translation(job_data, translated_fields, worker_id):
+                        translated_count += 1
                 except Exception as e:
-                    print(f"Failed to translate job {job_data.get('id', 'unknown')}: {e}")
-                    cursor.execute("""
-                        UPDATE jobs 
-                        SET translation_status = 'failed', translation_updated_at = NOW()
-                        WHERE id = %s
-                    """, (job_data['id'],))
-            
-            conn.commit()
-            print(f"Successfully translated {translated_count} jobs")
-            
-        except Exception as e:
-            conn.rollback()
-            print(f"Error in batch translation: {e}")
-        finally:
-            cursor.close()
-            release_ai_db_connection(conn)
-    
-    def _translate_single_job(self, job_data: Dict, cursor) -> bool:
+                    # The lease runs out and the job is claimed again
+                    print(f"Failed to save translation of job {job_data['id']}: {e}")
+
+        print(f"Successfully translated {translated_count} jobs "
+              f"({self.translation_service.throughput():.1f} jobs/min in {self.translation_service.mode} mode)")
+        if report:
+            print(f"Translation memory: {report['memory_hits']}/{report['memory_lookups']} hits "
+                  f"({self.translation_service.memory_hit_rate(report):.0%}), "
+                  f"{report['script_skips']} fields already in Arabic, "
+                  f"{report['calls']} LLM calls made, {report['calls_avoided']} avoided")
+        return completed + translated_count
+
+    def _save_translation(self, job_data: Dict, translated_fields: Dict[str, str], worker_id: str,
+                          status: Optional[str] = None) -> bool:
         """
-        Translate a single job and update database
-        
-        Args:
-            job_data: Job data dictionary
-            cursor: Database cursor
-            
+        Store a job's translations and release its lease, in its own transaction
+
+        The job is marked failed when no field was translated. Nothing is written
+        if the lease was lost to another worker.
+
         Returns:
-            True if successful, False otherwise
+            True if the job was saved as completed, False otherwise
         """
-        try:
-            translated_fields = self.translation_service.translate_job_fields(job_data)
-            
-            if not translated_fields:
-                print(f"No fields translated for job {job_data['id']}")
-                return False
-            
-            update_fields = list(translated_fields.keys()) + ['translation_status', 'translation_updated_at']
-            set_clause = ', '.join([f"{field} = %s" for field in update_fields])
-            
-            values = list(translated_fields.values()) + ['completed', 'NOW()']
-            values.append(job_data['id'])
-            
-            cursor.execute(f"""
-                UPDATE jobs 
-                SET {set_clause}
-                WHERE id = %s
-            """, values)
-            
-            print(f"Translated job {job_data['id']}: {list(translated_fields.keys())}")
-            return True
-            
-        except Exception as e:
-            print(f"Failed to translate job {job_data['id']}: {e}")
+        status = status or ('completed' if translated_fields else 'failed')
+        if status == 'failed':
+            print(f"No fields translated for job {job_data['id']} (attempt {job_data.get('translation_attempts')})")
+
+        set_clause = ''.join(f"{field} = %s, " for field in translated_fields)
+        row = execute_ai_query(f"""
+            UPDATE jobs
+            SET {set_clause}translation_status = %s, translation_updated_at = NOW(),
+                translation_error = %s, translation_priority = 0,
+                translation_locked_by = NULL, translation_locked_until = NULL
+            WHERE id = %s AND translation_locked_by = %s
+            RETURNING id
+        """, (*translated_fields.values(), status, None if status == 'completed' else 'no fields translated',
+              job_data['id'], worker_id), fetch_one=True, commit=True)
+
+        if row is None:
+            print(f"Lease on job {job_data['id']} was lost; its translation was not saved")
             return False
-    
+        if translated_fields:
+            print(f"Translated job {job_data['id']}: {list(translated_fields.keys())}")
+        return status == 'completed'
+
     def translate_job_immediately(self, job_id: int) -> bool:
         """
         Translate a specific job immediately (for new jobs)
-        
+
+        The job is claimed like any other, so it is skipped if a worker is
+        already translating it.
+
         Args:
             job_id: ID of the job to translate
-            
+
         Returns:
             True if successful, False otherwise
         """
-        conn = get_ai_db_connection()
-        cursor = conn.cursor()
-        
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
         try:
-            cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
-            job_row = cursor.fetchone()
-            
-            if not job_row:
-                print(f"Job {job_id} not found")
+            jobs = self.claim(worker_id, 1, job_id=job_id)
+            if not jobs:
+                print(f"Job {job_id} not found, already translated or being translated")
                 return False
-            
-            columns = [desc[0] for desc in cursor.description]
-            job_data = dict(zip(columns, job_row))
-            
-            if not self.translation_service.is_translation_needed(job_data):
-                cursor.execute("""
-                    UPDATE jobs 
-                    SET translation_status = 'completed', translation_updated_at = NOW()
-                    WHERE id = %s
-                """, (job_id,))
-                conn.commit()
-                return True
-            
-            success = self._translate_single_job(job_data, cursor)
-            conn.commit()
-            
-            return success
-            
+            return self._translate_claimed(jobs, worker_id) == 1
         except Exception as e:
-            conn.rollback()
             print(f"Error translating job {job_id}: {e}")
             return False
-        finally:
-            cursor.close()
-            release_ai_db_connection(conn)
-    
+
+    def queue_depth(self) -> int:
+        """Number of jobs a worker could claim right now"""
+        row = execute_ai_query(f"SELECT COUNT(*) AS jobs FROM jobs WHERE {CLAIMABLE_SQL}", {
+            'max_attempts': Config.TRANSLATION_MAX_ATTEMPTS, 'backoff': Config.TRANSLATION_RETRY_BACKOFF_SECONDS,
+        }, fetch_one=True)
+        return int(row['jobs']) if row else 0
+
     def get_translation_stats(self) -> Dict:
         """
         Get translation statistics
-        
+
         Returns:
             Dictionary with translation statistics
         """
-        conn = get_ai_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("""
-                SELECT 
+            rows = execute_ai_query("""
+                SELECT
                     translation_status,
                     COUNT(*) as count
-                FROM jobs 
+                FROM jobs
                 GROUP BY translation_status
-            """)
-            
+            """, fetch_all=True) or []
+
             stats = {}
-            for status, count in cursor.fetchall():
-                stats[status or 'pending'] = count
-            
+            for row in rows:
+                status = row['translation_status'] or 'pending'
+                stats[status] = stats.get(status, 0) + row['count']
+
             return stats
-            
+
         except Exception as e:
             print(f"Error getting translation stats: {e}")
             return {}
-        finally:
-            cursor.close()
-            release_ai_db_connection(conn)
+
+def request_translation(job_ids: List[int], priority: int = PRIORITY_REQUESTED) -> int:
+    """
+    Move untranslated jobs to the front of the translation queue
+
+    Cheap enough for the request path: one indexed UPDATE, no LLM call.
+
+    Returns:
+        Number of jobs whose priority was raised
+    """
+    job_ids = [int(job_id) for job_id in job_ids]
+    if not job_ids:
+        return 0
+    rows = execute_ai_query(f"""
+        UPDATE jobs SET translation_priority = %s
+        WHERE id = ANY(%s) AND {UNTRANSLATED_SQL} AND translation_priority < %s
+        RETURNING id
+    """, (priority, job_ids, priority), fetch_all=True, commit=True) or []
+    return len(rows)
+
+def warm_translations(limit: Optional[int] = None) -> int:
+    """
+    Queue the jobs most likely to be viewed ahead of the rest: the newest
+    untranslated jobs and those matched to the most clients
+
+    Returns:
+        Number of jobs whose priority was raised
+    """
+    limit = Config.TRANSLATION_WARM_JOBS if limit is None else limit
+    if limit <= 0:
+        return 0
+    rows = execute_ai_query(f"""
+        UPDATE jobs SET translation_priority = %(priority)s
+        WHERE translation_priority < %(priority)s AND id IN (
+            (SELECT id FROM jobs WHERE {UNTRANSLATED_SQL}
+             ORDER BY NULLIF(job_date, 'Nan') DESC NULLS LAST LIMIT %(limit)s)
+            UNION
+            (SELECT jobs.id FROM jobs
+             JOIN (SELECT job_id, COUNT(*) AS matches FROM rankings GROUP BY job_id) ranked
+               ON ranked.job_id = jobs.id::text
+             WHERE {UNTRANSLATED_SQL}
+             ORDER BY ranked.matches DESC LIMIT %(limit)s)
+        )
+        RETURNING id
+    """, {'priority': PRIORITY_WARM, 'limit': limit}, fetch_all=True, commit=True) or []
+    if rows:
+        print(f"Queued {len(rows)} likely-viewed jobs for translation")
+    return len(rows)
 
 translation_worker = JobTranslationWorker()
 
-def start_translation_worker():
+def start_translation_worker(threads: Optional[int] = None):
     """Start the global translation worker"""
+    if threads:
+        translation_worker.threads = threads
     translation_worker.start()
 
 def stop_translation_worker():
@@ -244,3 +366,7 @@ def translate_job_now(job_id: int) -> bool:
 def get_translation_stats() -> Dict:
     """Get translation statistics"""
     return translation_worker.get_translation_stats()
+
+def get_translation_queue_depth() -> int:
+    """Jobs waiting to be claimed by a translation worker"""
+    return translation_worker.queue_depth()
@@ -0,0 +1,200 @@
+"""
+Content-addressed cache for LLM chat completions.
+
+Responses are keyed on a SHA-256 of (model, temperature, messages and any
+other request parameters), so re-uploading the same CV, re-translating the
+same city name or retrying a failed request does not pay for the model call
+again. Each call site has its own TTL (`Config.LLM_CACHE_TTLS`) and can bypass
+the cache when its output is meant to vary (e.g. cover letters).
+
+Two backends are available, both safe to share across gunicorn workers:
+- "disk": one JSON file per key under `LLM_CACHE_DIR`, written atomically;
+- "postgres": the `llm_cache` table in the AI database.
+Set `LLM_CACHE_BACKEND=off` to disable caching entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.config import Config
+
+
+def make_cache_key(model, messages, **params):
+    """Stable hash of everything that determines a completion."""
+    payload = {'model': model, 'messages': messages, **params}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class DiskCacheBackend:
+    """One file per key; os.replace makes writes atomic across processes."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at') and entry['expires_at'] < time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return entry.get('response')
+
+    def set(self, key, response, ttl, call_site):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'response': response,
+            'call_site': call_site,
+            'created_at': time.time(),
+            'expires_at': time.time() + ttl if ttl else None,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+class PostgresCacheBackend:
+    """Rows in the AI database's llm_cache table (migrations/ai/0004), upserted on write."""
+
+    def get(self, key):
+        from app.database.db import execute_ai_query
+        row = execute_ai_query(
+            "SELECT response FROM llm_cache WHERE key = %s AND (expires_at IS NULL OR expires_at > NOW())",
+            (key,), fetch_one=True
+        )
+        return row['response'] if row else None
+
+    def set(self, key, response, ttl, call_site):
+        from app.database.db import execute_ai_query
+        execute_ai_query("""
+            INSERT INTO llm_cache (key, response, call_site, created_at, expires_at)
+            VALUES (%s, %s, %s, NOW(), CASE WHEN %s > 0 THEN NOW() + %s * INTERVAL '1 second' END)
+            ON CONFLICT (key) DO UPDATE
+            SET response = EXCLUDED.response, call_site = EXCLUDED.call_site,
+                created_at = EXCLUDED.created_at, expires_at = EXCLUDED.expires_at
+        """, (key, response, call_site, ttl or 0, ttl or 0), commit=True)
+
+
+class LLMCache:
+    """Cache front-end with per-call-site TTLs and hit/miss counters."""
+
+    def __init__(self, backend, ttls=None, default_ttl=None):
+        self.backend = backend
+        self.ttls = ttls if ttls is not None else Config.LLM_CACHE_TTLS
+        self.default_ttl = default_ttl if default_ttl is not None else Config.LLM_CACHE_DEFAULT_TTL
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, call_site, outcome):
+        with self._lock:
+            counters = self._stats.setdefault(call_site, {'hits': 0, 'misses': 0, 'bypassed': 0, 'errors': 0})
+            counters[outcome] += 1
+
+    def stats(self):
+        """Per-call-site counters for this process."""
+        with self._lock:
+            return {call_site: dict(counters) for call_site, counters in self._stats.items()}
+
+    def chat_completion(self, client, model, messages, call_site, bypass=False, ttl=None, **params):
+        """
+        Return the completion text for `messages`, from cache when possible.
+
+        Args:
+            client: OpenAI-compatible client from get_openai_client()
+            model: Model name
+            messages: Chat messages
+            call_site: Name used for TTL lookup and counters
+            bypass: Always call the model and do not store the result
+            ttl: Override the call site's TTL in seconds (0 = no expiry)
+            **params: Extra completion parameters (temperature, max_tokens, ...)
+
+        Returns:
+            The assistant message content
+        """
+        if bypass or self.backend is None:
+            self._count(call_site, 'bypassed')
+            response = client.chat.completions.create(model=model, messages=messages, **params)
+            return response.choices[0].message.content
+
+        # Transport-only options do not change the answer
+        key_params = {name: value for name, value in params.items() if name != 'timeout'}
+        key = make_cache_key(model, messages, **key_params)
+
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            print(f"[LLM_CACHE] Read failed for {call_site}: {e}")
+            self._count(call_site, 'errors')
+            cached = None
+        if cached is not None:
+            self._count(call_site, 'hits')
+            return cached
+
+        self._count(call_site, 'misses')
+        response = client.chat.completions.create(model=model, messages=messages, **params)
+        content = response.choices[0].message.content
+
+        if content and content.strip():
+            if ttl is None:
+                ttl = self.ttls.get(call_site, self.default_ttl)
+            try:
+                self.backend.set(key, content, ttl, call_site)
+            except Exception as e:
+                print(f"[LLM_CACHE] Write failed for {call_site}: {e}")
+                self._count(call_site, 'errors')
+        return content
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLMCache configured from Config."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend_name = (Config.LLM_CACHE_BACKEND or 'disk').lower()
+                if backend_name == 'postgres':
+                    backend = PostgresCacheBackend()
+                elif backend_name == 'disk':
+                    backend = DiskCacheBackend(Config.LLM_CACHE_DIR)
+                else:
+                    backend = None
+                _cache = LLMCache(backend)
+    return _cache
+
+
+def cached_chat_completion(client, model, messages, call_site, bypass=False, ttl=None, **params):
+    """Module-level shortcut for get_llm_cache().chat_completion(...)."""
+    return get_llm_cache().chat_completion(client, model, messages, call_site,
+                                           bypass=bypass, ttl=ttl, **params)
+
+
+def get_llm_cache_stats():
+    return get_llm_cache().stats()
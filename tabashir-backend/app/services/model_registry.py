@@ -0,0 +1,126 @@
+"""
+Lazy, shareable loading of the heavyweight NLP models.
+
+Nothing here is loaded at import time. Each model is loaded on first use via
+`get_model(name)`, or ahead of time by `warm_models()` according to
+`Config.MODEL_WARMUP`:
+- "lazy": only on first use (GET /resumes/ready starts a background warm-up);
+- "background": each worker warms up in a thread once the app is created;
+- "preload": create_app() loads everything synchronously. With gunicorn's
+  preload_app (gunicorn.conf.py) that happens once in the master, so forked
+  workers share the model pages copy-on-write instead of each loading a copy.
+
+Loaders must not open database connections, since with "preload" they run
+in the master before forking.
+"""
+
+import threading
+import time
+
+from app.config import Config
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load(Config.SPACY_MODEL)
+
+
+def _load_word_vectors():
+    from app.services.job_apply.word_vectors import get_word_vectors
+    return get_word_vectors()
+
+
+def _load_skill_model():
+    from app.services.job_apply.skill_model import load_persisted_skill_model
+    return load_persisted_skill_model()
+
+
+# name -> loader; a loader returns the model, or None when it is not installed/built
+LOADERS = {
+    'spacy': _load_spacy,
+    'word_vectors': _load_word_vectors,
+    'skill_model': _load_skill_model,
+}
+
+_models = {}
+_status = {name: {'state': 'cold'} for name in LOADERS}
+_locks = {name: threading.Lock() for name in LOADERS}
+_warming = threading.Event()
+
+
+def get_model(name):
+    """
+    Return the named model, loading it on first use.
+
+    Returns None when the model is unavailable (e.g. en_core_web_sm is not
+    installed); the failure is recorded once and not retried.
+    """
+    if _status[name]['state'] in ('ready', 'unavailable'):
+        return _models.get(name)
+    with _locks[name]:
+        if _status[name]['state'] not in ('ready', 'unavailable'):
+            _status[name] = {'state': 'loading'}
+            started = time.time()
+            try:
+                model = LOADERS[name]()
+                error = None if model is not None else 'not built'
+            except Exception as e:
+                model, error = None, str(e)
+            _models[name] = model
+            seconds = round(time.time() - started, 3)
+            if error:
+                _status[name] = {'state': 'unavailable', 'seconds': seconds, 'error': error}
+                print(f"[MODELS] ⚠️ {name} unavailable after {seconds}s: {error}")
+            else:
+                _status[name] = {'state': 'ready', 'seconds': seconds}
+                print(f"[MODELS] Loaded {name} in {seconds}s")
+    return _models.get(name)
+
+
+def warm_models(names=None):
+    """Load the given models (default: all) now and return model_status()."""
+    for name in names or LOADERS:
+        get_model(name)
+    return model_status()
+
+
+def warm_models_in_background():
+    """Start warm_models() in a daemon thread unless one is already running."""
+    if _warming.is_set():
+        return
+    _warming.set()
+
+    def run():
+        try:
+            warm_models()
+        finally:
+            _warming.clear()
+
+    threading.Thread(target=run, daemon=True, name="model-warmup").start()
+
+
+def similarity_status(models):
+    """
+    Configured and effective title/location similarity backend. "static"
+    without a built word-vector table runs on spaCy (see semantic_similarity),
+    and spaCy without its model runs on nothing.
+    """
+    configured = active = Config.SIMILARITY_BACKEND
+    status = {}
+    if configured == 'static' and models['word_vectors']['state'] == 'unavailable':
+        active = 'spacy'
+        status['warning'] = (f"No word vectors at {Config.WORD_VECTORS_PATH}, using spaCy "
+                             f"(build them with python -m app.commands.build_word_vectors)")
+    if active == 'spacy' and models['spacy']['state'] == 'unavailable':
+        active = 'off'
+    return {'configured': configured, 'active': active, **status}
+
+
+def model_status():
+    """Per-model load state; `ready` once no model is cold or still loading."""
+    models = {name: dict(status) for name, status in _status.items()}
+    ready = all(status['state'] in ('ready', 'unavailable') for status in models.values())
+    status = {'ready': ready, 'mode': Config.MODEL_WARMUP, 'models': models}
+    if 'word_vectors' in models and 'spacy' in models:
+        status['similarity'] = similarity_status(models)
+    return status
@@ -0,0 +1,443 @@
+"""
+Long-lived LibreOffice pool for DOCX -> PDF conversion.
+
+Every conversion used to spawn a cold `soffice --headless --convert-to pdf`,
+paying LibreOffice startup per document and sharing one user profile between
+concurrent conversions. This pool keeps `LIBREOFFICE_POOL_SIZE` instances per
+worker process, each with its own `-env:UserInstallation` profile directory.
+Jobs wait on a queue for a free instance, so concurrency is bounded by the
+pool size, and each conversion has a timeout.
+
+Instances stay loaded between documents in one of two ways:
+- "uno": the app's own interpreter imports `uno`; instances are started once
+  with `--accept` and documents are converted over the socket.
+- "bridge": `uno` only imports in another Python (LibreOffice's bundled one,
+  or the system python3 with python3-uno, as in the Docker image). Each slot
+  runs app/services/uno_bridge.py under that Python, which keeps its soffice
+  loaded and converts over a JSON-lines pipe.
+Crashed or hung instances are killed and restarted. Only when neither is
+available does a slot fall back to a cold `--convert-to` subprocess per
+document ("subprocess"), reusing its own already-initialised profile.
+"""
+
+import atexit
+import json
+import os
+import signal
+import platform
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from app.config import Config
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    uno = None
+    PropertyValue = None
+    UNO_AVAILABLE = False
+
+
+def get_libreoffice_path():
+    """Get the correct LibreOffice path for the current OS"""
+    system = platform.system()
+
+    if system == "Darwin":  # macOS
+        # Common macOS paths
+        paths = [
+            "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+            "/usr/local/bin/soffice",
+            "/opt/homebrew/bin/soffice"
+        ]
+    elif system == "Windows":
+        paths = [
+            r"C:\Program Files\LibreOffice\program\soffice.exe",
+            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
+        ]
+    else:  # Linux
+        paths = [
+            "/usr/lib/libreoffice/program/soffice.bin",
+            "/usr/bin/soffice",
+            "/usr/local/bin/soffice"
+        ]
+
+    # Return first existing path
+    for path in paths:
+        if os.path.exists(path):
+            return path
+
+    # Default fallback
+    return shutil.which("soffice") or "/usr/lib/libreoffice/program/soffice.bin"
+
+
+LIBREOFFICE_BIN = get_libreoffice_path()
+
+
+def get_uno_python():
+    """A Python interpreter that can import uno: LIBREOFFICE_PYTHON, else LibreOffice's own, else None"""
+    if Config.LIBREOFFICE_PYTHON:
+        return Config.LIBREOFFICE_PYTHON
+
+    system = platform.system()
+    if system == "Darwin":
+        paths = ["/Applications/LibreOffice.app/Contents/Resources/python"]
+    elif system == "Windows":
+        paths = [
+            r"C:\Program Files\LibreOffice\program\python.exe",
+            r"C:\Program Files (x86)\LibreOffice\program\python.exe"
+        ]
+    else:
+        # python3-uno installs into the system Python, not into /usr/local ones
+        paths = ["/usr/bin/python3"] if os.path.exists("/usr/lib/python3/dist-packages/uno.py") else []
+
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+UNO_PYTHON = get_uno_python()
+BRIDGE_SCRIPT = Path(__file__).with_name("uno_bridge.py")
+
+MODE_UNO, MODE_BRIDGE, MODE_SUBPROCESS = 'uno', 'bridge', 'subprocess'
+DEFAULT_MODE = MODE_UNO if UNO_AVAILABLE else MODE_BRIDGE if UNO_PYTHON else MODE_SUBPROCESS
+
+
+class ConversionError(RuntimeError):
+    """Raised when a document could not be converted to PDF."""
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _uno_properties(**values):
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+class LibreOfficeInstance:
+    """One LibreOffice slot with an isolated user profile."""
+
+    def __init__(self, slot, binary, profile_root, mode=DEFAULT_MODE, python=None):
+        self.slot = slot
+        self.binary = binary
+        self.profile_dir = Path(profile_root) / f"slot-{slot}"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.python = python or UNO_PYTHON
+        self.process = None
+        self.desktop = None
+        self.port = None
+        self.restarts = 0
+
+    @property
+    def profile_url(self):
+        return self.profile_dir.resolve().as_uri()
+
+    def is_alive(self):
+        if self.mode == MODE_SUBPROCESS:
+            return True
+        alive = self.process is not None and self.process.poll() is None
+        return alive and (self.mode == MODE_BRIDGE or self.desktop is not None)
+
+    def start(self, connect_timeout=30):
+        """Start a headless instance that stays loaded (uno and bridge modes only)."""
+        if self.mode == MODE_BRIDGE:
+            self._start_bridge(connect_timeout)
+            return
+        if self.mode != MODE_UNO:
+            return
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                self.binary, "--headless", "--invisible", "--nologo", "--norestore",
+                "--nodefault", "--nolockcheck",
+                f"-env:UserInstallation={self.profile_url}",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context)
+        deadline = time.time() + connect_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext")
+                self.desktop = context.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", context)
+                print(f"[PDF] LibreOffice slot {self.slot} ready on port {self.port}")
+                return
+            except Exception:
+                if self.process.poll() is not None or time.time() > deadline:
+                    self.stop()
+                    raise ConversionError(f"LibreOffice slot {self.slot} failed to start")
+                time.sleep(0.25)
+
+    def _start_bridge(self, connect_timeout):
+        # A session of its own, so stop() takes the bridge's soffice down with it
+        self.process = subprocess.Popen(
+            [self.python, str(BRIDGE_SCRIPT), self.binary, self.profile_url],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True,
+        )
+        try:
+            reply = self._bridge_reply(connect_timeout)
+        except ConversionError:
+            reply = {}
+        if not reply.get('ready'):
+            self.stop()
+            raise ConversionError(f"LibreOffice slot {self.slot} failed to start {reply.get('error', '')}".strip())
+        print(f"[PDF] LibreOffice slot {self.slot} ready (UNO bridge)")
+
+    def _bridge_reply(self, timeout):
+        """Next JSON line from the bridge; a bridge silent for `timeout` seconds is killed."""
+        process = self.process
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self.stop()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            line = process.stdout.readline()
+        finally:
+            # join: a kill already under way finishes before the slot is reused
+            timer.cancel()
+            timer.join()
+        if timed_out.is_set():
+            raise ConversionError(f"LibreOffice conversion timed out after {timeout}s")
+        if not line:
+            self.stop()
+            raise ConversionError("LibreOffice bridge exited")
+        return json.loads(line)
+
+    def stop(self):
+        self.desktop = None
+        if self.process is not None and self.process.poll() is None:
+            if self.mode == MODE_BRIDGE and hasattr(os, 'killpg'):
+                try:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            else:
+                self.process.kill()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+        self.process = None
+
+    def restart(self):
+        print(f"[PDF] Restarting LibreOffice slot {self.slot}")
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def convert(self, docx_path, output_dir, timeout):
+        """Convert one document, returning the PDF path."""
+        docx_path = Path(docx_path).resolve()
+        output_dir = Path(output_dir).resolve()
+        pdf_path = output_dir / f"{docx_path.stem}.pdf"
+
+        if self.mode == MODE_UNO:
+            self._convert_uno(docx_path, pdf_path, timeout)
+        elif self.mode == MODE_BRIDGE:
+            self._convert_bridge(docx_path, pdf_path, timeout)
+        else:
+            self._convert_subprocess(docx_path, output_dir, timeout)
+
+        if not pdf_path.exists():
+            raise ConversionError("PDF not created")
+        return pdf_path
+
+    def _convert_uno(self, docx_path, pdf_path, timeout):
+        if not self.is_alive():
+            self.restart()
+
+        # A hung conversion is unblocked by killing the instance it runs in
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self.stop()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(docx_path)), "_blank", 0, _uno_properties(Hidden=True))
+            try:
+                document.storeToURL(uno.systemPathToFileUrl(str(pdf_path)),
+                                    _uno_properties(FilterName="writer_pdf_Export"))
+            finally:
+                document.close(True)
+        except Exception as e:
+            self.stop()
+            if timed_out.is_set():
+                raise ConversionError(f"LibreOffice conversion timed out after {timeout}s")
+            raise ConversionError(f"LibreOffice failed: {e}")
+        finally:
+            timer.cancel()
+
+    def _convert_bridge(self, docx_path, pdf_path, timeout):
+        if not self.is_alive():
+            self.restart()
+        try:
+            self.process.stdin.write(json.dumps({"source": str(docx_path), "target": str(pdf_path)}) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.stop()
+            raise ConversionError(f"LibreOffice bridge failed: {e}")
+        reply = self._bridge_reply(timeout)
+        if not reply.get('ok'):
+            raise ConversionError(f"LibreOffice failed: {reply.get('error')}")
+
+    def _convert_subprocess(self, docx_path, output_dir, timeout):
+        cmd = [
+            self.binary,
+            "--headless",
+            "--norestore",
+            f"-env:UserInstallation={self.profile_url}",
+            "--convert-to", "pdf",
+            "--outdir", str(output_dir),
+            str(docx_path)
+        ]
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env={"PATH": "/usr/bin:/bin", "HOME": str(self.profile_dir)},
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise ConversionError(f"LibreOffice conversion timed out after {timeout}s")
+
+        if result.returncode != 0:
+            raise ConversionError("LibreOffice failed:\n" + result.stderr.decode(errors="replace"))
+
+
+class PdfConverterPool:
+    """Bounded pool of LibreOffice instances shared by every conversion in a process."""
+
+    def __init__(self, size=None, binary=None, profile_root=None, timeout=None, acquire_timeout=None,
+                 mode=DEFAULT_MODE, python=None):
+        self.size = max(1, size or Config.LIBREOFFICE_POOL_SIZE)
+        self.binary = binary or LIBREOFFICE_BIN
+        self.timeout = timeout or Config.LIBREOFFICE_CONVERT_TIMEOUT
+        self.acquire_timeout = acquire_timeout or Config.LIBREOFFICE_ACQUIRE_TIMEOUT
+        # Per-process root so gunicorn workers never share a profile
+        root = Path(profile_root or Config.LIBREOFFICE_PROFILE_DIR) / str(os.getpid())
+
+        self.mode = mode
+        self.stats = {'conversions': 0, 'failures': 0, 'timeouts': 0, 'restarts': 0}
+        self._stats_lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._instances = []
+        for slot in range(self.size):
+            instance = LibreOfficeInstance(slot, self.binary, root, mode=mode, python=python)
+            self._instances.append(instance)
+            self._idle.put(instance)
+
+    def warm(self):
+        """Start every instance up front so the first conversions do not pay startup."""
+        if self.mode == MODE_SUBPROCESS:
+            print("[PDF] ⚠️ No Python with UNO found (set LIBREOFFICE_PYTHON); "
+                  "every conversion starts LibreOffice cold")
+        for instance in self._instances:
+            try:
+                if not instance.is_alive():
+                    instance.start()
+            except ConversionError as e:
+                print(f"[PDF] ⚠️ {e}")
+
+    def convert(self, docx_path, output_dir=None, timeout=None):
+        """
+        Convert a DOCX file to PDF on the next free instance.
+
+        Args:
+            docx_path: Path to the source document
+            output_dir: Directory for the PDF (defaults to the source directory)
+            timeout: Per-document timeout in seconds
+
+        Returns:
+            Path of the created PDF
+
+        Raises:
+            ConversionError: If no instance is free in time or conversion fails
+        """
+        docx_path = Path(docx_path)
+        output_dir = Path(output_dir) if output_dir else docx_path.parent
+
+        try:
+            instance = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise ConversionError("No LibreOffice instance available, conversion queue is full")
+
+        restarts_before = instance.restarts
+        try:
+            pdf_path = instance.convert(docx_path, output_dir, timeout or self.timeout)
+            self._count('conversions')
+            return pdf_path
+        except ConversionError as e:
+            self._count('failures')
+            if 'timed out' in str(e):
+                self._count('timeouts')
+            raise
+        finally:
+            self._count('restarts', instance.restarts - restarts_before)
+            self._idle.put(instance)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def shutdown(self):
+        for instance in self._instances:
+            instance.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_converter():
+    """Return the process-wide converter pool, creating and warming it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = PdfConverterPool()
+                pool.warm()
+                atexit.register(pool.shutdown)
+                _pool = pool
+    return _pool
+
+
+def convert_docx_to_pdf(docx_path, output_dir=None, timeout=None):
+    """Convert a DOCX file to PDF through the shared pool and return the PDF path."""
+    return get_pdf_converter().convert(docx_path, output_dir=output_dir, timeout=timeout)
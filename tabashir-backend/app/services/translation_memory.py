@@ -0,0 +1,130 @@
+"""
+Translation memory for short, repetitive job fields.
+
+Cities, working days, job types and salary phrases repeat across thousands of
+jobs. Accepted Arabic translations of fields up to
+TRANSLATION_MEMORY_MAX_CHARS are kept in the AI database's
+`translation_memory` table (migrations/ai/0010), keyed by field and by the
+normalized source text. The translator looks up a whole batch of jobs with
+one query before calling the model, and stores the new translations with one
+upsert afterwards.
+
+Normalization folds case, Unicode compatibility forms, whitespace and
+punctuation ("Full-time", "full time", "FULL TIME." share an entry). Symbols
+that change meaning ("C++", "C#", "$", "%") are kept. An exact match is a
+special case of a normalized one.
+
+Only translations containing Arabic script are stored or served: the model
+sometimes echoes a short field unchanged ("Full-time" -> "Full-time"), and an
+echo kept here would block that phrase from ever being translated. An entry
+without Arabic script, if one exists, is replaced by the next real translation.
+"""
+
+import unicodedata
+
+from psycopg2.extras import execute_values
+
+from app.config import Config
+
+# Punctuation that is part of a term rather than around it
+KEPT_PUNCTUATION = set('#&%@')
+
+# Share of letters that must be Arabic for a field to count as already translated
+TARGET_SCRIPT_MIN_SHARE = 0.5
+
+
+def normalize(text):
+    """Memory key of a source text: casefolded, punctuation as spaces, whitespace collapsed."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ''.join(
+        ' ' if unicodedata.category(ch).startswith('P') and ch not in KEPT_PUNCTUATION else ch
+        for ch in text
+    )
+    return ' '.join(text.split())
+
+
+def is_target_script(text):
+    """True when most letters of `text` are in Arabic script, i.e. it needs no translation."""
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return False
+    arabic = sum(1 for ch in letters if unicodedata.name(ch, '').startswith('ARABIC'))
+    return arabic / len(letters) > TARGET_SCRIPT_MIN_SHARE
+
+
+def has_target_script(text):
+    """True when `text` contains any Arabic-script letter."""
+    return isinstance(text, str) and any(
+        ch.isalpha() and unicodedata.name(ch, '').startswith('ARABIC') for ch in text
+    )
+
+
+def is_memorable(text):
+    """Only fields short enough to repeat verbatim are looked up and stored."""
+    return bool(text and text.strip()) and len(text.strip()) <= Config.TRANSLATION_MEMORY_MAX_CHARS
+
+
+def lookup_translations(items):
+    """
+    Stored translations for (field, source text) pairs.
+
+    Returns:
+        {(field, source text): translation} for the pairs found
+    """
+    keys = {(field, normalize(text)): (field, text) for field, text in items if is_memorable(text)}
+    if not keys:
+        return {}
+
+    from app.database.db import execute_ai_query
+    rows = execute_ai_query("""
+        SELECT field, source_norm, translation
+        FROM translation_memory
+        WHERE source_norm = ANY(%s) AND field = ANY(%s)
+    """, (list({norm for _, norm in keys}), list({field for field, _ in keys})), fetch_all=True) or []
+
+    found = {(row['field'], row['source_norm']): row['translation'] for row in rows
+             if has_target_script(row['translation'])}
+    return {
+        (field, text): found[key]
+        for key, (field, text) in keys.items() if key in found
+    }
+
+
+def store_translations(entries):
+    """
+    Remember accepted translations that contain Arabic script. An existing
+    entry for the same key is kept unless it has no Arabic script itself.
+
+    Args:
+        entries: (field, source text, translation) triples
+
+    Returns:
+        Number of entries sent
+    """
+    values = {}
+    for field, text, translation in entries:
+        if is_memorable(text) and has_target_script(translation):
+            values.setdefault((field, normalize(text)), (field, normalize(text), text.strip(), translation.strip()))
+    if not values:
+        return 0
+
+    from app.database.db import ai_db_connection
+    with ai_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_values(cursor, """
+                INSERT INTO translation_memory (field, source_norm, source_text, translation)
+                VALUES %s
+                ON CONFLICT (field, source_norm) DO UPDATE SET
+                    source_text = EXCLUDED.source_text,
+                    translation = EXCLUDED.translation,
+                    created_at = NOW()
+                WHERE translation_memory.translation !~ '[\\u0600-\\u06FF]'
+            """, list(values.values()), page_size=1000)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return len(values)
@@ -3,21 +3,104 @@ Job Translation Service using LLM API
 Handles translation of job fields from English to Arabic
 """
 
-from typing import Dict, Optional
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional
 from app.services.cv_processor import get_openai_client
+from app.services.llm_cache import cached_chat_completion
+from app.services.translation_memory import is_memorable, is_target_script, lookup_translations, store_translations
 from app.config import Config
 
+# Guidance per field, keyed by the field name with spaces ("job title")
+FIELD_INSTRUCTIONS = {
+    "job title": """Translate this job title to Arabic. Use professional and commonly used Arabic job titles. 
+            Examples: Software Engineer = مهندس برمجيات, Marketing Manager = مدير تسويق, Sales Representative = مندوب مبيعات""",
+    
+    "job description": """Translate this job description to Arabic. Maintain professional tone and technical accuracy.
+            - Translate all technical terms to their Arabic equivalents
+            - Keep company names, email addresses, and URLs in English
+            - Use formal Arabic (الفصحى) for professional context
+            - Ensure all requirements and responsibilities are clearly translated""",
+    
+    "academic qualification": """Translate academic qualification requirements to Arabic.
+            - Translate degree names: Bachelor = بكالوريوس, Master = ماجستير, PhD = دكتوراه
+            - Keep institution names in English if they are international
+            - Translate field names: Computer Science = علوم الحاسوب, Engineering = هندسة""",
+    
+    "experience": """Translate experience requirements to Arabic.
+            - Translate years and experience levels clearly
+            - Use Arabic numerals for years: 3 years = 3 سنوات
+            - Translate experience types: Technical = تقني, Management = إداري""",
+    
+    "languages": """Translate language requirements to Arabic.
+            - Keep language names in English: English = English, Arabic = Arabic
+            - Translate proficiency levels: Fluent = بطلاقة, Native = لغته الأم
+            - Translate requirements: Required = مطلوب, Preferred = مفضل""",
+    
+    "salary": """Translate salary information to Arabic.
+            - Keep currency amounts in English format: $5000 = $5000
+            - Translate salary terms: Salary = راتب, Benefits = مزايا, Bonus = مكافأة
+            - Translate payment terms: Monthly = شهري, Annual = سنوي""",
+    
+    "working hours": """Translate working hours to Arabic.
+            - Keep time formats in English: 9:00 AM - 5:00 PM = 9:00 AM - 5:00 PM
+            - Translate work terms: Full-time = دوام كامل, Part-time = دوام جزئي
+            - Translate shift terms: Day shift = دوام صباحي, Night shift = دوام ليلي""",
+    
+    "working days": """Translate working days to Arabic.
+            - Keep day names in English format: Monday = Monday, Friday = Friday
+            - Translate work week terms: Weekdays = أيام الأسبوع, Weekend = عطلة نهاية الأسبوع
+            - Translate schedule terms: Flexible = مرن, Fixed = ثابت""",
+    
+    "company name": """Translate company name to Arabic if it's a generic name.
+            - Keep proper company names in English
+            - Translate generic terms: Company = شركة, Corporation = مؤسسة, LLC = ذ.م.م""",
+    
+    "vacancy city": """Translate city names to Arabic.
+            - Keep well-known international cities in English: Dubai = Dubai, London = London
+            - Translate local city names to Arabic
+            - Keep country names in English: UAE = UAE, Saudi Arabia = Saudi Arabia"""
+}
+
+ARABIC_SCRIPT = re.compile(r'[\u0600-\u06FF]')
+
+# Fields this short may legitimately come back unchanged (city names, "$5000", "Monday - Friday")
+KEEP_AS_IS_MAX_CHARS = 40
+
 class JobTranslationService:
     """Service for translating job fields using LLM API"""
     
-    def __init__(self):
-        """Initialize the translation service"""
+    def __init__(self, mode: Optional[str] = None, bypass_cache: bool = False, use_memory: Optional[bool] = None):
+        """
+        Initialize the translation service
+
+        Args:
+            mode: 'structured' (all fields of several jobs in one call) or 'per_field';
+                  defaults to Config.TRANSLATION_MODE
+            bypass_cache: Always call the model (used by the benchmark)
+            use_memory: Reuse and store translations of short fields; defaults to Config.TRANSLATION_MEMORY
+        """
         # We don't instantiate the client here, we will fetch it dynamically per request
         self.translatable_fields = [
             'job_title', 'job_description', 'academic_qualification',
             'experience', 'languages', 'salary', 'working_hours', 
             'working_days', 'company_name', 'vacancy_city'
         ]
+        self.mode = (mode or Config.TRANSLATION_MODE or 'structured').lower()
+        self.bypass_cache = bypass_cache
+        self.use_memory = Config.TRANSLATION_MEMORY if use_memory is None else use_memory
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+    
+    def fields_to_translate(self, job_data: Dict) -> Dict[str, str]:
+        """Non-empty translatable fields of a job (field_name: text)"""
+        return {
+            field: job_data[field]
+            for field in self.translatable_fields
+            if isinstance(job_data.get(field), str) and job_data[field].strip()
+        }
     
     def translate_job_fields(self, job_data: Dict) -> Dict[str, str]:
         """
@@ -29,23 +112,258 @@ class JobTranslationService:
         Returns:
             Dictionary with Arabic translations (field_name_ar: translated_text)
         """
-        translated_data = {}
+        return self.translate_jobs([job_data])[0]
+    
+    def translate_jobs(self, jobs: List[Dict]) -> List[Dict[str, str]]:
+        """
+        Translate the fields of several jobs
         
-        for field in self.translatable_fields:
-            if job_data.get(field) and job_data[field].strip():
+        Args:
+            jobs: Job dictionaries
+            
+        Returns:
+            One dictionary per job, in order (field_name_ar: translated_text)
+        """
+        return self.translate_batch(jobs)[0]
+    
+    def translate_batch(self, jobs: List[Dict]) -> tuple:
+        """
+        Translate the fields of several jobs and report how they were translated
+        
+        Fields already in Arabic are copied as they are and short fields found
+        in the translation memory are reused; only the rest reach the model.
+        In structured mode the fields of up to TRANSLATION_JOBS_PER_CALL jobs
+        go in one request and come back as JSON keyed the same way; fields
+        missing from or invalid in the reply are retried one by one.
+        
+        Args:
+            jobs: Job dictionaries
+            
+        Returns:
+            (one dictionary per job (field_name_ar: translated_text), report of this batch)
+        """
+        start = time.time()
+        results = [{} for _ in jobs]
+        job_fields = [self.fields_to_translate(job_data) for job_data in jobs]
+        report = {'jobs': len(jobs), 'fields': sum(len(fields) for fields in job_fields), 'calls': 0,
+                  'fallback_fields': 0, 'script_skips': 0, 'memory_lookups': 0, 'memory_hits': 0}
+        remaining = self._reuse_known(job_fields, results, report)
+        
+        if self.mode == 'per_field':
+            for index, fields in enumerate(remaining):
+                for field, text in fields.items():
+                    report['calls'] += 1
+                    self._translate_field(jobs[index], field, text, results[index])
+        else:
+            for batch in self._batches(remaining):
+                report['calls'] += 1
                 try:
-                    translated_text = self.translate_text(
-                        job_data[field], 
-                        context=f"Job {field.replace('_', ' ')}"
-                    )
-                    translated_data[f"{field}_ar"] = translated_text
-                    print(f"Translated {field} for job {job_data.get('id', 'unknown')}")
+                    translated = self._translate_batch([fields for _, fields in batch])
                 except Exception as e:
-                    print(f"Failed to translate {field} for job {job_data.get('id', 'unknown')}: {e}")
-                    # Don't add the field if translation fails
-                    continue
+                    print(f"[TRANSLATION] Structured call for {len(batch)} jobs failed, translating per field: {e}")
+                    translated = {}
+                
+                for position, (index, fields) in enumerate(batch):
+                    job_translation = translated.get(str(position), {})
+                    for field, text in fields.items():
+                        value = job_translation.get(field)
+                        if self._is_valid_translation(text, value):
+                            results[index][f"{field}_ar"] = value.strip()
+                        else:
+                            report['calls'] += 1
+                            report['fallback_fields'] += 1
+                            self._translate_field(jobs[index], field, text, results[index])
         
-        return translated_data
+        if self.use_memory:
+            self._remember(remaining, results)
+        report['calls_avoided'] = self._planned_calls(job_fields) - self._planned_calls(remaining)
+        report['seconds'] = time.time() - start
+        self._record(report)
+        return results, report
+    
+    def _reuse_known(self, job_fields: List[Dict[str, str]], results: List[Dict[str, str]], report: Dict) -> List[Dict[str, str]]:
+        """Fill in fields already in Arabic or in the translation memory; returns the fields left per job"""
+        remaining = []
+        for index, fields in enumerate(job_fields):
+            left = {}
+            for field, text in fields.items():
+                if is_target_script(text):
+                    results[index][f"{field}_ar"] = text
+                    report['script_skips'] += 1
+                else:
+                    left[field] = text
+            remaining.append(left)
+        
+        if not self.use_memory:
+            return remaining
+        
+        items = [(field, text) for fields in remaining for field, text in fields.items() if is_memorable(text)]
+        report['memory_lookups'] = len(items)
+        try:
+            known = lookup_translations(items)
+        except Exception as e:
+            print(f"[TRANSLATION] ⚠️ Could not read translation memory: {e}")
+            known = {}
+        
+        for index, fields in enumerate(remaining):
+            for field, text in list(fields.items()):
+                if (field, text) in known:
+                    results[index][f"{field}_ar"] = known[(field, text)]
+                    del fields[field]
+                    report['memory_hits'] += 1
+        return remaining
+    
+    def _remember(self, job_fields: List[Dict[str, str]], results: List[Dict[str, str]]):
+        """Store the model's translations of short fields in the translation memory (kept-as-is echoes are not stored)"""
+        entries = [
+            (field, text, results[index][f"{field}_ar"])
+            for index, fields in enumerate(job_fields)
+            for field, text in fields.items()
+            if self._is_valid_translation(text, results[index].get(f"{field}_ar"))
+            and ARABIC_SCRIPT.search(results[index][f"{field}_ar"])
+        ]
+        try:
+            store_translations(entries)
+        except Exception as e:
+            print(f"[TRANSLATION] ⚠️ Could not store translation memory: {e}")
+    
+    def _planned_calls(self, job_fields: List[Dict[str, str]]) -> int:
+        """LLM calls needed for these fields, before any per-field retries"""
+        if self.mode == 'per_field':
+            return sum(len(fields) for fields in job_fields)
+        return sum(1 for _ in self._batches(job_fields))
+    
+    def _translate_field(self, job_data: Dict, field: str, text: str, translated_data: Dict[str, str]):
+        """Translate one field with its own call, leaving it out if that fails"""
+        try:
+            translated_data[f"{field}_ar"] = self.translate_text(text, context=f"Job {field.replace('_', ' ')}")
+            print(f"Translated {field} for job {job_data.get('id', 'unknown')}")
+        except Exception as e:
+            print(f"Failed to translate {field} for job {job_data.get('id', 'unknown')}: {e}")
+    
+    def _batches(self, job_fields: List[Dict[str, str]]):
+        """Group jobs' fields into (index, fields) batches within the per-call job and character budgets"""
+        batch, batch_chars = [], 0
+        for index, fields in enumerate(job_fields):
+            if not fields:
+                continue
+            chars = sum(len(text) for text in fields.values())
+            if batch and (len(batch) >= Config.TRANSLATION_JOBS_PER_CALL
+                          or batch_chars + chars > Config.TRANSLATION_CHARS_PER_CALL):
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append((index, fields))
+            batch_chars += chars
+        if batch:
+            yield batch
+    
+    def _translate_batch(self, batch: List[Dict[str, str]]) -> Dict[str, Dict]:
+        """
+        Translate every field of a batch of jobs in one call
+        
+        Args:
+            batch: Fields of each job (field_name: text)
+            
+        Returns:
+            The parsed reply: {"<position in batch>": {field_name: arabic_text}}
+        """
+        payload = {str(position): fields for position, fields in enumerate(batch)}
+        client, model = get_openai_client()
+        content = cached_chat_completion(
+            client, model,
+            [{"role": "user", "content": self._create_structured_prompt(payload)}],
+            call_site='job_translation',
+            bypass=self.bypass_cache,
+            max_tokens=Config.TRANSLATION_MAX_TOKENS,
+            temperature=0.3,
+            timeout=Config.TRANSLATION_TIMEOUT_SECONDS
+        )
+        return self._parse_structured_response(content)
+    
+    def _create_structured_prompt(self, payload: Dict[str, Dict[str, str]]) -> str:
+        """Prompt asking for the whole payload back as JSON, with the guidance of each field present"""
+        fields = [field for field in self.translatable_fields
+                  if any(field in job_fields for job_fields in payload.values())]
+        instructions = "\n\n".join(
+            f"{field}: {FIELD_INSTRUCTIONS.get(field.replace('_', ' '), '')}" for field in fields
+        )
+        
+        prompt = f"""
+        Translate the job fields in the JSON below from English to Arabic.
+        
+        Field guidance:
+        {instructions}
+        
+        CRITICAL TRANSLATION GUIDELINES:
+        - Return ONLY a JSON object with exactly the same keys and nesting as the input, no explanations
+        - Each value must be the Arabic translation of the corresponding input value
+        - Use Modern Standard Arabic (العربية الفصحى)
+        - Translate ALL words and phrases completely - do not leave any English words untranslated
+        - Maintain professional and formal tone throughout
+        - Keep only proper nouns, company names, email addresses, and URLs in English
+        - Use appropriate Arabic terminology for the job market context
+        
+        JSON to translate:
+        {json.dumps(payload, ensure_ascii=False)}
+        
+        Arabic JSON:
+        """
+        
+        return prompt
+    
+    @staticmethod
+    def _parse_structured_response(content: str) -> Dict[str, Dict]:
+        """Parse the model's JSON reply, tolerating code fences and surrounding text"""
+        text = (content or '').strip()
+        if text.startswith('```'):
+            text = text.split('\n', 1)[1] if '\n' in text else ''
+            text = text.rsplit('```', 1)[0]
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end < start:
+            raise ValueError("No JSON object in structured translation response")
+        
+        parsed = json.loads(text[start:end + 1])
+        if not isinstance(parsed, dict):
+            raise ValueError("Structured translation response is not a JSON object")
+        return {key: value for key, value in parsed.items() if isinstance(value, dict)}
+    
+    @staticmethod
+    def _is_valid_translation(source: str, value) -> bool:
+        """A usable translation is non-empty text in Arabic script, unless the source is short enough to keep as is"""
+        if not isinstance(value, str) or not value.strip():
+            return False
+        return bool(ARABIC_SCRIPT.search(value)) or len(source.strip()) <= KEEP_AS_IS_MAX_CHARS
+    
+    def _record(self, report: Dict):
+        with self._stats_lock:
+            stats = self._stats.setdefault(self.mode, {})
+            for key, value in report.items():
+                stats[key] = stats.get(key, 0) + value
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Per-mode counters for this service, with throughput in jobs per minute"""
+        with self._stats_lock:
+            return {
+                mode: {**counters, 'jobs_per_minute': self._jobs_per_minute(counters),
+                       'memory_hit_rate': self.memory_hit_rate(counters)}
+                for mode, counters in self._stats.items()
+            }
+    
+    def throughput(self, mode: Optional[str] = None) -> float:
+        """Jobs translated per minute so far in `mode` (default: the service's mode)"""
+        with self._stats_lock:
+            return self._jobs_per_minute(self._stats.get(mode or self.mode, {}))
+    
+    @staticmethod
+    def _jobs_per_minute(counters: Dict) -> float:
+        seconds = counters.get('seconds', 0)
+        return counters.get('jobs', 0) * 60 / seconds if seconds > 0 else 0.0
+    
+    @staticmethod
+    def memory_hit_rate(counters: Dict) -> float:
+        """Share of translation memory lookups that found a translation (a batch report or stats)"""
+        lookups = counters.get('memory_lookups', 0)
+        return counters.get('memory_hits', 0) / lookups if lookups else 0.0
     
     def translate_text(self, text: str, context: str = "") -> str:
         """
@@ -65,15 +383,15 @@ class JobTranslationService:
         
         try:
             client, model = get_openai_client()
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
+            translated_text = cached_chat_completion(
+                client, model,
+                [{"role": "user", "content": prompt}],
+                call_site='job_translation',
+                bypass=self.bypass_cache,
                 max_tokens=2000,
                 temperature=0.3,
                 timeout=30
-            )
-            
-            translated_text = response.choices[0].message.content.strip()
+            ).strip()
             
             if not translated_text or len(translated_text) < 2:
                 raise ValueError("Translation result is too short or empty")
@@ -87,57 +405,7 @@ class JobTranslationService:
     def _create_translation_prompt(self, text: str, context: str) -> str:
         """Create a context-aware translation prompt with enhanced Arabic translation"""
         
-        context_instructions = {
-            "job title": """Translate this job title to Arabic. Use professional and commonly used Arabic job titles. 
-            Examples: Software Engineer = مهندس برمجيات, Marketing Manager = مدير تسويق, Sales Representative = مندوب مبيعات""",
-            
-            "job description": """Translate this job description to Arabic. Maintain professional tone and technical accuracy.
-            - Translate all technical terms to their Arabic equivalents
-            - Keep company names, email addresses, and URLs in English
-            - Use formal Arabic (الفصحى) for professional context
-            - Ensure all requirements and responsibilities are clearly translated""",
-            
-            "academic qualification": """Translate academic qualification requirements to Arabic.
-            - Translate degree names: Bachelor = بكالوريوس, Master = ماجستير, PhD = دكتوراه
-            - Keep institution names in English if they are international
-            - Translate field names: Computer Science = علوم الحاسوب, Engineering = هندسة""",
-            
-            "experience": """Translate experience requirements to Arabic.
-            - Translate years and experience levels clearly
-            - Use Arabic numerals for years: 3 years = 3 سنوات
-            - Translate experience types: Technical = تقني, Management = إداري""",
-            
-            "languages": """Translate language requirements to Arabic.
-            - Keep language names in English: English = English, Arabic = Arabic
-            - Translate proficiency levels: Fluent = بطلاقة, Native = لغته الأم
-            - Translate requirements: Required = مطلوب, Preferred = مفضل""",
-            
-            "salary": """Translate salary information to Arabic.
-            - Keep currency amounts in English format: $5000 = $5000
-            - Translate salary terms: Salary = راتب, Benefits = مزايا, Bonus = مكافأة
-            - Translate payment terms: Monthly = شهري, Annual = سنوي""",
-            
-            "working hours": """Translate working hours to Arabic.
-            - Keep time formats in English: 9:00 AM - 5:00 PM = 9:00 AM - 5:00 PM
-            - Translate work terms: Full-time = دوام كامل, Part-time = دوام جزئي
-            - Translate shift terms: Day shift = دوام صباحي, Night shift = دوام ليلي""",
-            
-            "working days": """Translate working days to Arabic.
-            - Keep day names in English format: Monday = Monday, Friday = Friday
-            - Translate work week terms: Weekdays = أيام الأسبوع, Weekend = عطلة نهاية الأسبوع
-            - Translate schedule terms: Flexible = مرن, Fixed = ثابت""",
-            
-            "company name": """Translate company name to Arabic if it's a generic name.
-            - Keep proper company names in English
-            - Translate generic terms: Company = شركة, Corporation = مؤسسة, LLC = ذ.م.م""",
-            
-            "vacancy city": """Translate city names to Arabic.
-            - Keep well-known international cities in English: Dubai = Dubai, London = London
-            - Translate local city names to Arabic
-            - Keep country names in English: UAE = UAE, Saudi Arabia = Saudi Arabia"""
-        }
-        
-        instruction = context_instructions.get(context.lower(), 
+        instruction = FIELD_INSTRUCTIONS.get(context.lower(), 
             "Translate this text to Arabic while maintaining professional tone and keeping proper nouns in English.")
         
         prompt = f"""
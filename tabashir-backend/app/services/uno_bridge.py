@@ -0,0 +1,99 @@
+"""
+UNO side of the LibreOffice pool (app/services/pdf_converter.py).
+
+Runs under a Python that can import `uno` - LibreOffice's bundled Python, or
+the system python3 with python3-uno - which is usually not the app's own
+interpreter. It starts one headless soffice with the given user profile, keeps
+it loaded, and converts documents for the parent process: one JSON request per
+line on stdin ({"source": ..., "target": ...}), one JSON reply per line on
+stdout. soffice is stopped when stdin closes.
+
+Usage: python3 uno_bridge.py SOFFICE PROFILE_URL
+
+Standalone on purpose: it must not import anything from the app.
+"""
+
+import json
+import subprocess
+import sys
+import time
+import uuid
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+CONNECT_TIMEOUT = 30
+
+
+def _properties(**values):
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _reply(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def _connect(pipe_name, office):
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context)
+    deadline = time.time() + CONNECT_TIMEOUT
+    while True:
+        try:
+            context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        except Exception:
+            if office.poll() is not None or time.time() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def _convert(desktop, source, target):
+    document = desktop.loadComponentFromURL(uno.systemPathToFileUrl(source), "_blank", 0, _properties(Hidden=True))
+    try:
+        document.storeToURL(uno.systemPathToFileUrl(target), _properties(FilterName="writer_pdf_Export"))
+    finally:
+        document.close(True)
+
+
+def main():
+    binary, profile_url = sys.argv[1:3]
+    pipe_name = f"tabashir-{uuid.uuid4().hex}"
+    office = subprocess.Popen(
+        [
+            binary, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={profile_url}",
+            f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        try:
+            desktop = _connect(pipe_name, office)
+        except Exception as e:
+            _reply({"ready": False, "error": str(e)})
+            return 1
+        _reply({"ready": True})
+
+        for line in sys.stdin:
+            request = json.loads(line)
+            try:
+                _convert(desktop, request["source"], request["target"])
+                _reply({"ok": True})
+            except Exception as e:
+                _reply({"ok": False, "error": str(e)})
+        return 0
+    finally:
+        office.kill()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import re
 from app.database.db import execute_query, execute_ai_query
+from app.services.job_apply.job_features import store_job_features
 
 def extract_salary(salary_str):
     """Extracts min and max salary as integers from a string."""
@@ -45,6 +46,12 @@ def sync_job_from_legacy(job_id_str):
         if not legacy_job:
             return False, "Job not found in legacy system"
 
+        # Backfill scoring features for jobs ingested before the feature store existed
+        try:
+            store_job_features([legacy_job])
+        except Exception as e:
+            print(f"[SYNC_JOB_ERROR] Could not store features for job {job_id_str}: {e}")
+
         # 3. Map legacy job data to new 'Job' schema
         title = legacy_job.get('job_title') or "Unknown Title"
         company = legacy_job.get('company_name') or legacy_job.get('entity') or "Unknown Company"
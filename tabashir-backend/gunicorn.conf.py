@@ -0,0 +1,30 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+With MODEL_WARMUP=preload the app, and the spaCy / word-vector / skill
+models with it, is loaded once in the master and shared copy-on-write by
+the forked workers. Per-process threads (translation workers, and pipeline
+workers when PIPELINE_WORKERS is set for development) start after the fork in
+post_fork.
+"""
+
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5050')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+preload_app = os.getenv('MODEL_WARMUP', 'background').lower() == 'preload'
+
+
+def pre_fork(server, worker):
+    # Move the loaded models out of the GC's reach so collections in the
+    # workers do not write to (and un-share) their pages
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import start_background_services
+        start_background_services()
@@ -0,0 +1,74 @@
+-- Migration: Core auto-apply tables in the AI database
+-- Previously created on the fly by ranking.main and the process_cv helpers.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id SERIAL PRIMARY KEY,
+    job_title TEXT,
+    job_description TEXT,
+    vacancy_city TEXT,
+    gender TEXT,
+    nationality TEXT,
+    application_email TEXT,
+    job_date TEXT
+);
+
+-- Older jobs tables predate the nationality column
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS nationality TEXT;
+
+CREATE TABLE IF NOT EXISTS clients (
+    id SERIAL PRIMARY KEY,
+    email TEXT UNIQUE,
+    name TEXT,
+    positions TEXT,
+    skills TEXT,
+    location TEXT,
+    major TEXT,
+    keywords TEXT,
+    gender TEXT,
+    nationality TEXT,
+    degree TEXT,
+    filename TEXT,
+    jobs_to_apply_number INTEGER DEFAULT 0,
+    job_location_based TEXT,
+    job_matching INTEGER DEFAULT 0,
+    fcv_as_string TEXT,
+    phone_number TEXT,
+    date_in TEXT,
+    gpa TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rankings (
+    id SERIAL PRIMARY KEY,
+    client_id TEXT,
+    job_id TEXT,
+    name TEXT,
+    email TEXT,
+    major TEXT,
+    location TEXT,
+    skills TEXT,
+    keywords TEXT,
+    job_title TEXT,
+    job_description TEXT,
+    job_application_email TEXT,
+    filename TEXT,
+    status TEXT DEFAULT 'pending',
+    date TEXT,
+    score REAL,
+    degree TEXT
+);
+
+CREATE TABLE IF NOT EXISTS blocked (
+    id SERIAL PRIMARY KEY,
+    email TEXT,
+    job_title TEXT,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS ProcessedTimestamps (
+    id SERIAL PRIMARY KEY,
+    timestamp TEXT,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- One-off resync of the rankings id sequence (ranking.main used to do this on every run)
+SELECT setval(pg_get_serial_sequence('rankings', 'id'), COALESCE(MAX(id), 1)) FROM rankings;
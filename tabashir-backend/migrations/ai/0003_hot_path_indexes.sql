@@ -0,0 +1,7 @@
+-- Migration: Indexes for per-client lookups on the ranking and apply paths
+
+CREATE INDEX IF NOT EXISTS idx_rankings_email_job ON rankings(email, job_id);
+CREATE INDEX IF NOT EXISTS idx_rankings_client_id ON rankings(client_id);
+CREATE INDEX IF NOT EXISTS idx_clients_email ON clients(email);
+CREATE INDEX IF NOT EXISTS idx_jobs_job_date ON jobs(job_date);
+CREATE INDEX IF NOT EXISTS idx_blocked_email_lower ON blocked(LOWER(email));
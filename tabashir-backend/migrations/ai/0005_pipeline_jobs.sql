@@ -0,0 +1,24 @@
+-- Migration: Durable queue for the /resumes/apply and /resumes/add_client pipeline
+-- Rows are claimed by app.services.job_apply.pipeline workers with FOR UPDATE SKIP LOCKED.
+
+CREATE TABLE IF NOT EXISTS pipeline_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    email TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    current_stage TEXT,
+    stages JSONB NOT NULL DEFAULT '{}'::jsonb,
+    result JSONB NOT NULL DEFAULT '{}'::jsonb,
+    error TEXT,
+    locked_by TEXT,
+    locked_until TIMESTAMP,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_queued ON pipeline_jobs(run_after, created_at) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_running ON pipeline_jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_updated_at ON pipeline_jobs(updated_at);
@@ -0,0 +1,16 @@
+-- Migration: Precomputed per-job text features (app/services/job_apply/job_features.py)
+-- Keyed by job id; content_hash covers title, description and city so edited jobs are recomputed.
+
+CREATE TABLE IF NOT EXISTS job_features (
+    job_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    feature_version INTEGER NOT NULL,
+    title_norm TEXT NOT NULL DEFAULT '',
+    title_tokens TEXT[] NOT NULL DEFAULT '{}',
+    title_terms TEXT[] NOT NULL DEFAULT '{}',
+    is_engineering BOOLEAN NOT NULL DEFAULT FALSE,
+    discipline TEXT NOT NULL DEFAULT '',
+    city_norm TEXT NOT NULL DEFAULT '',
+    skill_key TEXT,
+    computed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,8 @@
+-- Migration: Gazetteer location ids (app/services/job_apply/gazetteer.py)
+-- A job's place and its ancestors live with its other derived features; a client's
+-- preferred places are resolved when the profile is saved.
+
+ALTER TABLE job_features ADD COLUMN IF NOT EXISTS location_ids TEXT[] NOT NULL DEFAULT '{}';
+CREATE INDEX IF NOT EXISTS idx_job_features_location_ids ON job_features USING GIN (location_ids);
+
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS location_ids TEXT[];
@@ -0,0 +1,23 @@
+-- Migration: Cache of request-path match scores (app/services/job_apply/match_cache.py)
+-- Replaces the status = 'cached' pseudo-rows the /jobs endpoint used to add to rankings.
+-- profile_hash and content_hash are the profile and job text a score was computed from;
+-- a changed profile or an edited (or differently translated) job reads as a miss.
+
+CREATE TABLE IF NOT EXISTS match_scores (
+    client_key TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    scoring_version TEXT NOT NULL,
+    profile_hash TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    score DOUBLE PRECISION NOT NULL,
+    title_score DOUBLE PRECISION NOT NULL,
+    skill_score DOUBLE PRECISION NOT NULL,
+    location_score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (client_key, job_id, scoring_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_scores_job_id ON match_scores(job_id);
+
+-- The pseudo-rows made the ranker skip those jobs for the client; drop them so they get ranked
+DELETE FROM rankings WHERE status = 'cached';
@@ -0,0 +1,14 @@
+-- Migration: Incremental ranking (app/services/job_apply/ranking.py)
+-- ingest_seq orders jobs by arrival (ids of synced jobs come from the source and are not
+-- monotonic) and is bumped when a job is edited; a client's watermark is the highest
+-- ingest_seq their last run considered, for the profile it was ranked with.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS ingest_seq BIGSERIAL;
+CREATE INDEX IF NOT EXISTS idx_jobs_ingest_seq ON jobs(ingest_seq);
+
+CREATE TABLE IF NOT EXISTS ranking_watermarks (
+    email TEXT PRIMARY KEY,
+    last_seq BIGINT NOT NULL,
+    profile_hash TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
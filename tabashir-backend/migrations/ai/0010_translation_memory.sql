@@ -0,0 +1,12 @@
+-- Migration: Translation memory for short job fields (app/services/translation_memory.py)
+-- One accepted Arabic translation per field and normalized source text (case, whitespace and
+-- punctuation folded), so "Dubai", "dubai" and "Full-time" / "Full time" reuse one translation.
+
+CREATE TABLE IF NOT EXISTS translation_memory (
+    field TEXT NOT NULL,
+    source_norm TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (field, source_norm)
+);
@@ -0,0 +1,12 @@
+-- Migration: Leased translation queue (app/services/job_translation_worker.py)
+-- Workers on any host claim untranslated jobs with FOR UPDATE SKIP LOCKED and mark them
+-- 'in_progress' until translation_locked_until; a job whose lease expired is claimed again.
+-- Failed jobs are retried with backoff until translation_attempts reaches the configured maximum.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS translation_locked_by TEXT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS translation_locked_until TIMESTAMP;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS translation_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS translation_error TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_translation_queue ON jobs(job_date DESC)
+    WHERE translation_status IS NULL OR translation_status <> 'completed';
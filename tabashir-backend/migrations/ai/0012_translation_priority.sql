@@ -0,0 +1,10 @@
+-- Migration: Translation queue priority (app/services/job_translation_worker.py)
+-- Arabic /jobs pages raise the priority of the untranslated jobs they show instead of
+-- translating them inline, and warm-up raises it for the newest and most-matched jobs.
+-- Workers claim the highest priority first; it is reset once a job is translated.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS translation_priority INTEGER NOT NULL DEFAULT 0;
+
+DROP INDEX IF EXISTS idx_jobs_translation_queue;
+CREATE INDEX IF NOT EXISTS idx_jobs_translation_queue ON jobs(translation_priority DESC, job_date DESC)
+    WHERE translation_status IS NULL OR translation_status <> 'completed';
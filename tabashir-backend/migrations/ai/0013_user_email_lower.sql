@@ -0,0 +1,11 @@
+-- Migration: Case-insensitive "User" email lookup for ranking notifications
+-- The ranker maps client emails to user ids with LOWER(email) = ANY(...), since
+-- "User" rows keep the email as typed at sign-up. "User" is created by the
+-- main app's schema, so the index is only added where the table exists.
+
+DO $$
+BEGIN
+    IF to_regclass('"User"') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_user_email_lower ON "User"(LOWER(email));
+    END IF;
+END $$;
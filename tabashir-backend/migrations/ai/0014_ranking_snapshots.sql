@@ -0,0 +1,11 @@
+-- Migration: Snapshot-safe ranking watermarks (app/services/job_apply/ranking.py)
+-- ingest_seq is taken when a job is inserted, not when it commits, so a job can become
+-- visible after a run has already moved the watermark past its seq. ingest_xid records
+-- the writing transaction; a run stores the xmin of the snapshot it read jobs under, and
+-- the next incremental run also scores every job written by a transaction at or above it.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS ingest_xid xid8;
+ALTER TABLE jobs ALTER COLUMN ingest_xid SET DEFAULT pg_current_xact_id();
+CREATE INDEX IF NOT EXISTS idx_jobs_ingest_xid ON jobs(ingest_xid);
+
+ALTER TABLE ranking_watermarks ADD COLUMN IF NOT EXISTS snapshot_xmin xid8;
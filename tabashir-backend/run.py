@@ -1,6 +1,10 @@
-from app import create_app
+from app import create_app, start_background_services
+from app.config import Config
 
 app = create_app()
 
 if __name__ == '__main__':
+    if Config.MODEL_WARMUP == 'preload':
+        # No gunicorn master here, so start what post_fork would have
+        start_background_services()
     app.run(host="0.0.0.0", port=5050, debug=True)
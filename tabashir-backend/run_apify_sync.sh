@@ -7,7 +7,7 @@ cd /root/resume_api
 source .venv/bin/activate
 
 # Run the Python script
-python app/apify_integration.py
+python -m app.apify_integration
 
 # Log the execution
 echo "Apify sync completed at $(date)" >> /root/resume_api/logs/apify_sync.log
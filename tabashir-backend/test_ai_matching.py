@@ -0,0 +1,64 @@
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.services.job_apply import ai_matching
+from app.services.job_apply.ai_matching import (
+    score_jobs, title_position_match, semantic_location_match, _pair_tfidf_similarity, _tfidf_analyzer
+)
+
+
+PROFILE = {"positions": "Data Analyst, Python Developer", "skills": "python, sql, power bi", "location": "Dubai"}
+
+JOBS = [
+    {"job_title": "Data Analyst", "job_description": "SQL and Power BI reporting", "vacancy_city": "Dubai"},
+    {"job_title": "Senior Python Developer", "job_description": "", "vacancy_city": "Dubai, UAE"},
+    {"job_title": "Programmer", "job_description": "Java services", "vacancy_city": "Abu Dhabi"},
+    {"job_title": "Nurse", "job_description": "ICU ward", "vacancy_city": None},
+    {"job_title": None, "job_description": None, "vacancy_city": "Sharjah"},
+]
+
+
+class TestScoreJobs:
+    """Tests for batch match scoring in ai_matching"""
+
+    def test_pair_tfidf_matches_sklearn(self):
+        """Test the two-document TF-IDF shortcut equals fitting a vectorizer on the pair"""
+        pairs = [("Marketing Executive", "Data Analyst, Python Developer"),
+                 ("Data Scientist", "data analyst"), ("the of", "and")]
+        for job, profile in pairs:
+            got = _pair_tfidf_similarity(Counter(_tfidf_analyzer(job)), Counter(_tfidf_analyzer(profile)))
+            try:
+                matrix = TfidfVectorizer(stop_words='english').fit_transform([job, profile])
+                expected = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
+            except ValueError:
+                expected = None
+            assert got == pytest.approx(expected) if expected is not None else got is None
+
+    def test_batch_equals_single_job_functions(self):
+        """Test score_jobs gives the same weighted percentages as scoring each job alone"""
+        with patch.object(ai_matching, 'calculate_skills_matches', side_effect=lambda texts, skills, keys=None: [0.5] * len(texts)):
+            results = score_jobs(PROFILE, JOBS)
+
+        for job, result in zip(JOBS, results):
+            title = title_position_match(job['job_title'] or '', PROFILE['positions'])
+            location = semantic_location_match(job['vacancy_city'] or '', PROFILE['location'])
+            expected = round(0.4 * title + 0.4 * 0.5 + 0.2 * location, 3)
+            assert result['score'] == expected
+            assert result['percentage'] == int(round(expected * 100, 0))
+
+        assert results[0]['title_score'] == 1.0
+        assert results[2]['title_score'] == 0.7  # related role: programmer -> developer
+
+    def test_custom_fields_and_skill_text_fallback(self):
+        """Test jobs with other key names are scored and titles stand in for missing descriptions"""
+        jobs = [{"title": "Data Analyst", "description": None, "location": "Dubai"}]
+        with patch.object(ai_matching, 'calculate_skills_matches', return_value=[0.0]) as skills:
+            result = score_jobs(PROFILE, jobs, fields={'title': 'title', 'description': 'description', 'location': 'location'})
+
+        assert skills.call_args.args[:2] == (["Data Analyst"], PROFILE['skills'])
+        assert result[0]['title_score'] == 1.0
+        assert result[0]['location_score'] == 1.0
@@ -0,0 +1,146 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from docx import Document
+
+from app.services import arabic_translator
+
+ARABIC = {
+    'Experience': 'الخبرة',
+    'Software Engineer': 'مهندس برمجيات',
+    'Built the payments platform': 'بناء منصة المدفوعات',
+    'Dubai': 'دبي',
+    'January': 'يناير',
+    'Experienced in': 'خبرة في',
+    'Python': 'Python',
+    'and Django': 'و Django',
+}
+
+
+def translate_markup(text):
+    """Translates each tagged part on its own, or the whole text when it has no tags"""
+    if not arabic_translator.MARKUP_TAG.search(text):
+        return ARABIC.get(text.strip(), '')
+    return arabic_translator.MARKUP_TAG.sub(lambda m: f"<r{m[1]}>{ARABIC.get(m[2].strip(), '')}</r{m[1]}>", text)
+
+
+def fake_completion(client, model, messages, call_site, **params):
+    """Answers batch prompts with a JSON object and single-segment prompts with plain text"""
+    content = messages[-1]['content']
+    if messages[0]['content'] == arabic_translator.SEGMENT_PROMPT:
+        return "```json\n" + json.dumps({key: translate_markup(text) for key, text in json.loads(content).items()},
+                                        ensure_ascii=False) + "\n```"
+    return f"ترجمة {content}"
+
+
+@pytest.fixture
+def cv(tmp_path):
+    document = Document()
+    heading = document.add_paragraph()
+    heading.add_run('Experience').bold = True
+    mixed = document.add_paragraph()
+    mixed.add_run('Software Engineer').bold = True
+    mixed.add_run(' ')
+    mixed.add_run('Built the ')
+    mixed.add_run('payments platform')
+    document.add_paragraph('خبرة سابقة')
+    document.add_paragraph('2019 - 2021')
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = 'Dubai'
+    table.cell(0, 1).text = 'Experience'
+    document.add_paragraph('January')
+    path = tmp_path / "cv.docx"
+    document.save(path)
+    return path
+
+
+@pytest.fixture
+def llm():
+    with patch.object(arabic_translator, 'get_openai_client', return_value=(object(), 'm')), \
+            patch.object(arabic_translator, 'cached_chat_completion', side_effect=fake_completion) as completion, \
+            patch.object(arabic_translator, 'lookup_translations', return_value={}) as lookup, \
+            patch.object(arabic_translator, 'store_translations') as store:
+        yield completion, lookup, store
+
+
+class TestDocxTranslation:
+    """Tests for segment-level DOCX translation"""
+
+    def test_whole_paragraphs_are_segments_with_tagged_formatting(self, cv):
+        """Test paragraphs and cells are sent whole, formatting changes are tagged and untranslatable text skipped"""
+        texts = [segment.text for segment in arabic_translator.extract_segments(Document(cv))]
+
+        assert texts == ['Experience', '<r0>Software Engineer </r0><r1>Built the payments platform</r1>',
+                         'Dubai', 'Experience', 'January']
+
+    def test_translations_are_written_into_the_original_runs(self, cv, tmp_path, llm):
+        """Test run formatting and tables survive and each distinct text is sent once"""
+        completion, _, _ = llm
+        output = tmp_path / "cv_ar.docx"
+
+        stats = arabic_translator.translate_docx_to_arabic(cv, output)
+
+        document = Document(output)
+        heading, mixed, arabic, dates = document.paragraphs[:4]
+        assert heading.runs[0].text == 'الخبرة' and heading.runs[0].bold
+        assert [run.text for run in mixed.runs] == ['مهندس برمجيات ', '', 'بناء منصة المدفوعات', '']
+        assert mixed.runs[0].bold and not mixed.runs[2].bold
+        assert (arabic.text, dates.text) == ('خبرة سابقة', '2019 - 2021')
+        assert [cell.text for cell in document.tables[0].rows[0].cells] == ['دبي', 'الخبرة']
+        assert completion.call_count == 1
+        assert (stats['segments'], stats['unique_segments'], stats['untranslated']) == (5, 4, 0)
+
+    def test_batches_run_separately_and_missing_ids_fall_back(self, cv, tmp_path, llm):
+        """Test segments are split across calls and an id left out of a reply is translated alone"""
+        completion, _, _ = llm
+        with patch.dict(ARABIC, {'January': ''}), \
+                patch.object(arabic_translator.Config, 'DOCX_TRANSLATION_SEGMENTS_PER_CALL', 2):
+            stats = arabic_translator.translate_docx_to_arabic(cv, tmp_path / "cv_ar.docx")
+
+        batch_calls = [call for call in completion.call_args_list
+                       if call.args[2][0]['content'] == arabic_translator.SEGMENT_PROMPT]
+        assert stats['batches'] == len(batch_calls) == 2
+        assert Document(tmp_path / "cv_ar.docx").paragraphs[-1].text == 'ترجمة January'
+
+    def test_tagged_parts_follow_the_arabic_order(self, tmp_path, llm):
+        """Test each formatted part lands in its own run, moved to where the translation puts it"""
+        document = Document()
+        paragraph = document.add_paragraph('Experienced in ')
+        paragraph.add_run('Python').bold = True
+        paragraph.add_run(' and Django')
+        path = tmp_path / "skills.docx"
+        document.save(path)
+        completion, _, _ = llm
+        completion.side_effect = lambda client, model, messages, call_site, **params: json.dumps(
+            {"s0": "<r0>خبرة في</r0><r2>Django و</r2><r1>Python</r1>"}, ensure_ascii=False)
+
+        arabic_translator.translate_docx_to_arabic(path, tmp_path / "skills_ar.docx")
+
+        runs = Document(tmp_path / "skills_ar.docx").paragraphs[0].runs
+        assert [run.text for run in runs] == ['خبرة في ', ' Django و', 'Python']
+        assert [bool(run.bold) for run in runs] == [False, False, True]
+
+    def test_lost_tags_put_the_translation_in_the_first_part(self):
+        """Test a reply without the expected tags is still written, into the first group"""
+        document = Document()
+        paragraph = document.add_paragraph('Experienced in ')
+        paragraph.add_run('Python').bold = True
+        segment, = arabic_translator.extract_segments(document)
+
+        arabic_translator.write_segment(segment, 'خبرة في Python')
+
+        assert [run.text for run in paragraph.runs] == ['خبرة في Python ', '']
+
+    def test_boilerplate_comes_from_the_translation_memory(self, cv, tmp_path, llm):
+        """Test remembered headings are not sent and only short, digit-free segments are stored"""
+        completion, lookup, store = llm
+        lookup.return_value = {('cv_segment', 'Experience'): 'الخبرة', ('cv_segment', 'January'): 'يناير'}
+
+        stats = arabic_translator.translate_docx_to_arabic(cv, tmp_path / "cv_ar.docx")
+
+        sent = json.loads(completion.call_args.args[2][-1]['content'])
+        assert set(sent.values()) == {'<r0>Software Engineer </r0><r1>Built the payments platform</r1>', 'Dubai'}
+        assert stats['memory_hits'] == 2
+        stored = [text for call in store.call_args_list for _, text, _ in call.args[0]]
+        assert stored == ['Dubai']
@@ -78,8 +78,9 @@ class TestPrismaDatabase:
         )
         assert conn == mock_conn
 
-    @patch('psycopg2.connect')
-    def test_execute_prisma_query_fetch_one(self, mock_connect):
+    @patch('app.database.db.release_db_connection')
+    @patch('app.database.db.get_db_connection')
+    def test_execute_prisma_query_fetch_one(self, mock_get_conn, mock_release):
         """Test execute_prisma_query fetches one result"""
         from app.database.prisma_db import execute_prisma_query
 
@@ -88,7 +89,7 @@ class TestPrismaDatabase:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_get_conn.return_value = mock_conn
 
         result = execute_prisma_query("SELECT * FROM users WHERE id = %s", params=(1,), fetch_one=True)
 
@@ -96,8 +97,9 @@ class TestPrismaDatabase:
         mock_conn.commit.assert_not_called()
         assert result == {"id": 1, "name": "test"}
 
-    @patch('psycopg2.connect')
-    def test_execute_prisma_query_fetch_all(self, mock_connect):
+    @patch('app.database.db.release_db_connection')
+    @patch('app.database.db.get_db_connection')
+    def test_execute_prisma_query_fetch_all(self, mock_get_conn, mock_release):
         """Test execute_prisma_query fetches all results"""
         from app.database.prisma_db import execute_prisma_query
 
@@ -106,14 +108,15 @@ class TestPrismaDatabase:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_get_conn.return_value = mock_conn
 
         result = execute_prisma_query("SELECT * FROM users", fetch_all=True)
 
         assert result == [{"id": 1}, {"id": 2}]
 
-    @patch('psycopg2.connect')
-    def test_execute_prisma_query_commit(self, mock_connect):
+    @patch('app.database.db.release_db_connection')
+    @patch('app.database.db.get_db_connection')
+    def test_execute_prisma_query_commit(self, mock_get_conn, mock_release):
         """Test execute_prisma_query commits when requested"""
         from app.database.prisma_db import execute_prisma_query
 
@@ -121,17 +124,18 @@ class TestPrismaDatabase:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_get_conn.return_value = mock_conn
 
         result = execute_prisma_query("INSERT INTO users (name) VALUES (%s)", params=("test",), commit=True)
 
         mock_conn.commit.assert_called_once()
         mock_cursor.close.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_release.assert_called_once_with(mock_conn)
 
-    @patch('psycopg2.connect')
-    def test_execute_prisma_query_closes_connection(self, mock_connect):
-        """Test execute_prisma_query properly closes connection on error"""
+    @patch('app.database.db.release_db_connection')
+    @patch('app.database.db.get_db_connection')
+    def test_execute_prisma_query_closes_connection(self, mock_get_conn, mock_release):
+        """Test execute_prisma_query returns the pooled connection on error"""
         from app.database.prisma_db import execute_prisma_query
 
         mock_cursor = MagicMock()
@@ -139,10 +143,10 @@ class TestPrismaDatabase:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        mock_get_conn.return_value = mock_conn
 
         with pytest.raises(Exception):
             execute_prisma_query("SELECT * FROM users", fetch_one=True)
 
         mock_cursor.close.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_release.assert_called_once_with(mock_conn)
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from app.services import cv_processor
+
+
+SECTION_ANSWERS = {
+    "contact information": "['Jane Doe', 'jane@example.com', '050', 'Dubai', '', '', 'Emirati']",
+    "career objective": "Seeking an engineering role",
+    "education experience": "[]",
+    "work experience, return": "[['Acme', 'Engineer', '2020', 'Dubai', ['a', 'b', 'c']]]",
+    "their projects": "[]",
+    "leadership skills": "[]",
+    "key skills": "[['teamwork'], ['python'], []]",
+    "languages": "['English']",
+    "25 main keywords": "['Python']",
+}
+
+
+def fake_chat(messages, llm=None):
+    query = messages[-1]["content"]
+    for marker, answer in SECTION_ANSWERS.items():
+        if marker in query:
+            return answer
+    return "TRANSFORMED CV"
+
+
+class TestCvFormatter:
+    """Tests for concurrent section extraction in cv_formatter"""
+
+    @patch.object(cv_processor, "get_openai_client", return_value=(object(), "model"))
+    @patch.object(cv_processor, "chat_with_model", side_effect=fake_chat)
+    def test_sections_run_against_transformed_cv_only(self, mock_chat, _mock_client):
+        """Test each section request carries only the transformed CV, not earlier answers"""
+        resume = cv_processor.cv_formatter("raw cv", translate_to_english=True)
+
+        section_calls = [call.args[0] for call in mock_chat.call_args_list[1:]]
+        assert len(section_calls) == 9
+        for messages in section_calls:
+            # system, assistant, transformed CV, translation prompt pair, section query
+            assert len(messages) == 6
+            assert messages[2]["content"] == "TRANSFORMED CV"
+            assert "Yes, if and only if" in messages[4]["content"]
+
+        assert resume.header.name == "JANE DOE"
+        assert resume.work[0].company == "Acme"
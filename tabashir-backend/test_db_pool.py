@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import threading
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+from psycopg2.pool import PoolError
+
+from app.database import db
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.alive = True
+        self.pings = 0
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self):
+        conn = self
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+
+        def execute(query, params=None):
+            conn.pings += 1
+            if not conn.alive:
+                raise psycopg2.OperationalError("server closed the connection")
+        cursor.execute.side_effect = execute
+        return cursor
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool(db.ManagedConnectionPool):
+    def _connect(self, key=None):
+        conn = FakeConnection()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
+def pool_settings(idle=30, max_age=1800):
+    return patch.multiple(db.Config, DB_POOL_VALIDATE_IDLE_SECONDS=idle, DB_POOL_MAX_AGE_SECONDS=max_age)
+
+
+class TestPoolValidation:
+    """Tests for idle/max-age based connection validation"""
+
+    def test_recently_used_connection_is_not_pinged(self):
+        """Test a checkout of a fresh connection skips SELECT 1"""
+        pool = FakePool(minconn=1, maxconn=5)
+        with pool_settings():
+            conn = db._checkout(pool)
+            db._release(pool, conn)
+            again = db._checkout(pool)
+
+        assert again is conn
+        assert conn.pings == 0
+
+    def test_idle_connection_is_validated(self):
+        """Test connections idle past the threshold get one SELECT 1"""
+        pool = FakePool(minconn=1, maxconn=5)
+        with pool_settings(idle=-1):
+            conn = db._checkout(pool)
+            db._release(pool, conn)
+            before = pool.stats['validations']
+            db._checkout(pool)
+
+        assert pool.stats['validations'] == before + 1
+
+    def test_dead_connection_purges_idle_pool(self):
+        """Test a failed validation discards every idle connection and returns a new one"""
+        pool = FakePool(minconn=3, maxconn=5)
+        idle = list(pool._pool)
+        for conn in idle:
+            conn.alive = False
+        with pool_settings(idle=-1):
+            conn = db._checkout(pool)
+
+        assert conn not in idle
+        assert all(old.closed for old in idle)
+        assert pool.snapshot()['idle'] == 0 and pool.snapshot()['in_use'] == 1
+
+    def test_reaper_closes_connections_past_max_age(self):
+        """Test the background reaper drops idle connections older than the max age"""
+        pool = FakePool(minconn=2, maxconn=5)
+        idle = list(pool._pool)
+        with pool_settings(max_age=-1):
+            pool.reap()
+
+        assert pool._pool == []
+        assert all(conn.closed for conn in idle)
+
+    def test_connection_past_max_age_is_not_handed_out(self):
+        """Test checkout replaces a connection that has outlived the max age"""
+        pool = FakePool(minconn=1, maxconn=5)
+        with pool_settings():
+            old = db._checkout(pool)
+            db._release(pool, old)
+            pool._meta[old]['created_at'] -= 3600
+            conn = db._checkout(pool)
+
+        assert conn is not old
+        assert old.closed
+
+
+class TestPoolWaiting:
+    """Tests for blocking checkout when every connection is in use"""
+
+    def test_checkout_waits_for_a_released_connection(self):
+        """Test an exhausted pool blocks until a connection comes back and records the wait"""
+        pool = FakePool(minconn=1, maxconn=1)
+        with pool_settings():
+            held = db._checkout(pool)
+            threading.Timer(0.2, db._release, (pool, held)).start()
+            conn = db._checkout(pool)
+
+        assert conn is held
+        assert pool.stats['wait_time_max'] >= 0.15
+
+    def test_checkout_times_out_when_nothing_is_released(self):
+        """Test the wait is bounded and a failed wait does not use up a slot"""
+        pool = FakePool(minconn=1, maxconn=1)
+        with pool_settings(), patch.object(db.Config, 'DB_POOL_ACQUIRE_TIMEOUT_SECONDS', 0.05):
+            held = db._checkout(pool)
+            with pytest.raises(PoolError):
+                db._checkout(pool)
+            db._release(pool, held)
+            assert db._checkout(pool) is held
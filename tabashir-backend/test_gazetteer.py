@@ -0,0 +1,69 @@
+import pandas as pd
+
+from app.services.job_apply.ai_matching import MatchProfile
+from app.services.job_apply.gazetteer import (
+    client_location_ids, city_of, location_ids, locations_match, resolve_location, resolve_locations
+)
+from app.services.job_apply.ranking import check_location_match_fast
+from app.services.job_apply.scoring import JobMatrix
+
+
+class TestGazetteer:
+    """Tests for UAE location normalization"""
+
+    def test_variants_resolve_to_one_id(self):
+        """Test English, Arabic, code and suffixed spellings share a canonical id"""
+        for text in ("Abu Dhabi", "Abu Dhabi, AE", "أبوظبي", "ابو ظبي", "AUH", "abu-dhabi, United Arab Emirates"):
+            assert resolve_location(text) == 'abu-dhabi', text
+        assert resolve_location("رأس الخيمة") == resolve_location("RAK") == 'ras-al-khaimah'
+
+    def test_most_specific_place_and_ancestors(self):
+        """Test districts win over their emirate and carry it as an ancestor"""
+        assert location_ids("Dubai Marina - Dubai") == ['dubai-marina', 'dubai']
+        assert location_ids("Al Ain") == ['al-ain', 'abu-dhabi']
+        assert city_of('jebel-ali') == 'dubai'
+        assert client_location_ids("Dubai, الشارقة") == ['dubai', 'sharjah']
+
+    def test_unknown_locations_resolve_to_nothing(self):
+        """Test places outside the gazetteer and bare country names are left to string matching"""
+        assert resolve_locations("Riyadh") == ()
+        assert resolve_locations("UAE") == ()
+        assert resolve_location("Remote") is None
+
+    def test_hierarchical_matching(self):
+        """Test a job matches a wanted place, anything inside it, or a place containing it"""
+        assert locations_match('dubai-marina', ('dubai',))
+        assert locations_match('dubai', ('dubai-marina',))
+        assert not locations_match('deira', ('dubai-marina',))
+        assert not locations_match('sharjah', ('dubai',))
+
+    def test_matchers_compare_ids(self):
+        """Test the ranker, the columnar scorer and the request-path matcher agree on variants"""
+        assert check_location_match_fast("أبوظبي", "abu dhabi, ae") == 1.0
+        assert check_location_match_fast("sharjah", "dubai") == 0.3
+        assert check_location_match_fast("riyadh", "riyadh, dubai") == 1.0
+
+        matrix = JobMatrix(pd.DataFrame({'id': [1, 2, 3], 'vacancy_city': ['auh', 'dubai', 'riyadh']}))
+        assert matrix.location_scores("abu dhabi", ('abu-dhabi',)).tolist() == [1.0, 0.3, 0.3]
+
+        profile = MatchProfile(location="Dubai")
+        assert profile.location_score("Dubai Marina") == 0.95
+        assert profile.location_score("دبي") == 1.0
+        assert profile.location_score("Sharjah") == 0.2
+
+    def test_jobs_naming_several_places(self):
+        """Test a job listed in several places keeps all of them and matches through any"""
+        assert location_ids("Sharjah / Dubai") == ['sharjah', 'dubai']
+        assert location_ids("Dubai Marina, Dubai / Al Ain") == ['dubai-marina', 'dubai', 'al-ain', 'abu-dhabi']
+
+        assert check_location_match_fast("Sharjah / Dubai", "dubai") == 1.0
+        assert check_location_match_fast("Sharjah / Ajman", "dubai") == 0.3
+        assert check_location_match_fast("Sharjah / Ajman", "sharjah / ajman, fujairah") == 1.0
+
+        matrix = JobMatrix(pd.DataFrame({'id': [1, 2], 'vacancy_city': ['sharjah / dubai', 'sharjah / ajman']}))
+        assert matrix.location_scores("dubai", ('dubai',)).tolist() == [1.0, 0.3]
+
+        profile = MatchProfile(location="Dubai")
+        assert profile.location_score("Sharjah / Dubai") == 1.0
+        assert profile.location_score("Sharjah / Dubai Marina", {'location_ids': location_ids("Sharjah / Dubai Marina")}) == 0.95
+        assert profile.location_score("Sharjah / Ajman") == 0.2
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from app.services.job_apply import ranking
+from app.services.job_apply.ranking import client_profile_hash
+from app.services.job_apply.scoring import score_jobs, JobMatrix
+from test_ranking_scoring import CLIENTS, _build_fixture
+
+
+def _matches(jobs_df, clients_df, existing_matches):
+    return {(match['job_id'], match['email'], match['final_score'])
+            for match in score_jobs((JobMatrix(jobs_df.reset_index(drop=True)), clients_df, existing_matches))}
+
+
+def _run(watermark, profile=CLIENTS[0], full=False, insert_failed=False, loaded_seqs=(110, 120)):
+    """Run _rank_client with the database replaced by mocks"""
+    conn = MagicMock()
+    # pg_snapshot_xmin of the snapshot taken before the jobs are read
+    conn.cursor.return_value.fetchone.return_value = ('900',)
+    jobs_df = pd.DataFrame({'ingest_seq': list(loaded_seqs)})
+    summary = {'matches_inserted': 0, 'insert_failed': insert_failed}
+    with patch.object(ranking, '_load_clients', return_value=pd.DataFrame([profile])), \
+            patch.object(ranking, '_get_watermark', return_value=watermark), \
+            patch.object(ranking, '_load_jobs', return_value=(jobs_df, 'features')) as load_jobs, \
+            patch.object(ranking, '_prepare_jobs'), \
+            patch.object(ranking, '_rank', return_value=summary), \
+            patch.object(ranking, '_set_watermarks') as set_watermark:
+        result = ranking._rank_client(conn, profile['email'], 0, full=full)
+    return result, load_jobs, set_watermark
+
+
+class TestIncrementalRanking:
+    """Tests for watermark-driven incremental ranking"""
+
+    def test_incremental_runs_add_up_to_a_full_run(self):
+        """Test scoring older jobs, then only newer ones, finds the same matches as one full run"""
+        jobs_df, clients_df, existing = _build_fixture(seed=3)
+        full = _matches(jobs_df, clients_df, set(existing))
+
+        first = _matches(jobs_df.iloc[:250], clients_df, set(existing))
+        inserted = existing | {f"{email}_{job_id}" for job_id, email, _ in first}
+        second = _matches(jobs_df.iloc[250:], clients_df, inserted)
+
+        assert first | second == full
+        # Re-scoring the older jobs after they were inserted finds nothing new
+        assert _matches(jobs_df.iloc[:250], clients_df, inserted) == set()
+
+    def test_unchanged_profile_scores_only_jobs_after_the_watermark(self):
+        """Test a matching watermark narrows the job query and then advances to the jobs read"""
+        profile_hash = client_profile_hash(CLIENTS[0])
+        result, load_jobs, set_watermark = _run((95, profile_hash, '850'))
+
+        assert load_jobs.call_args.args[1:] == ("AND (ingest_seq > %s OR ingest_xid >= %s::xid8)", (95, '850'))
+        assert result['incremental'] is True and result['since_seq'] == 95
+        assert set_watermark.call_args.args[1] == [(CLIENTS[0]['email'], 120, profile_hash, '900')]
+
+    def test_watermark_comes_from_the_jobs_read_not_the_table(self):
+        """Test a job committed after the read is not skipped by the next run's watermark"""
+        profile_hash = client_profile_hash(CLIENTS[0])
+        # Nothing new was visible: the mark stays put instead of jumping to a later, uncommitted seq
+        _, _, set_watermark = _run((95, profile_hash, '850'), loaded_seqs=())
+        assert set_watermark.call_args.args[1] == [(CLIENTS[0]['email'], 95, profile_hash, '900')]
+
+        # Only the watermarked snapshot was read before ranking_watermarks got a snapshot_xmin
+        _, load_jobs, _ = _run((95, profile_hash, None))
+        assert load_jobs.call_args.args[2] == (95, None)
+
+    def test_changed_profile_or_full_flag_rescans_the_window(self):
+        """Test a profile edit, a missing watermark or full=True score every job in the window"""
+        stale = (95, client_profile_hash({**CLIENTS[0], 'positions': 'Civil Engineer'}), '850')
+        current = (95, client_profile_hash(CLIENTS[0]), '850')
+        for watermark, full in ((stale, False), (None, False), (current, True)):
+            result, load_jobs, _ = _run(watermark, full=full)
+            assert load_jobs.call_args.args[1:] == ()
+            assert result['incremental'] is False
+
+    def test_failed_insert_keeps_the_watermark(self):
+        """Test jobs are retried on the next run when inserting their matches failed"""
+        _, _, set_watermark = _run((95, client_profile_hash(CLIENTS[0]), '850'), insert_failed=True)
+
+        set_watermark.assert_not_called()
+
+    def test_new_jobs_are_loaded_through_the_primary_key(self):
+        """Test event ranking compares jobs.id to integer ids instead of casting the column"""
+        with patch.object(ranking, 'ai_db_connection'), \
+                patch.object(ranking, '_load_jobs', return_value=(pd.DataFrame(), None)) as load_jobs:
+            assert ranking.rank_new_jobs(['12', 7, None, 'abc', 7]) is None
+
+        assert load_jobs.call_args.args[1:] == ("AND id = ANY(%s::integer[])", ([7, 12],))
+
+
+class TestBatchRanking:
+    """Tests for ranking every active client through the process pool"""
+
+    def test_clients_are_fanned_out_and_watermarked_when_their_task_succeeds(self):
+        """Test each client is ranked once against the shared jobs and failed tasks keep their watermark"""
+        jobs_df, _, _ = _build_fixture(seed=5, job_count=50)
+        jobs_df['ingest_seq'] = range(251, 301)
+        clients = pd.DataFrame(CLIENTS)
+
+        def fake_rank(conn, jobs, clients_df, start_time):
+            # Runs in the worker: the prepared jobs were inherited, not reloaded
+            assert jobs.matrix.size == 50
+            failed = 'acc@example.com' in clients_df['email'].tolist()
+            return {'matches_found': 1, 'matches_inserted': 1, 'pairs_scored': 50 * len(clients_df),
+                    'insert_failed': failed}
+
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = ('900',)
+        progress = MagicMock()
+        with patch.object(ranking, 'ai_db_connection') as connection, \
+                patch.object(ranking, '_load_jobs', return_value=(jobs_df, None)), \
+                patch.object(ranking, '_load_clients', return_value=clients), \
+                patch.object(ranking, '_rank', side_effect=fake_rank), \
+                patch.object(ranking, '_set_watermarks') as set_watermarks:
+            connection.return_value.__enter__.return_value = conn
+            totals = ranking.rank_all_clients(workers=2, clients_per_task=2, progress=progress)
+
+        assert totals['clients_done'] == 5 and totals['failed_tasks'] == 1
+        assert totals['pairs_scored'] == 250
+        assert progress.call_count == 3
+        rows = set_watermarks.call_args.args[1]
+        # mech@ shared its task with acc@, whose insert failed
+        assert {email for email, _, _, _ in rows} == {'eng@example.com', 'data@example.com', 'soft@example.com'}
+        assert {(seq, xmin) for _, seq, _, xmin in rows} == {(300, '900')}
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from app.services.job_apply import job_features
+from app.services.job_apply.job_features import compute_job_features, load_job_features, content_hash
+from app.services.job_apply.ranking import preprocess_text
+from app.services.job_apply.scoring import JobMatrix
+
+
+JOBS = [
+    {"id": 1, "job_title": "  Senior Mechanical Engineer ", "job_description": "HVAC design", "vacancy_city": " Dubai"},
+    {"id": 2, "job_title": "Accountant", "job_description": None, "vacancy_city": "Abu Dhabi"},
+    {"id": 3, "job_title": None, "job_description": "Driver", "vacancy_city": None},
+    {"id": 4, "job_title": "Sales Sales Engineer", "job_description": "", "vacancy_city": "sharjah"},
+]
+
+
+class TestJobFeatures:
+    """Tests for the precomputed per-job feature store"""
+
+    def test_job_matrix_from_features_matches_raw_columns(self):
+        """Test a JobMatrix built from stored features equals one derived from the jobs"""
+        jobs_df = pd.DataFrame(JOBS)
+        for column in ('job_title', 'vacancy_city'):
+            jobs_df[column] = jobs_df[column].apply(preprocess_text)
+
+        derived = JobMatrix(jobs_df)
+        stored = JobMatrix(jobs_df, features=compute_job_features(JOBS))
+
+        assert derived.titles.tolist() == stored.titles.tolist()
+        assert derived.cities.tolist() == stored.cities.tolist()
+        assert np.array_equal(derived.is_engineering, stored.is_engineering)
+        assert derived.disciplines.tolist() == stored.disciplines.tolist()
+        assert sorted(zip(derived.title_tokens.index, derived.title_tokens)) == \
+            sorted(zip(stored.title_tokens.index, stored.title_tokens))
+
+    def test_stored_rows_are_used_only_when_hash_matches(self):
+        """Test features come from the table for unchanged jobs and are recomputed for edited ones"""
+        job_features._cache.clear()
+        computed = compute_job_features(JOBS[:2])
+        stale_hash = content_hash("old title", None, None)
+        stored = {
+            ("1", content_hash(JOBS[0]['job_title'], JOBS[0]['job_description'], JOBS[0]['vacancy_city'])): computed[0],
+            ("2", stale_hash): {**computed[1], 'title_norm': 'stale'},
+        }
+
+        with patch.object(job_features, '_fetch_stored', return_value=stored) as fetch, \
+                patch.object(job_features, 'store_job_features', return_value=1) as store:
+            features = load_job_features(JOBS[:2], store_missing=True)
+            again = load_job_features(JOBS[:2])
+
+        assert features[0] is computed[0]
+        assert features[1]['title_norm'] == 'accountant'
+        assert store.call_args.args[0] == [JOBS[1]]
+        # Second call is served by the in-process cache
+        assert fetch.call_count == 1
+        assert again == features
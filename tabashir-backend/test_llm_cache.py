@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from app.services.llm_cache import LLMCache, DiskCacheBackend, make_cache_key
+
+
+def make_client(*contents):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        MagicMock(choices=[MagicMock(message=MagicMock(content=content))]) for content in contents
+    ]
+    return client
+
+
+class TestLLMCache:
+    """Tests for the content-addressed LLM response cache"""
+
+    def test_key_depends_on_model_temperature_and_messages(self):
+        """Test any change to the request produces a different key"""
+        messages = [{"role": "user", "content": "Dubai"}]
+        base = make_cache_key("m", messages, temperature=0.3)
+
+        assert base == make_cache_key("m", [{"role": "user", "content": "Dubai"}], temperature=0.3)
+        assert base != make_cache_key("other", messages, temperature=0.3)
+        assert base != make_cache_key("m", messages, temperature=0.2)
+        assert base != make_cache_key("m", [{"role": "user", "content": "Sharjah"}], temperature=0.3)
+
+    def test_hit_skips_model_call(self, tmp_path):
+        """Test an identical request is served from disk and counted as a hit"""
+        cache = LLMCache(DiskCacheBackend(tmp_path), ttls={'job_translation': 0}, default_ttl=60)
+        client = make_client("دبي")
+        messages = [{"role": "user", "content": "Dubai"}]
+
+        first = cache.chat_completion(client, "m", messages, 'job_translation', temperature=0.3, timeout=30)
+        second = cache.chat_completion(client, "m", messages, 'job_translation', temperature=0.3, timeout=10)
+
+        assert first == second == "دبي"
+        assert client.chat.completions.create.call_count == 1
+        assert cache.stats()['job_translation'] == {'hits': 1, 'misses': 1, 'bypassed': 0, 'errors': 0}
+
+    def test_expired_entries_are_refetched(self, tmp_path):
+        """Test entries past their TTL count as misses"""
+        cache = LLMCache(DiskCacheBackend(tmp_path), ttls={'cv_parsing': -1}, default_ttl=60)
+        client = make_client("old", "new")
+        messages = [{"role": "user", "content": "cv"}]
+
+        cache.chat_completion(client, "m", messages, 'cv_parsing')
+        assert cache.chat_completion(client, "m", messages, 'cv_parsing') == "new"
+
+    def test_bypass_never_reads_or_writes(self, tmp_path):
+        """Test bypassed call sites always call the model"""
+        cache = LLMCache(DiskCacheBackend(tmp_path), ttls={}, default_ttl=60)
+        client = make_client("letter 1", "letter 2")
+        messages = [{"role": "user", "content": "cover letter"}]
+
+        assert cache.chat_completion(client, "m", messages, 'cover_letter', bypass=True) == "letter 1"
+        assert cache.chat_completion(client, "m", messages, 'cover_letter', bypass=True) == "letter 2"
+        assert cache.stats()['cover_letter']['bypassed'] == 2
+        assert not any(tmp_path.rglob('*.json'))
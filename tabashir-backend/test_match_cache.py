@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock, patch
+
+from app.services.job_apply import ai_matching, match_cache
+from app.services.job_apply.job_features import content_hash
+from app.services.job_apply.match_cache import profile_hash, score_jobs_cached
+from app.services.job_apply.word_vectors import StaticWordVectors
+
+
+PROFILE = {"positions": "Mechanical Engineer", "skills": "HVAC, AutoCAD", "location": "Dubai"}
+JOBS = [
+    {"id": 1, "job_title": "Mechanical Engineer", "job_description": "HVAC design", "vacancy_city": "Dubai"},
+    {"id": 2, "job_title": "Accountant", "job_description": "Ledgers", "vacancy_city": "Abu Dhabi"},
+    {"id": None, "job_title": "Driver", "job_description": "", "vacancy_city": "Dubai"},
+]
+SCORE = {'score': 0.645, 'title_score': 1.0, 'skill_score': 0.3, 'location_score': 0.3}
+
+
+def key(job):
+    return str(job['id']), content_hash(job['job_title'], job['job_description'], job['vacancy_city'])
+
+
+class TestMatchCache:
+    """Tests for the per-client match score cache"""
+
+    def test_hits_are_read_and_misses_scored_and_stored_in_one_upsert(self):
+        """Test cached jobs skip scoring and only the misses with an id are written"""
+        cached = {key(JOBS[0]): match_cache._result(SCORE)}
+        scored = [{**SCORE, 'score': 0.2, 'percentage': 20}, {**SCORE, 'score': 0.1, 'percentage': 10}]
+
+        with patch.object(match_cache, 'fetch_scores', return_value=cached) as fetch, \
+                patch.object(match_cache, 'score_jobs', return_value=scored) as score, \
+                patch.object(match_cache, 'store_scores', return_value=1) as store:
+            results = score_jobs_cached(" User@Example.com", PROFILE, JOBS)
+
+        assert fetch.call_args.args == ("user@example.com", {"1", "2"}, profile_hash(PROFILE))
+        assert score.call_args.args[1] == JOBS[1:]
+        assert store.call_count == 1
+        assert store.call_args.args[2] == {key(JOBS[1]): scored[0]}
+        assert [result['percentage'] for result in results] == [64, 20, 10]
+
+    def test_profile_and_job_edits_change_the_cache_keys(self):
+        """Test the profile hash covers every scored field and edited job text is a different key"""
+        assert profile_hash(PROFILE) != profile_hash({**PROFILE, "location": "Sharjah"})
+        assert profile_hash(PROFILE) == profile_hash(dict(reversed(list(PROFILE.items()))))
+        assert key(JOBS[0]) != key({**JOBS[0], "job_title": "Senior Mechanical Engineer"})
+
+    def test_without_email_or_on_read_errors_jobs_are_just_scored(self):
+        """Test anonymous requests bypass the cache and a failing read still returns scores"""
+        with patch.object(match_cache, 'score_jobs', return_value=['scored']) as score, \
+                patch.object(match_cache, 'fetch_scores') as fetch:
+            assert score_jobs_cached(None, PROFILE, JOBS[:1]) == ['scored']
+        fetch.assert_not_called()
+        score.assert_called_once()
+
+        with patch.object(match_cache, 'fetch_scores', side_effect=RuntimeError("down")), \
+                patch.object(match_cache, 'score_jobs', return_value=[SCORE]), \
+                patch.object(match_cache, 'store_scores', side_effect=RuntimeError("down")):
+            assert score_jobs_cached("user@example.com", PROFILE, JOBS[:1]) == [SCORE]
+
+    def test_version_follows_the_similarity_backend(self, tmp_path):
+        """Test switching spaCy to a built word-vector table, or rebuilding it, changes the cache version"""
+        source = tmp_path / "vectors.vec"
+        source.write_text("2 2\nnurse 1.0 0.0\nengineer 0.0 1.0\n", encoding="utf-8")
+        StaticWordVectors.build(source, tmp_path / "table")
+        table = StaticWordVectors(tmp_path / "table")
+        nlp = MagicMock(meta={'lang': 'en', 'name': 'core_web_sm', 'version': '3.7.1'})
+
+        with patch.object(ai_matching.Config, 'SIMILARITY_BACKEND', 'static'), \
+                patch.object(ai_matching, 'get_nlp', return_value=nlp):
+            with patch.object(ai_matching, 'get_word_vectors', return_value=None):
+                on_spacy = match_cache.cache_version()
+            with patch.object(ai_matching, 'get_word_vectors', return_value=table):
+                on_table = match_cache.cache_version()
+            source.write_text("3 2\nnurse 1.0 0.0\nengineer 0.0 1.0\ndoctor 1.0 1.0\n", encoding="utf-8")
+            StaticWordVectors.build(source, tmp_path / "table")
+            with patch.object(ai_matching, 'get_word_vectors', return_value=StaticWordVectors(tmp_path / "table")):
+                on_rebuilt = match_cache.cache_version()
+
+        assert on_spacy.endswith(".spacy-en_core_web_sm-3.7.1")
+        assert len({on_spacy, on_table, on_rebuilt}) == 3
+        with patch.object(ai_matching.Config, 'SIMILARITY_BACKEND', 'off'):
+            assert match_cache.cache_version().endswith(".off")
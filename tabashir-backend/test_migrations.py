@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock, patch
+from contextlib import contextmanager
+
+import pytest
+
+from app.database import migrations
+
+
+def write(directory, name, sql="SELECT 1;"):
+    (directory / name).write_text(sql)
+
+
+@contextmanager
+def fake_connection(conn):
+    yield conn
+
+
+class TestMigrations:
+    """Tests for the versioned AI database migration runner"""
+
+    def test_shipped_migrations_are_ordered(self):
+        """Test the repository's AI migrations parse and are in version order"""
+        found = migrations.discover_migrations()
+
+        versions = [int(version) for version, _, _ in found]
+        assert versions == sorted(versions)
+        assert versions[0] == 1
+
+    def test_duplicate_versions_are_rejected(self, tmp_path):
+        """Test two files with the same version number fail discovery"""
+        write(tmp_path, "0001_a.sql")
+        write(tmp_path, "0001_b.sql")
+
+        with pytest.raises(ValueError):
+            migrations.discover_migrations(tmp_path)
+
+    def test_only_pending_migrations_run(self, tmp_path):
+        """Test applied versions are skipped and new ones are executed and recorded"""
+        write(tmp_path, "0001_first.sql", "CREATE TABLE a (id int);")
+        write(tmp_path, "0002_second.sql", "CREATE TABLE b (id int);")
+        checksum = migrations._checksum("CREATE TABLE a (id int);")
+
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("0001", "first", checksum)]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        with patch.object(migrations, 'ai_db_connection', lambda: fake_connection(conn)):
+            applied = migrations.run_migrations(tmp_path)
+
+        executed = [call.args[0] for call in cursor.execute.call_args_list]
+        assert applied == ["0002"]
+        assert "CREATE TABLE b (id int);" in executed
+        assert "CREATE TABLE a (id int);" not in executed
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.commands.import_profile import LAZY_MODULES, profile_imports
+from app.services import model_registry
+
+
+@pytest.fixture
+def registry():
+    """Fresh registry state with fake loaders"""
+    loaders = {'fast': MagicMock(return_value='model'), 'missing': MagicMock(side_effect=OSError("not installed"))}
+    with patch.dict(model_registry.LOADERS, loaders, clear=True), \
+            patch.object(model_registry, '_models', {}), \
+            patch.object(model_registry, '_status', {name: {'state': 'cold'} for name in loaders}), \
+            patch.object(model_registry, '_locks', {name: model_registry.threading.Lock() for name in loaders}):
+        yield loaders
+
+
+class TestModelRegistry:
+    """Tests for lazy model loading and readiness"""
+
+    def test_models_load_once_on_first_use(self, registry):
+        """Test a model is loaded on first get_model call and reused afterwards"""
+        assert model_registry.model_status()['ready'] is False
+
+        assert model_registry.get_model('fast') == 'model'
+        assert model_registry.get_model('fast') == 'model'
+
+        assert registry['fast'].call_count == 1
+        assert model_registry.model_status()['models']['fast']['state'] == 'ready'
+
+    def test_unavailable_model_is_not_retried_and_counts_as_ready(self, registry):
+        """Test a failing loader yields None once and does not block readiness"""
+        status = model_registry.warm_models()
+
+        assert model_registry.get_model('missing') is None
+        assert registry['missing'].call_count == 1
+        assert status['models']['missing'] == {'state': 'unavailable', 'seconds': status['models']['missing']['seconds'],
+                                               'error': 'not installed'}
+        assert status['ready'] is True
+
+    def test_startup_does_not_import_lazy_modules(self):
+        """Test importing the app keeps spaCy and sklearn out of start-up"""
+        packages = profile_imports('run')
+
+        assert 'flask' in packages
+        assert not [name for name in LAZY_MODULES if name in packages]
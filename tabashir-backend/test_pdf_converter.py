@@ -0,0 +1,158 @@
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from app.services.pdf_converter import PdfConverterPool, ConversionError, MODE_BRIDGE
+
+
+FAKE_SOFFICE = """#!/bin/sh
+# Minimal stand-in for `soffice --convert-to pdf --outdir DIR FILE`
+outdir=""
+src=""
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --outdir) outdir="$2"; shift ;;
+        -env:*|--*) ;;
+        pdf) ;;
+        *) src="$1" ;;
+    esac
+    shift
+done
+case "$src" in
+    *slow*) sleep 5 ;;
+esac
+name=$(basename "$src" .docx)
+echo "%PDF" > "$outdir/$name.pdf"
+"""
+
+
+# Stand-in for a UNO Python running app/services/uno_bridge.py: logs each start,
+# then answers JSON-lines conversion requests without ever spawning soffice
+FAKE_BRIDGE = """#!{python}
+import json, pathlib, sys, time
+log = pathlib.Path({log!r})
+log.write_text(log.read_text() + "start\\n" if log.exists() else "start\\n")
+print(json.dumps({{"ready": True}}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    if "slow" in request["source"]:
+        time.sleep(5)
+    pathlib.Path(request["target"]).write_text("%PDF")
+    print(json.dumps({{"ok": True}}), flush=True)
+"""
+
+
+@pytest.fixture
+def fake_bridge(tmp_path):
+    path = tmp_path / "uno-python"
+    log = tmp_path / "bridge.log"
+    path.write_text(FAKE_BRIDGE.format(python=sys.executable, log=str(log)))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path), log
+
+
+@pytest.fixture
+def fake_binary(tmp_path):
+    path = tmp_path / "soffice"
+    path.write_text(FAKE_SOFFICE)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+class TestPdfConverterPool:
+    """Tests for the pooled LibreOffice converter (subprocess mode)"""
+
+    def test_convert_creates_pdf_next_to_source(self, tmp_path, fake_binary):
+        """Test a conversion returns the PDF path in the source directory"""
+        docx = tmp_path / "cv.docx"
+        docx.write_bytes(b"docx")
+        pool = PdfConverterPool(size=1, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=10, acquire_timeout=10, mode='subprocess')
+
+        pdf_path = pool.convert(docx)
+
+        assert pdf_path == tmp_path / "cv.pdf"
+        assert pdf_path.exists()
+        assert pool.stats['conversions'] == 1
+
+    def test_each_slot_uses_its_own_profile(self, tmp_path, fake_binary):
+        """Test instances get distinct, per-process profile directories"""
+        pool = PdfConverterPool(size=3, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=10, acquire_timeout=10, mode='subprocess')
+
+        profiles = {instance.profile_dir for instance in pool._instances}
+
+        assert len(profiles) == 3
+        assert all(str(os.getpid()) in str(profile) for profile in profiles)
+
+    def test_timeout_raises_conversion_error(self, tmp_path, fake_binary):
+        """Test a hung conversion is cut off and reported"""
+        docx = tmp_path / "slow.docx"
+        docx.write_bytes(b"docx")
+        pool = PdfConverterPool(size=1, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=1, acquire_timeout=10, mode='subprocess')
+
+        with pytest.raises(ConversionError):
+            pool.convert(docx)
+        assert pool.stats['timeouts'] == 1
+        # The slot is returned to the pool after a failure
+        assert pool._idle.qsize() == 1
+
+    def test_concurrency_is_bounded_by_pool_size(self, tmp_path, fake_binary):
+        """Test callers wait for a free instance instead of spawning more"""
+        pool = PdfConverterPool(size=1, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=10, acquire_timeout=0.2, mode='subprocess')
+        busy = pool._idle.get()
+        try:
+            docx = tmp_path / "cv.docx"
+            docx.write_bytes(b"docx")
+            started = time.time()
+            with pytest.raises(ConversionError):
+                pool.convert(docx)
+            assert time.time() - started >= 0.2
+        finally:
+            pool._idle.put(busy)
+
+
+class TestPdfConverterBridge:
+    """Tests for warm instances driven through the UNO bridge"""
+
+    def test_conversions_reuse_one_running_instance(self, tmp_path, fake_binary, fake_bridge):
+        """Test the pooled path is taken: one instance start serves every conversion"""
+        python, log = fake_bridge
+        pool = PdfConverterPool(size=1, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=10, acquire_timeout=10, mode=MODE_BRIDGE, python=python)
+        pool.warm()
+        try:
+            for name in ("a", "b", "c"):
+                docx = tmp_path / f"{name}.docx"
+                docx.write_bytes(b"docx")
+                assert pool.convert(docx).read_text() == "%PDF"
+        finally:
+            pool.shutdown()
+
+        assert log.read_text().split() == ["start"]
+        assert pool.stats['conversions'] == 3
+
+    def test_hung_instance_is_killed_and_restarted(self, tmp_path, fake_binary, fake_bridge):
+        """Test a timed-out conversion kills the instance and the next one starts a fresh one"""
+        python, log = fake_bridge
+        pool = PdfConverterPool(size=1, binary=fake_binary, profile_root=tmp_path / "profiles",
+                                timeout=1, acquire_timeout=10, mode=MODE_BRIDGE, python=python)
+        pool.warm()
+        try:
+            slow = tmp_path / "slow.docx"
+            slow.write_bytes(b"docx")
+            with pytest.raises(ConversionError):
+                pool.convert(slow)
+            docx = tmp_path / "cv.docx"
+            docx.write_bytes(b"docx")
+            assert pool.convert(docx).exists()
+        finally:
+            pool.shutdown()
+
+        assert pool.stats['timeouts'] == 1 and pool.stats['restarts'] == 1
+        assert log.read_text().split() == ["start", "start"]
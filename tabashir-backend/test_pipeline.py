@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.job_apply import pipeline
+
+
+def make_job(tmp_path, stages=None):
+    resume = tmp_path / "job-1" / "cv.pdf"
+    resume.parent.mkdir()
+    resume.write_bytes(b"%PDF")
+    return {
+        'id': 'job-1',
+        'kind': 'apply',
+        'email': 'form@example.com',
+        'payload': {
+            'email': 'form@example.com', 'resume_path': str(resume), 'nationality': 'uae',
+            'gender': 'male', 'positions': 'engineer', 'locations': 'dubai',
+        },
+        'stages': stages or {name: {'status': 'pending', 'attempts': 0} for name in pipeline.STAGES},
+        'result': {},
+    }
+
+
+def saved_statuses(query):
+    return [call.args[1][0] for call in query.call_args_list if 'SET status = %s' in call.args[0]]
+
+
+class TestPipelineWorker:
+    """Tests for the queued /apply and /add_client pipeline"""
+
+    def test_runs_all_stages_and_cleans_up(self, tmp_path):
+        """Test a job runs process_cv -> rank -> apply with the parsed email and removes its CV"""
+        job = make_job(tmp_path)
+        handlers = {
+            'process_cv': MagicMock(return_value={'email': 'cv@example.com'}),
+            'rank': MagicMock(return_value={'ranked': 3}),
+            'apply': MagicMock(return_value={'applied': 2}),
+        }
+        query = MagicMock()
+
+        with patch.dict(pipeline.STAGE_HANDLERS, handlers), patch.object(pipeline, 'execute_ai_query', query):
+            pipeline.PipelineWorker(threads=1).run_job(job, 'w1')
+
+        assert saved_statuses(query)[-1] == 'succeeded'
+        assert job['email'] == 'cv@example.com'
+        assert job['result'] == {'process_cv': {'email': 'cv@example.com'}, 'rank': {'ranked': 3}, 'apply': {'applied': 2}}
+        assert all(job['stages'][name]['status'] == 'succeeded' for name in pipeline.STAGES)
+        assert not (tmp_path / "job-1").exists()
+
+    def test_failed_stage_is_requeued_without_rerunning_earlier_stages(self, tmp_path):
+        """Test a failing stage schedules a retry and the next run resumes at that stage"""
+        job = make_job(tmp_path)
+        handlers = {
+            'process_cv': MagicMock(return_value={'email': 'cv@example.com'}),
+            'rank': MagicMock(side_effect=[RuntimeError("db down"), {'ranked': 1}]),
+            'apply': MagicMock(return_value={'applied': 1}),
+        }
+        query = MagicMock()
+        worker = pipeline.PipelineWorker(threads=1)
+
+        with patch.dict(pipeline.STAGE_HANDLERS, handlers), patch.object(pipeline, 'execute_ai_query', query), \
+                patch.object(pipeline.Config, 'PIPELINE_STAGE_MAX_ATTEMPTS', 3):
+            worker.run_job(job, 'w1')
+            assert saved_statuses(query)[-1] == 'queued'
+            assert job['stages']['rank']['status'] == 'failed'
+            handlers['apply'].assert_not_called()
+
+            worker.run_job(job, 'w1')
+
+        assert handlers['process_cv'].call_count == 1
+        assert job['stages']['rank']['attempts'] == 2
+        assert saved_statuses(query)[-1] == 'succeeded'
+        assert worker.stats()['stages']['rank']['failures'] == 1
+
+    def test_retry_resets_stage_and_later_stages(self, tmp_path):
+        """Test retrying from rank keeps process_cv and clears rank and apply"""
+        done = {'status': 'succeeded', 'attempts': 1}
+        row = make_job(tmp_path, stages={'process_cv': dict(done), 'rank': dict(done),
+                                         'apply': {'status': 'failed', 'attempts': 3}})
+        row.update(status='failed', result={'process_cv': {'email': 'a'}, 'rank': {'ranked': 1}})
+        query = MagicMock(side_effect=[row, None])
+
+        with patch.object(pipeline, 'execute_ai_query', query):
+            stage = pipeline.retry_pipeline_job('job-1', stage='rank')
+
+        assert stage == 'rank'
+        assert row['stages']['process_cv'] == done
+        assert row['stages']['rank'] == row['stages']['apply'] == {'status': 'pending', 'attempts': 0}
+        assert row['result'] == {'process_cv': {'email': 'a'}}
+
+    def test_retry_rejects_running_job(self, tmp_path):
+        """Test a job that is still running cannot be re-queued"""
+        row = make_job(tmp_path)
+        row['status'] = 'running'
+
+        with patch.object(pipeline, 'execute_ai_query', MagicMock(return_value=row)):
+            with pytest.raises(ValueError):
+                pipeline.retry_pipeline_job('job-1')
@@ -0,0 +1,128 @@
+import random
+
+import pandas as pd
+import pytest
+
+from app.services.job_apply.ranking import process_job_chunk, preprocess_text
+from app.services.job_apply.scoring import score_jobs, JobMatrix
+from app.services.job_apply.title_index import TitleIndex
+
+
+TITLES = [
+    "Mechanical Engineer", "Senior Mechanical Engineer", "Electrical Engineer", "Civil Engineer",
+    "Software Engineer", "Web Engineer", "Engineer", "Project Engineer", "Sales Engineer",
+    "Accountant", "Senior Accountant", "Sales Manager", "Marketing Manager", "Data Analyst",
+    "Business Data Analyst", "HR Officer", "Nurse", "Registered Nurse", "", "IT Engineer",
+    "Quality Engineer", "Petroleum Engineer", "Network Engineer", "Driver", "sales executive",
+]
+CITIES = ["Dubai", "Abu Dhabi", "Sharjah", "Ajman", "Dubai, UAE", "", "Al Ain", "abu dhabi city",
+          "أبوظبي", "Dubai Marina", "AUH", "Riyadh"]
+GENDERS = ["", "any", "male", "female", "male and female"]
+NATIONALITIES = ["", "UAE National", "Emirati only", "any", "Indian", "uae"]
+
+CLIENTS = [
+    {"id": 1, "email": "mech@example.com", "positions": "Mechanical Engineer, Project Engineer",
+     "major": "Mechanical Engineering", "job_location_based": "Dubai, Abu Dhabi", "location": "Dubai",
+     "gender": "male", "nationality": "indian"},
+    {"id": 2, "email": "acc@example.com", "positions": "Senior Accountant, Accountant",
+     "major": "Accounting", "job_location_based": "Sharjah", "location": "Sharjah",
+     "gender": "female", "nationality": "emirati"},
+    {"id": 3, "email": "eng@example.com", "positions": "engineer, sales engineer",
+     "major": "General Engineering", "job_location_based": None, "location": "ajman",
+     "gender": "male", "nationality": "uae"},
+    {"id": 4, "email": "data@example.com", "positions": "Business Data Analyst, Sales Manager",
+     "major": None, "job_location_based": "", "location": "",
+     "gender": "", "nationality": ""},
+    {"id": 5, "email": "soft@example.com", "positions": "Software Engineer",
+     "major": "Software Engineering", "job_location_based": "dubai,", "location": "dubai",
+     "gender": "female", "nationality": "jordanian"},
+]
+
+
+def _build_fixture(seed=7, job_count=400):
+    rng = random.Random(seed)
+    jobs = []
+    for job_id in range(1, job_count + 1):
+        jobs.append({
+            "id": job_id,
+            "job_title": rng.choice(TITLES),
+            "job_description": "",
+            "vacancy_city": rng.choice(CITIES),
+            "gender": rng.choice(GENDERS),
+            "nationality": rng.choice(NATIONALITIES),
+            "application_email": rng.choice(["hr@corp.example", "", None, "jobs@corp.example"]),
+        })
+    jobs_df = pd.DataFrame(jobs)
+    clients_df = pd.DataFrame(CLIENTS)
+
+    # Same preprocessing as ranking.main
+    for col in ['job_title', 'vacancy_city', 'gender', 'nationality']:
+        jobs_df[col] = jobs_df[col].apply(preprocess_text)
+    for col in ['positions', 'job_location_based', 'location', 'gender', 'nationality']:
+        clients_df[col] = clients_df[col].apply(preprocess_text)
+    clients_df['job_location_based'] = clients_df.apply(
+        lambda row: row['job_location_based'] if pd.notna(row['job_location_based']) else row['location'],
+        axis=1
+    )
+
+    existing_matches = {f"{CLIENTS[0]['email']}_{job_id}" for job_id in range(1, job_count, 9)}
+    return jobs_df, clients_df, existing_matches
+
+
+class TestVectorizedScoring:
+    """Parity tests between the columnar scorer and the per-pair reference loop"""
+
+    @pytest.mark.parametrize("seed", [1, 7, 42])
+    def test_matches_reference_implementation(self, seed):
+        """Test score_jobs returns exactly the same matches and scores as process_job_chunk"""
+        chunk = _build_fixture(seed=seed)
+
+        expected = process_job_chunk(chunk)
+        actual = score_jobs(chunk)
+
+        assert len(expected) > 0
+        assert actual == expected
+
+    def test_accepts_prebuilt_job_matrix(self):
+        """Test a JobMatrix can be built once and reused across calls"""
+        jobs_df, clients_df, existing = _build_fixture()
+        matrix = JobMatrix(jobs_df)
+
+        assert score_jobs((matrix, clients_df, existing)) == score_jobs((jobs_df, clients_df, existing))
+
+    def test_empty_inputs(self):
+        """Test no jobs or no clients yields no matches"""
+        jobs_df, clients_df, existing = _build_fixture(job_count=5)
+
+        assert score_jobs((jobs_df.iloc[0:0], clients_df, existing)) == []
+        assert score_jobs((jobs_df, clients_df.iloc[0:0], existing)) == []
+
+
+class TestTitleIndex:
+    """Tests for inverted title index candidate pruning"""
+
+    @pytest.mark.parametrize("seed", [1, 7, 42])
+    def test_pruning_keeps_all_matches(self, seed):
+        """Test scoring only indexed candidates gives the same matches as a full scan"""
+        jobs_df, clients_df, existing = _build_fixture(seed=seed)
+        matrix = JobMatrix(jobs_df)
+        stats = {}
+
+        pruned = score_jobs((matrix, clients_df, existing), index=TitleIndex(matrix), stats=stats)
+
+        assert pruned == score_jobs((matrix, clients_df, existing))
+        assert stats['pruned_pairs'] > 0
+        assert stats['scored_pairs'] + stats['pruned_pairs'] == len(jobs_df) * len(clients_df)
+
+    def test_candidates_by_token_and_discipline(self):
+        """Test candidates come from shared tokens, or disciplines for engineering titles"""
+        jobs_df = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'job_title': ['senior accountant', 'mechanical engineer', 'project engineer', 'nurse'],
+            'application_email': ['a@x.com'] * 4,
+        })
+        index = TitleIndex(JobMatrix(jobs_df))
+
+        assert index.candidates('accountant, project engineer').tolist() == [0, 1, 2]
+        assert index.candidates('accountant, project engineer', 'Mechanical Engineering').tolist() == [0, 1]
+        assert index.candidates('').tolist() == []
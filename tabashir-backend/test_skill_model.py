@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.job_apply import skill_model
+from app.services.job_apply.skill_model import SkillModel, score_skills
+
+
+CORPUS = [
+    "Python developer with Django, PostgreSQL and REST API experience",
+    "Accountant familiar with IFRS, VAT filing and SAP",
+    "Registered nurse, ICU experience, BLS and ACLS certified",
+    "Data analyst: SQL, Python, Power BI dashboards",
+    "Site engineer for civil construction projects, AutoCAD",
+]
+
+
+class TestSkillModel:
+    """Tests for the corpus-level TF-IDF skill matching model"""
+
+    def test_precomputed_vectors_match_fresh_transform(self):
+        """Test scoring known jobs from stored rows equals vectorising them again"""
+        model = SkillModel.fit(CORPUS)
+        skills = "python, sql, django"
+
+        stored = model.score(skills, CORPUS)
+        model.rows = {}
+        fresh = model.score(skills, CORPUS)
+
+        assert np.allclose(stored, fresh)
+        assert stored.argmax() == 0
+        assert stored[1] == 0.0
+
+    def test_unseen_jobs_and_empty_texts(self):
+        """Test jobs outside the corpus are scored and empty texts score zero"""
+        model = SkillModel.fit(CORPUS)
+
+        scores = model.score("sap, vat", ["", "Senior accountant: VAT and SAP", CORPUS[1]])
+
+        assert scores[0] == 0.0
+        assert scores[1] > 0.0
+        assert scores[2] > 0.0
+        assert model.score("", CORPUS).tolist() == [0.0] * len(CORPUS)
+
+    def test_round_trips_through_disk(self, tmp_path):
+        """Test a saved model loads with the same vectors"""
+        model = SkillModel.fit(CORPUS)
+        path = tmp_path / "skill.joblib"
+        model.save(path)
+
+        loaded = SkillModel.load(path)
+
+        assert np.allclose(loaded.score("python", CORPUS), model.score("python", CORPUS))
+
+    def test_falls_back_without_corpus_model(self):
+        """Test scoring still works when the corpus model cannot be built"""
+        with patch.object(skill_model, 'get_skill_model', return_value=None):
+            scores = score_skills("icu nurse", CORPUS)
+
+        assert scores.argmax() == 2
+        assert score_skills("icu nurse", ["", None]).tolist() == [0.0, 0.0]
@@ -0,0 +1,64 @@
+import random
+
+from app.services.job_apply.title_taxonomy import (
+    ENGINEERING_DISCIPLINES, RELATED_ROLE_MAPPINGS, classify_title, major_disciplines, related_roles, title_discipline
+)
+
+WORDS = ['senior', 'audit', 'it', 'process', 'petroleum', 'chemical', 'software', 'web', 'mech', 'mechanical',
+         'engineer', 'engineering', 'developer', 'hr', 'three', 'manager', 'lead', 'sales', 'account', 'analyst',
+         'finance', 'systems', 'control', 'qa', 'oil', 'network', 'head', 'content', 'programmer']
+
+
+def reference_discipline(title):
+    """The keyword loop match_engineering_discipline used to run"""
+    for discipline, keywords in ENGINEERING_DISCIPLINES.items():
+        if any(f"{keyword} engineer" in title for keyword in keywords):
+            return discipline
+    return None
+
+
+def reference_related(job_title, positions):
+    """The related-role loop title_position_match used to run"""
+    for key, related_terms in RELATED_ROLE_MAPPINGS.items():
+        if key in job_title:
+            if any(term in positions for term in related_terms):
+                return True
+        elif any(term in job_title for term in related_terms):
+            if key in positions:
+                return True
+    return False
+
+
+class TestTitleTaxonomy:
+    """Tests for the compiled title taxonomy"""
+
+    def test_matches_reference_loops(self):
+        """Test the compiled scan gives the same disciplines and related roles as the keyword loops"""
+        rng = random.Random(3)
+        for _ in range(3000):
+            title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+            positions = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+
+            assert title_discipline(title) == reference_discipline(title), title
+            assert related_roles(title, positions) == reference_related(title, positions), (title, positions)
+            assert set(major_disciplines(positions)) == {
+                discipline for discipline, keywords in ENGINEERING_DISCIPLINES.items()
+                if any(f"{keyword} engineer" in positions for keyword in keywords)
+            }
+
+    def test_overlapping_keywords_keep_priority(self):
+        """Test the first listed discipline wins when keywords overlap"""
+        assert title_discipline("Petroleum Process Engineer") == 'chemical'
+        assert title_discipline("Audit Engineer") == 'computer'
+        assert title_discipline("Accountant") is None
+
+    def test_seniority_and_families(self):
+        """Test seniority is read from whole words and families from keys and related titles"""
+        info = classify_title("Sr. Mechanical Engineer")
+
+        assert info.discipline == 'mechanical' and info.is_engineering
+        assert info.seniority == 'senior'
+        assert classify_title("Junior Data Analyst").seniority == 'junior'
+        assert classify_title("Leadership Coach").seniority == 'mid'
+        assert classify_title("Python Developer").family_keys == {'developer'}
+        assert related_roles("software programmer", "developer")
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services import translation_memory
+from app.services.translation_memory import is_target_script, normalize
+from app.services.translation_service import JobTranslationService
+
+
+@pytest.fixture
+def completion():
+    """Mocked LLM call"""
+    with patch('app.services.translation_service.get_openai_client', return_value=(object(), 'm')), \
+            patch('app.services.translation_service.cached_chat_completion') as mock:
+        yield mock
+
+
+class TestNormalization:
+    """Tests for translation memory keys and script detection"""
+
+    def test_case_whitespace_and_punctuation_are_folded(self):
+        """Test spelling variants of the same phrase share a key"""
+        assert normalize("Full-time") == normalize("  FULL   time. ") == "full time"
+        assert normalize("Abu Dhabi") == normalize("abu dhabi")
+        assert normalize("Monday - Friday") == "monday friday"
+
+    def test_meaningful_symbols_are_kept(self):
+        """Test symbols that change a term's meaning do not collapse different terms"""
+        assert normalize("C++ Developer") != normalize("C Developer")
+        assert normalize("C# Developer") != normalize("C Developer")
+        assert normalize("$5000") != normalize("5000")
+
+    def test_arabic_text_is_detected(self):
+        """Test fields mostly written in Arabic script need no translation"""
+        assert is_target_script("مهندس برمجيات")
+        assert is_target_script("مهندس برمجيات في Google")
+        assert not is_target_script("Software Engineer")
+        assert not is_target_script("9:00 - 17:00")
+
+
+class TestTranslationMemory:
+    """Tests for reusing stored translations before calling the model"""
+
+    def test_lookup_matches_normalized_source(self):
+        """Test a stored entry is found for any spelling with the same key"""
+        rows = [{'field': 'vacancy_city', 'source_norm': 'abu dhabi', 'translation': 'أبوظبي'}]
+        with patch('app.database.db.execute_ai_query', return_value=rows) as query:
+            found = translation_memory.lookup_translations([('vacancy_city', 'ABU  DHABI'), ('job_title', 'Abu Dhabi'),
+                                                            ('job_description', 'x' * 1000)])
+
+        assert found == {('vacancy_city', 'ABU  DHABI'): 'أبوظبي'}
+        assert query.call_count == 1
+        assert 'x' * 1000 not in str(query.call_args)
+
+    def test_hits_and_arabic_fields_skip_the_model(self, completion):
+        """Test remembered and already-Arabic fields are filled in and only the rest is sent"""
+        completion.return_value = '```json\n{"0": {"job_title": "مهندس برمجيات"}}\n```'
+        job = {'id': 1, 'job_title': 'Software Engineer', 'vacancy_city': 'Dubai', 'working_days': 'Full-time',
+               'company_name': 'شركة الإمارات'}
+        known = {('vacancy_city', 'Dubai'): 'دبي', ('working_days', 'Full-time'): 'دوام كامل'}
+
+        with patch('app.services.translation_service.lookup_translations', return_value=known), \
+                patch('app.services.translation_service.store_translations') as store:
+            service = JobTranslationService(mode='structured', use_memory=True)
+            results, report = service.translate_batch([job])
+
+        assert results == [{'job_title_ar': 'مهندس برمجيات', 'vacancy_city_ar': 'دبي',
+                            'working_days_ar': 'دوام كامل', 'company_name_ar': 'شركة الإمارات'}]
+        prompt = completion.call_args.args[2][0]['content']
+        assert 'Dubai' not in prompt and 'Software Engineer' in prompt
+        assert (report['memory_lookups'], report['memory_hits'], report['script_skips']) == (3, 2, 1)
+        assert service.memory_hit_rate(report) == pytest.approx(2 / 3)
+        store.assert_called_once_with([('job_title', 'Software Engineer', 'مهندس برمجيات')])
+
+    def test_calls_avoided_when_every_field_is_known(self, completion):
+        """Test a job fully served from memory makes no LLM call and counts the calls it saved"""
+        known = {('vacancy_city', 'Dubai'): 'دبي', ('job_title', 'Engineer'): 'مهندس'}
+
+        with patch('app.services.translation_service.lookup_translations', return_value=known), \
+                patch('app.services.translation_service.store_translations'):
+            service = JobTranslationService(mode='per_field', use_memory=True)
+            results, report = service.translate_batch([{'id': 1, 'job_title': 'Engineer', 'vacancy_city': 'Dubai'}])
+
+        assert completion.call_count == 0
+        assert results == [{'job_title_ar': 'مهندس', 'vacancy_city_ar': 'دبي'}]
+        assert (report['calls'], report['calls_avoided']) == (0, 2)
+
+    def test_rejected_translations_are_not_stored(self, completion):
+        """Test a long field returned in English is not remembered"""
+        completion.return_value = "Lead the digital marketing team across the whole region"
+        job = {'id': 1, 'job_title': 'Lead the digital marketing team across the whole region'}
+
+        with patch('app.services.translation_service.lookup_translations', return_value={}), \
+                patch('app.services.translation_service.store_translations') as store:
+            JobTranslationService(mode='per_field', use_memory=True).translate_batch([job])
+
+        store.assert_called_once_with([])
+
+    def test_echoed_short_fields_are_not_stored(self, completion):
+        """Test a short field the model returned unchanged is kept for the job but not remembered"""
+        completion.return_value = '```json\n{"0": {"working_days": "Full-time", "job_title": "مهندس"}}\n```'
+        job = {'id': 1, 'working_days': 'Full-time', 'job_title': 'Engineer'}
+
+        with patch('app.services.translation_service.lookup_translations', return_value={}), \
+                patch('app.services.translation_service.store_translations') as store:
+            results, _ = JobTranslationService(mode='structured', use_memory=True).translate_batch([job])
+
+        assert results[0]['working_days_ar'] == 'Full-time'
+        store.assert_called_once_with([('job_title', 'Engineer', 'مهندس')])
+
+    def test_entries_without_arabic_are_ignored_and_replaced(self):
+        """Test a stored echo is not served, is never written, and gives way to a real translation"""
+        rows = [{'field': 'working_days', 'source_norm': 'full time', 'translation': 'Full-time'}]
+        with patch('app.database.db.execute_ai_query', return_value=rows):
+            assert translation_memory.lookup_translations([('working_days', 'Full-time')]) == {}
+
+        with patch('app.database.db.ai_db_connection') as connection, \
+                patch.object(translation_memory, 'execute_values') as insert:
+            sent = translation_memory.store_translations([('working_days', 'Full-time', 'Full-time'),
+                                                          ('job_type', 'Contract', 'عقد')])
+
+        sql, values = insert.call_args.args[1:3]
+        assert sent == 1 and values == [('job_type', 'contract', 'Contract', 'عقد')]
+        assert 'DO UPDATE' in sql and "translation_memory.translation !~ '[\\u0600-\\u06FF]'" in sql
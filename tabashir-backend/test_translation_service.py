@@ -0,0 +1,97 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.translation_service import JobTranslationService
+
+JOBS = [
+    {'id': 1, 'job_title': 'Software Engineer', 'vacancy_city': 'Dubai', 'salary': ''},
+    {'id': 2, 'job_title': 'Marketing Manager', 'job_description': 'Lead the digital marketing team across the region'},
+]
+
+
+@pytest.fixture
+def completion():
+    """Mocked LLM call; per-field prompts get a fixed Arabic answer"""
+    with patch('app.services.translation_service.get_openai_client', return_value=(object(), 'm')), \
+            patch('app.services.translation_service.Config.TRANSLATION_MEMORY', False), \
+            patch('app.services.translation_service.cached_chat_completion') as mock:
+        yield mock
+
+
+def structured_reply(payload):
+    return "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```"
+
+
+class TestStructuredTranslation:
+    """Tests for translating all job fields in one structured call"""
+
+    def test_several_jobs_share_one_call(self, completion):
+        """Test every non-empty field of every job is sent and read back from a single request"""
+        completion.return_value = structured_reply({
+            "0": {"job_title": "مهندس برمجيات", "vacancy_city": "Dubai"},
+            "1": {"job_title": "مدير تسويق", "job_description": "قيادة فريق التسويق الرقمي في المنطقة"},
+        })
+        service = JobTranslationService(mode='structured')
+
+        results = service.translate_jobs(JOBS)
+
+        assert completion.call_count == 1
+        prompt = completion.call_args.args[2][0]['content']
+        assert '"salary"' not in prompt and 'Software Engineer' in prompt
+        assert results == [
+            {'job_title_ar': 'مهندس برمجيات', 'vacancy_city_ar': 'Dubai'},
+            {'job_title_ar': 'مدير تسويق', 'job_description_ar': 'قيادة فريق التسويق الرقمي في المنطقة'},
+        ]
+        stats = service.stats()['structured']
+        assert (stats['jobs'], stats['calls'], stats['fields'], stats['fallback_fields']) == (2, 1, 4, 0)
+
+    def test_missing_and_untranslated_fields_fall_back_per_field(self, completion):
+        """Test a field left out or returned in English is retried with its own call"""
+        completion.side_effect = [
+            structured_reply({
+                "0": {"job_title": "مهندس برمجيات", "vacancy_city": "دبي"},
+                "1": {"job_description": "Lead the digital marketing team across the region"},
+            }),
+            "مدير تسويق",
+            "قيادة فريق التسويق",
+        ]
+
+        results = JobTranslationService(mode='structured').translate_jobs(JOBS)
+
+        assert completion.call_count == 3
+        assert results[1] == {'job_title_ar': 'مدير تسويق', 'job_description_ar': 'قيادة فريق التسويق'}
+
+    def test_invalid_json_falls_back_for_every_field(self, completion):
+        """Test an unparseable reply still yields translations through the per-field path"""
+        completion.side_effect = ["Sorry, here is the translation: مهندس"] + ["ترجمة"] * 4
+
+        service = JobTranslationService(mode='structured')
+        results = service.translate_jobs(JOBS)
+
+        assert completion.call_count == 5
+        assert all(value == 'ترجمة' for result in results for value in result.values())
+        assert service.stats()['structured']['fallback_fields'] == 4
+
+    def test_batches_respect_jobs_per_call(self, completion):
+        """Test jobs are split across calls once the per-call job budget is reached"""
+        completion.side_effect = [structured_reply({"0": {"job_title": "مهندس"}, "1": {"job_title": "مهندس"}}),
+                                  structured_reply({"0": {"job_title": "مهندس"}})]
+        jobs = [{'id': index, 'job_title': 'Engineer'} for index in range(3)]
+
+        with patch('app.services.translation_service.Config.TRANSLATION_JOBS_PER_CALL', 2):
+            results = JobTranslationService(mode='structured').translate_jobs(jobs)
+
+        assert completion.call_count == 2
+        assert results == [{'job_title_ar': 'مهندس'}] * 3
+
+    def test_per_field_mode_makes_one_call_per_field(self, completion):
+        """Test the per-field path is kept for comparison"""
+        completion.return_value = "ترجمة"
+
+        service = JobTranslationService(mode='per_field')
+        service.translate_jobs(JOBS)
+
+        assert completion.call_count == 4
+        assert service.throughput() > 0
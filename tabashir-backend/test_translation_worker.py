@@ -0,0 +1,156 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from app.services import job_translation_worker
+from app.services.job_translation_worker import JobTranslationWorker
+
+
+class FakeQueue:
+    """In-memory stand-in for the jobs table's claim, renew and save statements"""
+
+    def __init__(self, job_ids):
+        self.rows = {job_id: {'status': 'pending', 'locked_by': None} for job_id in job_ids}
+        self.saves = []
+        self.lock = threading.Lock()
+
+    def __call__(self, query, params=None, fetch_one=False, fetch_all=False, commit=False):
+        with self.lock:
+            if 'FOR UPDATE SKIP LOCKED' in query:
+                claimed = [job_id for job_id, row in self.rows.items() if row['status'] == 'pending'][:params['limit']]
+                for job_id in claimed:
+                    self.rows[job_id].update(status='in_progress', locked_by=params['worker_id'])
+                return [{'id': job_id, 'translation_attempts': 1, 'job_title': 'Engineer', 'job_title_ar': None}
+                        for job_id in claimed]
+            if 'RETURNING id' in query:
+                status, job_id, worker_id = params[-4], params[-2], params[-1]
+                if self.rows[job_id]['locked_by'] != worker_id:
+                    return None
+                self.rows[job_id].update(status=status, locked_by=None)
+                self.saves.append((job_id, worker_id))
+                return {'id': job_id}
+            return None
+
+
+def fake_service(delay=0.0):
+    service = MagicMock(mode='structured')
+    service.is_translation_needed.return_value = True
+    service.throughput.return_value = 0.0
+
+    def translate_batch(jobs):
+        time.sleep(delay)
+        return [{'job_title_ar': 'مهندس'} for _ in jobs], None
+
+    service.translate_batch.side_effect = translate_batch
+    return service
+
+
+class TestTranslationQueue:
+    """Tests for leased, concurrent job translation"""
+
+    def test_concurrent_workers_translate_each_job_once(self):
+        """Test several threads drain the queue without translating or saving any job twice"""
+        queue = FakeQueue(range(40))
+        worker = JobTranslationWorker(batch_size=3, threads=4, poll_interval=0.01)
+        worker.translation_service = fake_service(delay=0.005)
+
+        with patch.object(job_translation_worker, 'execute_ai_query', queue), \
+                patch.object(job_translation_worker.Config, 'TRANSLATION_WARM_JOBS', 0):
+            worker.start()
+            deadline = time.time() + 5
+            while len(queue.saves) < 40 and time.time() < deadline:
+                time.sleep(0.01)
+            worker.stop()
+
+        translated = [job['id'] for call in worker.translation_service.translate_batch.call_args_list
+                      for job in call.args[0]]
+        assert sorted(translated) == list(range(40))
+        assert sorted(job_id for job_id, _ in queue.saves) == list(range(40))
+        assert len({worker_id for _, worker_id in queue.saves}) > 1
+        assert all(row['status'] == 'completed' for row in queue.rows.values())
+
+    def test_each_job_commits_on_its_own_and_lost_leases_are_not_saved(self):
+        """Test translations are written per job, guarded by the worker's lease"""
+        queue = FakeQueue([1, 2])
+        worker = JobTranslationWorker(batch_size=2, threads=1)
+        worker.translation_service = fake_service()
+
+        def steal_job_2(jobs):
+            queue.rows[2]['locked_by'] = 'other-worker'
+            return [{'job_title_ar': 'مهندس'} for _ in jobs], None
+
+        worker.translation_service.translate_batch.side_effect = steal_job_2
+        with patch.object(job_translation_worker, 'execute_ai_query', queue):
+            claimed = worker.translate_pending_jobs('w1')
+
+        assert claimed == 2
+        assert queue.saves == [(1, 'w1')]
+        assert queue.rows[2]['status'] == 'in_progress'
+
+    def test_claim_uses_skip_locked_and_a_lease(self):
+        """Test the claim statement skips rows other workers hold and sets a lease"""
+        query = MagicMock(return_value=[])
+        with patch.object(job_translation_worker, 'execute_ai_query', query), \
+                patch.object(job_translation_worker.Config, 'TRANSLATION_LEASE_SECONDS', 120):
+            assert JobTranslationWorker(threads=1).translate_job_immediately(7) is False
+
+        sql, params = query.call_args.args
+        assert 'FOR UPDATE SKIP LOCKED' in sql and 'translation_locked_until' in sql
+        assert (params['lease'], params['job_id'], params['limit']) == (120, 7, 1)
+        assert query.call_args.kwargs == {'fetch_all': True, 'commit': True}
+
+    def test_job_without_translations_is_marked_failed(self):
+        """Test a job whose fields all failed is released as failed for a later retry"""
+        queue = FakeQueue([1])
+        worker = JobTranslationWorker(threads=1)
+        worker.translation_service = fake_service()
+        worker.translation_service.translate_batch.side_effect = lambda jobs: ([{} for _ in jobs], None)
+
+        with patch.object(job_translation_worker, 'execute_ai_query', queue):
+            worker.translate_pending_jobs('w1')
+
+        assert queue.rows[1]['status'] == 'failed'
+
+    def test_claims_highest_priority_first(self):
+        """Test requested jobs are claimed before the newest-first backlog"""
+        query = MagicMock(return_value=[])
+        with patch.object(job_translation_worker, 'execute_ai_query', query):
+            JobTranslationWorker(threads=1).translate_pending_jobs('w1')
+
+        sql = query.call_args.args[0]
+        assert sql.index('translation_priority DESC') < sql.index("NULLIF(job_date, 'Nan') DESC")
+
+
+class TestTranslationRequests:
+    """Tests for queueing translations from the request path instead of translating inline"""
+
+    def test_request_raises_priority_of_untranslated_jobs_only(self):
+        """Test a page's jobs are bumped in one statement that skips completed ones"""
+        query = MagicMock(return_value=[{'id': 3}])
+        with patch.object(job_translation_worker, 'execute_ai_query', query):
+            raised = job_translation_worker.request_translation(['3', 4])
+
+        sql, params = query.call_args.args
+        assert raised == 1
+        assert "translation_status <> 'completed'" in sql
+        assert params == (job_translation_worker.PRIORITY_REQUESTED, [3, 4], job_translation_worker.PRIORITY_REQUESTED)
+
+    def test_empty_request_does_not_query(self):
+        """Test a fully translated page costs nothing"""
+        query = MagicMock()
+        with patch.object(job_translation_worker, 'execute_ai_query', query):
+            assert job_translation_worker.request_translation([]) == 0
+        query.assert_not_called()
+
+    def test_warm_up_targets_newest_and_most_matched_jobs(self):
+        """Test warm-up queues recent and frequently ranked jobs below explicit requests"""
+        query = MagicMock(return_value=[{'id': 1}, {'id': 2}])
+        with patch.object(job_translation_worker, 'execute_ai_query', query):
+            assert job_translation_worker.warm_translations(limit=50) == 2
+            assert job_translation_worker.warm_translations(limit=0) == 0
+
+        sql, params = query.call_args.args
+        assert query.call_count == 1
+        assert 'FROM rankings GROUP BY job_id' in sql and "NULLIF(job_date, 'Nan') DESC" in sql
+        assert params == {'priority': job_translation_worker.PRIORITY_WARM, 'limit': 50}
+        assert job_translation_worker.PRIORITY_WARM < job_translation_worker.PRIORITY_REQUESTED
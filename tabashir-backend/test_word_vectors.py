@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.services import model_registry
+from app.services.job_apply import ai_matching
+from app.services.job_apply.ai_matching import MatchProfile, semantic_similarity
+from app.services.job_apply.word_vectors import StaticWordVectors
+
+
+EMBEDDINGS = """4 3
+developer 1.0 0.1 0.0
+engineer 0.9 0.2 0.0
+software 0.8 0.0 0.1
+nurse 0.0 1.0 0.0
+Dubai 0.0 0.0 1.0
+dubai 0.5 0.5 0.5
+"""
+
+
+@pytest.fixture
+def table(tmp_path):
+    source = tmp_path / "vectors.vec"
+    source.write_text(EMBEDDINGS, encoding="utf-8")
+    StaticWordVectors.build(source, tmp_path / "table")
+    return StaticWordVectors(tmp_path / "table")
+
+
+class TestStaticWordVectors:
+    """Tests for the memory-mapped word-vector similarity backend"""
+
+    def test_build_sorts_normalises_and_memory_maps(self, table):
+        """Test the table is sorted, unit-length, lowercased and opened read-only"""
+        assert list(table.words) == ["developer", "dubai", "engineer", "nurse", "software"]
+        assert np.allclose(np.linalg.norm(table.vectors, axis=1), 1.0)
+        assert isinstance(table.vectors, np.memmap)
+        # First spelling wins when words differ only by case
+        assert np.allclose(table.vectors[table.row("dubai")], [0.0, 0.0, 1.0])
+        assert table.row("accountant") is None
+
+    def test_similarity(self, table):
+        """Test related texts score higher and unknown words give None"""
+        close = table.similarity("Software Developer", "software engineer")
+        far = table.similarity("Software Developer", "Nurse")
+
+        assert close > 0.9
+        assert far < close
+        assert table.similarity("Software Developer", "Software Developer") == pytest.approx(1.0)
+        assert table.similarity("Accountant", "Nurse") is None
+
+    def test_matcher_uses_configured_backend(self, table):
+        """Test title/location fallbacks use the static table and skip it when off"""
+        profile = MatchProfile(positions="software developer", location="Dubai")
+        with patch.object(ai_matching, 'get_word_vectors', return_value=table), \
+                patch.object(ai_matching.Config, 'SIMILARITY_BACKEND', 'static'):
+            assert semantic_similarity("nurse", "engineer") == pytest.approx(table.similarity("nurse", "engineer"))
+            assert profile.location_score("Nurse") == pytest.approx(0.0)
+            assert profile.title_score("Engineer") > 0.3
+
+        with patch.object(ai_matching.Config, 'SIMILARITY_BACKEND', 'off'):
+            assert semantic_similarity("nurse", "engineer") is None
+            assert profile.location_score("Nurse") == 0.2
+
+    def test_missing_table_falls_back_to_spacy(self):
+        """Test the static backend without a built table keeps the spaCy similarity and says so"""
+        nlp = lambda text: MagicMock(similarity=lambda other: 0.42)
+        ai_matching.get_spacy_doc.cache_clear()
+        with patch.object(ai_matching, 'get_word_vectors', return_value=None), \
+                patch.object(ai_matching, 'get_nlp', return_value=nlp), \
+                patch.object(ai_matching.Config, 'SIMILARITY_BACKEND', 'static'):
+            assert semantic_similarity("nurse", "engineer") == 0.42
+        ai_matching.get_spacy_doc.cache_clear()
+
+        models = {'word_vectors': {'state': 'unavailable', 'error': 'not built'}, 'spacy': {'state': 'ready'}}
+        with patch.object(model_registry, '_status', models), \
+                patch.object(model_registry.Config, 'SIMILARITY_BACKEND', 'static'):
+            similarity = model_registry.model_status()['similarity']
+        assert (similarity['configured'], similarity['active']) == ('static', 'spacy')
+        assert 'word vectors' in similarity['warning']